@@ -0,0 +1,754 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Track the throughput of tike on synthetic data.
+
+Each benchmark creates its own synthetic inputs of a named size, so no test
+data are needed. Operators are benchmarked with either the NumPy (CPU) or
+CuPy (GPU) backend; benchmarks which are not available for a backend, or
+whose backend cannot be loaded, are recorded as skipped. A benchmark which
+cannot import tike or its dependencies is recorded as failed, and the run
+exits with an error, so missing results are never mistaken for skipped ones.
+The results are saved as JSON, so runs with different releases of tike may be
+compared.
+
+Run the suite with the CPU operators and save the results::
+
+    python benchmark.py run --backend numpy --size small medium -o new.json
+
+Compare two runs; exit with an error if the throughput of any benchmark
+dropped by more than 10 percent::
+
+    python benchmark.py compare old.json new.json --threshold 0.1
+
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import datetime
+import importlib
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import typing
+
+import numpy as np
+
+import tike
+
+SIZES = {
+    'small':
+        dict(
+            num_position=256,
+            num_mode=1,
+            probe_width=32,
+            lamino_width=16,
+            num_angle=16,
+            num_cluster_position=10_000,
+            num_cluster=16,
+            num_frame=256,
+            frame_width=128,
+        ),
+    'medium':
+        dict(
+            num_position=2048,
+            num_mode=2,
+            probe_width=64,
+            lamino_width=32,
+            num_angle=64,
+            num_cluster_position=100_000,
+            num_cluster=64,
+            num_frame=1024,
+            frame_width=256,
+        ),
+    'large':
+        dict(
+            num_position=8192,
+            num_mode=4,
+            probe_width=128,
+            lamino_width=64,
+            num_angle=128,
+            num_cluster_position=500_000,
+            num_cluster=256,
+            num_frame=4096,
+            frame_width=512,
+        ),
+}
+"""The parameters of the synthetic data for each size."""
+
+
+@dataclasses.dataclass
+class Backend():
+    """The array module and operators used by a benchmark."""
+    name: str
+    xp: typing.Any
+    operators: typing.Any
+    synchronize: typing.Callable[[], None]
+
+
+def load_backend(name: str) -> Backend:
+    """Return the named backend; raise ImportError if it is unavailable."""
+    if name == 'numpy':
+        return Backend(
+            name='numpy',
+            xp=np,
+            operators=importlib.import_module('tike.operators.numpy'),
+            synchronize=lambda: None,
+        )
+    if name == 'cupy':
+        import cupy as cp
+        try:
+            if cp.cuda.runtime.getDeviceCount() < 1:
+                raise ImportError("No CUDA devices are available.")
+        except cp.cuda.runtime.CUDARuntimeError as error:
+            raise ImportError(str(error)) from error
+        return Backend(
+            name='cupy',
+            xp=cp,
+            operators=importlib.import_module('tike.operators.cupy'),
+            synchronize=lambda: cp.cuda.Device().synchronize(),
+        )
+    raise ValueError(f"{name} is not a backend; choose numpy or cupy.")
+
+
+@dataclasses.dataclass
+class Benchmark():
+    """A named workload and the backends which it supports.
+
+    The setup is a context manager which is given the backend and the size
+    parameters. It yields a function which runs the workload once and the
+    number of items (e.g. patterns or positions) processed by each run.
+    Backends of None means that the workload only uses the host.
+    """
+    name: str
+    unit: str
+    setup: typing.Callable
+    backends: typing.Union[typing.Tuple[str, ...], None]
+
+
+benchmarks: typing.List[Benchmark] = []
+
+
+def benchmark(
+    name: str,
+    unit: str,
+    backends: typing.Union[typing.Tuple[str, ...], None] = ('numpy', 'cupy'),
+):
+    """Register a generator function as the setup of a benchmark."""
+
+    def decorator(setup):
+        benchmarks.append(
+            Benchmark(name, unit, contextlib.contextmanager(setup), backends))
+        return setup
+
+    return decorator
+
+
+def _random_complex(xp, *shape, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.random(shape, dtype='float32') + 1j * rng.random(
+        shape, dtype='float32')
+    return xp.asarray(x.astype('complex64'))
+
+
+def _random_positions(size: dict, width: int, seed=0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.random((size['num_position'], 2)) *
+            (width - size['probe_width'] - 2) + 1).astype('float32')
+
+
+def _object_width(size: dict) -> int:
+    return int(np.sqrt(size['num_position']) * size['probe_width'] / 4 +
+               size['probe_width'])
+
+
+# Operators
+
+
+@benchmark('operators.Patch.fwd', unit='patches')
+def _patch_fwd(backend: Backend, size: dict):
+    width = _object_width(size)
+    operator = backend.operators.Patch()
+    images = _random_complex(backend.xp, 1, width, width)
+    positions = backend.xp.asarray(_random_positions(size, width)[None])
+    with operator:
+        yield (
+            lambda: operator.fwd(
+                images=images,
+                positions=positions,
+                patch_width=size['probe_width'],
+                nrepeat=size['num_mode'],
+            ),
+            size['num_position'] * size['num_mode'],
+        )
+
+
+@benchmark('operators.Patch.adj', unit='patches')
+def _patch_adj(backend: Backend, size: dict):
+    width = _object_width(size)
+    operator = backend.operators.Patch()
+    patches = _random_complex(
+        backend.xp,
+        1,
+        size['num_position'] * size['num_mode'],
+        size['probe_width'],
+        size['probe_width'],
+    )
+    positions = backend.xp.asarray(_random_positions(size, width)[None])
+    with operator:
+        yield (
+            lambda: operator.adj(
+                patches=patches,
+                positions=positions,
+                height=width,
+                width=width,
+                nrepeat=size['num_mode'],
+            ),
+            size['num_position'] * size['num_mode'],
+        )
+
+
+def _propagation(backend: Backend, size: dict, direction: str):
+    operator = backend.operators.Propagation(
+        detector_shape=size['probe_width'])
+    wave = _random_complex(
+        backend.xp,
+        size['num_position'],
+        1,
+        size['num_mode'],
+        size['probe_width'],
+        size['probe_width'],
+    )
+    with operator:
+        yield (
+            lambda: getattr(operator, direction)(wave),
+            size['num_position'] * size['num_mode'],
+        )
+
+
+@benchmark('operators.Propagation.fwd', unit='wavefronts')
+def _propagation_fwd(backend: Backend, size: dict):
+    yield from _propagation(backend, size, 'fwd')
+
+
+@benchmark('operators.Propagation.adj', unit='wavefronts')
+def _propagation_adj(backend: Backend, size: dict):
+    yield from _propagation(backend, size, 'adj')
+
+
+def _usfft_inputs(backend: Backend, size: dict):
+    n = size['lamino_width']
+    rng = np.random.default_rng(0)
+    x = backend.xp.asarray(
+        rng.random((size['num_angle'] * n * n, 3), dtype='float32') - 0.5)
+    usfft = importlib.import_module(f'tike.operators.{backend.name}.usfft')
+    return n, x, usfft
+
+
+@benchmark('operators.usfft.gather', unit='points')
+def _usfft_gather(backend: Backend, size: dict):
+    n, x, usfft = _usfft_inputs(backend, size)
+    f = _random_complex(backend.xp, n, n, n)
+    yield (
+        lambda: usfft.eq2us(f, x, n, 1e-3, backend.xp),
+        len(x),
+    )
+
+
+@benchmark('operators.usfft.scatter', unit='points')
+def _usfft_scatter(backend: Backend, size: dict):
+    n, x, usfft = _usfft_inputs(backend, size)
+    f = _random_complex(backend.xp, len(x))
+    yield (
+        lambda: usfft.us2eq(f, x, n, 1e-3, backend.xp),
+        len(x),
+    )
+
+
+def _bucket(backend: Backend, size: dict, direction: str):
+    n = size['lamino_width']
+    operator = backend.operators.Bucket(n=n, tilt=np.pi / 3)
+    theta = backend.xp.linspace(0, np.pi, size['num_angle'], dtype='float32')
+    grid = backend.xp.asarray(
+        operator._make_grid().reshape(n**3, 3),
+        dtype='int16',
+    )
+    with operator:
+        if direction == 'fwd':
+            u = _random_complex(backend.xp, n, n, n)
+            run = lambda: operator.fwd(u=u, theta=theta, grid=grid)
+        else:
+            data = _random_complex(backend.xp, size['num_angle'], n, n)
+            run = lambda: operator.adj(data=data, theta=theta, grid=grid)
+        yield run, size['num_angle']
+
+
+@benchmark('operators.Bucket.fwd', unit='projections', backends=('cupy',))
+def _bucket_fwd(backend: Backend, size: dict):
+    yield from _bucket(backend, size, 'fwd')
+
+
+@benchmark('operators.Bucket.adj', unit='projections', backends=('cupy',))
+def _bucket_adj(backend: Backend, size: dict):
+    yield from _bucket(backend, size, 'adj')
+
+
+# Clustering
+
+
+def _fly_scan(num_position: int, seed=0) -> np.ndarray:
+    """Return the positions of a jittered spiral fly scan."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 400 * np.pi, num_position)
+    r = np.sqrt(t)
+    return np.stack(
+        [r * np.cos(t), r * np.sin(t)],
+        axis=-1,
+    ) + rng.normal(scale=0.01, size=(num_position, 2))
+
+
+@benchmark('cluster.wobbly_center', unit='positions', backends=None)
+def _wobbly_center(backend: None, size: dict):
+    import tike.cluster
+    scan = _fly_scan(size['num_cluster_position'])
+    yield (
+        lambda: tike.cluster.wobbly_center(scan, size['num_cluster']),
+        len(scan),
+    )
+
+
+@benchmark('cluster.compact', unit='positions', backends=None)
+def _compact(backend: None, size: dict):
+    import tike.cluster
+    # Compact clustering is quadratic in the number of clusters
+    scan = _fly_scan(size['num_cluster_position'] // 10)
+    yield (
+        lambda: tike.cluster.compact(scan, size['num_cluster']),
+        len(scan),
+    )
+
+
+@benchmark('cluster.stripes_equal_count', unit='positions', backends=None)
+def _stripes(backend: None, size: dict):
+    import tike.cluster
+    scan = _fly_scan(size['num_cluster_position'])
+    yield (
+        lambda: tike.cluster.stripes_equal_count(scan, size['num_cluster']),
+        len(scan),
+    )
+
+
+# Solvers
+
+
+# Reconstruction and its solvers call CuPy directly, so they cannot run on
+# CPU workers yet.
+def _ptycho_epoch(backend: Backend, size: dict, options: str):
+    import tike.ptycho
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(0)
+    width = size['probe_width']
+    probe = tike.ptycho.probe.gaussian(width) * np.exp(
+        2j * np.pi * rng.random((1, 1, size['num_mode'], width, width)))
+    probe = probe.astype('complex64')
+    psi, scan = tike.ptycho.object.get_padded_object(
+        _random_positions(size, _object_width(size)),
+        probe,
+    )
+    data = rng.poisson(
+        10,
+        size=(size['num_position'], width, width),
+    ).astype('float32')
+    parameters = tike.ptycho.PtychoParameters(
+        probe=probe,
+        psi=psi,
+        scan=scan,
+        algorithm_options=getattr(tike.ptycho, options)(num_batch=8),
+        probe_options=tike.ptycho.ProbeOptions(),
+        object_options=tike.ptycho.ObjectOptions(),
+    )
+    with tike.ptycho.Reconstruction(data, parameters, num_gpu=1) as context:
+        yield lambda: context.iterate(1), size['num_position']
+    logging.disable(logging.NOTSET)
+
+
+@benchmark('ptycho.rpie.epoch', unit='patterns', backends=('cupy',))
+def _rpie(backend: Backend, size: dict):
+    yield from _ptycho_epoch(backend, size, 'RpieOptions')
+
+
+@benchmark('ptycho.lstsq_grad.epoch', unit='patterns', backends=('cupy',))
+def _lstsq_grad(backend: Backend, size: dict):
+    yield from _ptycho_epoch(backend, size, 'LstsqOptions')
+
+
+@benchmark('ptycho.dm.epoch', unit='patterns', backends=('cupy',))
+def _dm(backend: Backend, size: dict):
+    yield from _ptycho_epoch(backend, size, 'DmOptions')
+
+
+def _lamino_epoch(
+    backend: Backend,
+    size: dict,
+    algorithm: str,
+    operator: str,
+):
+    import tike.communicators
+    import tike.lamino.solvers
+    logging.disable(logging.WARNING)
+    n = size['lamino_width']
+    theta = np.linspace(0, np.pi, size['num_angle'], dtype='float32')
+    data = _random_complex(np, size['num_angle'], n, n)
+    operator = getattr(backend.operators, operator)(
+        n=n,
+        tilt=np.pi / 3,
+        eps=1e-1,
+    )
+    # The solvers run on the workers of the backend: CPU workers for NumPy
+    with operator, tike.communicators.Comm(1, xp=backend.xp) as comm:
+        kwargs = dict(
+            data=comm.pool.bcast([data]),
+            theta=comm.pool.bcast([theta]),
+        )
+        if algorithm == 'bucket':
+            kwargs['grid'] = comm.pool.bcast([
+                operator._make_grid().astype('int16').reshape(n**3, 3),
+            ])
+        result = {
+            'obj': comm.pool.bcast([_random_complex(np, n, n, n)]),
+        }
+
+        def epoch():
+            result.update(
+                getattr(tike.lamino.solvers, algorithm)(
+                    operator,
+                    comm,
+                    cg_iter=1,
+                    **kwargs,
+                    **result,
+                ))
+
+        yield epoch, size['num_angle']
+    logging.disable(logging.NOTSET)
+
+
+@benchmark('lamino.cgrad.epoch', unit='projections')
+def _lamino_cgrad(backend: Backend, size: dict):
+    yield from _lamino_epoch(backend, size, 'cgrad', 'Lamino')
+
+
+@benchmark('lamino.bucket.epoch', unit='projections', backends=('cupy',))
+def _lamino_bucket(backend: Backend, size: dict):
+    yield from _lamino_epoch(backend, size, 'bucket', 'Bucket')
+
+
+def _align_images(size: dict) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Return images and copies of them which are shifted by a few pixels."""
+    rng = np.random.default_rng(0)
+    width = size['frame_width']
+    original = _random_complex(np, size['num_angle'], width, width)
+    unaligned = np.stack([
+        np.roll(x, shift, axis=(-2, -1))
+        for x, shift in zip(original, rng.integers(-4, 5, (len(original), 2)))
+    ])
+    return original, unaligned
+
+
+@benchmark('align.cross_correlation', unit='images')
+def _cross_correlation(backend: Backend, size: dict):
+    import tike.align.solvers
+    original, unaligned = _align_images(size)
+    original = backend.xp.asarray(original)
+    unaligned = backend.xp.asarray(unaligned)
+    with backend.operators.Alignment() as operator:
+        yield (
+            lambda: tike.align.solvers.cross_correlation(
+                operator,
+                original=original,
+                unaligned=unaligned,
+                upsample_factor=8,
+            ),
+            size['num_angle'],
+        )
+
+
+@benchmark('align.farneback', unit='images', backends=None)
+def _farneback(backend: None, size: dict):
+    import tike.align.solvers
+    original, unaligned = _align_images(size)
+    yield (
+        lambda: tike.align.solvers.farneback(
+            None,
+            original=np.angle(original),
+            unaligned=np.angle(unaligned),
+        ),
+        size['num_angle'],
+    )
+
+
+# Readers
+
+
+def _write_lynx(folder: str, size: dict) -> typing.Tuple[str, str]:
+    """Write a synthetic LYNX diffraction file and position file."""
+    import h5py
+    rng = np.random.default_rng(0)
+    width = size['frame_width']
+    diffraction_path = os.path.join(folder, 'lynx.h5')
+    with h5py.File(diffraction_path, 'w') as f:
+        dataset = f.create_dataset(
+            '/entry/data/eiger_4',
+            data=rng.poisson(
+                3,
+                size=(size['num_frame'], width, width),
+            ).astype('uint16'),
+            chunks=(1, width, width),
+        )
+        dataset.attrs['Pixel_size'] = [7.5e-05]
+    position_path = os.path.join(folder, 'lynx.dat')
+    positions = np.zeros((size['num_frame'], 8))
+    positions[:, 0] = np.arange(size['num_frame'])
+    positions[:, 3], positions[:, 6] = rng.random((2, size['num_frame'])) * 1e3
+    np.savetxt(position_path, positions, header='\n', comments='')
+    return diffraction_path, position_path
+
+
+@benchmark('io.read_aps_lynx', unit='frames', backends=None)
+def _read_lynx(backend: None, size: dict):
+    import tike.ptycho.io
+    with tempfile.TemporaryDirectory() as folder:
+        diffraction_path, position_path = _write_lynx(folder, size)
+        yield (
+            lambda: tike.ptycho.io.read_aps_lynx(
+                diffraction_path,
+                position_path,
+                photon_energy=8000,
+                beam_center_x=size['frame_width'] // 2,
+                beam_center_y=size['frame_width'] // 2,
+                detector_dist=2.0,
+            ),
+            size['num_frame'],
+        )
+
+
+@benchmark('io.read_diffraction_store', unit='frames', backends=None)
+def _read_store(backend: None, size: dict):
+    import tike.ptycho.io
+    rng = np.random.default_rng(0)
+    width = size['frame_width']
+    data = rng.poisson(3, size=(size['num_frame'], width, width))
+    scan = rng.random((size['num_frame'], 2), dtype='float32')
+    with tempfile.TemporaryDirectory() as folder:
+        tike.ptycho.io.write_diffraction_store(
+            folder,
+            [(data.astype('uint16'), scan)],
+        )
+        yield (
+            lambda: np.array(tike.ptycho.io.read_diffraction_store(folder)[0]),
+            size['num_frame'],
+        )
+
+
+# Running and comparing
+
+
+def _time(
+    run: typing.Callable,
+    synchronize: typing.Callable[[], None],
+    repeat: int,
+) -> typing.List[float]:
+    """Return the wall time of each run after one warm-up run."""
+    run()
+    synchronize()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        synchronize()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmark(
+    case: Benchmark,
+    backend_name: typing.Union[str, None],
+    size_name: str,
+    repeat: int = 5,
+) -> typing.Dict[str, typing.Any]:
+    """Run one benchmark and return its result as a dictionary."""
+    result = dict(
+        name=case.name,
+        backend='host' if backend_name is None else backend_name,
+        size=size_name,
+        unit=case.unit,
+    )
+    try:
+        backend = None if backend_name is None else load_backend(backend_name)
+    except ImportError as error:
+        result.update(status='skipped', reason=str(error))
+        return result
+    try:
+        with case.setup(backend, SIZES[size_name]) as (run, items):
+            times = _time(
+                run,
+                (lambda: None) if backend is None else backend.synchronize,
+                repeat,
+            )
+    except ImportError as error:
+        result.update(status='failed', reason=str(error))
+        return result
+    median = statistics.median(times)
+    result.update(
+        status='ok',
+        items=items,
+        repeat=repeat,
+        median=median,
+        min=min(times),
+        throughput=items / median,
+    )
+    return result
+
+
+def _environment() -> typing.Dict[str, str]:
+    return dict(
+        tike=getattr(tike, '__version__', 'unknown'),
+        numpy=np.__version__,
+        python=platform.python_version(),
+        machine=platform.machine(),
+        processor=platform.processor(),
+        node=platform.node(),
+        date=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    )
+
+
+def _print(result: typing.Dict[str, typing.Any]) -> None:
+    if result['status'] == 'ok':
+        print(f"{result['name']:36s} {result['backend']:6s} "
+              f"{result['size']:6s} {result['median']:10.4f} s "
+              f"{result['throughput']:14,.1f} "
+              f"{result['unit']}/s")
+    else:
+        print(f"{result['name']:36s} {result['backend']:6s} "
+              f"{result['size']:6s} {result['status']}: {result['reason']}")
+
+
+def run(args) -> int:
+    """Run the benchmarks; return 1 if any failed."""
+    results = []
+    for size_name in args.size:
+        for case in benchmarks:
+            if args.filter and not any(f in case.name for f in args.filter):
+                continue
+            if case.backends is not None:
+                for b in args.backend:
+                    if b not in case.backends:
+                        results.append(
+                            dict(
+                                name=case.name,
+                                backend=b,
+                                size=size_name,
+                                unit=case.unit,
+                                status='skipped',
+                                reason=f"Not available for the {b} backend.",
+                            ))
+                        _print(results[-1])
+            backends = [None] if case.backends is None else [
+                b for b in args.backend if b in case.backends
+            ]
+            for backend_name in backends:
+                result = run_benchmark(case, backend_name, size_name,
+                                       args.repeat)
+                results.append(result)
+                _print(result)
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(
+                dict(environment=_environment(), results=results),
+                f,
+                indent=2,
+            )
+    failed = [r for r in results if r['status'] == 'failed']
+    for r in failed:
+        print(f"{r['name']} failed: {r['reason']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _index(path: str) -> typing.Dict[typing.Tuple[str, str, str], dict]:
+    with open(path, 'r') as f:
+        results = json.load(f)['results']
+    return {(r['name'], r['backend'], r['size']): r
+            for r in results
+            if r['status'] == 'ok'}
+
+
+def compare(args) -> int:
+    """Print the change of throughput; return 1 if any regressed."""
+    old = _index(args.old)
+    new = _index(args.new)
+    regressed = 0
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key]['throughput'] / old[key]['throughput']
+        flag = ''
+        if ratio < 1 - args.threshold:
+            flag = 'REGRESSION'
+            regressed += 1
+        print(f"{key[0]:36s} {key[1]:6s} {key[2]:6s} {ratio:8.3f}x "
+              f"{flag}".rstrip())
+    for key in sorted(old.keys() - new.keys()):
+        print(f"{key[0]:36s} {key[1]:6s} {key[2]:6s} missing from {args.new}")
+    return 1 if regressed else 0
+
+
+def main(argv: typing.Union[typing.List[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_run = commands.add_parser('run', help='Run the benchmarks.')
+    parser_run.add_argument(
+        '--backend',
+        nargs='+',
+        choices=['numpy', 'cupy'],
+        default=['numpy'],
+        help='The operator backends to benchmark.',
+    )
+    parser_run.add_argument(
+        '--size',
+        nargs='+',
+        choices=list(SIZES),
+        default=['small'],
+        help='The sizes of the synthetic data.',
+    )
+    parser_run.add_argument(
+        '--filter',
+        nargs='*',
+        help='Only run benchmarks whose names contain one of these strings.',
+    )
+    parser_run.add_argument('--repeat', type=int, default=5)
+    parser_run.add_argument('-o', '--output', help='Save results as JSON.')
+    parser_run.set_defaults(func=run)
+
+    parser_compare = commands.add_parser(
+        'compare',
+        help='Compare the throughput of two saved runs.',
+    )
+    parser_compare.add_argument('old')
+    parser_compare.add_argument('new')
+    parser_compare.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='The fraction of lost throughput which is a regression.',
+    )
+    parser_compare.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
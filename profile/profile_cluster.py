@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark clustering of scan positions into batches."""
+
+import time
+import unittest
+
+import numpy as np
+
+import tike.cluster
+
+
+def _wobbly_center_reference(population, num_cluster):
+    """The wobbly center algorithm which measures all samples every turn."""
+    labels = np.full(len(population), -1)
+    labels[np.argpartition(
+        np.linalg.norm(population - population.mean(axis=0), axis=1),
+        num_cluster,
+    )[:num_cluster]] = range(num_cluster)
+    for c in range(len(population) - num_cluster):
+        c = c % num_cluster
+        unassigned = np.flatnonzero(labels == -1)
+        distance = np.linalg.norm(
+            population[unassigned] - population[labels == c].mean(axis=0),
+            axis=1,
+        )
+        labels[unassigned[np.argmax(distance)]] = c
+    return [np.flatnonzero(labels == c) for c in range(num_cluster)]
+
+
+def _fly_scan(num_position, seed=0):
+    """Return the positions of a jittered spiral fly scan."""
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 400 * np.pi, num_position)
+    r = np.sqrt(t)
+    return np.stack(
+        [r * np.cos(t), r * np.sin(t)],
+        axis=-1,
+    ) + rng.normal(scale=0.01, size=(num_position, 2))
+
+
+class BenchmarkWobblyCenter(unittest.TestCase):
+    """Compare the wobbly center clustering to the reference algorithm."""
+
+    num_cluster = 20
+
+    def test_wobbly_center(self):
+        print(f"\n{'positions':>10s} {'reference':>10s} {'wobbly':>10s}")
+        for num_position in [1_000, 10_000, 30_000, 100_000, 500_000]:
+            scan = _fly_scan(num_position)
+            if num_position <= 30_000:
+                start = time.perf_counter()
+                expected = _wobbly_center_reference(scan, self.num_cluster)
+                reference = f"{time.perf_counter() - start:10.3f}"
+            else:
+                expected = None
+                reference = f"{'-':>10s}"
+            start = time.perf_counter()
+            result = tike.cluster.wobbly_center(scan, self.num_cluster)
+            print(f"{num_position:10,d} {reference} "
+                  f"{time.perf_counter() - start:10.3f}")
+            if expected is not None:
+                for a, b in zip(expected, result):
+                    np.testing.assert_array_equal(a, b)
+
+
+
+class BenchmarkCompact(unittest.TestCase):
+    """Time compact clustering from scratch and after appending positions."""
+
+    num_cluster = 20
+
+    def test_compact(self):
+        print(f"\n{'positions':>10s} {'compact':>10s} {'append':>10s}")
+        for num_position in [1_000, 10_000, 30_000]:
+            scan = _fly_scan(num_position)
+            num_old = num_position * 9 // 10
+            start = time.perf_counter()
+            clusters = tike.cluster.compact(scan[:num_old], self.num_cluster)
+            compact = time.perf_counter() - start
+            start = time.perf_counter()
+            tike.cluster.compact_append(scan, clusters)
+            print(f"{num_position:10,d} {compact:10.3f} "
+                  f"{time.perf_counter() - start:10.3f}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmark the cold-start time of importing tike modules.
+
+Each import runs in a fresh interpreter so that nothing is cached in memory.
+CUDA kernels are compiled when they are first launched instead of when their
+module is imported, so importing tike.ptycho should take about as long as
+importing CuPy.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+import unittest
+
+modules = [
+    'numpy',
+    'cupy',
+    'tike.scan',
+    'tike.operators',
+    'tike.ptycho',
+    'tike.lamino',
+    'tike.align',
+]
+
+
+def _time_import(module: str, repeat: int = 5) -> float:
+    """Return the median wall time in seconds of importing module."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', f'import {module}'],
+            check=True,
+        )
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+class BenchmarkImport(unittest.TestCase):
+    """Run benchmarks for importing tike modules."""
+
+    def test_import(self):
+        """Print the median import time of each module."""
+        baseline = _time_import('sys')
+        print(f"\n{'interpreter':>16s} {baseline:8.3f} s")
+        for module in modules:
+            print(f"{module:>16s} {_time_import(module) - baseline:8.3f} s")
+
+
+if __name__ == '__main__':
+    unittest.main()
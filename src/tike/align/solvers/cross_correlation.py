@@ -28,6 +28,8 @@ phase_cross_correlation from skimage.registration."""
 
 import numpy as np
 
+import tike.operators.numpy
+
 
 def cross_correlation(
     op,
@@ -46,6 +48,22 @@ def cross_correlation(
     then refines the shift estimation by upsampling the DFT only in a small
     neighborhood of that estimate by means of a matrix-multiply DFT.
 
+    The whole stack of images is registered at once: one FFT of the stack
+    followed by one batched matrix-multiply DFT.
+
+    Parameters
+    ----------
+    op : :py:class:`tike.operators.Alignment` or None
+        The FFT plans are cached by op.shift. If None, the images are aligned
+        on the CPU by the NumPy operators.
+    original, unaligned : (..., H, W) complex64
+        The images to be aligned.
+
+    Returns
+    -------
+    shift : (..., 2) float32
+        The shift from unaligned to original.
+
     References
     ----------
     Stéfan van der Walt, Johannes L. Schönberger, Juan Nunez-Iglesias,
@@ -61,44 +79,66 @@ def cross_correlation(
     James R. Fienup, "Invariant error metrics for image reconstruction"
     Optics Letters 36, 8352-8357 (1997). :doi:`10.1364/AO.36.008352`
     """
+    if op is None:
+        with tike.operators.numpy.Shift() as fft:
+            return _cross_correlation(
+                fft,
+                np.asarray(original),
+                np.asarray(unaligned),
+                upsample_factor,
+                space,
+                reg_weight,
+            )
+    return _cross_correlation(
+        op.shift,
+        original,
+        unaligned,
+        upsample_factor,
+        space,
+        reg_weight,
+    )
+
+
+def _cross_correlation(fft, original, unaligned, upsample_factor, space,
+                       reg_weight):
+    xp = fft.xp
+    shape = unaligned.shape
+    original = original.reshape(-1, *shape[-2:])
+    unaligned = unaligned.reshape(-1, *shape[-2:])
+
     # assume complex data is already in Fourier space
     if space.lower() == 'fourier':
         src_freq = unaligned
         target_freq = original
     # real data needs to be fft'd.
     elif space.lower() == 'real':
-        src_freq = op.xp.fft.fft2(unaligned)
-        target_freq = op.xp.fft.fft2(original)
+        dtype = xp.result_type(unaligned, 'complex64')
+        src_freq = fft._fft2(unaligned.astype(dtype, copy=False))
+        target_freq = fft._fft2(original.astype(dtype, copy=False))
     else:
         raise ValueError(f"space must be 'fourier' or 'real' not '{space}'.")
 
     # Whole-pixel shift - Compute cross-correlation by an IFFT
-    shape = src_freq.shape
     image_product = src_freq * target_freq.conj()
-    cross_correlation = op.xp.fft.ifft2(image_product)
+    cross_correlation = fft._ifft2(image_product)
 
     # Add a small regularization term so that smaller shifts are preferred when
     # the cross_correlation is the same for multiple shifts.
     if reg_weight > 0:
-        w = _area_overlap(op, cross_correlation)
-        w = op.xp.fft.fftshift(w) * reg_weight
+        w = _area_overlap(fft, cross_correlation)
+        w = xp.fft.fftshift(w) * reg_weight
     else:
         w = 0
 
-    A = np.abs(cross_correlation) + w
-    maxima = A.reshape(A.shape[0], -1).argmax(1)
-    maxima = np.column_stack(np.unravel_index(maxima, A[0, :, :].shape))
-    shifts = op.xp.array(maxima, dtype='float32')
+    shifts = _argmax2d(xp, xp.abs(cross_correlation) + w).astype('float32')
 
-    midpoints = [x // 2 for x in shape[1:]]
-    ids = np.where(shifts[:, 0] > midpoints[0])
-    shifts[ids[0], 0] -= shape[1]
-    ids = np.where(shifts[:, 1] > midpoints[1])
-    shifts[ids[0], 1] -= shape[2]
+    # Shifts past the midpoint wrap around to negative shifts
+    size = xp.asarray(shape[-2:], dtype='float32')
+    shifts -= size * (shifts > size // 2)
 
     if upsample_factor > 1:
         # Initial shift estimate in upsampled grid
-        shifts = np.round(shifts * upsample_factor) / upsample_factor
+        shifts = xp.round(shifts * upsample_factor) / upsample_factor
         upsampled_region_size = np.ceil(upsample_factor * 1.5)
         # Center of output array at dftshift + 1
         dftshift = np.fix(upsampled_region_size / 2.0)
@@ -108,7 +148,7 @@ def cross_correlation(
 
         sample_region_offset = dftshift - shifts * upsample_factor
         cross_correlation = _upsampled_dft(
-            op,
+            fft,
             image_product.conj(),
             upsampled_region_size,
             upsample_factor,
@@ -116,12 +156,18 @@ def cross_correlation(
         ).conj()
         cross_correlation /= normalization
         # Locate maximum and map back to original pixel grid
-        A = np.abs(cross_correlation)
-        maxima = A.reshape(A.shape[0], -1).argmax(1)
-        maxima = np.column_stack(np.unravel_index(maxima, A[0, :, :].shape))
-        maxima = maxima - dftshift
+        maxima = _argmax2d(xp, xp.abs(cross_correlation)) - dftshift
         shifts = shifts + maxima / upsample_factor
-    return {'shift': shifts.astype('float32'), 'cost': -1}
+    return {
+        'shift': shifts.reshape(*shape[:-2], 2).astype('float32'),
+        'cost': -1,
+    }
+
+
+def _argmax2d(xp, A):
+    """Return the (N, 2) coordinates of the maximum of each of N images."""
+    maxima = A.reshape(A.shape[0], -1).argmax(axis=-1)
+    return xp.stack(xp.unravel_index(maxima, A.shape[-2:]), axis=-1)
 
 
 def _upsampled_dft(op, data, ups, upsample_factor, axis_offsets):
@@ -129,12 +175,12 @@ def _upsampled_dft(op, data, ups, upsample_factor, axis_offsets):
     shape = data.shape
     kernel = ((op.xp.arange(ups) - axis_offsets[:, 1:2])[:, :, None] *
               op.xp.fft.fftfreq(shape[2], upsample_factor))
-    kernel = np.exp(im2pi * kernel)
-    data = np.einsum('ijk,ipk->ijp', kernel, data)
+    kernel = op.xp.exp(im2pi * kernel)
+    data = kernel @ data.swapaxes(-1, -2)
     kernel = ((op.xp.arange(ups) - axis_offsets[:, 0:1])[:, :, None] *
               op.xp.fft.fftfreq(shape[1], upsample_factor))
-    kernel = np.exp(im2pi * kernel)
-    return np.einsum('ijk,ipk->ijp', kernel, data)
+    kernel = op.xp.exp(im2pi * kernel)
+    return kernel @ data.swapaxes(-1, -2)
 
 
 def _triangle(op, N):
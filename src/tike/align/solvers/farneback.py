@@ -1,5 +1,7 @@
 """Implements a 2D alignmnent algorithm by Gunnar Farneback."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from cv2 import calcOpticalFlowFarneback
 
@@ -33,6 +35,19 @@ def _rescale_8bit(a, b, hi=None, lo=None):
     return a, b
 
 
+def _farneback_one(original, unaligned, flow, hi, lo, rescale, **kwargs):
+    """Return the flow for one pair of images."""
+    if rescale:
+        original, unaligned = _rescale_8bit(original, unaligned, hi=hi, lo=lo)
+    return calcOpticalFlowFarneback(
+        original,
+        unaligned,
+        flow=flow,
+        flags=4,
+        **kwargs,
+    )
+
+
 def farneback(
     op,
     original,
@@ -46,6 +61,8 @@ def farneback(
     flow=None,
     hi=None,
     lo=None,
+    rescale=True,
+    num_workers=None,
     **kwargs,
 ):
     """Find the flow from unaligned to original using Farneback's algorithm
@@ -53,12 +70,23 @@ def farneback(
     For parameter descriptions see
     https://docs.opencv.org/4.3.0/dc/d6b/group__video__track.html
 
+    Each pair of images is aligned independently by a pool of threads, so the
+    result is the same for any number of workers.
+
     Parameters
     ----------
     original, unaligned (L, M, N)
         The images to be aligned.
     flow : (L, M, N, 2) float32
-        The inital guess for the displacement field.
+        The inital guess for the displacement field. Pass the flow from the
+        previous iteration of a joint reconstruction to warm-start.
+    rescale : bool
+        Rescale each pair of images into the same 8-bit range before
+        alignment. If False, the float32 images are aligned directly, so they
+        should already have similar ranges.
+    num_workers : int
+        The number of threads which align images concurrently. The default is
+        decided by :py:class:`concurrent.futures.ThreadPoolExecutor`.
 
     References
     ----------
@@ -68,29 +96,36 @@ def farneback(
     shape = original.shape
     assert original.dtype == 'float32', original.dtype
     assert unaligned.dtype == 'float32', unaligned.dtype
+    # NOTE: Passing a reshaped view as any of the parameters breaks OpenCV's
+    # Farneback implementation, but the images of a contiguous stack are
+    # contiguous views, so they are not copied.
+    original = np.ascontiguousarray(original)
+    unaligned = np.ascontiguousarray(unaligned)
 
     if flow is None:
         flow = np.zeros((*shape, 2), dtype='float32')
     else:
         flow = flow[..., ::-1].copy()
 
-    # NOTE: Passing a reshaped view as any of the parameters breaks OpenCV's
-    # Farneback implementation.
-    for i in range(len(original)):
-        flow[i] = calcOpticalFlowFarneback(
-            *_rescale_8bit(
-                original[i],
-                unaligned[i],
-                hi=hi[i] if hi is not None else None,
-                lo=lo[i] if lo is not None else None,
-            ),
+    def align(i):
+        # OpenCV releases the GIL, so the images are aligned concurrently
+        flow[i] = _farneback_one(
+            original[i],
+            unaligned[i],
             flow=flow[i],
+            hi=hi[i] if hi is not None else None,
+            lo=lo[i] if lo is not None else None,
+            rescale=rescale,
             pyr_scale=pyr_scale,
             levels=levels,
             winsize=winsize,
             iterations=num_iter,
             poly_n=poly_n,
             poly_sigma=poly_sigma,
-            flags=4,
         )
+
+    with ThreadPoolExecutor(num_workers) as executor:
+        # Consume the results so that exceptions are raised
+        list(executor.map(align, range(len(original))))
+
     return {'flow': flow[..., ::-1], 'cost': -1}
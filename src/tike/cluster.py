@@ -2,8 +2,6 @@ import itertools
 import typing
 import logging
 
-import cupy as cp
-import cupyx
 import numpy as np
 import numpy.typing as npt
 
@@ -12,11 +10,20 @@ import tike.communicators
 logger = logging.getLogger(__name__)
 
 
+def _asnumpy(x: npt.ArrayLike) -> np.ndarray:
+    """Return x on the host; CuPy is only imported if x is on a GPU."""
+    if hasattr(x, '__cuda_array_interface__'):
+        import cupy as cp
+        return cp.asnumpy(x)
+    return np.asarray(x)
+
+
 def _split_gpu(
     m: npt.NDArray,
     x: npt.ArrayLike,
     dtype: npt.DTypeLike,
 ) -> npt.ArrayLike:
+    import cupy as cp
     return cp.asarray(x[m], dtype=dtype)
 
 
@@ -32,12 +39,90 @@ def _split_pinned(
     m: npt.NDArray,
     x: npt.ArrayLike,
     dtype: npt.DTypeLike,
+    chunk_size: int = 256,
 ) -> npt.ArrayLike:
+    import cupyx
+    if m.dtype == np.bool_:
+        m = np.flatnonzero(m)
     pinned = cupyx.empty_pinned(shape=(len(m), *x.shape[1:]), dtype=dtype)
-    pinned[...] = x[m]
+    # Copy chunk by chunk in ascending order of the source, so that x[m] is
+    # never materialized in full and memory-mapped sources are read
+    # sequentially.
+    order = np.argsort(m, kind='stable')
+    for lo in range(0, len(m), chunk_size):
+        part = order[lo:lo + chunk_size]
+        pinned[part] = x[m[part]]
     return pinned
 
 
+class IndexedRows():
+    """A read-only view of the rows x[index] which leaves x where it is.
+
+    Rows are only gathered (and converted to dtype) when the view is indexed,
+    so a memory-mapped x is never loaded in full. Rows are read from x in
+    ascending order.
+
+    Parameters
+    ----------
+    x : (N, ...) array_like
+        The array to index; typically a memory map.
+    index : (M, ) int
+        The rows of x which are in the view.
+    dtype : dtype
+        The dtype of the returned rows.
+    """
+
+    def __init__(
+        self,
+        x: npt.ArrayLike,
+        index: npt.NDArray,
+        dtype: npt.DTypeLike,
+    ):
+        self.x = x
+        self.index = np.asarray(index)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def shape(self) -> typing.Tuple[int, ...]:
+        return (len(self.index), *self.x.shape[1:])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def itemsize(self) -> int:
+        return self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, key) -> npt.NDArray:
+        rows = np.atleast_1d(self.index[key])
+        order = np.argsort(rows, kind='stable')
+        result = np.empty((len(rows), *self.x.shape[1:]), dtype=self.dtype)
+        result[order] = self.x[rows[order]]
+        return result if np.ndim(self.index[key]) > 0 else result[0]
+
+
+def _split_lazy(
+    m: npt.NDArray,
+    x: npt.ArrayLike,
+    dtype: npt.DTypeLike,
+) -> IndexedRows:
+    if m.dtype == np.bool_:
+        m = np.flatnonzero(m)
+    return IndexedRows(x, m, dtype)
+
+
+_split_functions = {
+    'gpu': _split_gpu,
+    'host': _split_host,
+    'pinned': _split_pinned,
+    'lazy': _split_lazy,
+}
+
+
 def by_scan_grid(
     *args,
     pool: tike.communicators.ThreadPool,
@@ -57,6 +142,10 @@ def by_scan_grid(
         The number of grid divisions along each dimension.
     dtype : List[str]
         The datatypes of the args after splitting.
+    destination : List[str]
+        Where each arg is placed after splitting: 'gpu' memory, 'host' memory,
+        'pinned' host memory, or 'lazy' for an IndexedRows view which leaves
+        the arg where it is.
     scan : (nscan, 2) float32
         The 2D coordinates of the scan positions.
     args : (nscan, ...) float32 or None
@@ -92,7 +181,7 @@ def by_scan_grid(
         else:
             split_args.append(
                 pool.map(
-                    _split_gpu if dest == 'gpu' else _split_pinned,
+                    _split_functions[dest],
                     mask,
                     x=arg,
                     dtype=t,
@@ -194,6 +283,10 @@ def by_scan_stripes_contiguous(
         The number of grid divisions along each dimension.
     dtype : List[str]
         The datatypes of the args after splitting.
+    destination : List[str]
+        Where each arg is placed after splitting: 'gpu' memory, 'host' memory,
+        'pinned' host memory, or 'lazy' for an IndexedRows view which leaves
+        the arg where it is.
     scan : (nscan, 2) float32
         The 2D coordinates of the scan positions.
     args : (nscan, ...) float32 or None
@@ -247,26 +340,68 @@ def by_scan_stripes_contiguous(
                 batch_breaks,
             ))
 
+    split_args = by_order(
+        scan,
+        *args,
+        order=map_to_gpu_contiguous,
+        pool=pool,
+        dtype=dtype,
+        destination=destination,
+    )
+
+    if __debug__:
+        for device in batches_contiguous:
+            assert len(device) == num_batch, (
+                f"There should be {num_batch} batches, found {len(device)}"
+            )
+
+    return (map_to_gpu_contiguous, batches_contiguous, *split_args)
+
+
+def by_order(
+    *args,
+    order: typing.List[npt.NDArray],
+    pool: tike.communicators.ThreadPool,
+    dtype: typing.List[npt.DTypeLike],
+    destination: typing.List[str],
+) -> typing.List[typing.Union[typing.List[npt.NDArray], None]]:
+    """Split args among the workers in a previously determined order.
+
+    Use this function to repeat the split returned by another function in this
+    module; e.g. when resuming a reconstruction.
+
+    Parameters
+    ----------
+    args : (nscan, ...) float32 or None
+        The arrays to be split by scan position.
+    order : List[array[int]]
+        The locations of each worker's elements in the args.
+    dtype : List[str]
+        The datatypes of the args after splitting.
+    destination : List[str]
+        Where each arg is placed after splitting: 'gpu' memory, 'host' memory,
+        'pinned' host memory, or 'lazy' for an IndexedRows view which leaves
+        the arg where it is.
+
+    Returns
+    -------
+    args : List[array[float32]] or None
+        Each input divided among the workers or None if arg was None.
+
+    """
     split_args = []
-    for arg, t, dest in zip([scan, *args], dtype, destination):
+    for arg, t, dest in zip(args, dtype, destination):
         if arg is None:
             split_args.append(None)
         else:
             split_args.append(
                 pool.map(
-                    _split_gpu if dest == 'gpu' else _split_pinned,
-                    map_to_gpu_contiguous,
+                    _split_functions[dest],
+                    order,
                     x=arg,
                     dtype=t,
                 ))
-
-    if __debug__:
-        for device in batches_contiguous:
-            assert len(device) == num_batch, (
-                f"There should be {num_batch} batches, found {len(device)}"
-            )
-
-    return (map_to_gpu_contiguous, batches_contiguous, *split_args)
+    return split_args
 
 
 def stripes_equal_count(
@@ -295,17 +430,103 @@ def stripes_equal_count(
         The indicies of population that belong to each cluster.
     """
     logger.info("Clustering method is stripes.")
-    xp = cp.get_array_module(population)
     if (num_cluster == 1) or (num_cluster >= len(population)):
         return np.array_split(np.arange(population.shape[0]), num_cluster)
     # Sort the population along the dimension, then split into ranges of approx
     # equal size
     return np.array_split(
-        cp.asnumpy(xp.argsort(population[:, dim])),
+        np.argsort(_asnumpy(population[:, dim])),
         num_cluster,
     )
 
 
+# The cluster label of samples which are not assigned to a cluster yet
+_UNASSIGNED = 0xFFFF
+
+
+def _assign_furthest(
+    population: npt.NDArray,
+    labels: npt.NDArray[np.uint16],
+    num_cluster: int,
+    chunk: int = 64,
+) -> None:
+    """Assign each unassigned sample to the cluster furthest from it in place.
+
+    The clusters take turns in order of their labels; on each turn, a cluster
+    claims the unassigned sample which is furthest from its centroid. Ties
+    are broken by claiming the sample with the lowest index.
+
+    Instead of measuring the distance from the centroid to every unassigned
+    sample on every turn, the centroids are running sums and the samples are
+    sorted by their distance, r, from the global centroid. By the triangle
+    inequality, the distance from a sample to a centroid which is d from the
+    global centroid is at most r + d. So once the distances to a few of the
+    furthest samples are known, only the samples with r >= best - d need to
+    be measured. These are a thin shell of samples because the centroids of
+    heterogeneous clusters stay near the global centroid.
+
+    Parameters
+    ----------
+    population : (M, N)
+        The M samples of an N dimensional population.
+    labels : (M, ) uint16
+        The cluster of each sample or _UNASSIGNED.
+    chunk : int
+        The number of the furthest samples measured to bound the search.
+
+    """
+    population = np.asarray(population, dtype=np.float64)
+    unassigned = labels == _UNASSIGNED
+    members = labels[~unassigned]
+    sums = np.zeros((num_cluster, population.shape[-1]))
+    np.add.at(sums, members, population[~unassigned])
+    counts = np.bincount(members, minlength=num_cluster).astype(np.float64)
+    center = np.mean(population, axis=0)
+    radius = np.linalg.norm(population - center, axis=1)
+    # The unassigned samples sorted by descending distance from the center
+    order = np.flatnonzero(unassigned)
+    order = order[np.argsort(-radius[order], kind='stable')]
+    descending = -radius[order]
+    # Accounts for rounding error in the triangle inequality
+    slack = 1e-9 * (radius.max() + 1)
+    head = 0
+    num_removed = 0
+    for turn in range(len(order)):
+        c = turn % num_cluster
+        # Empty clusters are centered on the global centroid
+        centroid = sums[c] / counts[c] if counts[c] > 0 else center
+        offset = np.linalg.norm(centroid - center)
+        while not unassigned[order[head]]:
+            head += 1
+        candidates = order[head:head + chunk]
+        candidates = candidates[unassigned[candidates]]
+        distance = np.linalg.norm(population[candidates] - centroid, axis=1)
+        # Samples after end are too close to the center to be the furthest
+        end = np.searchsorted(
+            descending,
+            offset + slack - distance.max(),
+            side='right',
+        )
+        if end > head + chunk:
+            candidates = order[head:end]
+            candidates = candidates[unassigned[candidates]]
+            distance = np.linalg.norm(population[candidates] - centroid,
+                                      axis=1)
+        i = candidates[distance == distance.max()].min()
+        labels[i] = c
+        unassigned[i] = False
+        sums[c] += population[i]
+        counts[c] += 1
+        num_removed += 1
+        # Periodically drop the assigned samples from the sorted list
+        if num_removed > max(chunk, (len(order) - head) // 16):
+            keep = unassigned[order]
+            order = order[keep]
+            descending = descending[keep]
+            head = 0
+            num_removed = 0
+
+
 def wobbly_center(population, num_cluster):
     """Return the indices that divide population into heterogenous clusters.
 
@@ -314,6 +535,11 @@ def wobbly_center(population, num_cluster):
     the entire variance of the original population yielding clusters which are
     similar to each other in excess to the original population itself.
 
+    Each turn only measures the samples which could be furthest from the
+    cluster, so the cost grows much more slowly than the M**2 of measuring
+    every unassigned sample on every turn. The population is clustered on
+    the host.
+
     Parameters
     ----------
     population : (M, N) array_like
@@ -342,7 +568,7 @@ def wobbly_center(population, num_cluster):
 
     """
     logger.info("Clustering method is wobbly center.")
-    xp = cp.get_array_module(population)
+    population = _asnumpy(population)
     if not 0 < num_cluster < 0xFFFF:
         raise ValueError(
             f"The number of clusters must be 0 < {num_cluster} < 65536."
@@ -350,35 +576,17 @@ def wobbly_center(population, num_cluster):
     if (num_cluster == 1) or (num_cluster >= len(population)):
         return np.array_split(np.arange(population.shape[0]), num_cluster)
     # Start with the num_cluster observations closest to the global centroid
-    starting_centroids = xp.argpartition(
-        xp.linalg.norm(population - xp.mean(population, axis=0, keepdims=True),
+    starting_centroids = np.argpartition(
+        np.linalg.norm(population - np.mean(population, axis=0, keepdims=True),
                        axis=1),
         num_cluster,
         axis=0,
     )[:num_cluster]
     # Use a label array to keep track of cluster assignment
-    UNASSIGNED = 0xFFFF
-    labels = xp.full(len(population), UNASSIGNED, dtype='uint16')
+    labels = np.full(len(population), _UNASSIGNED, dtype='uint16')
     labels[starting_centroids] = range(num_cluster)
-    # print(f"\nStart with labels: {labels}")
-    for c in range(len(population) - len(starting_centroids)):
-        # c is the label of the cluster getting the next addition
-        c = c % num_cluster
-        # add the unclaimed observation that is furthest from this cluster
-        furthest = xp.argmax(
-            xp.linalg.norm(
-                population[labels == UNASSIGNED] -
-                xp.mean(population[labels == c], axis=0, keepdims=True),
-                axis=1,
-            ),
-            axis=0,
-        )
-        # i is the index of furthest in labels
-        i = xp.argmax(xp.cumsum(labels == UNASSIGNED) == (furthest + 1))
-        # print(f"{i} will be added to {c}")
-        labels[i] = c
-        # print(f"Start with labels: {labels}")
-    return [cp.asnumpy(xp.flatnonzero(labels == c)) for c in range(num_cluster)]
+    _assign_furthest(population, labels, num_cluster)
+    return [np.flatnonzero(labels == c) for c in range(num_cluster)]
 
 
 def wobbly_center_random_bootstrap(
@@ -424,7 +632,7 @@ def wobbly_center_random_bootstrap(
 
     """
     logger.info("Clustering method is wobbly center with random bootstrap.")
-    xp = cp.get_array_module(population)
+    population = _asnumpy(population)
     if not 0 < num_cluster < 0xFFFF:
         raise ValueError(
             f"The number of clusters must be 0 < {num_cluster} < 65536."
@@ -435,35 +643,145 @@ def wobbly_center_random_bootstrap(
     # equal number of members
     num_bootstrap = int(len(population) * boot_fraction)
     num_bootstrap -= num_bootstrap % num_cluster
-    seed = xp.random.choice(
+    seed = np.random.choice(
         len(population),
         size=num_bootstrap,
         replace=False,
     )
     # Use a label array to keep track of cluster assignment
-    UNASSIGNED = 0xFFFF
-    labels = xp.full(len(population), UNASSIGNED, dtype='uint16')
+    labels = np.full(len(population), _UNASSIGNED, dtype='uint16')
     for c in range(num_cluster):
         labels[seed[c::num_cluster]] = c
-    # print(f"\nStart with labels: {labels}")
-    for c in range(len(population) - num_bootstrap):
-        # c is the label of the cluster getting the next addition
-        c = c % num_cluster
-        # add the unclaimed observation that is furthest from this cluster
-        furthest = xp.argmax(
-            xp.linalg.norm(
-                population[labels == UNASSIGNED] -
-                xp.mean(population[labels == c], axis=0, keepdims=True),
-                axis=1,
-            ),
+    _assign_furthest(population, labels, num_cluster)
+    return [np.flatnonzero(labels == c) for c in range(num_cluster)]
+
+
+def _compact_sizes(num_sample: int, num_cluster: int) -> npt.NDArray:
+    """Return the equal sizes of num_cluster clusters; larger ones first."""
+    max_size = np.full(num_cluster, num_sample // num_cluster)
+    max_size[:num_sample % num_cluster] += 1
+    return max_size
+
+
+def _distances(population: npt.NDArray, centroids: npt.NDArray) -> npt.NDArray:
+    """Return the (M, K) distances from each sample to each centroid."""
+    return np.linalg.norm(
+        population[:, None, :] - centroids[None, :, :],
+        axis=-1,
+    )
+
+
+def _centroids(
+    population: npt.NDArray,
+    labels: npt.NDArray,
+    num_cluster: int,
+) -> npt.NDArray:
+    """Return the (K, N) mean of the samples in each cluster."""
+    counts = np.bincount(labels, minlength=num_cluster)
+    return np.stack(
+        [
+            np.bincount(labels, weights=x, minlength=num_cluster)
+            for x in population.T
+        ],
+        axis=-1,
+    ) / np.maximum(counts, 1)[:, None]
+
+
+def _assign_to_nearest_unfilled(
+    distances: npt.NDArray,
+    labels: npt.NDArray[np.uint16],
+    max_size: npt.NDArray,
+) -> None:
+    """Assign unassigned samples to their nearest unfilled cluster in place.
+
+    Samples which strongly prefer their nearest cluster over their farthest
+    cluster are assigned first. All samples are assigned at once until one of
+    the clusters is filled, then the preferences are recomputed without the
+    filled cluster.
+    """
+    num_cluster = len(max_size)
+    size = np.bincount(
+        labels[labels != _UNASSIGNED],
+        minlength=num_cluster,
+    )
+    unassigned = np.flatnonzero(labels == _UNASSIGNED)
+    while len(unassigned) > 0:
+        unfilled = np.flatnonzero(size < max_size)
+        d = distances[unassigned][:, unfilled]
+        nearest = unfilled[np.argmin(d, axis=1)]
+        priority = np.argsort(np.amin(d, axis=1) - np.amax(d, axis=1),
+                              kind='stable')
+        unassigned = unassigned[priority]
+        nearest = nearest[priority]
+        # Stop after the sample which fills the first cluster; rank is the
+        # number of earlier claims on the same cluster
+        by_cluster = np.argsort(nearest, kind='stable')
+        first_claim = np.searchsorted(nearest[by_cluster], nearest[by_cluster])
+        rank = np.empty_like(by_cluster)
+        rank[by_cluster] = np.arange(len(by_cluster)) - first_claim
+        fills = np.flatnonzero(rank == (max_size - size)[nearest] - 1)
+        stop = fills[0] + 1 if len(fills) > 0 else len(unassigned)
+        labels[unassigned[:stop]] = nearest[:stop]
+        size += np.bincount(nearest[:stop], minlength=num_cluster)
+        unassigned = unassigned[stop:]
+
+
+def _swap_to_nearest(
+    population: npt.NDArray,
+    labels: npt.NDArray[np.uint16],
+    num_cluster: int,
+    max_iter: int,
+) -> None:
+    """Swap pairs of samples between clusters to make the clusters compact.
+
+    Each sweep, for each pair of clusters where a sample is nearer to the
+    centroid of the other cluster, the samples which would gain the
+    most by moving to the other cluster are paired up and swapped as long as
+    the swap brings both samples closer to their cluster centroids on
+    balance. Swapping pairs keeps the sizes of the clusters equal. Each
+    sample is swapped at most once per sweep, and the centroids are updated
+    between sweeps.
+    """
+    _all = np.arange(len(population))
+    for _ in range(max_iter):
+        centroids = _centroids(population, labels, num_cluster)
+        distances = _distances(population, centroids)
+        # Only pairs of clusters where a sample wants to leave one for the
+        # other are considered for swaps
+        wanted = np.argmin(distances, axis=1)
+        unhappy = distances[_all, wanted] < distances[_all, labels]
+        pairs = np.unique(
+            np.sort(np.stack([labels[unhappy], wanted[unhappy]], axis=1),
+                    axis=1),
             axis=0,
         )
-        # i is the index of furthest in labels
-        i = xp.argmax(xp.cumsum(labels == UNASSIGNED) == (furthest + 1))
-        # print(f"{i} will be added to {c}")
-        labels[i] = c
-        # print(f"Start with labels: {labels}")
-    return [cp.asnumpy(xp.flatnonzero(labels == c)) for c in range(num_cluster)]
+        if len(pairs) == 0:
+            break
+        members = [np.flatnonzero(labels == c) for c in range(num_cluster)]
+        free = np.ones(len(population), dtype=bool)
+        any_were_swapped = False
+        for a, b in pairs:
+            in_a = members[a][free[members[a]]]
+            in_b = members[b][free[members[b]]]
+            # The reduction in distance to the centroid from moving
+            gain_a = distances[in_a, a] - distances[in_a, b]
+            gain_b = distances[in_b, b] - distances[in_b, a]
+            order_a = np.argsort(-gain_a, kind='stable')
+            order_b = np.argsort(-gain_b, kind='stable')
+            in_a, gain_a = in_a[order_a], gain_a[order_a]
+            in_b, gain_b = in_b[order_b], gain_b[order_b]
+            num_pair = min(len(in_a), len(in_b))
+            net_gain = gain_a[:num_pair] + gain_b[:num_pair]
+            # net_gain is decreasing, so the good swaps are at the start
+            num_swap = np.count_nonzero(net_gain > 0)
+            if num_swap > 0:
+                any_were_swapped = True
+                labels[in_a[:num_swap]] = b
+                labels[in_b[:num_swap]] = a
+                free[in_a[:num_swap]] = False
+                free[in_b[:num_swap]] = False
+        if not any_were_swapped:
+            break
 
 
 def compact(population, num_cluster, max_iter=500):
@@ -479,6 +797,8 @@ def compact(population, num_cluster, max_iter=500):
         clustered.
     num_cluster : int (0..M]
         The number of clusters in which to divide M samples.
+    max_iter : int
+        The maximum number of sweeps of swaps between clusters.
 
     Returns
     -------
@@ -493,27 +813,24 @@ def compact(population, num_cluster, max_iter=500):
         uses uint16 as cluster tag, so it cannot count more than that number of
         clusters.
 
+
+    .. seealso:: :py:func:`tike.cluster.compact_append`
+
     """
     logger.info("Clustering method is compact.")
     # Indexing and serial operations is very slow on GPU, so always use host
-    population = cp.asnumpy(population)
+    population = _asnumpy(population)
     if not 0 < num_cluster < 0xFFFF:
         raise ValueError(
             f"The number of clusters must be 0 < {num_cluster} < 65536."
         )
     if (num_cluster == 1) or (num_cluster >= len(population)):
         return np.array_split(np.arange(population.shape[0]), num_cluster)
-    # Define a constant array used for indexing.
-    _all = np.arange(len(population))
     # Specify the number of points allowed in each cluster
-    size = np.zeros(num_cluster, dtype='int')
-    max_size = np.full(num_cluster, len(population) // num_cluster)
-    max_size[:len(population) % num_cluster] += 1
-    assert np.sum(max_size) == len(population), (
-        f"Sum of cluster maximums {np.sum(max_size)} should "
-        f"equal the population size {len(population)}!")
+    max_size = _compact_sizes(len(population), num_cluster)
 
     # Use kmeans++ to choose initial cluster centers
+    _all = np.arange(len(population))
     starting_centroids = np.zeros(num_cluster, dtype='int')
     starting_centroids[0] = np.random.choice(_all, size=1, p=None)[0]
     distances = np.inf
@@ -530,104 +847,20 @@ def compact(population, num_cluster, max_iter=500):
             size=1,
             p=distances / distances.sum(),
         )[0]
-    centroids = population[starting_centroids]
 
     # Use a label array to keep track of cluster assignment
-    UNASSIGNED = 0xFFFF
-    labels = np.full(len(population), UNASSIGNED, dtype='uint16')
+    labels = np.full(len(population), _UNASSIGNED, dtype='uint16')
+    labels[starting_centroids] = range(num_cluster)
 
     # Add all points to initial clusters
-    distances = np.empty((len(population), num_cluster))
-    unfilled_clusters = list(range(num_cluster))
-    _unassigned = list(range(len(population)))
-    for c in unfilled_clusters:
-        distances[:, c] = np.linalg.norm(centroids[c] - population, axis=1)
-        p = starting_centroids[c]
-        labels[p] = c
-        _unassigned.remove(p)
-        size[c] += 1
-    for c in range(num_cluster):
-        if size[c] >= max_size[c]:
-            unfilled_clusters.remove(c)
-    while unfilled_clusters:
-        nearest = np.array(unfilled_clusters)[np.argmin(
-            distances[:, unfilled_clusters],
-            axis=1,
-        )]
-        farthest = np.array(unfilled_clusters)[np.argmax(
-            distances[:, unfilled_clusters],
-            axis=1,
-        )]
-        priority = np.array(_unassigned)[np.argsort(
-            (distances[_all, nearest] -
-             distances[_all, farthest])[_unassigned])]
-        for p in priority:
-            assert labels[p] == UNASSIGNED
-            labels[p] = nearest[p]
-            _unassigned.remove(p)
-            size[nearest[p]] += 1
-            assert size[nearest[p]] <= max_size[nearest[p]], (
-                f"{size[nearest[p]]} !<= {max_size[nearest[p]]}")
-            if size[nearest[p]] >= max_size[nearest[p]]:
-                unfilled_clusters.remove(nearest[p])
-                # re-start with one less available cluster
-                break
-
-    if __debug__:
-        old_objective = _k_means_objective(population, labels, num_cluster)
+    _assign_to_nearest_unfilled(
+        _distances(population, population[starting_centroids]),
+        labels,
+        max_size,
+    )
 
     # Swap points between clusters to minimize objective
-    for _ in range(max_iter):
-        any_were_swapped = False
-        # Determine distance from each point to each cluster
-        for c in range(num_cluster):
-            distances[:, c] = np.linalg.norm(centroids[c] - population, axis=1)
-        # Determine if each point would be happier in another cluster.
-        # Negative happiness is bad; zero is optimal.
-        labels_wanted = np.argmin(distances, axis=1)
-        happiness = distances[_all, labels_wanted] - distances[_all, labels]
-        # Starting from the least happy point, swap points between groups to
-        # improve net happiness
-        for p in np.argsort(happiness):
-            if happiness[p] < 0:
-                # Compute the change in happiness from swapping this point with
-                # every other point
-                net_happiness = (
-                    + distances[p, labels[p]]
-                    + distances[_all, labels]
-                    - distances[p, labels]
-                    - distances[_all, labels[p]]
-                )  # yapf: disable
-                good_swaps = np.flatnonzero(
-                    np.logical_and(
-                        # only want swaps that improve happiness
-                        net_happiness > 0,
-                        # swapping within a cluster has no effect
-                        labels != labels[p],
-                    ))
-                if good_swaps.size > 0:
-                    any_were_swapped = True
-                    o = good_swaps[np.argmax(net_happiness[good_swaps])]
-                    assert labels[p] != labels[
-                        o], 'swapping within a cluster has no effect!'
-                    labels[o], labels[p] = labels[p], labels[o]
-                    happiness[o] = distances[o, labels_wanted[o]] - distances[
-                        o, labels[o]]
-                    happiness[p] = distances[p, labels_wanted[p]] - distances[
-                        p, labels[p]]
-        if not any_were_swapped:
-            break
-        elif __debug__:
-            objective = _k_means_objective(population, labels, num_cluster)
-            # print(f"{objective:e}")
-            # NOTE: Assertion disabled because happiness metric is heuristic
-            # approximation of k-means objective
-            # assert old_objective >= objective, (old_objective, objective)
-            old_objective = objective
-
-        # compute new cluster centroids
-        for c in range(num_cluster):
-            centroids[c] = np.mean(population[labels == c], axis=0)
+    _swap_to_nearest(population, labels, num_cluster, max_iter)
 
     if __debug__:
         for c in range(num_cluster):
@@ -637,26 +870,78 @@ def compact(population, num_cluster, max_iter=500):
     return indices
 
 
-def _k_means_objective(population, labels, num_cluster):
-    """Return the weighted sum of the generalized variance of each cluster."""
-    xp = cp.get_array_module(population)
-    cost = 0
-    for c in range(num_cluster):
-        weight = xp.sum(labels == c)
-        if weight > 1:
-            cost += weight * abs(
-                xp.linalg.det(xp.cov(
-                    population[labels == c],
-                    rowvar=False,
-                )))
-    return cost
+def compact_append(
+    population,
+    clusters: typing.List[npt.NDArray],
+    max_iter: int = 8,
+) -> typing.List[npt.NDArray]:
+    """Return compact clusters after adding new samples to existing clusters.
+
+    Instead of clustering the whole population again, each new sample joins
+    the nearest existing cluster which has room, then a few sweeps of swaps
+    between clusters keep the clusters compact. Use this function when new
+    samples arrive during an online reconstruction.
+
+    Parameters
+    ----------
+    population : (M, N) array_like
+        The M samples of an N dimensional population. The samples not in any
+        of the clusters are new.
+    clusters : (num_cluster,) list of array of integer
+        The existing clusters of population; e.g. from
+        :py:func:`tike.cluster.compact`.
+    max_iter : int
+        The maximum number of sweeps of swaps between clusters.
+
+    Returns
+    -------
+    indicies : (num_cluster,) list of array of integer
+        The indicies of population that belong to each cluster. Clusters are
+        sorted from largest to smallest.
+
+    """
+    population = _asnumpy(population)
+    num_cluster = len(clusters)
+    if (num_cluster == 1) or (num_cluster >= len(population)):
+        return np.array_split(np.arange(population.shape[0]), num_cluster)
+    labels = np.full(len(population), _UNASSIGNED, dtype='uint16')
+    for c, indices in enumerate(clusters):
+        labels[_asnumpy(indices)] = c
+    size = np.bincount(labels[labels != _UNASSIGNED], minlength=num_cluster)
+    # The largest clusters are allowed to remain the largest
+    max_size = np.empty_like(size)
+    max_size[np.argsort(-size, kind='stable')] = _compact_sizes(
+        len(population),
+        num_cluster,
+    )
+    if np.any(size > max_size) or np.any(size == 0):
+        logger.info("Existing clusters cannot be grown equally; "
+                    "clustering from scratch.")
+        return compact(population, num_cluster)
+    logger.info(f"Adding {np.sum(labels == _UNASSIGNED):,d} samples to "
+                f"{num_cluster:,d} compact clusters.")
+    _assign_to_nearest_unfilled(
+        _distances(population, _centroids(
+            population[labels != _UNASSIGNED],
+            labels[labels != _UNASSIGNED],
+            num_cluster,
+        )),
+        labels,
+        max_size,
+    )
+    _swap_to_nearest(population, labels, num_cluster, max_iter)
+    if __debug__:
+        for c in range(num_cluster):
+            _assert_cluster_is_full(labels, c, max_size[c])
+    indices = [np.flatnonzero(labels == c) for c in range(num_cluster)]
+    indices.sort(key=len, reverse=True)
+    return indices
 
 
 def _assert_cluster_is_full(labels, c, size):
-    xp = cp.get_array_module(labels)
     assert size == np.sum(labels == c), ('All clusters should be full, but '
                                          f'cluster {c} had '
-                                         f'{xp.sum(labels == c)} points '
+                                         f'{np.sum(labels == c)} points '
                                          f'when it should have {size}.')
 
 
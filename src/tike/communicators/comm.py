@@ -1,20 +1,65 @@
 """Defines a communicator for both inter-GPU and inter-node communications."""
 
+from __future__ import annotations
+
 __author__ = "Xiaodong Yu, Daniel Ching"
 __copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
 
+from concurrent.futures import Future, ThreadPoolExecutor
 import warnings
 import typing
 
-import cupy as cp
 import numpy as np
 
 from .mpi import MPIComm, NoMPIComm
 from .pool import ThreadPool
 
+if typing.TYPE_CHECKING:
+    import cupy as cp
+
 
 def _init_streams():
-    return [cp.cuda.Stream() for _ in range(2)]
+    import cupy
+    return [cupy.cuda.Stream() for _ in range(2)]
+
+
+def _record_event() -> cp.cuda.Event:
+    import cupy
+    return cupy.cuda.get_current_stream().record()
+
+
+def _wait_event(event: cp.cuda.Event) -> None:
+    import cupy
+    cupy.cuda.get_current_stream().wait_event(event)
+
+
+class Request():
+    """A reduction which was started in the background by a Comm.
+
+    Call :py:meth:`Request.wait` to get the result. The inputs of the
+    reduction are kept alive until then, so they must not be modified before
+    the request is complete.
+    """
+
+    def __init__(
+        self,
+        future: Future,
+        finish: typing.Callable[[typing.Any], typing.Any],
+        x: typing.List[cp.ndarray],
+    ):
+        self._future = future
+        self._finish = finish
+        self._x = x
+
+    def wait(self):
+        """Return the result of the reduction.
+
+        On GPU workers, the work queued after this call waits for the
+        reduction on the devices without blocking the host.
+        """
+        result = self._finish(self._future.result())
+        self._x = None
+        return result
 
 
 class Comm:
@@ -26,11 +71,15 @@ class Comm:
     Attributes
     ----------
     gpu_count : int
-        The number of GPUs to use per process.
+        The number of GPUs to use per process. The number of CPU workers per
+        process when `xp` is NumPy.
     mpi : class
         The multi-processing communicator.
     pool : class
         The multi-threading communicator.
+    xp : module
+        The array module of the pool workers; CuPy if None. Use NumPy for CPU
+        workers which do not require CUDA; the streams of CPU workers are None.
 
     """
 
@@ -40,14 +89,24 @@ class Comm:
         mpi: typing.Union[typing.Type[MPIComm],
                           typing.Type[NoMPIComm]] = NoMPIComm,
         pool: typing.Type[ThreadPool] = ThreadPool,
+        xp=None,
     ):
         if isinstance(mpi, NoMPIComm):
             self.use_mpi = False
         else:
             self.use_mpi = True
         self.mpi = mpi()
-        self.pool = pool(gpu_count)
-        self.streams = self.pool.map(_init_streams)
+        self.pool = pool(gpu_count, xp=xp)
+        if self.pool.xp is np:
+            self.streams = [[None, None] for _ in self.pool.workers]
+            self._reduction_stream = None
+        else:
+            self.streams = self.pool.map(_init_streams)
+            with self.pool.Device(self.pool.workers[0]):
+                # Does not implicitly synchronize with the default stream
+                self._reduction_stream = self.pool.xp.cuda.Stream(
+                    non_blocking=True)
+        self._background = ThreadPoolExecutor(1)
 
     def __enter__(self):
         self.mpi.__enter__()
@@ -55,6 +114,7 @@ class Comm:
         return self
 
     def __exit__(self, type, value, traceback):
+        self._background.shutdown(wait=True)
         self.mpi.__exit__(type, value, traceback)
         self.pool.__exit__(type, value, traceback)
 
@@ -104,15 +164,27 @@ class Comm:
         axis: typing.Union[int, None] = 0,
     ) -> cp.ndarray:
         """Multi-process multi-GPU based mean."""
-        with cp.cuda.Device(self.pool.workers[0]):
-            counts_local = np.array(
-                [1 if x0.ndim == 0 else x0.shape[axis] for x0 in x],
-                dtype=x[0].dtype,
-            ).sum()
-            counts_all = self.mpi.Allgather(counts_local, axis=None).sum()
-            weight_local = counts_local / counts_all
-            return self.mpi.Allreduce(
-                self.pool.reduce_mean(x, axis=axis) * weight_local)
+        with self.pool.Device(self.pool.workers[0]):
+            return self._Allreduce_mean_mpi(
+                self.pool.reduce_mean(x, axis=axis),
+                x,
+                axis,
+            )
+
+    def _Allreduce_mean_mpi(
+        self,
+        mean: cp.ndarray,
+        x: typing.List[cp.ndarray],
+        axis: typing.Union[int, None],
+    ) -> cp.ndarray:
+        """Weight the mean of this process by its share of x and sum."""
+        counts_local = np.array(
+            [1 if x0.ndim == 0 else x0.shape[axis] for x0 in x],
+            dtype=x[0].dtype,
+        ).sum()
+        counts_all = self.mpi.Allgather(counts_local, axis=None).sum()
+        weight_local = counts_local / counts_all
+        return self.mpi.Allreduce(mean * weight_local)
 
     def Allreduce(self, x, s=None, **kwargs):
         """ThreadPool allreduce coupled with MPI allreduce.
@@ -130,9 +202,92 @@ class Comm:
         src = self.pool.allreduce(x, s)
         buf = []
         for worker in self.pool.workers:
-            with cp.cuda.Device(worker):
+            with self.pool.Device(worker):
                 buf.append(
-                    cp.asarray(
+                    self.pool.xp.asarray(
                         self.mpi.Allreduce(
-                            cp.asnumpy(src[self.pool.workers.index(worker)]),)))
+                            self.pool._copy_host(
+                                src[self.pool.workers.index(worker)],
+                                worker,
+                            ),)))
         return buf
+
+    def _start(
+        self,
+        reduce: typing.Callable[[typing.List[cp.ndarray]], cp.ndarray],
+        x: typing.List[cp.ndarray],
+    ) -> Future:
+        """Reduce x to the first worker in the background.
+
+        For GPU workers, the reduction is queued on a separate stream after
+        the work that is already queued on each worker, so it overlaps with
+        work that is queued later. The future returns the reduction and an
+        event which marks its completion.
+        """
+        if self._reduction_stream is None:
+            return self._background.submit(lambda: (reduce(x), None))
+        ready = self.pool.map(_record_event)
+
+        def f():
+            with self.pool.Device(self.pool.workers[0]):
+                with self._reduction_stream as stream:
+                    for event in ready:
+                        stream.wait_event(event)
+                    result = reduce(x)
+                    return result, stream.record()
+
+        return self._background.submit(f)
+
+    def _join(self, future_result) -> cp.ndarray:
+        result, done = future_result
+        if done is not None:
+            self.pool.map(_wait_event, [done] * self.pool.num_workers)
+        return result
+
+    def Iallreduce(self, x: typing.List[cp.ndarray]) -> Request:
+        """Start a non-blocking :py:meth:`Comm.Allreduce`.
+
+        The devices reduce x while the host queues more work. Each worker's
+        part of x must be ready on its current stream; the work queued on
+        the current streams after :py:meth:`Request.wait` waits for the
+        result. MPI communication happens during :py:meth:`Request.wait`
+        so that all processes call their collectives in the same order.
+        """
+
+        def reduce(x):
+            return sum(self.pool._copy_to(part, self.pool.workers[0])
+                       for part in x)
+
+        def finish(future_result):
+            result = self._join(future_result)
+            if self.mpi.size > 1:
+                with self.pool.Device(self.pool.workers[0]):
+                    result = self.pool.xp.asarray(
+                        self.mpi.Allreduce(
+                            self.pool._copy_host(
+                                result,
+                                self.pool.workers[0],
+                            )))
+            return self.pool.bcast([result])
+
+        return Request(self._start(reduce, x), finish, x)
+
+    def Iallreduce_mean(
+        self,
+        x: typing.List[cp.ndarray],
+        axis: typing.Union[int, None] = 0,
+    ) -> Request:
+        """Start a non-blocking :py:meth:`Comm.Allreduce_mean`.
+
+        .. seealso:: :py:meth:`Comm.Iallreduce`
+        """
+
+        def reduce(x):
+            return self.pool.reduce_mean(x, axis=axis)
+
+        def finish(future_result):
+            result = self._join(future_result)
+            with self.pool.Device(self.pool.workers[0]):
+                return self._Allreduce_mean_mpi(result, x, axis)
+
+        return Request(self._start(reduce, x), finish, x)
@@ -1,15 +1,41 @@
 """Define a MPI wrapper for inter-node communications."""
 
+from __future__ import annotations
+
 __author__ = "Xiaodong Yu, Daniel Ching"
 __copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
 __docformat__ = 'restructuredtext en'
 
 import os
+import sys
 import typing
 import warnings
 
 import numpy as np
-import cupy as cp
+
+if typing.TYPE_CHECKING:
+    import cupy as cp
+
+
+def _get_array_module(x):
+    """Return the array module of x; CuPy is only imported for CuPy arrays."""
+    if isinstance(x, np.ndarray):
+        return np
+    import cupy
+    return cupy.get_array_module(x)
+
+
+def _synchronize(xp=None):
+    """Wait for the current CUDA stream when xp (or any imported) is CuPy.
+
+    Buffers must be ready on the host before MPI reads them. Nothing is
+    waited for when xp is NumPy or CuPy was never imported.
+    """
+    if xp is np:
+        return
+    cupy = sys.modules.get('cupy') if xp is None else xp
+    if cupy is not None and cupy.cuda.is_available():
+        cupy.cuda.get_current_stream().synchronize()
 
 
 def combined_shape(
@@ -178,11 +204,11 @@ def check_opal(func):
     """Move sendbuf to host before the function if opal is not avaiable."""
 
     def wrapper(self, sendbuf, *args, **kwargs):
-        xp = cp.get_array_module(sendbuf)
+        xp = _get_array_module(sendbuf)
 
-        if not self._use_opal and xp.__name__ == cp.__name__:
-            return cp.asarray(
-                func(self, cp.asnumpy(sendbuf), *args, **kwargs))
+        if not self._use_opal and xp is not np:
+            return xp.asarray(
+                func(self, xp.asnumpy(sendbuf), *args, **kwargs))
 
         return func(self, sendbuf, *args, **kwargs)
 
@@ -252,7 +278,7 @@ try:
             root: int = 0,
         ) -> typing.Any:
             """Send a Python object from a root to all processes."""
-            cp.cuda.get_current_stream().synchronize()
+            _synchronize()
             return self.comm.bcast(sendobj, root=root)
 
         @check_opal
@@ -266,11 +292,11 @@ try:
             if sendbuf is None:
                 raise ValueError(f"Broadcast data can't be empty.")
 
-            xp = cp.get_array_module(sendbuf)
+            xp = _get_array_module(sendbuf)
 
             if self.rank != root:
                 sendbuf = xp.empty_like(sendbuf)
-            cp.cuda.get_current_stream().synchronize()
+            _synchronize(xp)
             self.comm.Bcast(sendbuf, root=root)
             return sendbuf
 
@@ -293,7 +319,7 @@ try:
             if sendbuf is None:
                 raise ValueError(f"Gather data can't be empty.")
 
-            xp = cp.get_array_module(sendbuf)
+            xp = _get_array_module(sendbuf)
 
             assert axis is None or sendbuf.ndim > 0, "Cannot concatenate zero-dimensional arrays; use `axis=None`"
 
@@ -310,7 +336,7 @@ try:
             else:
                 recvbuf = None
                 sizes = None
-            cp.cuda.get_current_stream().synchronize()
+            _synchronize(xp)
             self.comm.Gatherv(sendbuf, (recvbuf, sizes), root=root)
             if self.rank == root:
                 assert recvbuf is not None
@@ -353,10 +379,10 @@ try:
             if sendbuf is None:
                 raise ValueError(f"Allreduce data can't be empty.")
 
-            xp = cp.get_array_module(sendbuf)
+            xp = _get_array_module(sendbuf)
 
             recvbuf = xp.empty_like(sendbuf)
-            cp.cuda.get_current_stream().synchronize()
+            _synchronize(xp)
             self.comm.Allreduce(sendbuf, recvbuf, op=op)
             return recvbuf
 
@@ -378,7 +404,7 @@ try:
             if sendbuf is None:
                 raise ValueError("Allgather data can't be None")
 
-            xp = cp.get_array_module(sendbuf)
+            xp = _get_array_module(sendbuf)
 
             assert axis is None or sendbuf.ndim > 0, "Cannot concatenate zero-dimensional arrays; use `axis=None`"
 
@@ -390,7 +416,7 @@ try:
                 sendbuf,
                 shape=sum(sizes),
             )
-            cp.cuda.get_current_stream().synchronize()
+            _synchronize(xp)
             self.comm.Allgatherv(sendbuf, (recvbuf, sizes))
             restored_arrays = [
                 x.reshape(shape) for x, shape in zip(
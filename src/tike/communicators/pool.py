@@ -1,16 +1,24 @@
 """Defines a worker Pool for multi-device managerment."""
 
+from __future__ import annotations
+
 __author__ = "Daniel Ching, Xiaodong Yu"
 __copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
 __docformat__ = 'restructuredtext en'
 
 from concurrent.futures import ThreadPoolExecutor
+import glob
+import os
 import typing
 import warnings
 
-import cupy as cp
 import numpy as np
 
+import tike.trace
+
+if typing.TYPE_CHECKING:
+    import cupy as cp
+
 
 class NoPoolExecutor():
     """Replaces ThreadPoolExecutor when only one thread is needed."""
@@ -31,22 +39,122 @@ class NoPoolExecutor():
         return map(func, *iterables)
 
 
+def _parse_cpulist(cpulist: str) -> typing.Set[int]:
+    """Return the CPU ids in a Linux cpulist string e.g. '0-3,8,10-11'."""
+    cpus = set()
+    for group in cpulist.strip().split(','):
+        if not group:
+            continue
+        first, _, last = group.partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _available_cpus() -> typing.Set[int]:
+    """Return the CPU ids that this process is allowed to run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+def _numa_nodes() -> typing.List[typing.List[int]]:
+    """Return the available CPU ids grouped by NUMA node.
+
+    All available CPUs are returned as a single node when the NUMA topology
+    cannot be read from sysfs.
+    """
+    available = _available_cpus()
+    nodes = []
+    for path in sorted(
+            glob.glob('/sys/devices/system/node/node[0-9]*/cpulist'),
+            key=lambda x: int(os.path.basename(os.path.dirname(x))[4:]),
+    ):
+        with open(path) as f:
+            cpus = _parse_cpulist(f.read()) & available
+        if cpus:
+            nodes.append(sorted(cpus))
+    if not nodes:
+        nodes = [sorted(available)]
+    return nodes
+
+
+def _partition_cpus(num_workers: int) -> typing.List[typing.Set[int]]:
+    """Divide the available CPUs into one set per worker.
+
+    Workers are assigned to NUMA nodes round-robin, and the CPUs of each node
+    are divided evenly among the workers assigned to that node; no worker
+    spans more than one node unless there are fewer workers than nodes.
+    Workers share CPUs only when there are more workers on a node than CPUs.
+    """
+    nodes = _numa_nodes()
+    if num_workers < len(nodes):
+        return [set().union(*nodes[w::num_workers]) for w in range(num_workers)]
+    partitions = []
+    for w in range(num_workers):
+        node = nodes[w % len(nodes)]
+        num_sharing = len(range(w % len(nodes), num_workers, len(nodes)))
+        part = np.array_split(node, num_sharing)[w // len(nodes)]
+        partitions.append(set(part.tolist()) if part.size > 0 else set(node))
+    return partitions
+
+
+class PinnedThread():
+    """Pin the calling thread to a set of CPUs while in context.
+
+    The CPU analog of cupy.cuda.Device; the previous affinity of the thread is
+    restored on exit. Pinning is skipped on platforms without
+    os.sched_setaffinity.
+
+    Parameters
+    ----------
+    cpus : set(int)
+        The ids of the CPUs which the thread may run on.
+    """
+
+    def __init__(self, cpus: typing.Set[int]):
+        self.cpus = cpus
+        self._previous = []
+
+    def __enter__(self):
+        if hasattr(os, 'sched_setaffinity'):
+            # pid 0 is the calling thread on Linux
+            self._previous.append(os.sched_getaffinity(0))
+            os.sched_setaffinity(0, self.cpus)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self._previous:
+            os.sched_setaffinity(0, self._previous.pop())
+
+
 class ThreadPool():
     """Python thread pool plus scatter gather methods.
 
     A Pool is a context manager which provides access to and communications
     amongst workers.
 
+    When `xp` is NumPy, the pool does not use CUDA. Instead, each worker is a
+    thread which is pinned to its own partition of the host CPUs while it does
+    work; partitions do not span NUMA nodes. Arrays sent to a CPU worker are
+    copied by the pinned thread, so their memory is first touched on the NUMA
+    node of that worker.
+
     Attributes
     ----------
     workers : int, tuple(int)
         The number of GPUs to use or a tuple of the device numbers of the GPUs
         to use. If the number of GPUs is less than the requested number, only
-        workers for the available GPUs are allocated.
+        workers for the available GPUs are allocated. For CPU workers, the
+        number of workers or a tuple of worker ids in range(device_count).
     device_count : int
-        The total number of devices on the host as reported by CUDA runtime.
+        The total number of devices on the host as reported by CUDA runtime or
+        the number of CPUs available to this process for CPU workers.
     num_workers : int
         Returns len(self.workers). For convenience.
+    xp : module
+        The array module of the workers: CuPy for GPU workers and NumPy for
+        CPU workers. CuPy is only imported for GPU workers, so CPU workers do
+        not need CUDA.
 
     Raises
     ------
@@ -57,40 +165,52 @@ class ThreadPool():
 
     """
 
-    Device = cp.cuda.Device
-
     def __init__(
         self,
         workers: typing.Union[int, typing.Tuple[int, ...]],
-        xp=cp,
+        xp=None,
         device_count: typing.Union[int, None] = None,
     ):
-        self.device_count = cp.cuda.runtime.getDeviceCount(
-        ) if device_count is None else device_count
+        if xp is None:
+            import cupy
+            xp = cupy
+        self.use_cpu = xp is np
+        if not self.use_cpu:
+            self.Device = xp.cuda.Device
+        if device_count is not None:
+            self.device_count = device_count
+        elif self.use_cpu:
+            self.device_count = len(_available_cpus())
+        else:
+            self.device_count = xp.cuda.runtime.getDeviceCount()
         if isinstance(workers, int):
             if workers < 1:
                 raise ValueError(f"Provide workers > 0, not {workers}.")
             if workers > self.device_count:
                 warnings.warn(
-                    "Not enough CUDA devices for workers!"
+                    "Not enough devices for workers!"
                     f" Requested {workers} of {self.device_count} devices.")
                 workers = min(workers, self.device_count)
-            if workers == 1:
+            if workers == 1 and not self.use_cpu:
                 # Respect "with cp.cuda.Device()" blocks for single thread
-                workers = (int(cp.cuda.Device().id),)
+                workers = (int(xp.cuda.Device().id),)
             else:
                 workers = tuple(range(workers))
         for w in workers:
             if w < 0 or w >= self.device_count:
-                raise ValueError(f'{w} is not a valid GPU device number.')
+                raise ValueError(f'{w} is not a valid device number.')
         self.workers = workers
         self.xp = xp
+        if self.use_cpu:
+            self._cpus = dict(
+                zip(self.workers, _partition_cpus(self.num_workers)))
+            self.Device = self._pin_thread
         self.executor = ThreadPoolExecutor(
             self.num_workers) if self.num_workers > 1 else NoPoolExecutor(
                 self.num_workers)
 
     def __enter__(self):
-        if self.workers[0] != cp.cuda.Device().id:
+        if not self.use_cpu and self.workers[0] != self.Device().id:
             raise ValueError(
                 "The primary worker must be the current device. "
                 f"Use `with cupy.cuda.Device({self.workers[0]}):` to set the "
@@ -105,12 +225,23 @@ class ThreadPool():
     def num_workers(self):
         return len(self.workers)
 
+    def _pin_thread(self, worker: int) -> PinnedThread:
+        return PinnedThread(self._cpus[worker])
+
     def _copy_to(
         self,
         x: typing.Union[cp.ndarray, np.ndarray],
         worker: int,
     ) -> cp.ndarray:
         with self.Device(worker):
+            if self.use_cpu:
+                tike.trace.count_bytes('device_to_device', x.nbytes)
+                # Always copy, so each CPU worker owns memory local to it
+                return np.array(x)
+            if isinstance(x, np.ndarray):
+                tike.trace.count_bytes('host_to_device', x.nbytes)
+            elif x.device.id != worker:
+                tike.trace.count_bytes('device_to_device', x.nbytes)
             return self.xp.asarray(x)
 
     def _copy_host(
@@ -118,7 +249,11 @@ class ThreadPool():
         x: cp.ndarray,
         worker: int,
     ) -> np.ndarray:
+        if self.use_cpu:
+            return np.asarray(x)
         with self.Device(worker):
+            if isinstance(x, self.xp.ndarray):
+                tike.trace.count_bytes('device_to_host', x.nbytes)
             return self.xp.asnumpy(x)
 
     def bcast(
@@ -343,7 +478,7 @@ class ThreadPool():
         """Reduce x by addition to one GPU from all other GPUs."""
         worker = self.workers[0] if worker is None else worker
         with self.Device(worker):
-            return cp.mean(
+            return self.xp.mean(
                 self.gather(x, worker=worker, axis=axis),
                 keepdims=x[0].ndim > 0,
                 axis=axis,
@@ -395,7 +530,11 @@ class ThreadPool():
         workers: typing.Union[typing.Tuple[int, ...], None] = None,
         **kwargs,
     ) -> list:
-        """ThreadPoolExecutor.map, but wraps call in a cuda.Device context."""
+        """ThreadPoolExecutor.map, but wraps call in a worker's device context.
+
+        The device context is a cuda.Device for GPU workers or a PinnedThread
+        for CPU workers.
+        """
 
         def f(worker, *args):
             with self.Device(worker):
@@ -1,16 +1,73 @@
+"""Stream host data through CUDA devices in chunks.
+
+CuPy is imported when these functions are called, so the module may be
+imported on hosts without CUDA.
+"""
+
+from __future__ import annotations
+
 import typing
 import math
 
-import cupy as cp
+import numpy as np
 import numpy.typing as npt
 
+import tike.trace
+
+if typing.TYPE_CHECKING:
+    import cupy as cp
+
+
+def _contiguous_run(indices: typing.Sequence[int]) -> typing.Union[slice, None]:
+    """Return a slice equivalent to indices if they are consecutive."""
+    indices = np.asarray(indices)
+    if (indices.ndim == 1 and len(indices) > 0
+            and indices[-1] - indices[0] == len(indices) - 1
+            and np.all(np.diff(indices) == 1)):
+        return slice(int(indices[0]), int(indices[-1]) + 1)
+    return None
+
+
+def _copy_chunk_to_device(
+    x_gpu: cp.ndarray,
+    x: npt.ArrayLike,
+    indices: typing.Sequence[int],
+    staging: typing.Union[None, npt.NDArray],
+) -> typing.Union[None, npt.NDArray]:
+    """Copy x[indices] into x_gpu on the current stream.
+
+    Host to device copies are only asynchronous from pinned memory. Fancy
+    indexing a pinned array returns pageable memory, so a consecutive run of
+    indices is copied from a view of x instead. Other host sources (scattered
+    indices, memory maps, lazy arrays) are gathered into a pinned staging
+    buffer first. The staging buffer is allocated on first use and returned so
+    that it can be reused for later chunks.
+    """
+    import cupy as cp
+    import cupyx
+    if isinstance(x, cp.ndarray):
+        x_gpu[...] = x[indices]
+        return staging
+    tike.trace.count_bytes('host_to_device', x_gpu.nbytes)
+    run = _contiguous_run(indices)
+    if (run is not None and type(x) is np.ndarray
+            and x.flags.c_contiguous and x.dtype == x_gpu.dtype):
+        x_gpu.set(x[run])
+        return staging
+    if staging is None or staging.shape[0] < len(x_gpu):
+        staging = cupyx.empty_pinned(shape=x_gpu.shape, dtype=x_gpu.dtype)
+    staged = staging[:len(x_gpu)]
+    staged[...] = x[indices]
+    x_gpu.set(staged)
+    return staging
+
 
 def stream_and_reduce(
     f: typing.Callable[[npt.NDArray], typing.Tuple[npt.NDArray, ...]],
     args: typing.List[npt.NDArray],
     y_shapes: typing.List[typing.List[int]],
     y_dtypes: typing.List[npt.DTypeLike],
-    streams: typing.List[cp.cuda.Stream] = [cp.cuda.Stream(), cp.cuda.Stream()],
+    streams: typing.Union[None, typing.List[cp.cuda.Stream]] = None,
     indices: typing.Union[None, typing.List[int]] = None,
     *,
     chunk_size: int = 64,
@@ -30,13 +87,14 @@ def stream_and_reduce(
     args: [(N, ...) array, (N, ...) array, ...]
         A list of pinned arrays that can be sliced along the 0-th dimension for
         work. If you have constant args that are not sliced, Use a wrapper
-        function
+        function. Other host arrays, such as memory maps, are gathered
+        through pinned staging buffers while the previous chunk is processed.
     y_shapes:
         The shape of the output of f(args)
     y_dtypes:
         The dtypes of the outputs of f(args)
     streams:
-        A list of two CUDA streams to use for streaming
+        A list of two CUDA streams to use for streaming; new streams if None.
     indices:
         A list of indices to use instead of range(0, N) for slices of args
     chunk_size:
@@ -66,6 +124,9 @@ def stream_and_reduce(
         result = [np.sum(y, axis=0) for y in zip(*[f(*x) for x in zip(*args)])]
 
     """
+    import cupy as cp
+    if streams is None:
+        streams = [cp.cuda.Stream(), cp.cuda.Stream()]
     if indices is None:
         N = len(args[0])
         indices = range(N)
@@ -75,11 +136,13 @@ def stream_and_reduce(
     num_streams = 2
 
     args_gpu = [
-        cp.empty_like(
-            x,
+        cp.empty(
             shape=(num_streams * chunk_size, *x.shape[1:]),
+            dtype=x.dtype,
         ) for x in args
     ]
+    # One pinned staging buffer per buffer_index and arg
+    staging = [[None] * len(args) for _ in range(num_streams)]
     y_sums = [
         cp.zeros(dtype=d, shape=(num_streams, *s))
         for d, s in zip(y_dtypes, y_shapes)
@@ -93,12 +156,13 @@ def stream_and_reduce(
         bufhi = buflo + len(indices_chunk)
 
         with streams[0]:
-            for x_gpu, x in zip(args_gpu, args):
-                # Use a range because set() needs an array always; never scalar
-                if isinstance(x, cp.ndarray):
-                    x_gpu[buflo:bufhi] = x[indices_chunk]
-                else:  # x is a pinned np.ndarray
-                    x_gpu[buflo:bufhi].set(x[indices_chunk])
+            for j, (x_gpu, x) in enumerate(zip(args_gpu, args)):
+                staging[buffer_index][j] = _copy_chunk_to_device(
+                    x_gpu[buflo:bufhi],
+                    x,
+                    indices_chunk,
+                    staging[buffer_index][j],
+                )
 
         streams[0].synchronize()
         streams[1].synchronize()
@@ -121,7 +185,7 @@ def stream_and_modify(
     ],
     ind_args: typing.List[npt.NDArray],
     mod_args: typing.Tuple,
-    streams: typing.List[cp.cuda.Stream] = [cp.cuda.Stream(), cp.cuda.Stream()],
+    streams: typing.Union[None, typing.List[cp.cuda.Stream]] = None,
     indices: typing.Union[None, typing.List[int]] = None,
     *,
     chunk_size: int = 64,
@@ -142,11 +206,12 @@ def stream_and_modify(
     ind_args: [(N, ...) array, (N, ...) array, ...]
         A list of pinned arrays that can be sliced along the 0-th dimension for
         work. If you have constant args that are not sliced, Use a wrapper
-        function
+        function. Other host arrays, such as memory maps, are gathered
+        through pinned staging buffers while the previous chunk is processed.
     mod_args:
         A tuple of args that are modified across calls to f
     streams:
-        A list of two CUDA streams to use for streaming
+        A list of two CUDA streams to use for streaming; new streams if None.
     indices:
         A list of indices to use instead of range(0, N) for slices of args
     chunk_size:
@@ -181,6 +246,9 @@ def stream_and_modify(
         assert mod_args == truth
 
     """
+    import cupy as cp
+    if streams is None:
+        streams = [cp.cuda.Stream(), cp.cuda.Stream()]
     if indices is None:
         N = len(ind_args[0])
         indices = list(range(N))
@@ -190,11 +258,13 @@ def stream_and_modify(
     num_streams = 2
 
     ind_args_gpu = [
-        cp.empty_like(
-            x,
+        cp.empty(
             shape=(num_streams * chunk_size, *x.shape[1:]),
+            dtype=x.dtype,
         ) for x in ind_args
     ]
+    # One pinned staging buffer per buffer_index and arg
+    staging = [[None] * len(ind_args) for _ in range(num_streams)]
 
     for s, i in enumerate(range(0, N, chunk_size)):
         buffer_index = s % num_streams
@@ -204,12 +274,13 @@ def stream_and_modify(
         bufhi: int = buflo + len(indices_chunk)
 
         with streams[0]:
-            for x_gpu, x in zip(ind_args_gpu, ind_args):
-                # Use a range because set() needs an array always; never scalar
-                if isinstance(x, cp.ndarray):
-                    x_gpu[buflo:bufhi] = x[indices_chunk]
-                else:  # x is a pinned np.ndarray
-                    x_gpu[buflo:bufhi].set(x[indices_chunk])
+            for j, (x_gpu, x) in enumerate(zip(ind_args_gpu, ind_args)):
+                staging[buffer_index][j] = _copy_chunk_to_device(
+                    x_gpu[buflo:bufhi],
+                    x,
+                    indices_chunk,
+                    staging[buffer_index][j],
+                )
 
         streams[0].synchronize()
         streams[1].synchronize()
@@ -233,7 +304,7 @@ def stream_and_modify_debug(
     ],
     ind_args: typing.List[npt.NDArray],
     mod_args: typing.Tuple,
-    streams: typing.List[cp.cuda.Stream] = [cp.cuda.Stream(), cp.cuda.Stream()],
+    streams: typing.Union[None, typing.List[cp.cuda.Stream]] = None,
     indices: typing.Union[None, typing.List[int]] = None,
     *,
     chunk_size: int = 64,
@@ -251,13 +322,16 @@ def stream_and_modify_debug(
     mod_args:
         A tuple of args that are modified across calls to f
     streams:
-        A list of two CUDA streams to use for streaming
+        A list of two CUDA streams to use for streaming; new streams if None.
     indices:
         A list of indices to use instead of range(0, N) for slices of args
     chunk_size:
         The number of slices out of N to process at one time
 
     """
+    import cupy as cp
+    if streams is None:
+        streams = [cp.cuda.Stream(), cp.cuda.Stream()]
     if indices is None:
         N = len(ind_args[0])
         indices = list(range(N))
@@ -10,6 +10,14 @@ operators in the future.
 
 All operator methods accept the array type that matches the output of their
 asarray() method.
+
+Two backends are provided: :py:mod:`tike.operators.cupy` for CUDA devices and
+:py:mod:`tike.operators.numpy` for the host CPU. The backend of an operator is
+given by its `xp` attribute. The CuPy operators are exported from this module
+when CuPy is available; otherwise, the NumPy operators are exported.
 """
 
-from .cupy import *
+try:
+    from .cupy import *
+except ImportError:
+    from .numpy import *
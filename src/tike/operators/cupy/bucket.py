@@ -1,11 +1,6 @@
 __author__ = "Daniel Ching, Xiaodong Yu"
 __copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
 
-try:
-    from importlib.resources import files
-except ImportError:
-    # Backport for python<3.9 available as importlib_resources package
-    from importlib_resources import files
 from itertools import product
 import logging
 
@@ -13,6 +8,8 @@ import cupy as cp
 import numpy as np
 import tike.precision
 
+from ..plancache import PlanCache
+from .kernel import LazyModule
 from .lamino import Lamino
 
 kernels = [
@@ -24,11 +21,7 @@ kernels = [
     'adj<double2>',
 ]
 
-_bucket_module = cp.RawModule(
-    code=files('tike.operators.cupy').joinpath('bucket.cu').read_text(),
-    name_expressions=kernels,
-    options=('--std=c++11',),
-)
+_bucket_module = LazyModule('bucket.cu', kernels)
 
 typename = {
     np.dtype('complex64'): 'float2',
@@ -40,6 +33,24 @@ typename = {
 logger = logging.getLogger(__name__)
 
 
+class _Geometry():
+    """The grid index and the plane index of every angle for a Bucket.
+
+    The theta and grid arrays are referenced so that their memory cannot be
+    reused by other arrays while the geometry is cached.
+    """
+
+    def __init__(self, theta, grid, grid_index, plane_index):
+        self.theta = theta
+        self.grid = grid
+        self.grid_index = grid_index
+        self.plane_index = plane_index
+
+    @property
+    def nbytes(self):
+        return self.grid_index.nbytes + self.plane_index.nbytes
+
+
 class Bucket(Lamino):
     """A Laminography operator.
 
@@ -66,9 +77,14 @@ class Bucket(Lamino):
         The complex projection data of the object.
     theta : array-like float32
         The projection angles; rotation around the vertical axis of the object.
+    geometry_max_bytes : int
+        The device memory budget for the projection geometry which is reused
+        between calls with the same theta and grid. A budget of zero computes
+        the geometry on every call. The geometry is released when the operator
+        exits.
     """
 
-    def __init__(self, n, tilt, eps=1, **kwargs):
+    def __init__(self, n, tilt, eps=1, geometry_max_bytes=2**30, **kwargs):
         """Please see help(Lamino) for more info."""
         self.n = n
         self.tilt = np.single(tilt)
@@ -80,12 +96,98 @@ class Bucket(Lamino):
                     precision, eps)
         self.precision = np.int16(precision)
         self.weight = np.double(1.0 / self.precision**3)
+        self.geometry_cache = PlanCache(
+            max_bytes=geometry_max_bytes,
+            max_plans=16,
+        )
 
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
-        pass
+        self.geometry_cache.clear()
+
+    def _grid_index(self, grid):
+        """Return the indices of the grid points in the object array."""
+        gmax, gmin = grid[:, :1].max(), grid[:, :1].min()
+        return cp.concatenate(
+            [(grid[:, :1] + cp.abs(gmin)) % (gmax - gmin),
+             (grid[:, 1:] + self.n // 2) % self.n],
+            axis=-1,
+        )
+
+    def _plane_index(self, theta, grid, t, plane_coords):
+        """Return the indices of the projections of the grid for angle t."""
+        _coords_weights_kernel = _bucket_module.get_function(
+            f'coordinates_and_weights<{typename[theta.dtype]},{typename[theta.dtype]}3>'
+        )
+        assert grid.dtype == 'int16'
+        assert self.tilt.dtype == np.single
+        assert self.precision.dtype == 'int16'
+        assert plane_coords.dtype == 'int16'
+        _coords_weights_kernel(
+            (grid.shape[0],),
+            (self.precision, self.precision, self.precision),
+            (
+                grid,
+                grid.shape[0],
+                self.tilt,
+                theta,
+                t,
+                self.precision,
+                plane_coords,
+            ),
+        )
+        # Shift zero-centered coordinates to array indices; wrap negative
+        # indices around
+        return (plane_coords + self.n // 2) % self.n
+
+    def _make_geometry(self, theta, grid):
+        grid_index = self._grid_index(grid)
+        plane_coords = cp.zeros((len(grid), self.precision**3, 2),
+                                dtype='int16')
+        plane_index = cp.empty((len(theta), *plane_coords.shape),
+                               dtype='int16')
+        for t in range(len(theta)):
+            plane_index[t] = self._plane_index(theta, grid, t, plane_coords)
+        return _Geometry(theta, grid, grid_index, plane_index)
+
+    def _geometry(self, theta, grid):
+        """Return the grid index and an iterable of the plane index per angle.
+
+        The geometry is computed once for each theta and grid and reused by
+        later calls if it fits in the budget of geometry_cache; otherwise,
+        the plane index of each angle is computed as needed. Cached geometry
+        is found by the memory address and layout of theta and grid, so these
+        arrays must not be modified in place while the operator is entered.
+        """
+        key = (
+            theta.data.ptr,
+            theta.shape,
+            theta.strides,
+            theta.dtype,
+            grid.data.ptr,
+            grid.shape,
+            grid.strides,
+            self.n,
+            float(self.tilt),
+            int(self.precision),
+            cp.cuda.runtime.getDevice(),
+        )
+        nbytes = 2 * len(grid) * (3 + 2 * len(theta) * int(self.precision)**3)
+        if (key in self.geometry_cache
+                or nbytes <= self.geometry_cache.max_bytes):
+            geometry = self.geometry_cache.get(
+                key,
+                create=lambda: self._make_geometry(theta, grid),
+                nbytes=lambda geometry: geometry.nbytes,
+            )
+            return geometry.grid_index, geometry.plane_index
+        plane_coords = cp.zeros((len(grid), self.precision**3, 2),
+                                dtype='int16')
+        return self._grid_index(grid), (
+            self._plane_index(theta, grid, t, plane_coords)
+            for t in range(len(theta)))
 
     def fwd(self, u: cp.array, theta: cp.array, grid: cp.array, **kwargs):
         """Perform forward laminography operation.
@@ -106,42 +208,11 @@ class Bucket(Lamino):
 
         """
         data = cp.zeros_like(u, shape=(len(theta), self.n, self.n))
-        plane_coords = cp.zeros((len(grid), self.precision**3, 2),
-                                dtype='int16')
-
-        _coords_weights_kernel = _bucket_module.get_function(
-            f'coordinates_and_weights<{typename[theta.dtype]},{typename[theta.dtype]}3>'
-        )
 
         _bucket_fwd = _bucket_module.get_function(f'fwd<{typename[u.dtype]}>')
 
-        for t in range(len(theta)):
-            assert grid.dtype == 'int16'
-            assert self.tilt.dtype == np.single
-            assert self.precision.dtype == 'int16'
-            assert plane_coords.dtype == 'int16'
-            _coords_weights_kernel(
-                (grid.shape[0],),
-                (self.precision, self.precision, self.precision),
-                (
-                    grid,
-                    grid.shape[0],
-                    self.tilt,
-                    theta,
-                    t,
-                    self.precision,
-                    plane_coords,
-                ),
-            )
-            # Shift zero-centered coordinates to array indices; wrap negative
-            # indices around
-            plane_index = (plane_coords + self.n // 2) % self.n
-            gmax, gmin = grid[:, :1].max(), grid[:, :1].min()
-            grid_index = cp.concatenate(
-                [(grid[:, :1] + cp.abs(gmin)) % (gmax - gmin),
-                 (grid[:, 1:] + self.n // 2) % self.n],
-                axis=-1,
-            )
+        grid_index, plane_indices = self._geometry(theta, grid)
+        for t, plane_index in enumerate(plane_indices):
             assert data.dtype == u.dtype
             assert self.weight.dtype == np.double
             assert grid_index.dtype == 'int16'
@@ -190,39 +261,12 @@ class Bucket(Lamino):
             data,
             shape=(len(grid) // (self.n**2), self.n, self.n),
         )
-        plane_coords = cp.zeros((len(grid), self.precision**3, 2),
-                                dtype='int16')
-
-        _coords_weights_kernel = _bucket_module.get_function(
-            f'coordinates_and_weights<{typename[theta.dtype]},{typename[theta.dtype]}3>'
-        )
 
         _bucket_adj = _bucket_module.get_function(
             f'adj<{typename[data.dtype]}>')
 
-        for t in range(len(theta)):
-            _coords_weights_kernel(
-                (grid.shape[0],),
-                (self.precision, self.precision, self.precision),
-                (
-                    grid,
-                    grid.shape[0],
-                    self.tilt,
-                    theta,
-                    t,
-                    self.precision,
-                    plane_coords,
-                ),
-            )
-            # Shift zero-centered coordinates to array indices; wrap negative
-            # indices around
-            plane_index = (plane_coords + self.n // 2) % self.n
-            gmax, gmin = grid[:, :1].max(), grid[:, :1].min()
-            grid_index = cp.concatenate(
-                [(grid[:, :1] + cp.abs(gmin)) % (gmax - gmin),
-                 (grid[:, 1:] + self.n // 2) % self.n],
-                axis=-1,
-            )
+        grid_index, plane_indices = self._geometry(theta, grid)
+        for t, plane_index in enumerate(plane_indices):
             assert data.dtype == u.dtype
             assert self.weight.dtype == np.double
             assert grid_index.dtype == 'int16'
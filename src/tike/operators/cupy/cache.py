@@ -9,6 +9,23 @@ import cupy.cuda.runtime
 import numpy.typing as npt
 import numpy as np
 
+from ..plancache import PlanCache
+
+# The process-wide cache of cuFFT plans shared by all CachedFFT. Use
+# fft_plan_cache.set_limits() to change the device memory budget for the plan
+# work areas.
+fft_plan_cache = PlanCache(max_bytes=2**30, max_plans=64)
+
+
+def _plan_nbytes(
+    plan: typing.Union[cupy.cuda.cufft.Plan1d, cupy.cuda.cufft.PlanNd]
+) -> int:
+    """Return the size of the device memory work area of a cuFFT plan."""
+    work_area = getattr(plan, 'work_area', None)
+    if work_area is None:
+        return 0
+    return work_area.mem.size
+
 
 class CachedFFT():
     """Provides a multi-plan per-device cache for CuPy FFT.
@@ -17,16 +34,17 @@ class CachedFFT():
     methods which provide automatic plan caching for the CuPy FFTs.
 
     This plan cache differs from the cache included in CuPy>=8 because it is
-    NOT per-thread. This allows us to use threadpool.map() and allows us to
-    destroy the cache manually.
+    NOT per-thread. This allows us to use threadpool.map(). The plans are
+    shared by all operators in the process and are evicted least recently used
+    first when the work areas exceed the memory budget of
+    :py:data:`fft_plan_cache`.
     """
 
     def __enter__(self):
-        self.plan_cache = {}
+        self.plan_cache = fft_plan_cache
         return self
 
     def __exit__(self, type, value, traceback):
-        self.plan_cache.clear()
         del self.plan_cache
 
     def _get_fft_plan(
@@ -38,12 +56,11 @@ class CachedFFT():
         """Cache multiple FFT plans at the same time."""
         axes = tuple(range(a.ndim)) if axes == () else axes
         key = (*a.shape, *axes, a.dtype, cupy.cuda.runtime.getDevice())
-        if key in self.plan_cache:
-            plan = self.plan_cache[key]
-        else:
-            plan = get_fft_plan(a, axes=axes)
-            self.plan_cache[key] = plan
-        return plan
+        return self.plan_cache.get(
+            key,
+            create=lambda: get_fft_plan(a, axes=axes),
+            nbytes=_plan_nbytes,
+        )
 
     def _fft2(
         self,
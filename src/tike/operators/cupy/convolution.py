@@ -22,6 +22,9 @@ class Convolution(Operator):
         The pixel width and height of the reconstructed grid.
     ntheta : int
         The number of angular partitions of the data.
+    wavefront_dtype : complex64 or complex128
+        The type of the extracted patches and nearplane wavefronts. Defaults
+        to the type of psi.
 
     Parameters
     ----------
@@ -41,8 +44,10 @@ class Convolution(Operator):
 
     """
     def __init__(self, probe_shape, nz, n, ntheta=None,
-                 detector_shape=None, **kwargs):  # yapf: disable
+                 detector_shape=None, wavefront_dtype=None,
+                 **kwargs):  # yapf: disable
         self.probe_shape = probe_shape
+        self.wavefront_dtype = wavefront_dtype
         self.nz = nz
         self.n = n
         if detector_shape is None:
@@ -53,6 +58,11 @@ class Convolution(Operator):
         self.end = self.probe_shape + self.pad
         self.patch = Patch()
 
+    def _wavefront_dtype(self, psi):
+        if self.wavefront_dtype is None:
+            return psi.dtype
+        return self.wavefront_dtype
+
     def fwd(self, psi, scan, probe):
         """Extract probe shaped patches from the psi at each scan position.
 
@@ -65,12 +75,14 @@ class Convolution(Operator):
         if self.detector_shape == self.probe_shape:
             patches = self.xp.empty_like(
                 psi,
+                dtype=self._wavefront_dtype(psi),
                 shape=(*scan.shape[:-2], scan.shape[-2] * probe.shape[-3],
                     self.detector_shape, self.detector_shape),
             )
         else:
             patches = self.xp.zeros_like(
                 psi,
+                dtype=self._wavefront_dtype(psi),
                 shape=(*scan.shape[:-2], scan.shape[-2] * probe.shape[-3],
                     self.detector_shape, self.detector_shape),
             )
@@ -117,6 +129,7 @@ class Convolution(Operator):
         assert psi.shape[:-2] == scan.shape[:-2], (psi.shape, scan.shape)
         patches = self.xp.zeros_like(
             psi,
+            dtype=self._wavefront_dtype(psi),
             shape=(*scan.shape[:-2], scan.shape[-2] * nearplane.shape[-3],
                    self.probe_shape, self.probe_shape),
         )
@@ -145,6 +158,7 @@ class Convolution(Operator):
             # Could be xp.empty if scan positions are all in bounds
             patches=self.xp.zeros_like(
                 psi,
+                dtype=self._wavefront_dtype(psi),
                 shape=(*scan.shape[:-2], scan.shape[-2] * nearplane.shape[-3],
                        self.probe_shape, self.probe_shape),
             ),
@@ -3,13 +3,9 @@ __copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
 
 import cupy as cp
 import numpy as np
-try:
-    from importlib.resources import files
-except ImportError:
-    # Backport for python<3.9 available as importlib_resources package
-    from importlib_resources import files
 
 from .operator import Operator
+from .kernel import LazyModule
 
 kernels = [
     'fwd_lanczos_interp2D<float2,float>',
@@ -22,11 +18,7 @@ kernels = [
     'adj_lanczos_interp2D<double2,double>',
 ]
 
-_interp_module = cp.RawModule(
-    code=files('tike.operators.cupy').joinpath('interp.cu').read_text(),
-    name_expressions=kernels,
-    options=('--std=c++11',),
-)
+_interp_module = LazyModule('interp.cu', kernels)
 
 typename = {
     np.dtype('complex64'): 'float2',
@@ -36,44 +28,68 @@ typename = {
 }
 
 
+# The largest number of images that may be remapped by one launch
+_max_images_per_launch = 65535
+
+
 def _remap_lanczos(Fe, x, m, F, fwd=True, cval=0.0):
-    """Lanczos resampling from grid Fe to points x.
+    """Lanczos resampling from a stack of grids Fe to points x.
 
     At the edges, the Lanczos filter wraps around.
 
     Parameters
     ----------
-    Fe : (H, W)
+    Fe : (B, H, W) or (H, W)
         The function at equally spaced samples.
-    x : (N, 2) float32
-        The non-uniform sample positions on the grid.
+    x : (B, N, 2), (1, N, 2), or (N, 2) float32
+        The non-uniform sample positions on the grid. One set of positions is
+        shared by all of the grids when the leading dimension is missing or
+        one.
     m : int > 0
         The Lanczos filter is 2m + 1 wide.
-    F : (N, )
+    F : (B, N) or (N, )
         The values at the non-uniform samples.
     """
-    assert Fe.ndim == 2
-    assert x.ndim == 2 and x.shape[-1] == 2
+    if Fe.ndim == 2:
+        Fe, F = Fe[None], F[None]
+    if x.ndim == 2:
+        x = x[None]
+    assert Fe.ndim == 3
+    assert x.ndim == 3 and x.shape[-1] == 2 and x.shape[0] in (1, len(Fe))
     assert m > 0
-    assert F.shape == x.shape[:-1], F.dtype == Fe.dtype
+    assert F.shape == (len(Fe), x.shape[-2]), (F.shape, Fe.shape, x.shape)
     assert Fe.dtype == F.dtype
+    # The kernel writes in place to the output, so it must be contiguous
+    if fwd:
+        Fe = cp.ascontiguousarray(Fe)
+        assert F.flags.c_contiguous
+    else:
+        F = cp.ascontiguousarray(F)
+        assert Fe.flags.c_contiguous
+    x = cp.ascontiguousarray(x)
     lanczos_width = 2 * m + 1
 
     kernel = _interp_module.get_function(
         f"{'fwd' if fwd else 'adj'}_lanczos_interp2D<{typename[Fe.dtype]},{typename[x.dtype]}>"
     )
 
-    grid = (-(-x.shape[0] // kernel.max_threads_per_block), 0, 0)
-    block = (min(x.shape[0], kernel.max_threads_per_block), 0, 0)
-    kernel(grid, block, (
-        Fe,
-        cp.array(Fe.shape, dtype='int32'),
-        F,
-        x,
-        len(x),
-        lanczos_width,
-        cp.complex64(cval),
-    ))
+    # Each image is one row of blocks; positions are shared when stride is 0
+    x_stride = 0 if len(x) == 1 else x.shape[-2] * 2
+    block = (min(x.shape[-2], kernel.max_threads_per_block), 1, 1)
+    shape = cp.array(Fe.shape[-2:], dtype='int32')
+    for lo in range(0, len(Fe), _max_images_per_launch):
+        hi = min(lo + _max_images_per_launch, len(Fe))
+        grid = (-(-x.shape[-2] // block[0]), hi - lo, 1)
+        kernel(grid, block, (
+            Fe[lo:hi],
+            shape,
+            F[lo:hi],
+            x if x_stride == 0 else x[lo:hi],
+            x.shape[-2],
+            lanczos_width,
+            cp.complex64(cval),
+            x_stride,
+        ))
 
 
 class Flow(Operator):
@@ -115,8 +131,7 @@ class Flow(Operator):
         g = self.xp.zeros_like(f).reshape(-1, h * w)
 
         a = max(0, (filter_size) // 2)
-        for i in range(len(f)):
-            _remap_lanczos(f[i], coords[i], a, g[i], cval=cval)
+        _remap_lanczos(f, coords, a, g, cval=cval)
 
         return g.reshape(shape)
 
@@ -153,8 +168,7 @@ class Flow(Operator):
         g = g.reshape(-1, h * w)
 
         a = max(0, (filter_size) // 2)
-        for i in range(len(f)):
-            _remap_lanczos(f[i], coords[i], a, g[i], fwd=False, cval=cval)
+        _remap_lanczos(f, coords, a, g, fwd=False, cval=cval)
 
         return f.reshape(shape)
 
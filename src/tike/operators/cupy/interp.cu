@@ -214,24 +214,32 @@ _loop_over_kernels(int ndim,  // number of dimensions
   }
 }
 
+// Each row of blocks (blockIdx.y) remaps one image from a stack of images.
+// The images are contiguous; the coordinates of the points for each image
+// are x_stride apart, so all images share one set of points if x_stride is 0.
+// grid shape (-(-nx // max_threads), num_images, 1)
 template <typename valueType, typename coordType>
 __global__ void
 fwd_lanczos_interp2D(valueType* grid, const int* grid_shape, valueType* points,
                      const coordType* x, int num_points, int diameter,
-                     float2 cval
-
-) {
+                     float2 cval, int x_stride) {
+  const size_t image = blockIdx.y;
   _loop_over_kernels<valueType, coordType>(
-      2, lanczos_kernel<coordType>, gather<valueType, coordType>, grid,
-      grid_shape, points, x, num_points, diameter, cval);
+      2, lanczos_kernel<coordType>, gather<valueType, coordType>,
+      grid + image * grid_shape[0] * grid_shape[1], grid_shape,
+      points + image * num_points, x + image * x_stride, num_points, diameter,
+      cval);
 }
 
 template <typename valueType, typename coordType>
 __global__ void
 adj_lanczos_interp2D(valueType* grid, const int* grid_shape, valueType* points,
                      const coordType* x, int num_points, int diameter,
-                     float2 cval) {
+                     float2 cval, int x_stride) {
+  const size_t image = blockIdx.y;
   _loop_over_kernels<valueType, coordType>(
-      2, lanczos_kernel<coordType>, scatter<valueType, coordType>, grid,
-      grid_shape, points, x, num_points, diameter, cval);
+      2, lanczos_kernel<coordType>, scatter<valueType, coordType>,
+      grid + image * grid_shape[0] * grid_shape[1], grid_shape,
+      points + image * num_points, x + image * x_stride, num_points, diameter,
+      cval);
 }
@@ -0,0 +1,145 @@
+"""Lazily compiled CUDA kernels with a persistent on-disk cache.
+
+Compiling every template instantiation of every kernel when tike is imported
+is slow and creates a CUDA context even when no kernel is ever launched.
+Instead, each instantiation is compiled the first time that it is requested
+and the compiled binary is saved to disk, so later processes load it instead
+of compiling it again.
+"""
+
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+
+import os
+import threading
+import typing
+
+try:
+    from importlib.resources import files
+except ImportError:
+    # Backport for python<3.9 available as importlib_resources package
+    from importlib_resources import files
+
+import cupy as cp
+
+import tike
+
+
+def kernel_cache_dir() -> str:
+    """Return the folder where compiled kernels are saved.
+
+    The folder is $TIKE_KERNEL_CACHE_DIR if it is set; otherwise it is
+    versioned by the installed version of tike inside of the user's cache
+    folder. Binaries are further keyed by a hash of the source, the template
+    instantiation, the compiler options, the GPU architecture, and the CUDA
+    version, so a stale binary is never loaded.
+    """
+    folder = os.environ.get('TIKE_KERNEL_CACHE_DIR')
+    if folder is None:
+        folder = os.path.join(
+            os.environ.get(
+                'XDG_CACHE_HOME',
+                os.path.join(os.path.expanduser('~'), '.cache'),
+            ),
+            'tike',
+            'kernels',
+            getattr(tike, '__version__', 'unknown'),
+        )
+    return folder
+
+
+class _Kernel:
+    """A compiled kernel with the launch interface of cupy.RawKernel."""
+
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, grid, block, args, *, shared_mem=0, stream=None):
+        self.function(grid, block, args, shared_mem, stream)
+
+    @property
+    def max_threads_per_block(self) -> int:
+        """The maximum number of threads per block of this kernel."""
+        return cp.cuda.driver.funcGetAttribute(
+            cp.cuda.driver.CU_FUNC_ATTRIBUTE_MAX_THREADS_PER_BLOCK,
+            self.function.ptr,
+        )
+
+
+class LazyModule:
+    """A cupy.RawModule whose template instantiations are compiled on use.
+
+    Parameters
+    ----------
+    filename : str
+        The name of a CUDA source file in the tike.operators.cupy package.
+    name_expressions : list of str
+        The template instantiations which may be requested.
+    options : tuple of str
+        Options for the NVRTC compiler.
+
+    Example
+    -------
+    .. code-block:: python
+
+        _module = LazyModule('interp.cu', ['fwd<float2>', 'adj<float2>'])
+        # Only fwd<float2> is compiled; the first time this line runs
+        kernel = _module.get_function('fwd<float2>')
+
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        name_expressions: typing.Sequence[str],
+        options: typing.Tuple[str, ...] = ('--std=c++11',),
+    ):
+        self.filename = filename
+        self.name_expressions = tuple(name_expressions)
+        self.options = tuple(options)
+        self._code = None
+        self._functions = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({self.filename!r}, "
+                f"compiled={sorted(set(n for _, n in self._functions))})")
+
+    @property
+    def code(self) -> str:
+        """The CUDA source code of this module."""
+        if self._code is None:
+            self._code = files('tike.operators.cupy').joinpath(
+                self.filename).read_text()
+        return self._code
+
+    def get_function(self, name: str) -> _Kernel:
+        """Return the kernel named name for the current device.
+
+        The kernel is compiled (or loaded from the on-disk cache) the first
+        time that it is requested on each device. The cache folder is passed
+        to the compiler directly instead of through $CUPY_CACHE_DIR, so other
+        threads compiling with CuPy are unaffected.
+        """
+        key = (cp.cuda.Device().id, name)
+        try:
+            return self._functions[key]
+        except KeyError:
+            pass
+        if name not in self.name_expressions:
+            raise ValueError(f"{name} is not an instantiation provided by "
+                             f"{self.filename}; choose one of "
+                             f"{self.name_expressions}.")
+        with self._lock:
+            if key not in self._functions:
+                # cupy.RawModule only reads its cache folder from the
+                # environment, so call the compiler that it wraps.
+                module = cp.cuda.compiler._compile_module_with_cache(
+                    self.code,
+                    options=self.options,
+                    cache_dir=kernel_cache_dir(),
+                    name_expressions=(name,),
+                )
+                self._functions[key] = _Kernel(
+                    module.get_function(module.mapping[name]))
+        return self._functions[key]
@@ -1,18 +1,13 @@
 __author__ = "Daniel Ching, Viktor Nikitin"
 __copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
 
-try:
-    from importlib.resources import files
-except ImportError:
-    # Backport for python<3.9 available as importlib_resources package
-    from importlib_resources import files
-
 import cupy as cp
 import numpy as np
 
 from .cache import CachedFFT
 from .usfft import eq2us, us2eq, checkerboard
 from .operator import Operator
+from .kernel import LazyModule
 
 kernels = [
     'make_grids<float,float>',
@@ -28,11 +23,7 @@ typename = {
     np.dtype('float64'): 'double',
 }
 
-_grid_module = cp.RawModule(
-    code=files('tike.operators.cupy').joinpath('grid.cu').read_text(),
-    name_expressions=kernels,
-    options=('--std=c++11',),
-)
+_grid_module = LazyModule('grid.cu', kernels)
 
 
 class Lamino(CachedFFT, Operator):
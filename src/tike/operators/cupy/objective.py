@@ -2,6 +2,8 @@
 
 import cupy as cp
 
+from ..encoding import EncodedPatterns, encode_patterns
+
 # NOTE: We use mean instead of sum so that cost functions may be compared
 # when mini-batches of different sizes are used.
 
@@ -124,6 +126,34 @@ def poisson_each_pattern(data, intensity) -> cp.ndarray:
     )
 
 
+# Compact storage
+
+
+@cp.fuse()
+def _decode_fuse(codes, scale):
+    return codes * scale
+
+
+def decode_patterns(codes, scale=None):
+    """Return diffraction patterns from their encoded form.
+
+    The decoding is fused with the conversion to floating point, so it costs
+    about the same as reading the codes.
+
+    Parameters
+    ----------
+    codes : (N, M, M)
+        The encoded patterns.
+    scale : (N, ) float32 or None
+        The value of one count of each pattern.
+
+    .. seealso:: :py:func:`encode_patterns`
+    """
+    if scale is None:
+        return codes
+    return _decode_fuse(codes, scale[:, None, None])
+
+
 def _mad(x, **kwargs):
     """Return the mean absolute deviation around the median."""
     return cp.mean(cp.abs(x - cp.median(x, **kwargs)), **kwargs)
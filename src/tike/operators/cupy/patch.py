@@ -1,17 +1,12 @@
 __author__ = "Daniel Ching"
 __copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
 
-try:
-    from importlib.resources import files
-except ImportError:
-    # Backport for python<3.9 available as importlib_resources package
-    from importlib_resources import files
-
 import cupy as cp
 import numpy.typing as npt
 import numpy as np
 
 from .operator import Operator
+from .kernel import LazyModule
 
 kernels = [
     'fwd_patch<float2,float2,float>',
@@ -32,11 +27,7 @@ kernels = [
     'adj_patch<double2,float2,double>',
 ]
 
-_patch_module = cp.RawModule(
-    code=files('tike.operators.cupy').joinpath('convolution.cu').read_text(),
-    name_expressions=kernels,
-    options=('--std=c++11',),
-)
+_patch_module = LazyModule('convolution.cu', kernels)
 
 typename = {
     np.dtype('complex64'): 'float2',
@@ -111,7 +102,7 @@ class Patch(Operator):
             patch_width,
         )
         blocks = (min(_next_power_two(patch_width),
-                      _fwd_patch.attributes['max_threads_per_block']),)
+                      _fwd_patch.max_threads_per_block),)
         _fwd_patch(
             grids,
             blocks,
@@ -167,7 +158,7 @@ class Patch(Operator):
             patch_width,
         )
         blocks = (min(_next_power_two(patch_width),
-                      _adj_patch.attributes['max_threads_per_block']),)
+                      _adj_patch.max_threads_per_block),)
         _adj_patch(
             grids,
             blocks,
@@ -2,7 +2,6 @@ __author__ = "Daniel Ching"
 __copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
 __docformat__ = 'restructuredtext en'
 
-import numpy as np
 import tike.precision
 
 from .flow import _remap_lanczos
@@ -14,16 +13,23 @@ class Rotate(Operator):
 
     Parameters
     ----------
-    angle : float
+    angle : float or (...) float
         The desired rotation in radians. Operation skipped if angle is None.
+        One angle per image rotates each image of the stack by its own angle.
     cval : complex64
         The value to use for filling regions that rotated from outside the
         original image.
     """
 
     def _make_grid(self, unrotated, angle):
-        """Return the points on the rotated grid."""
-        cos, sin = np.cos(angle), np.sin(angle)
+        """Return the points on the rotated grid.
+
+        The unrotated grid is shared by all angles. The points are (1, H * W,
+        2) for one angle or (B, H * W, 2) for B angles.
+        """
+        angle = self.xp.asarray(angle).reshape(-1, 1)
+        cos = self.xp.cos(angle).astype(tike.precision.floating)
+        sin = self.xp.sin(angle).astype(tike.precision.floating)
         shifti = (unrotated.shape[-2] - 1) / 2.0
         shiftj = (unrotated.shape[-1] - 1) / 2.0
 
@@ -31,13 +37,13 @@ class Rotate(Operator):
                              0:unrotated.shape[-1]].astype(
                                  tike.precision.floating)
 
-        i -= shifti
-        j -= shiftj
+        i = (i - shifti).ravel()
+        j = (j - shiftj).ravel()
 
         i1 = (+cos * i + sin * j) + shifti
         j1 = (-sin * i + cos * j) + shiftj
 
-        return self.xp.stack([i1.ravel(), j1.ravel()], axis=-1)
+        return self.xp.stack([i1, j1], axis=-1)
 
     def fwd(self, unrotated, angle, cval=0.0):
         if angle is None:
@@ -54,8 +60,7 @@ class Rotate(Operator):
         f = f.reshape(-1, h, w)
         g = g.reshape(-1, h * w)
 
-        for i in range(len(f)):
-            _remap_lanczos(f[i], coords, 2, g[i], fwd=True, cval=cval)
+        _remap_lanczos(f, coords, 2, g, fwd=True, cval=cval)
 
         return g.reshape(shape)
 
@@ -74,8 +79,7 @@ class Rotate(Operator):
         f = f.reshape(-1, h, w)
         g = g.reshape(-1, h * w)
 
-        for i in range(len(f)):
-            _remap_lanczos(f[i], coords, 2, g[i], fwd=False, cval=cval)
+        _remap_lanczos(f, coords, 2, g, fwd=False, cval=cval)
 
         return f.reshape(shape)
 
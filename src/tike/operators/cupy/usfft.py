@@ -11,11 +11,8 @@ linear-interpolation.
 """
 import cupy as cp
 import numpy as np
-try:
-    from importlib.resources import files
-except ImportError:
-    # Backport for python<3.9 available as importlib_resources package
-    from importlib_resources import files
+
+from .kernel import LazyModule
 
 kernels = [
     'scatter<float2,float>',
@@ -35,11 +32,7 @@ typename = {
     np.dtype('float64'): 'double',
 }
 
-_usfft_module = cp.RawModule(
-    code=files('tike.operators.cupy').joinpath('usfft.cu').read_text(),
-    name_expressions=kernels,
-    options=('--std=c++11',),
-)
+_usfft_module = LazyModule('usfft.cu', kernels)
 
 
 def _get_kernel(xp, n, mu, dtype):
@@ -0,0 +1,158 @@
+"""Encode diffraction patterns as unsigned integers for compact storage.
+
+The encoder is shared by both backends; it runs on the host for NumPy arrays
+and memory maps and on the device for CuPy arrays. Only the decoding, which
+happens once per batch on the workers, is implemented by each backend as
+``decode_patterns``.
+"""
+
+import numpy as np
+
+
+def _array_module(x):
+    """Return the array module of x; CuPy is only imported for CuPy arrays."""
+    if hasattr(x, '__cuda_array_interface__'):
+        import cupy as cp
+        return cp
+    return np
+
+
+def _check_encoding(dtype) -> np.dtype:
+    dtype = np.dtype(dtype)
+    if dtype.kind != 'u':
+        raise ValueError(f"Patterns must be encoded as an unsigned integer "
+                         f"type, not {dtype}.")
+    return dtype
+
+
+def _encoding_scale(x, limit: int):
+    """Return the value of one count of each pattern in x."""
+    xp = _array_module(x)
+    peak = xp.max(x, axis=(-2, -1))
+    exact = xp.all(x == xp.rint(x), axis=(-2, -1)) & (peak <= limit)
+    return xp.where(
+        exact | (peak <= 0),
+        1.0,
+        peak / limit,
+    ).astype(np.float32)
+
+
+def _encode(x, scale, dtype: np.dtype):
+    xp = _array_module(x)
+    limit = np.iinfo(dtype).max
+    return xp.rint(xp.clip(x / scale[:, None, None], 0,
+                           limit)).astype(dtype)
+
+
+def encode_patterns(
+    data,
+    dtype='uint16',
+    chunk: int = 1024,
+):
+    """Quantize diffraction patterns to unsigned integers for compact storage.
+
+    Patterns whose values are all integers (e.g. photon counts) which fit in
+    dtype are stored exactly. Other patterns are scaled so that their maximum
+    is the largest value of dtype and rounded.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    dtype : 'uint8' or 'uint16'
+        The storage type of the encoded patterns.
+    chunk : int
+        The number of patterns encoded at once; limits temporary memory.
+
+    Returns
+    -------
+    codes : (N, M, M) dtype
+        The encoded patterns.
+    scale : (N, ) float32 or None
+        The value of one count of each pattern; None if every pattern was
+        stored exactly.
+
+    .. seealso:: :py:func:`tike.operators.decode_patterns`,
+        :py:class:`EncodedPatterns`
+    """
+    xp = _array_module(data)
+    dtype = _check_encoding(dtype)
+    codes = xp.empty(data.shape, dtype=dtype)
+    scale = xp.ones(len(data), dtype=np.float32)
+    limit = np.iinfo(dtype).max
+    for lo in range(0, len(data), chunk):
+        x = xp.asarray(data[lo:lo + chunk])
+        scale[lo:lo + chunk] = _encoding_scale(x, limit)
+        codes[lo:lo + chunk] = _encode(x, scale[lo:lo + chunk], dtype)
+    return codes, None if xp.all(scale == 1) else scale
+
+
+class EncodedPatterns():
+    """A read-only view of diffraction patterns which encodes rows on access.
+
+    The patterns are encoded as by :py:func:`encode_patterns`, but only the
+    rows which are indexed are encoded, so the data are never copied in full.
+    Splitting this view among workers writes the codes straight into each
+    worker's buffer, and an out-of-core view of it gathers codes instead of
+    floating point patterns. Computing the scale reads the data once.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data; typically a memory map.
+    dtype : 'uint8' or 'uint16'
+        The storage type of the encoded patterns.
+    chunk : int
+        The number of patterns read at once while computing the scale.
+
+    Attributes
+    ----------
+    scale : (N, ) float32 or None
+        The value of one count of each pattern; None if every pattern is
+        stored exactly.
+
+    .. seealso:: :py:func:`encode_patterns`,
+        :py:func:`tike.operators.decode_patterns`
+    """
+
+    def __init__(
+        self,
+        data,
+        dtype='uint16',
+        chunk: int = 1024,
+    ):
+        xp = _array_module(data)
+        self.data = data
+        self.dtype = _check_encoding(dtype)
+        limit = np.iinfo(self.dtype).max
+        scale = xp.ones(len(data), dtype=np.float32)
+        for lo in range(0, len(data), chunk):
+            scale[lo:lo + chunk] = _encoding_scale(
+                xp.asarray(data[lo:lo + chunk]),
+                limit,
+            )
+        self._scale = scale
+        self.scale = None if xp.all(scale == 1) else scale
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.data.ndim
+
+    @property
+    def itemsize(self) -> int:
+        return self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, key):
+        xp = _array_module(self.data)
+        x = xp.asarray(self.data[key])
+        scale = xp.asarray(self._scale[key])
+        if x.ndim < 3:
+            return _encode(x[None], scale[None], self.dtype)[0]
+        return _encode(x, scale, self.dtype)
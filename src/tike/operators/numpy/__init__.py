@@ -0,0 +1,22 @@
+"""Module for operators utilizing the NumPy library.
+
+This module implements the forward and adjoint operators using NumPy and the
+pocketfft backend of SciPy. These operators have the same API as the operators
+in :py:mod:`tike.operators.cupy`, so they may be used on hosts without CUDA
+devices. Operators which launch custom CUDA kernels are replaced with
+vectorized array expressions.
+"""
+
+from .alignment import *
+from .cache import *
+from .convolution import *
+from .flow import *
+from .lamino import *
+from .operator import *
+from .objective import *
+from .pad import *
+from .patch import *
+from .propagation import *
+from .ptycho import *
+from .rotate import *
+from .shift import *
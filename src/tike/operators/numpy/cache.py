@@ -0,0 +1,108 @@
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
+
+import typing
+
+import numpy.typing as npt
+import numpy as np
+import scipy.fft
+
+from ..plancache import PlanCache
+
+# The process-wide cache of CPU FFT plans shared by all CachedFFT.
+fft_plan_cache = PlanCache(max_bytes=2**28, max_plans=64)
+
+
+class _Plan():
+    """A description of an FFT over fixed axes of arrays of one shape.
+
+    pocketfft keeps its own twiddle factors for recently used lengths, so a
+    plan only fixes the arguments of the transform. Its size is an estimate
+    of the twiddle factors that pocketfft keeps for it.
+    """
+
+    def __init__(self, shape, axes, dtype, workers):
+        self.axes = axes
+        self.workers = workers
+        self.nbytes = sum(2 * shape[axis] for axis in axes) * np.dtype(
+            dtype).itemsize
+
+    def fftn(self, a, *args, **kwargs):
+        return scipy.fft.fftn(a, *args, workers=self.workers, **kwargs)
+
+    def ifftn(self, a, *args, **kwargs):
+        return scipy.fft.ifftn(a, *args, workers=self.workers, **kwargs)
+
+
+class CachedFFT():
+    """Provides the CachedFFT interface for the SciPy (pocketfft) FFT.
+
+    A class which inherits from this class gains the _fft2, _fftn, and _ifft2
+    methods. The plans are kept in the process-wide :py:data:`fft_plan_cache`
+    so that its counters are comparable to those of
+    :py:class:`tike.operators.cupy.CachedFFT`.
+
+    Attributes
+    ----------
+    fft_workers : int
+        The number of threads used by each FFT. Negative values wrap around
+        from os.cpu_count().
+    """
+
+    fft_workers: int = -1
+
+    def __enter__(self):
+        self.plan_cache = fft_plan_cache
+        return self
+
+    def __exit__(self, type, value, traceback):
+        del self.plan_cache
+
+    def _get_fft_plan(
+        self,
+        a: npt.NDArray,
+        axes: typing.Tuple[int, ...] = (),
+        **kwargs,
+    ) -> _Plan:
+        """Cache multiple FFT plans at the same time."""
+        axes = tuple(range(a.ndim)) if axes == () else axes
+        key = (*a.shape, *axes, a.dtype, self.fft_workers)
+        return self.plan_cache.get(
+            key,
+            create=lambda: _Plan(a.shape, axes, a.dtype, self.fft_workers),
+            nbytes=lambda plan: plan.nbytes,
+        )
+
+    def _fft2(
+        self,
+        a: npt.NDArray,
+        *args,
+        axes: typing.Tuple[int, int] = (-2, -1),
+        **kwargs,
+    ) -> npt.NDArray[np.csingle]:
+        return self._fftn(a, *args, axes=axes, **kwargs)
+
+    def _ifft2(
+        self,
+        a: npt.NDArray,
+        *args,
+        axes: typing.Tuple[int, int] = (-2, -1),
+        **kwargs,
+    ) -> npt.NDArray[np.csingle]:
+        return self._ifftn(a, *args, axes=axes, **kwargs)
+
+    def _ifftn(
+        self,
+        a: npt.NDArray,
+        *args,
+        **kwargs,
+    ) -> npt.NDArray[np.csingle]:
+        return self._get_fft_plan(a, **kwargs).ifftn(a, *args, **kwargs)
+
+    def _fftn(
+        self,
+        a: npt.NDArray,
+        *args,
+        **kwargs,
+    ) -> npt.NDArray[np.csingle]:
+        return self._get_fft_plan(a, **kwargs).fftn(a, *args, **kwargs)
@@ -0,0 +1,196 @@
+__author__ = "Daniel Ching, Viktor Nikitin"
+__copyright__ = "Copyright (c) 2020, UChicago Argonne, LLC."
+
+import numpy as np
+
+from .operator import Operator
+
+
+def _lanczos(x, nlobes=2):
+    """Return the Lanczos kernel weight at distance x from the center."""
+    pix = np.pi * x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = nlobes * np.sin(pix) * np.sin(pix / nlobes) / (pix * pix)
+    return np.where(
+        x == 0,
+        1,
+        np.where(np.abs(x) <= nlobes, weight, 0),
+    ).astype(x.dtype)
+
+
+def _lanczos_weights(x, m, height, width):
+    """Return the flat indices, weights, and mask of the filter at x."""
+    offset = np.arange(-m, m + 1)
+    center = np.floor(x).astype(np.intp)
+    rows = (center[..., 0, None] + offset)[..., :, None]
+    cols = (center[..., 1, None] + offset)[..., None, :]
+    weight = (_lanczos((x[..., 0, None, None] - rows).astype(x.dtype)) *
+              _lanczos((x[..., 1, None, None] - cols).astype(x.dtype)))
+    inside = np.logical_and(
+        np.logical_and(0 <= rows, rows < height),
+        np.logical_and(0 <= cols, cols < width),
+    )
+    index = np.clip(rows, 0, height - 1) * width + np.clip(cols, 0, width - 1)
+    return index, weight, inside
+
+
+def _remap_lanczos(Fe, x, m, F, fwd=True, cval=0.0, max_bytes=2**27):
+    """Lanczos resampling from a stack of grids Fe to points x.
+
+    At the edges, the Lanczos filter wraps around.
+
+    Parameters
+    ----------
+    Fe : (B, H, W) or (H, W)
+        The function at equally spaced samples.
+    x : (B, N, 2), (1, N, 2), or (N, 2) float32
+        The non-uniform sample positions on the grid. One set of positions is
+        shared by all of the grids when the leading dimension is missing or
+        one.
+    m : int > 0
+        The Lanczos filter is 2m + 1 wide.
+    F : (B, N) or (N, )
+        The values at the non-uniform samples.
+    max_bytes : int
+        The grids are resampled a few at a time so that the temporary arrays
+        of the filter take about this many bytes.
+    """
+    if Fe.ndim == 2:
+        Fe, F = Fe[None], F[None]
+    if x.ndim == 2:
+        x = x[None]
+    assert Fe.ndim == 3
+    assert x.ndim == 3 and x.shape[-1] == 2 and x.shape[0] in (1, len(Fe))
+    assert m > 0
+    assert F.shape == (len(Fe), x.shape[-2]), (F.shape, Fe.shape, x.shape)
+    assert Fe.dtype == F.dtype
+    nimage, height, width = Fe.shape
+
+    # Bytes of the index, weight, mask, and gathered values of one grid
+    nbytes = x.shape[-2] * (2 * m + 1)**2 * (
+        np.dtype(np.intp).itemsize + x.itemsize + 1 + 2 * Fe.itemsize)
+    chunk = max(1, min(nimage, max_bytes // nbytes))
+
+    # The weights are computed once for positions shared by all grids
+    shared = x.shape[0] == 1
+    if shared:
+        weights = _lanczos_weights(x, m, height, width)
+
+    for lo in range(0, nimage, chunk):
+        hi = min(lo + chunk, nimage)
+        index, weight, inside = weights if shared else _lanczos_weights(
+            x[lo:hi], m, height, width)
+        # Offset the index into the flattened chunk of grids
+        index = index + np.arange(hi - lo)[:, None, None, None] * (height *
+                                                                    width)
+        if fwd:
+            F[lo:hi] += np.sum(
+                np.where(inside, Fe[lo:hi].reshape(-1)[index], cval) * weight,
+                axis=(-2, -1),
+            )
+        else:
+            weighted = F[lo:hi, ..., None, None] * weight
+            mask = np.broadcast_to(inside, weighted.shape)
+            index = np.broadcast_to(index, weighted.shape)[mask]
+            weighted = weighted[mask]
+            size = (hi - lo) * height * width
+            Fe[lo:hi] += np.bincount(
+                index,
+                weights=weighted.real,
+                minlength=size,
+            ).reshape(hi - lo, height, width)
+            if np.iscomplexobj(Fe):
+                Fe[lo:hi] += 1j * np.bincount(
+                    index,
+                    weights=weighted.imag,
+                    minlength=size,
+                ).reshape(hi - lo, height, width)
+
+
+class Flow(Operator):
+    """Map input 2D arrays to new coordinates by Lanczos interpolation.
+
+    Uses Lanczos interpolation for a non-affine deformation of a series of 2D
+    images.
+    """
+
+    def fwd(self, f, flow, filter_size=5, cval=0.0):
+        """Remap individual pixels of f with Lanczos filtering.
+
+        Parameters
+        ----------
+        f : (..., H, W) complex64
+            A stack of arrays to be deformed.
+        flow : (..., H, W, 2) float32
+            The displacements to be applied to each pixel along the last two
+            dimensions. Operation skipped when flow is None.
+        filter_size : int
+            The width of the Lanczos filter. Automatically rounded up to an
+            odd positive integer.
+        cval : complex64
+            This value is used for interpolation from points outside the grid.
+        """
+        if flow is None:
+            return f
+        assert f.shape == flow.shape[:-1], (f.shape, flow.shape)
+        # Convert from displacements to coordinates
+        h, w = flow.shape[-3:-1]
+        coords = -flow.copy()
+        coords[..., 0] += self.xp.arange(h)[:, None]
+        coords[..., 1] += self.xp.arange(w)
+
+        # Reshape into stack of 2D images
+        shape = f.shape
+        coords = coords.reshape(-1, h * w, 2)
+        f = f.reshape(-1, h, w)
+        g = self.xp.zeros_like(f).reshape(-1, h * w)
+
+        a = max(0, (filter_size) // 2)
+        _remap_lanczos(f, coords, a, g, cval=cval)
+
+        return g.reshape(shape)
+
+    def adj(self, g, flow, filter_size=5, cval=0.0):
+        """Remap individual pixels of f with Lanczos filtering.
+
+        Parameters
+        ----------
+        g : (..., H, W) complex64
+            A stack of deformed arrays.
+        flow : (..., H, W, 2) float32
+            The displacements to be applied to each pixel along the last two
+            dimensions. Operation skipped when flow is None.
+        filter_size : int
+            The width of the Lanczos filter. Automatically rounded up to an
+            odd positive integer.
+        cval : complex64
+            This value is used for interpolation from points outside the grid.
+        """
+        if flow is None:
+            return g
+        f = self.xp.zeros_like(g)
+        assert f.shape == flow.shape[:-1], (f.shape, flow.shape)
+        # Convert from displacements to coordinates
+        h, w = flow.shape[-3:-1]
+        coords = -flow.copy()
+        coords[..., 0] += self.xp.arange(h)[:, None]
+        coords[..., 1] += self.xp.arange(w)
+
+        # Reshape into stack of 2D images
+        shape = f.shape
+        coords = coords.reshape(-1, h * w, 2)
+        f = f.reshape(-1, h, w)
+        g = g.reshape(-1, h * w)
+
+        a = max(0, (filter_size) // 2)
+        _remap_lanczos(f, coords, a, g, fwd=False, cval=cval)
+
+        return f.reshape(shape)
+
+    def inv(self, g, flow, filter_size=5, cval=0.0):
+        return self.fwd(
+            g,
+            flow if flow is None else -flow,
+            filter_size,
+            cval,
+        )
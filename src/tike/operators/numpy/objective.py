@@ -0,0 +1,167 @@
+"""Implement cost functions and gradients."""
+
+import numpy as np
+
+from ..encoding import EncodedPatterns, encode_patterns
+
+# NOTE: We use mean instead of sum so that cost functions may be compared
+# when mini-batches of different sizes are used.
+
+# Gaussian Model
+
+
+def _gaussian_fuse(data, intensity):
+    diff = np.sqrt(intensity) - np.sqrt(data)
+    diff *= np.conj(diff)
+    return diff
+
+
+def gaussian(data, intensity) -> float:
+    """The Gaussian model objective function.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    intensity : (N, M, M)
+        The modeled intensity
+    """
+    return np.mean(_gaussian_fuse(data, intensity))
+
+
+def gaussian_grad(data, farplane, intensity) -> np.ndarray:
+    """The gradient of the Gaussian model objective function
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    intensity : (N, M, M)
+        The modeled intensity
+    farplane : (N, K, L, M, M)
+    """
+    return farplane * (1 - np.sqrt(data) /
+                       (np.sqrt(intensity) + 1e-9))[..., np.newaxis,
+                                                    np.newaxis, :, :]
+
+
+def gaussian_each_pattern(data, intensity) -> np.ndarray:
+    """The Gaussian model objective function per diffraction pattern.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    intensity : (N, M, M)
+        The modeled intensity
+
+    Returns
+    -------
+    costs : (N, )
+        The objective function for each pattern.
+    """
+    return np.mean(
+        _gaussian_fuse(data, intensity),
+        axis=(-2, -1),
+        keepdims=False,
+    )
+
+
+# Poisson Model
+
+
+def _poisson_fuse(data, intensity):
+    return intensity - data * np.log(intensity + 1e-9)
+
+
+def poisson(data, intensity) -> float:
+    """The Poisson model objective function.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    intensity : (N, M, M)
+        The modeled intensity
+    """
+    return np.mean(_poisson_fuse(data, intensity))
+
+
+def poisson_grad(data, farplane, intensity) -> np.ndarray:
+    """The gradient of the Poisson model objective function.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    intensity : (N, M, M)
+        The modeled intensity
+    farplane : (N, K, L, M, M)
+    """
+    return farplane * (1 - data /
+                       (intensity + 1e-9))[..., np.newaxis, np.newaxis, :, :]
+
+
+def poisson_each_pattern(data, intensity) -> np.ndarray:
+    """The Poisson model objective function per diffraction pattern.
+
+    Parameters
+    ----------
+    data : (N, M, M)
+        The measured diffraction data
+    intensity : (N, M, M)
+        The modeled intensity
+
+    Returns
+    -------
+    costs : (N, )
+        The objective function for each pattern.
+    """
+    return np.mean(
+        _poisson_fuse(data, intensity),
+        axis=(-2, -1),
+        keepdims=False,
+    )
+
+
+# Compact storage
+
+
+def _decode_fuse(codes, scale):
+    return codes * scale
+
+
+def decode_patterns(codes, scale=None):
+    """Return diffraction patterns from their encoded form.
+
+    Unlike the CuPy backend, the decoding is not fused; multiplying the codes
+    by the scale of each pattern allocates a new floating point array.
+
+    Parameters
+    ----------
+    codes : (N, M, M)
+        The encoded patterns.
+    scale : (N, ) float32 or None
+        The value of one count of each pattern.
+
+    .. seealso:: :py:func:`encode_patterns`
+    """
+    if scale is None:
+        return codes
+    return _decode_fuse(codes, scale[:, None, None])
+
+
+def _mad(x, **kwargs):
+    """Return the mean absolute deviation around the median."""
+    return np.mean(np.abs(x - np.median(x, **kwargs)), **kwargs)
+
+
+def _gaussian_penalty_grad(x, x0, variance=1.0):
+    delta = x - x0
+    k = -2.0 / variance
+    return k * delta * np.exp(0.5 * k * delta * delta)
+
+
+def _l2_penalty_grad(x, x0, variance=1.0):
+    delta = x - x0
+    return 2 * delta / variance
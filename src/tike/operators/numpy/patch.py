@@ -0,0 +1,185 @@
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+
+import typing
+
+import numpy.typing as npt
+import numpy as np
+
+from .operator import Operator
+
+
+def _bilinear_neighbors(
+    positions: npt.NDArray,
+    patch_width: int,
+    height: int,
+    width: int,
+) -> typing.Tuple[npt.NDArray, typing.List[typing.Tuple[npt.NDArray,
+                                                         npt.NDArray]]]:
+    """Return the image pixels which are interpolated for each patch pixel.
+
+    Follows the same conventions as the CUDA kernels in convolution.cu. Patch
+    pixels whose leading neighbor is outside the image are not touched.
+    Trailing neighbors outside the image are given zero weight.
+
+    Parameters
+    ----------
+    positions : (M, N, 2)
+        The minimum corner of each patch.
+
+    Returns
+    -------
+    valid : (M, N, patch_width, patch_width) bool
+        Whether the patch pixel is inside the image.
+    neighbors : list of 4 ((M, N, patch_width, patch_width) int, weights)
+        The linear index of each neighbor in the flattened image and its
+        linear interpolation weight.
+    """
+    corner = np.floor(positions)
+    fy = (positions[..., 0] - corner[..., 0])[..., None, None]
+    fx = (positions[..., 1] - corner[..., 1])[..., None, None]
+    corner = corner.astype(np.intp)
+    offset = np.arange(patch_width)
+    rows = (corner[..., 0, None] + offset)[..., :, None]
+    cols = (corner[..., 1, None] + offset)[..., None, :]
+    valid = np.logical_and(
+        np.logical_and(0 <= rows, rows < height),
+        np.logical_and(0 <= cols, cols < width),
+    )
+    neighbors = []
+    for drow, dcol, weight in (
+        (0, 0, (1 - fx) * (1 - fy)),
+        (0, 1, fx * (1 - fy)),
+        (1, 0, (1 - fx) * fy),
+        (1, 1, fx * fy),
+    ):
+        r = rows + drow
+        c = cols + dcol
+        inside = np.logical_and(
+            np.logical_and(0 <= r, r < height),
+            np.logical_and(0 <= c, c < width),
+        )
+        index = (np.clip(r, 0, height - 1) * width + np.clip(c, 0, width - 1))
+        neighbors.append((index, np.where(inside, weight, 0)))
+    return valid, neighbors
+
+
+class Patch(Operator):
+    """Extract (zero-padded) patches from images at provided positions.
+
+    Parameters
+    ----------
+    images : (..., H, W) complex64
+        The complex wavefront modulation of the object.
+    positions : (..., N, 2) float32
+        Coordinates of the minimum corner of the patches in the image grid.
+    patches : (..., N * nrepeat, width+, width+) complex64
+           OR (..., L, width+, width+) complex64
+        The extracted (zero-padded) patches. (N * nrepeat) = K * L, K >= nrepeat
+    patch_width : int
+        The width of the unpadded patches.
+    """
+
+    def fwd(
+        self,
+        images: npt.NDArray[np.csingle],
+        positions: npt.NDArray[np.single],
+        patches: npt.NDArray[np.csingle] = None,
+        patch_width: int = 0,
+        height: int = 0,
+        width: int = 0,
+        nrepeat: int = 1,
+    ):
+        patch_width = patches.shape[-1] if patch_width == 0 else patch_width
+        if patches is None:
+            patches = np.zeros_like(
+                images,
+                shape=(*positions.shape[:-2], positions.shape[-2] * nrepeat,
+                       patch_width, patch_width),
+            )
+        assert patch_width <= patches.shape[-1]
+        assert images.shape[:-2] == positions.shape[:-2]
+        assert positions.shape[:-2] == patches.shape[:-3], (positions.shape,
+                                                            patches.shape)
+        assert positions.shape[-2] * nrepeat == patches.shape[-3]
+        assert positions.shape[-1] == 2, positions.shape
+        nimage = int(np.prod(images.shape[:-2]))
+        N = positions.shape[-2]
+        pad = (patches.shape[-1] - patch_width) // 2
+        end = pad + patch_width
+
+        valid, neighbors = _bilinear_neighbors(
+            positions.reshape(nimage, N, 2),
+            patch_width,
+            *images.shape[-2:],
+        )
+        flat = images.reshape(nimage, -1)
+        image_index = np.arange(nimage)[:, None, None, None]
+        values = 0
+        for index, weight in neighbors:
+            values = values + flat[image_index, index] * weight
+
+        np.copyto(
+            patches.reshape(nimage, N, nrepeat, *patches.shape[-2:])[...,
+                                                                     pad:end,
+                                                                     pad:end],
+            values[:, :, None],
+            where=valid[:, :, None],
+        )
+        return patches
+
+    def adj(
+        self,
+        positions: npt.NDArray[np.single],
+        patches: npt.NDArray[np.csingle],
+        images: npt.NDArray[np.csingle] = None,
+        patch_width: int = 0,
+        height: int = 0,
+        width: int = 0,
+        nrepeat: int = 1,
+    ):
+        patch_width = patches.shape[-1] if patch_width == 0 else patch_width
+        assert patch_width <= patches.shape[-1]
+        if images is None:
+            images = np.zeros_like(
+                patches,
+                shape=(*positions.shape[:-2], height, width),
+            )
+        leading = images.shape[:-2]
+        height, width = images.shape[-2:]
+        assert positions.shape[:-2] == leading
+        N = positions.shape[-2]
+        assert positions.shape[-1] == 2
+        assert patches.shape[:-3] == leading
+        K = patches.shape[-3]
+        assert (N * nrepeat) % K == 0 and K >= nrepeat
+        assert patches.shape[-1] == patches.shape[-2]
+        nimage = int(np.prod(images.shape[:-2]))
+        pad = (patches.shape[-1] - patch_width) // 2
+        end = pad + patch_width
+
+        # The rth repeat of the nth position reads from patch (r + nrepeat * n)
+        # % K; repeats are summed before scattering because they share weights
+        repeat_index = (np.arange(N)[:, None] * nrepeat +
+                        np.arange(nrepeat)) % K
+        values = patches.reshape(nimage, K, *patches.shape[-2:])[
+            :, repeat_index, pad:end, pad:end].sum(axis=2)  # yapf: disable
+
+        valid, neighbors = _bilinear_neighbors(
+            positions.reshape(nimage, N, 2),
+            patch_width,
+            height,
+            width,
+        )
+        image_offset = (np.arange(nimage) * height * width)[:, None, None,
+                                                            None]
+        index = np.concatenate(
+            [(i + image_offset)[valid] for i, _ in neighbors])
+        weighted = np.concatenate([(values * w)[valid] for _, w in neighbors])
+        size = nimage * height * width
+        flat = images.reshape(size)
+        flat += np.bincount(index, weights=weighted.real, minlength=size)
+        if np.iscomplexobj(flat):
+            flat += 1j * np.bincount(
+                index, weights=weighted.imag, minlength=size)
+        return images
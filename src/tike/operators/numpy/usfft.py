@@ -0,0 +1,244 @@
+"""Provides unequally-spaced fast fourier transforms (USFFT).
+
+The USFFT, NUFFT, or NFFT is a fast-fourier transform from an uniform domain to
+a non-uniform domain or vice-versa. This module provides forward Fourier
+transforms for those two cased. The inverser Fourier transforms may be created
+by negating the frequencies on the non-uniform grid.
+
+The implementation of this USFFT is the composition of the following
+operations: zero-padding, interpolation-kernel-correction, FFT, and
+linear-interpolation.
+"""
+import numpy as np
+
+
+def _get_kernel(xp, n, mu, dtype):
+    """Return the interpolation kernel for the USFFT."""
+    pad = n // 2
+    end = n - pad
+    u = -mu * xp.arange(-pad, end, dtype=dtype)**2
+    kernel_shape = (len(u), len(u), len(u))
+    norm = xp.zeros(kernel_shape, dtype=dtype)
+    norm += u
+    norm += u[:, None]
+    norm += u[:, None, None]
+    return xp.exp(norm)
+
+
+def _kernel_indices(x, n, m):
+    """Return the grid indices and squared distances for each kernel point.
+
+    Returns
+    -------
+    index : 3 x (N, 2m) int
+        The index on the zero-centered grid along each dimension.
+    delta : 3 x (N, 2m) float
+        The squared distance from x to each kernel point along each dimension.
+    """
+    half = n // 2
+    ell = np.floor(n * x).astype(np.intp)  # nearest grid to x
+    kernel = np.arange(-m, m)
+    index = []
+    delta = []
+    for dim in range(3):
+        grid = ell[:, dim, None] + kernel
+        index.append((half + grid) % n)
+        delta.append((grid.astype(x.dtype) / n - x[:, dim, None])**2)
+    return index, delta
+
+
+def gather(_, Fe, x, n, m, mu):
+    """Gather F from the regular grid.
+
+    Vectorized over the non-uniform frequencies and the last dimension of the
+    interpolation kernel.
+
+    Parameters
+    ----------
+    Fe : (n, n, n) complex64
+        The function at equally spaced frequencies. Frequencies on the grid are
+        zero-centered i.e. [ -0.5, 0.25, 0.0,  0.25]
+    x : (N, 3) float32
+        The non-uniform frequencies in the range [-0.5, 0.5)
+    n : int
+        The width of Fe along each edge
+    m : int
+        The width of the interpolation kernel along each edge.
+
+    Returns
+    -------
+    F : (N, ) complex64
+        The values at the non-uniform frequencies.
+    """
+    cons = [np.sqrt(np.pi / mu)**3, -np.pi**2 / mu]
+    index, delta = _kernel_indices(x, n, m)
+    flat = Fe.reshape(-1)
+    F = np.zeros_like(Fe, shape=x.shape[0])
+    for i0 in range(2 * m):
+        for i1 in range(2 * m):
+            Fkernel = cons[0] * np.exp(cons[1] * (
+                delta[0][:, i0, None] + delta[1][:, i1, None] + delta[2]))
+            ids = (index[0][:, i0, None] * n + index[1][:, i1, None]) * n
+            ids = ids + index[2]
+            F += np.sum(flat[ids] * Fkernel, axis=-1)
+    return F
+
+
+def eq2us(f, x, n, eps, xp, gather=gather, fftn=None, upsample=2):
+    """USFFT from equally-spaced grid to unequally-spaced grid.
+
+    Parameters
+    ----------
+    f : (n, n, n) complex64
+        The function at equally-spaced frequencies. Frequencies on the grid are
+        zero-centered i.e. [ -0.5, 0.25, 0.0,  0.25]
+    x : (N, 3) float32
+        The frequencies on the unequally-spaced grid in the range [-0.5, 0.5)
+    n : int
+        The size of the equally-spaced grid along each edge.
+    eps : float
+        The accuracy of computing USFFT.
+    upsample : float >= 1
+        The ratio of the upsampled grid to the equally-spaced grid.
+
+    Returns
+    -------
+    F : (N, ) complex64
+        Values of unequally-spaced function on the grid x.
+
+    """
+    fftn = xp.fft.fftn if fftn is None else fftn
+    upsampled = 2 * int(upsample * n / 2)  # upsampled grid is always even-sized
+    pad = (upsampled - n) // 2  # where zero-padding stops
+    end = pad + n  # where f stops
+
+    # parameters for the USFFT transform
+    mu = -xp.log(eps) / (2 * n**2)
+    Te = 1 / xp.pi * xp.sqrt(-mu * xp.log(eps) + (mu * n)**2 / 4)
+    m = int(xp.ceil(upsampled * Te))
+
+    # smearing kernel (ker)
+    kernel = _get_kernel(xp, n, mu, f.dtype)
+    kernel *= upsampled**3
+
+    # FFT and compesantion for smearing
+    fe = xp.zeros([upsampled] * 3, dtype=f.dtype)
+
+    fe[pad:end, pad:end, pad:end] = f / kernel
+    Fe = checkerboard(xp, fftn(checkerboard(xp, fe)), inverse=True)
+    F = gather(xp, Fe, x, upsampled, m, mu)
+
+    return F
+
+
+def scatter(_, f, x, n, m, mu):
+    """Scatter f to the regular grid.
+
+    Vectorized over the non-uniform frequencies and the last dimension of the
+    interpolation kernel.
+
+    Parameters
+    ----------
+    f : (N, ) complex64
+        Values at non-uniform frequencies.
+    x : (N, 3) float32
+        The non-uniform frequencies in the range [-0.5, 0.5)
+    n : int
+        The width of G along each edge
+    m : int
+        The width of the interpolation kernel along each edge.
+
+    Return
+    ------
+    G : (n, n, n) complex64
+        The function at equally spaced frequencies. Frequencies on the grid are
+        zero-centered i.e. [ -0.5, 0.25, 0.0,  0.25]
+
+    """
+    cons = [np.sqrt(np.pi / mu)**3, -np.pi**2 / mu]
+    index, delta = _kernel_indices(x, n, m)
+    G = np.zeros_like(f, shape=n**3)
+    for i0 in range(2 * m):
+        for i1 in range(2 * m):
+            Fkernel = cons[0] * np.exp(cons[1] * (
+                delta[0][:, i0, None] + delta[1][:, i1, None] + delta[2]))
+            ids = (index[0][:, i0, None] * n + index[1][:, i1, None]) * n
+            ids = (ids + index[2]).ravel()
+            vals = (f[:, None] * Fkernel).ravel()
+            G += np.bincount(ids, weights=vals.real, minlength=n**3)
+            G += 1j * np.bincount(ids, weights=vals.imag, minlength=n**3)
+    return G.reshape([n] * 3)
+
+
+def us2eq(f, x, n, eps, xp, scatter=scatter, fftn=None, upsample=2):
+    """USFFT from unequally-spaced grid to equally-spaced grid.
+
+    Parameters
+    ----------
+    f : (N, ) complex64
+        Values of unequally-spaced function on the grid x
+    x : (N, 3) float
+        The frequencies on the unequally-spaced grid in the range [-0.5, 0.5)
+    n : int
+        The size of the equally-spaced grid along each edge.
+    eps : float
+        The accuracy of computing USFFT.
+    scatter : function
+        The scatter function to use.
+    upsample : float >= 1
+        The ratio of the upsampled grid to the equally-spaced grid.
+
+    Returns
+    -------
+    F : (n, n, n) complex64
+        The function at equally spaced frequencies. Frequencies on the grid are
+        zero-centered i.e. [ -0.5, 0.25, 0.0,  0.25]
+    """
+    fftn = xp.fft.fftn if fftn is None else fftn
+    upsampled = 2 * int(upsample * n / 2)  # upsampled grid is always even-sized
+    pad = (upsampled - n) // 2  # where zero-padding stops
+    end = pad + n  # where f stops
+
+    # parameters for the USFFT transform
+    mu = -xp.log(eps) / (2 * n**2)
+    Te = 1 / xp.pi * xp.sqrt(-mu * xp.log(eps) + (mu * n)**2 / 4)
+    m = int(xp.ceil(upsampled * Te))
+
+    # smearing kernel (ker)
+    kernel = _get_kernel(xp, n, mu, f.dtype)
+    kernel *= upsampled**3
+
+    G = scatter(xp, f, x, upsampled, m, mu)
+
+    # FFT and compesantion for smearing
+    F = checkerboard(xp, fftn(checkerboard(xp, G)), inverse=True)
+    F = F[pad:end, pad:end, pad:end] / kernel
+
+    return F
+
+
+def _g(x):
+    """Return -1 for odd x and 1 for even x."""
+    return 1 - 2 * (x % 2)
+
+
+def checkerboard(xp, array, axes=None, inverse=False):
+    """In-place FFTshift for even sized grids only.
+
+    If and only if the dimensions of `array` are even numbers, flipping the
+    signs of input signal in an alternating pattern before an FFT is equivalent
+    to shifting the zero-frequency component to the center of the spectrum
+    before the FFT.
+    """
+    axes = range(array.ndim) if axes is None else axes
+    for i in axes:
+        if array.shape[i] % 2 != 0:
+            raise ValueError(
+                "Can only use checkerboard algorithm for even dimensions. "
+                f"This dimension is {array.shape[i]}.")
+        array = xp.moveaxis(array, i, -1)
+        array *= _g(xp.arange(array.shape[-1]) + 1)
+        if inverse:
+            array *= _g(array.shape[-1] // 2)
+        array = xp.moveaxis(array, -1, i)
+    return array
@@ -0,0 +1,137 @@
+"""Defines a bounded, process-wide cache for FFT plans."""
+
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+
+import collections
+import logging
+import threading
+import typing
+
+logger = logging.getLogger(__name__)
+
+
+class PlanCache():
+    """A thread-safe least-recently-used cache of FFT plans.
+
+    Plans are shared by every operator in the process, so operators which
+    transform arrays of the same shape (e.g. the levels of a multigrid
+    reconstruction or many small reconstructions) do not each create their own
+    plans. When adding a plan would exceed either limit, the least recently
+    used plans are evicted until it fits. A plan is only freed when it is no
+    longer referenced, so evicting a plan which is in use is safe.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum total size of the work areas of the cached plans. A plan
+        which is larger than this budget is created but never cached.
+    max_plans : int
+        The maximum number of cached plans.
+
+    Attributes
+    ----------
+    hits : int
+        The number of requests which returned a cached plan.
+    misses : int
+        The number of requests which created a new plan.
+    evictions : int
+        The number of plans removed to make room for new plans.
+    nbytes : int
+        The total size of the work areas of the cached plans.
+    """
+
+    def __init__(self, max_bytes: int = 2**30, max_plans: int = 64):
+        self.max_bytes = max_bytes
+        self.max_plans = max_plans
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._plans = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        return key in self._plans
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(plans={len(self)}/{self.max_plans}, "
+                f"bytes={self.nbytes:,d}/{self.max_bytes:,d}, "
+                f"hits={self.hits:,d}, misses={self.misses:,d}, "
+                f"evictions={self.evictions:,d})")
+
+    def get(
+        self,
+        key: typing.Hashable,
+        create: typing.Callable[[], typing.Any],
+        nbytes: typing.Callable[[typing.Any], int] = lambda plan: 0,
+    ) -> typing.Any:
+        """Return the plan for key; calling create() to make it if missing.
+
+        Parameters
+        ----------
+        key : hashable
+            Uniquely identifies the plan; i.e. shape, axes, dtype, and device.
+        create : callable
+            Returns a new plan.
+        nbytes : callable
+            Returns the size in bytes of the memory held by a plan.
+        """
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return self._plans[key][0]
+            self.misses += 1
+            plan = create()
+            size = int(nbytes(plan))
+            if size > self.max_bytes:
+                logger.info(f"An FFT plan for {key} is {size:,d} bytes which "
+                            f"exceeds the {self.max_bytes:,d} byte budget.")
+                return plan
+            self._plans[key] = (plan, size)
+            self.nbytes += size
+            self._evict()
+            return plan
+
+    def set_limits(
+        self,
+        max_bytes: typing.Optional[int] = None,
+        max_plans: typing.Optional[int] = None,
+    ) -> None:
+        """Change the limits of the cache and evict plans to meet them."""
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_plans is not None:
+                self.max_plans = max_plans
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._plans and (self.nbytes > self.max_bytes
+                               or len(self._plans) > self.max_plans):
+            _, (_, size) = self._plans.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all plans from the cache; the counters are not reset."""
+        with self._lock:
+            self._plans.clear()
+            self.nbytes = 0
+
+    def stats(self) -> typing.Dict[str, int]:
+        """Return the counters and current usage as a dictionary."""
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                plans=len(self._plans),
+                nbytes=self.nbytes,
+                max_plans=self.max_plans,
+                max_bytes=self.max_bytes,
+            )
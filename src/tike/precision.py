@@ -1,5 +1,9 @@
 """This module defines constants for the default data types."""
+import dataclasses
+import typing
+
 import numpy as np
+import numpy.typing as npt
 
 integer = np.intc
 """The default integer type"""
@@ -9,3 +13,88 @@ floating = np.single
 
 cfloating = np.csingle
 """The default complex floating type"""
+
+
+def _as_floating(dtype: npt.DTypeLike, name: str) -> np.dtype:
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.single), np.dtype(np.double)):
+        raise ValueError(
+            f"The {name} type of a Precision must be float32 or float64, not "
+            f"{dtype}. Half precision FFTs of complex arrays are not "
+            "available.")
+    return dtype
+
+
+def _complex(dtype: np.dtype) -> np.dtype:
+    return np.result_type(dtype, np.csingle)
+
+
+@dataclasses.dataclass(frozen=True)
+class Precision():
+    """A policy for the floating point types used by one reconstruction.
+
+    Lower precision types use less memory and bandwidth; higher precision
+    types accumulate less rounding error. Each relative rounding error is at
+    most the unit roundoff of its type (6e-8 for float32 and 1e-16 for
+    float64), so a sum of n terms in the accumulate type is accurate to about
+    n times that unit roundoff.
+
+    Parameters
+    ----------
+    floating : float32 or float64
+        The real type of the reconstructed parameters. The object and probe
+        are the complex type of the same precision.
+    wavefront : float32 or float64
+        The real type of the intermediate wavefronts (patches, nearplane, and
+        farplane) computed by the Patch and Propagation operators. Defaults
+        to floating.
+    accumulate : float32 or float64
+        The real type of the running sums of updates over the batches of
+        positions and of their reductions between workers. Defaults to
+        floating.
+
+    Example
+    -------
+    .. code-block:: python
+
+        # Store the reconstruction in single precision, but sum the updates
+        # from every position in double precision.
+        Precision(floating='float32', accumulate='float64')
+
+    """
+    floating: npt.DTypeLike = floating
+    wavefront: typing.Union[npt.DTypeLike, None] = None
+    accumulate: typing.Union[npt.DTypeLike, None] = None
+
+    def __post_init__(self):
+        real = _as_floating(self.floating, 'floating')
+        object.__setattr__(self, 'floating', real)
+        for name in ('wavefront', 'accumulate'):
+            value = getattr(self, name)
+            object.__setattr__(
+                self,
+                name,
+                real if value is None else _as_floating(value, name),
+            )
+
+    @property
+    def cfloating(self) -> np.dtype:
+        """The complex type of the object and probe."""
+        return _complex(self.floating)
+
+    @property
+    def cwavefront(self) -> np.dtype:
+        """The complex type of the intermediate wavefronts."""
+        return _complex(self.wavefront)
+
+    @property
+    def caccumulate(self) -> np.dtype:
+        """The complex type of the running sums of updates."""
+        return _complex(self.accumulate)
+
+    @property
+    def unit_roundoff(self) -> float:
+        """The largest relative rounding error of any type in this policy."""
+        return max(
+            float(np.finfo(x).eps) / 2
+            for x in (self.floating, self.wavefront, self.accumulate))
@@ -0,0 +1,201 @@
+"""Save and restore the state of a reconstruction without pickle.
+
+A checkpoint is a folder which holds a JSON manifest and one NumPy file per
+array. The manifest describes the state of a reconstruction as a tree of
+plain values which refers to each array by a digest of its contents. Arrays
+which did not change since the previous checkpoint in the same folder (the
+initial positions, the measured pixels, the split of the positions among the
+workers, etc.) are not written again. The manifest is replaced atomically
+before the arrays which it no longer refers to are removed, so a checkpoint
+is never left half written.
+
+Only the classes of the reconstruction parameters are restored, and
+attributes which were added to them after a checkpoint was written take their
+default values, so checkpoints remain readable by later versions of tike.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import typing
+
+import numpy as np
+
+import tike.precision
+from .exitwave import ExitWaveOptions
+from .object import ObjectOptions
+from .position import AffineTransform, PositionOptions
+from .probe import ProbeOptions
+from .solvers import (
+    DmOptions,
+    LstsqOptions,
+    PreconditionerReference,
+    PtychoParameters,
+    RpieOptions,
+)
+
+FORMAT = 'tike.ptycho.checkpoint'
+VERSION = 2
+
+_MANIFEST = 'manifest.json'
+_ARRAY = re.compile(r'[0-9a-f]{32}\.npy')
+
+# The only classes which may be restored from a manifest
+_CLASSES = {
+    cls.__name__: cls for cls in (
+        AffineTransform,
+        DmOptions,
+        ExitWaveOptions,
+        LstsqOptions,
+        ObjectOptions,
+        PositionOptions,
+        PreconditionerReference,
+        ProbeOptions,
+        PtychoParameters,
+        RpieOptions,
+        tike.precision.Precision,
+    )
+}
+
+
+def _digest(x: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f'{x.dtype.str}{x.shape}'.encode())
+    h.update(np.ascontiguousarray(x).data)
+    return h.hexdigest()
+
+
+def _encode(
+    x: typing.Any,
+    arrays: typing.Dict[str, np.ndarray],
+) -> typing.Any:
+    """Return a JSON compatible tree of x and add its arrays to arrays."""
+    if x is None or isinstance(x, (bool, int, float, str)):
+        return x
+    if isinstance(x, np.dtype):
+        return {'dtype': x.str}
+    if isinstance(x, np.generic) or (isinstance(x, np.ndarray) and
+                                     x.ndim == 0):
+        value = x.item()
+        if isinstance(value, complex):
+            value = [value.real, value.imag]
+        return {'scalar': value, 'dtype': x.dtype.str}
+    if isinstance(x, np.ndarray):
+        if x.dtype.hasobject:
+            raise TypeError("Arrays of objects cannot be checkpointed.")
+        digest = _digest(x)
+        arrays[digest] = x
+        return {'array': digest}
+    if isinstance(x, tuple):
+        return {'tuple': [_encode(v, arrays) for v in x]}
+    if isinstance(x, list):
+        return [_encode(v, arrays) for v in x]
+    if isinstance(x, dict):
+        return {'dict': {str(k): _encode(v, arrays) for k, v in x.items()}}
+    if _CLASSES.get(type(x).__name__) is type(x):
+        return {
+            'class': type(x).__name__,
+            'attributes': {k: _encode(v, arrays) for k, v in vars(x).items()},
+        }
+    raise TypeError(f"A {type(x)} cannot be checkpointed.")
+
+
+def _decode(x: typing.Any, folder: str) -> typing.Any:
+    """Return the object encoded by x; the inverse of _encode."""
+    if isinstance(x, list):
+        return [_decode(v, folder) for v in x]
+    if not isinstance(x, dict):
+        return x
+    if 'scalar' in x:
+        value = x['scalar']
+        if isinstance(value, list):
+            value = complex(*value)
+        return np.dtype(x['dtype']).type(value)
+    if 'dtype' in x:
+        return np.dtype(x['dtype'])
+    if 'array' in x:
+        return np.load(
+            os.path.join(folder, f"{x['array']}.npy"),
+            allow_pickle=False,
+        )
+    if 'tuple' in x:
+        return tuple(_decode(v, folder) for v in x['tuple'])
+    if 'dict' in x:
+        return {k: _decode(v, folder) for k, v in x['dict'].items()}
+    if x['class'] not in _CLASSES:
+        raise ValueError(f"A {x['class']} cannot be restored.")
+    cls = _CLASSES[x['class']]
+    # Attributes are set directly, so the checkpointed state is not
+    # changed by __init__; missing attributes take their defaults.
+    obj = cls.__new__(cls)
+    if dataclasses.is_dataclass(cls):
+        for field in dataclasses.fields(cls):
+            if field.default is not dataclasses.MISSING:
+                obj.__dict__[field.name] = field.default
+            elif field.default_factory is not dataclasses.MISSING:
+                obj.__dict__[field.name] = field.default_factory()
+    obj.__dict__.update(
+        {k: _decode(v, folder) for k, v in x['attributes'].items()})
+    return obj
+
+
+def _write_atomically(
+    path: str,
+    write: typing.Callable[[typing.BinaryIO], None],
+) -> None:
+    """Write to a temporary file then rename it to path."""
+    temporary = f"{path}.partial"
+    with open(temporary, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def write(folder: str, state: typing.Dict[str, typing.Any]) -> None:
+    """Write the state of a reconstruction to a checkpoint folder.
+
+    Parameters
+    ----------
+    folder : str
+        The folder is created if it does not exist. Arrays from previous
+        checkpoints in this folder are reused or removed.
+    state : dict
+        A tree of dicts, lists, tuples, scalars, numpy arrays, and
+        reconstruction parameters.
+    """
+    os.makedirs(folder, exist_ok=True)
+    arrays = dict()
+    manifest = {
+        'format': FORMAT,
+        'version': VERSION,
+        'state': _encode(state, arrays),
+    }
+    for digest, x in arrays.items():
+        path = os.path.join(folder, f'{digest}.npy')
+        if not os.path.exists(path):
+            _write_atomically(
+                path,
+                lambda f, x=x: np.save(f, x, allow_pickle=False),
+            )
+    _write_atomically(
+        os.path.join(folder, _MANIFEST),
+        lambda f: f.write(json.dumps(manifest).encode()),
+    )
+    for name in os.listdir(folder):
+        if _ARRAY.fullmatch(name) and name[:-4] not in arrays:
+            os.remove(os.path.join(folder, name))
+
+
+def read(folder: str) -> typing.Dict[str, typing.Any]:
+    """Return the state of a reconstruction from a checkpoint folder."""
+    with open(os.path.join(folder, _MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT:
+        raise ValueError(f"{folder} is not a tike checkpoint.")
+    if manifest['version'] != VERSION:
+        raise ValueError(
+            f"Checkpoint version {manifest['version']} is not supported.")
+    return _decode(manifest['state'], folder)
@@ -109,26 +109,26 @@ def poisson_steplength_all_modes(
 
     Parameters
     ----------
-    xi              :   (FRAME, 1, 1, WIDE, HIGH) float32
+    xi              :   (..., FRAME, 1, 1, WIDE, HIGH) float32
                         xi = 1 - I_m / I_e
-    abs2_Psi        :   (FRAME, 1, SHARED, WIDE, HIGH ) float32
+    abs2_Psi        :   (..., FRAME, 1, SHARED, WIDE, HIGH ) float32
                         the squared absolute value of the calulated exitwaves
-    I_m             :   (FRAME, WIDE, HIGH) float32
+    I_m             :   (..., FRAME, WIDE, HIGH) float32
                         measured diffraction intensity
-    I_e             :   (FRAME, WIDE, HIGH) float32
+    I_e             :   (..., FRAME, WIDE, HIGH) float32
                         calculated diffraction intensity
     measured_pixels :   (WIDE, HIGH) float32
                         the regions on the detector where we have defined
                         measurements
-    step_length     :   (FRAME, 1, SHARED, 1, 1) float32
+    step_length     :   (..., FRAME, 1, SHARED, 1, 1) float32
                         the steplength initializations
     weight_avg      :   float
                         the weight we use when computing a weighted average
                         with ( 0.0 <= weight_avg <= 1.0  )
     """
 
-    I_e = I_e[:, None, None, ...]
-    I_m = I_m[:, None, None, ...]
+    I_e = I_e[..., None, None, :, :]
+    I_m = I_m[..., None, None, :, :]
 
     xi_abs_Psi2 = xi * abs2_Psi
 
@@ -169,24 +169,24 @@ def poisson_steplength_dominant_mode(
 
     Parameters
     ----------
-    xi              :   (FRAME, 1, 1, WIDE, HIGH) float32
+    xi              :   (..., FRAME, 1, 1, WIDE, HIGH) float32
                         xi = 1 - I_m / I_e
-    I_m             :   (FRAME, WIDE, HIGH) float32
+    I_m             :   (..., FRAME, WIDE, HIGH) float32
                         measured diffraction intensity
-    I_e             :   (FRAME, WIDE, HIGH) float32
+    I_e             :   (..., FRAME, WIDE, HIGH) float32
                         calculated diffraction intensity
     measured_pixels :   (WIDE, HIGH) float32
                         the regions on the detector where we have defined
                         measurements
-    step_length     :   (FRAME, 1, SHARED, 1, 1) float32
+    step_length     :   (..., FRAME, 1, SHARED, 1, 1) float32
                         the steplength initializations
     weight_avg      :   float
                         the weight we use when computing a weighted average
                         with ( 0.0 <= weight_avg <= 1.0  )
     """
 
-    I_e = I_e[:, None, None, ...]
-    I_m = I_m[:, None, None, ...]
+    I_e = I_e[..., None, None, :, :]
+    I_m = I_m[..., None, None, :, :]
 
     sum_denom = cp.sum(
         (cp.square(xi) * I_e)[..., measured_pixels],
@@ -3,6 +3,8 @@
 __author__ = "Tekin Bicer, Daniel Ching"
 __copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
 
+import json
+import os
 import warnings
 import logging
 import typing
@@ -58,6 +60,139 @@ def position_units_to_pixels(
     return positions * pixel_per_meter
 
 
+def _autodetect_crop(
+    beam_center_x: int,
+    beam_center_y: int,
+    detect_width: int,
+    detect_height: int,
+    max_crop: int,
+    binned_pix: int,
+) -> typing.Tuple[int, int]:
+    """Return the radius of the crop and the width after binning.
+
+    Autodetect the diffraction pattern size by doubling until it doesn't fit
+    on the detector anymore.
+    """
+    max_radius = max_crop // 2
+    radius = 2
+    while (
+        radius <= max_radius
+        and beam_center_x + radius < detect_width
+        and beam_center_y + radius < detect_height
+        and beam_center_x - radius >= 0 and beam_center_y - radius >= 0
+    ):  # yapf:disable
+        radius *= 2
+    radius = radius // 2
+    logger.info(f'Autodetected diffraction size is {2 * radius}.')
+
+    binned_width = (2 * radius) // binned_pix
+    if binned_width * binned_pix != 2 * radius:
+        msg = (f"Invalid pixel binning provided! {2 * radius} cannot be "
+               f"evenly collected into bins of {binned_pix}.")
+        raise ValueError(msg)
+    logger.info(f'Post-binning diffraction size is {binned_width}.')
+    return radius, binned_width
+
+
+def _frame_chunks(
+    dataset: h5py.Dataset,
+    chunk_size: int,
+) -> typing.Iterator[slice]:
+    """Yield slices of the frame dimension which align with the HDF5 chunks.
+
+    Each slice spans a whole number of the detector-native chunks, so that no
+    HDF5 chunk is read or decompressed more than once.
+    """
+    native = 1 if dataset.chunks is None else dataset.chunks[0]
+    step = native * max(1, chunk_size // native)
+    for lo in range(0, dataset.shape[0], step):
+        yield slice(lo, min(lo + step, dataset.shape[0]))
+
+
+def _read_frames(
+    datasets: typing.List[h5py.Dataset],
+    beam_center_x: int,
+    beam_center_y: int,
+    radius: int,
+    binned_pix: int,
+    chunk_size: int,
+    gap_value: typing.Union[int, None] = None,
+) -> typing.Iterator[npt.NDArray]:
+    """Yield chunks of frames which are cropped, binned, and FFT shifted."""
+    for dataset in datasets:
+        for frames in _frame_chunks(dataset, chunk_size):
+            try:
+                # yapf: disable
+                cropped = dataset[
+                    frames,
+                    beam_center_y - radius:beam_center_y + radius,
+                    beam_center_x - radius:beam_center_x + radius,
+                ]
+                # yapf: enable
+            except OSError as error:
+                warnings.warn(
+                    "The HDF5 compression plugin is probably missing. "
+                    "See the conda-forge hdf5-external-filter-plugins package.")
+                raise error
+            if gap_value is not None:
+                # Set between panel values to zero
+                cropped[cropped == gap_value] = 0
+            binned_width = (2 * radius) // binned_pix
+            binned = np.sum(
+                np.reshape(
+                    cropped,
+                    (-1, binned_width, binned_pix, binned_width, binned_pix),
+                ),
+                axis=(-3, -1),
+                keepdims=False,
+                dtype=cropped.dtype,
+            )
+            yield np.fft.ifftshift(binned, axes=(-2, -1))
+
+
+def _pair_frames_and_positions(
+    chunks: typing.Iterator[npt.NDArray],
+    scan: npt.NDArray,
+    num_frame: int,
+    frame_shape: typing.Tuple[int, ...],
+) -> typing.Iterator[typing.Tuple[npt.NDArray, npt.NDArray]]:
+    """Yield (data, scan) chunks; truncate to the shorter of the two."""
+    if num_frame != len(scan):
+        warnings.warn(
+            f"The number of positions {scan.shape} and frames "
+            f"{(num_frame, *frame_shape)} is not equal. "
+            "One of the two will be truncated.")
+    scan = scan.astype(tike.precision.floating)
+    offset = 0
+    for data in chunks:
+        data = data[:len(scan) - offset]
+        if len(data) == 0:
+            break
+
+        if np.any(np.logical_not(np.isfinite(data))):
+            warnings.warn("Some values in the diffraction data are not finite. "
+                          "Photon counts must be >= 0 and finite.")
+
+        if np.any(data < 0):
+            warnings.warn("Some values in the diffraction data are negative. "
+                          "Photon counts must be >= 0 and finite.")
+
+        yield data, scan[offset:offset + len(data)]
+        offset += len(data)
+
+
+def _concatenate_chunks(
+    chunks: typing.Iterator[typing.Tuple[npt.NDArray, npt.NDArray]]
+) -> typing.Tuple[npt.NDArray, npt.NDArray]:
+    chunks = list(chunks)
+    if not chunks:
+        raise ValueError(
+            "No diffraction patterns were read. The file has no frames or "
+            "there are no scan positions to pair with them.")
+    data, scan = zip(*chunks)
+    return np.concatenate(data, axis=0), np.concatenate(scan, axis=0)
+
+
 def read_aps_velociprobe(
     diffraction_path,
     position_path,
@@ -130,6 +265,53 @@ def read_aps_velociprobe(
     scan : (POSI, 2) float32
         Scan positions; rescaled to pixel coordinates but uncentered.
 
+    See Also
+    --------
+    tike.ptycho.io.iter_aps_velociprobe
+
+    """
+    return _concatenate_chunks(
+        iter_aps_velociprobe(
+            diffraction_path,
+            position_path,
+            xy_columns=xy_columns,
+            trigger_column=trigger_column,
+            max_crop=max_crop,
+            binned_pix=binned_pix,
+        ))
+
+
+def iter_aps_velociprobe(
+    diffraction_path,
+    position_path,
+    xy_columns: typing.Tuple[int, int] = (5, 1),
+    trigger_column: int = 7,
+    max_crop: int = 2048,
+    binned_pix: int = 1,
+    chunk_size: int = 256,
+) -> typing.Iterator[typing.Tuple[npt.NDArray, npt.NDArray]]:
+    """Stream ptychography data from the Advanced Photon Source Velociprobe.
+
+    The same as :py:func:`read_aps_velociprobe` except that the diffraction
+    patterns are read, cropped, binned, and shifted one block of frames at a
+    time. Blocks are aligned to the HDF5 chunks of the detector, so the memory
+    used is bounded by the size of one block. Each pair of yielded arrays may
+    be passed directly to :py:meth:`tike.ptycho.Reconstruction.append_new_data`.
+
+    Parameters
+    ----------
+    chunk_size : int
+        The approximate number of frames in each block. Rounded down to a
+        whole number of HDF5 chunks; at least one HDF5 chunk.
+
+    Yields
+    ------
+    data : (chunk_size, WIDE, HIGH)
+        Diffraction patterns; cropped square and peak FFT shifted to corner.
+    scan : (chunk_size, 2) float32
+        Scan positions; rescaled to pixel coordinates but uncentered. All
+        blocks share the same coordinate system.
+
     """
     with h5py.File(diffraction_path, 'r') as f:
         photon_energy = f['/entry/instrument/detector'
@@ -151,68 +333,61 @@ def read_aps_velociprobe(
                     f'\twidth: {detect_width}, center: {beam_center_x}\n'
                     f'\theight: {detect_height}, center: {beam_center_y}')
 
-        # Autodetect the diffraction pattern size by doubling until it
-        # doesn't fit on the detector anymore.
-        max_radius = max_crop // 2
-        radius = 2
-        while (
-            radius <= max_radius
-            and beam_center_x + radius < detect_width
-            and beam_center_y + radius < detect_height
-            and beam_center_x - radius >= 0 and beam_center_y - radius >= 0
-        ):  # yapf:disable
-            radius *= 2
-        radius = radius // 2
-        logger.info(f'Autodetected diffraction size is {2* radius}.')
-
-        binned_width = (2 * radius) // binned_pix
-        if binned_width * binned_pix != 2 * radius:
-            msg = (f"Invalid pixel binning provided! {2 * radius} cannot be "
-                   f"evenly collected into bins of {binned_pix}.")
-            raise ValueError(msg)
-        logger.info(f'Post-binning diffraction size is {binned_width}.')
-
-        data = []
-
-        def crop_and_shift(x):
-            # yapf: disable
-            cropped = x[
-                ...,
-                beam_center_y - radius:beam_center_y + radius,
-                beam_center_x - radius:beam_center_x + radius,
-            ]
-            binned = np.sum(
-                np.reshape(
-                    cropped,
-                    (-1, binned_width, binned_pix, binned_width, binned_pix),
-                ),
-                axis=(-3, -1),
-                keepdims=False,
-                dtype=x.dtype,
-            )
-            data.append(
-                np.fft.ifftshift(
-                    binned,
-                    axes=(-2, -1),
-                ))
-            # yapf: enable
+        radius, binned_width = _autodetect_crop(
+            beam_center_x,
+            beam_center_y,
+            detect_width,
+            detect_height,
+            max_crop,
+            binned_pix,
+        )
 
+        datasets = []
         for x in f['/entry/data']:
             try:
-                crop_and_shift(f[f'/entry/data/{x}'])
+                datasets.append(f[f'/entry/data/{x}'])
             except KeyError:
                 # Catches links to non-files.
                 # TODO: Should be able to predict the number of datasets.
                 # However, let's just catch exception for now.
                 break
-            except OSError as error:
-                warnings.warn(
-                    "The HDF5 compression plugin is probably missing. "
-                    "See the conda-forge hdf5-external-filter-plugins package.")
-                raise error
 
-        data = np.concatenate(data, axis=0)
+        scan = _read_velociprobe_positions(
+            position_path,
+            xy_columns,
+            trigger_column,
+            chi,
+        )
+        scan = position_units_to_pixels(
+            scan,
+            detector_dist,
+            binned_width,
+            det_pix_width * binned_pix,
+            photon_energy,
+        )
+
+        yield from _pair_frames_and_positions(
+            _read_frames(
+                datasets,
+                beam_center_x,
+                beam_center_y,
+                radius,
+                binned_pix,
+                chunk_size,
+            ),
+            scan,
+            num_frame=sum(d.shape[0] for d in datasets),
+            frame_shape=(binned_width, binned_width),
+        )
+
 
+def _read_velociprobe_positions(
+    position_path,
+    xy_columns: typing.Tuple[int, int],
+    trigger_column: int,
+    chi: float,
+) -> npt.NDArray:
+    """Load Velociprobe positions in meters from CSV file(s)."""
     # Load data from six column file
     if isinstance(position_path, list):
         raw_position = [
@@ -257,32 +432,7 @@ def read_aps_velociprobe(
     scan[:, 1] *= 1e-9 * np.cos(chi / 180 * np.pi)
 
     logger.info(f'Loaded {len(scan)} scan positions.')
-
-    if len(data) != len(scan):
-        warnings.warn(
-            f"The number of positions {scan.shape} and frames {data.shape}"
-            " is not equal. One of the two will be truncated.")
-        num_frame = min(len(data), len(scan))
-        scan = scan[:num_frame, ...]
-        data = data[:num_frame, ...]
-
-    scan = position_units_to_pixels(
-        scan,
-        detector_dist,
-        data.shape[-1],
-        det_pix_width * binned_pix,
-        photon_energy,
-    )
-
-    if np.any(np.logical_not(np.isfinite(data))):
-        warnings.warn("Some values in the diffraction data are not finite. "
-                      "Photon counts must be >= 0 and finite.")
-
-    if np.any(data < 0):
-        warnings.warn("Some values in the diffraction data are negative. "
-                      "Photon counts must be >= 0 and finite.")
-
-    return data, scan.astype(tike.precision.floating)
+    return scan
 
 
 def read_aps_lynx(
@@ -341,109 +491,215 @@ def read_aps_lynx(
     scan : (POSI, 2) float32
         Scan positions; rescaled to pixel coordinates but uncentered.
 
+    See Also
+    --------
+    tike.ptycho.io.iter_aps_lynx
+
+    """
+    return _concatenate_chunks(
+        iter_aps_lynx(
+            diffraction_path,
+            position_path,
+            photon_energy,
+            beam_center_x,
+            beam_center_y,
+            detector_dist,
+            xy_columns=xy_columns,
+            trigger_column=trigger_column,
+            max_crop=max_crop,
+            gap_value=gap_value,
+            binned_pix=binned_pix,
+        ))
+
+
+def iter_aps_lynx(
+    diffraction_path,
+    position_path,
+    photon_energy,
+    beam_center_x,
+    beam_center_y,
+    detector_dist,
+    xy_columns: typing.Tuple[int, int] = (6, 3),
+    trigger_column: int = 0,
+    max_crop: int = 2048,
+    gap_value: int = 2**12 - 1,
+    binned_pix: int = 1,
+    chunk_size: int = 256,
+) -> typing.Iterator[typing.Tuple[npt.NDArray, npt.NDArray]]:
+    """Stream ptychography data from Advanced Photon Source LYNX.
+
+    The same as :py:func:`read_aps_lynx` except that the diffraction patterns
+    are read, cropped, binned, and shifted one block of frames at a time.
+    Blocks are aligned to the HDF5 chunks of the detector, so the memory used
+    is bounded by the size of one block. Each pair of yielded arrays may be
+    passed directly to :py:meth:`tike.ptycho.Reconstruction.append_new_data`.
+
+    Parameters
+    ----------
+    chunk_size : int
+        The approximate number of frames in each block. Rounded down to a
+        whole number of HDF5 chunks; at least one HDF5 chunk.
+
+    Yields
+    ------
+    data : (chunk_size, WIDE, HIGH)
+        Diffraction patterns; cropped square and peak FFT shifted to corner.
+    scan : (chunk_size, 2) float32
+        Scan positions; rescaled to pixel coordinates but uncentered. All
+        blocks share the same coordinate system.
 
     """
     with h5py.File(diffraction_path, 'r') as f:
-        det_pix_width = f['/entry/data/eiger_4'].attrs['Pixel_size'].item(
-        )  # meter
-        _, detect_height, detect_width = f['/entry/data/eiger_4'].shape
+        dataset = f['/entry/data/eiger_4']
+        det_pix_width = dataset.attrs['Pixel_size'].item()  # meter
+        num_frame, detect_height, detect_width = dataset.shape
         logger.info('Loading 28-ID-C ptychography data:\n'
                     f'\tphoton energy {photon_energy} eV\n'
                     f'\twidth: {detect_width}, center: {beam_center_x}\n'
                     f'\theight: {detect_height}, center: {beam_center_y}\n'
                     f'\tdetector pixel width: {det_pix_width} m\n')
 
-        # Autodetect the diffraction pattern size by doubling until it
-        # doesn't fit on the detector anymore.
-        max_radius = max_crop // 2
-        radius = 2
-        while (
-            radius <= max_radius
-            and beam_center_x + radius < detect_width
-            and beam_center_y + radius < detect_height
-            and beam_center_x - radius >= 0 and beam_center_y - radius >= 0
-        ):  # yapf:disable
-            radius *= 2
-        radius = radius // 2
-        logger.info(f'Autodetected diffraction size is {2 * radius}.')
-
-        binned_width = (2 * radius) // binned_pix
-        if binned_width * binned_pix != 2 * radius:
-            msg = (f"Invalid pixel binning provided! {2 * radius} cannot be "
-                   f"evenly collected into bins of {binned_pix}.")
-            raise ValueError(msg)
-        logger.info(f'Post-binning diffraction size is {binned_width}.')
-
-        data = []
-
-        def crop_and_shift(x):
-            # yapf: disable
-            cropped = x[
-                ...,
-                beam_center_y - radius:beam_center_y + radius,
-                beam_center_x - radius:beam_center_x + radius,
-            ]
-            # Set between panel values to zero
-            cropped[cropped == gap_value] = 0
-            binned = np.sum(
-                np.reshape(
-                    cropped,
-                    (-1, binned_width, binned_pix, binned_width, binned_pix),
-                ),
-                axis=(-3, -1),
-                keepdims=False,
-                dtype=x.dtype,
-            )
-            data.append(
-                np.fft.ifftshift(
-                    binned,
-                    axes=(-2, -1),
-                ))
-            # yapf: enable
-
-        try:
-            crop_and_shift(f['/entry/data/eiger_4'])
-        except OSError as error:
-            warnings.warn(
-                "The HDF5 compression plugin is probably missing. "
-                "See the conda-forge hdf5-external-filter-plugins package.")
-            raise error
-
-    data = np.concatenate(data, axis=0)
-
-    raw_position = np.genfromtxt(
-        position_path,
-        usecols=(*xy_columns, trigger_column),
-        delimiter=' ',
-        dtype=tike.precision.floating,
-        skip_header=2,
-    )
-    scan = raw_position[:, :2] * -1e-6
+        radius, binned_width = _autodetect_crop(
+            beam_center_x,
+            beam_center_y,
+            detect_width,
+            detect_height,
+            max_crop,
+            binned_pix,
+        )
 
-    logger.info(f'Loaded {len(scan)} scan positions.')
+        raw_position = np.genfromtxt(
+            position_path,
+            usecols=(*xy_columns, trigger_column),
+            delimiter=' ',
+            dtype=tike.precision.floating,
+            skip_header=2,
+        )
+        scan = raw_position[:, :2] * -1e-6
 
-    if len(data) != len(scan):
-        warnings.warn(
-            f"The number of positions {scan.shape} and frames {data.shape}"
-            " is not equal. One of the two will be truncated.")
-        num_frame = min(len(data), len(scan))
-        scan = scan[:num_frame, ...]
-        data = data[:num_frame, ...]
-
-    scan = position_units_to_pixels(
-        scan,
-        detector_dist,
-        data.shape[-1],
-        det_pix_width * binned_pix,
-        photon_energy,
-    )
+        logger.info(f'Loaded {len(scan)} scan positions.')
+
+        scan = position_units_to_pixels(
+            scan,
+            detector_dist,
+            binned_width,
+            det_pix_width * binned_pix,
+            photon_energy,
+        )
+
+        yield from _pair_frames_and_positions(
+            _read_frames(
+                [dataset],
+                beam_center_x,
+                beam_center_y,
+                radius,
+                binned_pix,
+                chunk_size,
+                gap_value=gap_value,
+            ),
+            scan,
+            num_frame=num_frame,
+            frame_shape=(binned_width, binned_width),
+        )
+
+
+def write_diffraction_store(
+    path: str,
+    chunks: typing.Iterable[typing.Tuple[npt.NDArray, npt.NDArray]],
+) -> int:
+    """Write diffraction patterns to a tike diffraction store on disk.
+
+    A diffraction store is a folder containing the raw C-ordered diffraction
+    patterns in `frames.raw` and a sidecar index, `index.json`, which records
+    the scan positions along with the dtype and shape of the patterns. The
+    patterns are appended one chunk at a time, so the output of
+    :py:func:`iter_aps_velociprobe` or :py:func:`iter_aps_lynx` may be stored
+    without loading the whole dataset into memory.
+
+    Parameters
+    ----------
+    path : string
+        The folder in which to create the store.
+    chunks : iterable of ((N, WIDE, HIGH), (N, 2) float32)
+        Pairs of diffraction patterns and scan positions. For a single pair of
+        arrays, use [(data, scan)].
 
-    if np.any(np.logical_not(np.isfinite(data))):
-        warnings.warn("Some values in the diffraction data are not finite. "
-                      "Photon counts must be >= 0 and finite.")
+    Returns
+    -------
+    num_frame : int
+        The number of diffraction patterns in the store.
+
+    See Also
+    --------
+    tike.ptycho.io.read_diffraction_store
+
+    """
+    os.makedirs(path, exist_ok=True)
+    scan = []
+    dtype = None
+    frame_shape = None
+    with open(os.path.join(path, 'frames.raw'), 'wb') as f:
+        for data_chunk, scan_chunk in chunks:
+            if dtype is None:
+                dtype = data_chunk.dtype
+                frame_shape = data_chunk.shape[1:]
+            if data_chunk.dtype != dtype or data_chunk.shape[1:] != frame_shape:
+                raise ValueError(
+                    "All chunks must have the same dtype and frame shape. "
+                    f"Expected {dtype} {frame_shape}; got "
+                    f"{data_chunk.dtype} {data_chunk.shape[1:]}.")
+            if len(data_chunk) != len(scan_chunk):
+                raise ValueError(
+                    f"data {data_chunk.shape} and scan {scan_chunk.shape} "
+                    "chunks should have the same leading dimension.")
+            np.ascontiguousarray(data_chunk).tofile(f)
+            scan.append(np.asarray(scan_chunk))
+    if dtype is None:
+        raise ValueError("Cannot create a diffraction store with no data.")
+    scan = np.concatenate(scan, axis=0)
+    with open(os.path.join(path, 'index.json'), 'w') as f:
+        json.dump(
+            {
+                'dtype': np.dtype(dtype).str,
+                'frame_shape': list(frame_shape),
+                'scan_dtype': scan.dtype.str,
+                'scan': scan.tolist(),
+            },
+            f,
+        )
+    logger.info(f'Wrote {len(scan)} diffraction patterns to {path}.')
+    return len(scan)
+
+
+def read_diffraction_store(path: str) -> typing.Tuple[np.memmap, npt.NDArray]:
+    """Open a tike diffraction store without loading the patterns.
 
-    if np.any(data < 0):
-        warnings.warn("Some values in the diffraction data are negative. "
-                      "Photon counts must be >= 0 and finite.")
+    The diffraction patterns are returned as a read-only memory map, so only
+    the frames which are accessed are paged into host memory. The memory map
+    may be passed to :py:class:`tike.ptycho.Reconstruction` in place of an
+    in-memory array; each worker then copies only its own frames into pinned
+    memory.
 
-    return data, scan.astype(tike.precision.floating)
+    Parameters
+    ----------
+    path : string
+        The folder written by :py:func:`write_diffraction_store`.
+
+    Returns
+    -------
+    data : (FRAME, WIDE, HIGH) memmap
+        Diffraction patterns.
+    scan : (FRAME, 2)
+        Scan positions from the sidecar index.
+
+    """
+    with open(os.path.join(path, 'index.json'), 'r') as f:
+        index = json.load(f)
+    scan = np.asarray(index['scan'], dtype=index['scan_dtype'])
+    data = np.memmap(
+        os.path.join(path, 'frames.raw'),
+        dtype=np.dtype(index['dtype']),
+        mode='r',
+        shape=(len(scan), *index['frame_shape']),
+    )
+    return data, scan
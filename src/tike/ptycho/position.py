@@ -130,6 +130,7 @@ import tike.linalg
 import tike.opt
 import tike.random
 import tike.precision
+import tike.trace
 
 logger = logging.getLogger(__name__)
 
@@ -249,6 +250,239 @@ def estimate_global_transformation(
     return result, np.linalg.norm(result(positions0) - positions1)
 
 
+def _as_affine_matrices(T: np.ndarray) -> np.ndarray:
+    """Return (..., 3, 2) matrices of affine transforms without reflections.
+
+    A vectorized equivalent of ``AffineTransform.fromarray(T).asarray3()``,
+    so candidate models are scored exactly as the chosen model will be
+    applied.
+    """
+    R0 = T[..., 0, :]
+    R1 = T[..., 1, :]
+    scale0 = np.linalg.norm(R0, axis=-1)
+    valid = scale0 > 0
+    R0 = R0 / np.where(valid, scale0, 1)[..., None]
+    shear1 = np.sum(R0 * R1, axis=-1)
+    R1 = R1 - shear1[..., None] * R0
+    scale1 = np.linalg.norm(R1, axis=-1)
+    valid &= scale1 > 0
+    shear1 = shear1 / np.where(valid, scale1, 1)
+    angle = np.arccos(np.clip(R0[..., 0], -1, 1))
+    cosx = np.cos(angle)
+    sinx = np.sin(angle)
+    M = np.empty_like(T)
+    # diag(scale) @ [[1, 0], [shear1, 1]] @ [[cos, -sin], [sin, cos]]
+    M[..., 0, 0] = scale0 * cosx
+    M[..., 0, 1] = -scale0 * sinx
+    M[..., 1, 0] = scale1 * (shear1 * cosx + sinx)
+    M[..., 1, 1] = scale1 * (cosx - shear1 * sinx)
+    M[..., 2, :] = T[..., 2, :]
+    M[~valid] = AffineTransform().asarray3()
+    return M
+
+
+def _solve_affine_normal_equations(
+    AtA: np.ndarray,
+    AtB: np.ndarray,
+) -> np.ndarray:
+    """Return (K, 3, 2) least-squares affine matrices from normal equations.
+
+    Singular systems (e.g. from colinear positions) return the identity.
+    """
+    T = np.empty_like(AtB)
+    T[...] = AffineTransform().asarray3()
+    singular = np.abs(np.linalg.det(AtA)) <= 1e-9 * np.maximum(
+        1, np.max(np.abs(AtA), axis=(-2, -1)))**3
+    if np.any(~singular):
+        T[~singular] = np.linalg.solve(AtA[~singular], AtB[~singular])
+    return T
+
+
+def _pad_ones(x):
+    xp = cp.get_array_module(x)
+    return xp.concatenate([x, xp.ones_like(x[..., :1])], axis=-1)
+
+
+def _asnumpy(x) -> np.ndarray:
+    """Copy x to the host and count the copy if x is on a device."""
+    if not isinstance(x, np.ndarray):
+        tike.trace.count_bytes('device_to_host', x.nbytes)
+    return cp.asnumpy(x)
+
+
+def _take_samples(
+    positions0: np.ndarray,
+    positions1: np.ndarray,
+    weights: typing.Union[np.ndarray, None],
+    offset: int,
+    subsets: np.ndarray,
+) -> np.ndarray:
+    """Return the (K, S, 5) sampled positions and weights owned by this shard.
+
+    Samples owned by other shards are zero, so the samples of all shards are
+    combined by summation.
+    """
+    local = subsets - offset
+    owned = (local >= 0) & (local < len(positions0))
+    samples = np.zeros((*subsets.shape, 5), dtype=np.float64)
+    if np.any(owned):
+        xp = cp.get_array_module(positions0)
+        index = xp.asarray(local[owned])
+        samples[owned, :2] = _asnumpy(positions0[index])
+        samples[owned, 2:4] = _asnumpy(positions1[index])
+        if weights is None:
+            samples[owned, 4] = 1
+        else:
+            samples[owned, 4] = _asnumpy(weights[cp.get_array_module(
+                weights).asarray(local[owned])])
+    return samples
+
+
+def _score_candidates(
+    positions0: np.ndarray,
+    positions1: np.ndarray,
+    weights: typing.Union[np.ndarray, None],
+    candidates: np.ndarray,
+    refits: typing.Union[np.ndarray, None] = None,
+    *,
+    max_error: float,
+    chunk: int = 2**16,
+) -> typing.Tuple[np.ndarray, ...]:
+    """Return partial sums for scoring candidate models on this shard.
+
+    Returns the inliar count (K, ) and the weighted normal equations (K, 3,
+    3), (K, 3, 2) of the inliars of each candidate. If refits are provided,
+    also returns the squared residual (K, ) of the refits on the inliars of
+    their candidates.
+    """
+    xp = cp.get_array_module(positions0)
+    candidates = xp.asarray(candidates, dtype=xp.float64)
+    if refits is not None:
+        refits = xp.asarray(refits, dtype=xp.float64)
+    K = len(candidates)
+    count = xp.zeros(K, dtype=xp.float64)
+    AtA = xp.zeros((K, 3, 3), dtype=xp.float64)
+    AtB = xp.zeros((K, 3, 2), dtype=xp.float64)
+    residual = xp.zeros(K, dtype=xp.float64)
+    for lo in range(0, len(positions0), chunk):
+        A = _pad_ones(positions0[lo:lo + chunk].astype(xp.float64))
+        B = positions1[lo:lo + chunk].astype(xp.float64)
+        error = xp.linalg.norm(A @ candidates - B, axis=-1)
+        inliars = (error <= max_error).astype(xp.float64)
+        count += xp.sum(inliars, axis=-1)
+        if weights is None:
+            weighted = inliars
+        else:
+            weighted = inliars * xp.asarray(
+                weights[lo:lo + chunk],
+                dtype=xp.float64,
+            )
+        # Sums of outer products as one matrix product for all candidates
+        AtA += (weighted @ (A[:, :, None] * A[:, None, :]).reshape(-1, 9)
+               ).reshape(K, 3, 3)
+        AtB += (weighted @ (A[:, :, None] * B[:, None, :]).reshape(-1, 6)
+               ).reshape(K, 3, 2)
+        if refits is not None:
+            residual += xp.sum(
+                inliars * xp.sum(xp.square(A @ refits - B), axis=-1),
+                axis=-1,
+            )
+    return tuple(
+        _asnumpy(x) for x in (count, AtA, AtB, residual))
+
+
+def _ransac(
+    positions0: typing.List[np.ndarray],
+    positions1: typing.List[np.ndarray],
+    subsets: np.ndarray,
+    offsets: typing.List[int],
+    num_total: int,
+    *,
+    map_shards: typing.Callable,
+    sum_shards: typing.Callable,
+    weights: typing.Union[typing.List[np.ndarray], None] = None,
+    max_error: float,
+    min_consensus: float,
+) -> typing.Tuple[typing.Union[np.ndarray, None], float]:
+    """Fit and score all RANSAC candidates at once over sharded positions.
+
+    Every step communicates only partial sums whose size depends on the
+    number of candidates, not the number of positions.
+
+    Parameters
+    ----------
+    map_shards : callable
+        Calls a function on each shard; i.e. :py:meth:`ThreadPool.map`.
+    sum_shards : callable
+        Sums a list of host arrays (one from each local shard) over all
+        shards of all processes.
+    weights : list of (N, ) array or None
+        The weights of the positions in each shard for fitting the candidate
+        models and the consensus refits. The inliar counts and the fitness are
+        not weighted.
+
+    Returns
+    -------
+    transform : (3, 2) array or None
+        The affine matrix of the best consensus model; None if no candidate
+        reached consensus.
+    fitness : float
+        The norm of the residual of the best model on its inliars.
+    """
+    if weights is None:
+        weights = [None] * len(positions0)
+    samples = sum_shards(
+        map_shards(
+            _take_samples,
+            positions0,
+            positions1,
+            weights,
+            offsets,
+            subsets=subsets,
+        ))
+    w = np.sqrt(samples[..., 4:])
+    A = _pad_ones(samples[..., :2]) * w
+    B = samples[..., 2:4] * w
+    candidates = _as_affine_matrices(
+        _solve_affine_normal_equations(
+            np.swapaxes(A, -1, -2) @ A,
+            np.swapaxes(A, -1, -2) @ B,
+        ))
+
+    count, AtA, AtB, _ = (sum_shards(list(x)) for x in zip(*map_shards(
+        _score_candidates,
+        positions0,
+        positions1,
+        weights,
+        candidates=candidates,
+        max_error=max_error,
+    )))
+    consensus = np.flatnonzero(count / num_total >= min_consensus)
+    if len(consensus) == 0:
+        return None, np.inf
+
+    # Refit with consensus inliars
+    refits = _solve_affine_normal_equations(AtA[consensus], AtB[consensus])
+    residual = sum_shards([
+        x[3] for x in map_shards(
+            _score_candidates,
+            positions0,
+            positions1,
+            weights,
+            candidates=candidates[consensus],
+            refits=_as_affine_matrices(refits),
+            max_error=max_error,
+        )
+    ])
+    fitness = np.sqrt(residual)
+    best = np.argmin(fitness)
+    return refits[best], float(fitness[best])
+
+
+def _map_local(f, *args, **kwargs):
+    return [f(*x, **kwargs) for x in zip(*args)]
+
+
 def estimate_global_transformation_ransac(
     positions0: np.ndarray,
     positions1: np.ndarray,
@@ -261,48 +495,43 @@ def estimate_global_transformation_ransac(
 ) -> tuple[AffineTransform, float]:
     """Use RANSAC to estimate the global affine transformation.
 
+    All candidate models are fitted and scored simultaneously, so the cost is
+    a few vectorized passes over the positions instead of one pass per
+    candidate.
+
     Parameters
     ----------
+    weights
+        The weights of each position for fitting the candidate models.
     min_sample
         The number of positions to use to initialize each candidate model
     max_error
         The distance from the model which determines inliar/outliar status
     min_consensus
         The proportion of points needed to accept model as consensus.
+    max_iter
+        The number of candidate models.
     """
-    best_fitness = np.inf  # small fitness is good
-    # Choose a subset
-    for subset in tike.random.randomizer_np.choice(
-            a=len(positions0),
-            size=(max_iter, min_sample),
-            replace=True,
-    ):
-        # Fit to subset
-        candidate_model, _ = estimate_global_transformation(
-            positions0=positions0[subset],
-            positions1=positions1[subset],
-            weights=weights,
-            transform=transform,
-        )
-        # Determine inliars and outliars
-        position_error = np.linalg.norm(
-            candidate_model(positions0) - positions1,
-            axis=-1,
-        )
-        inliars = (position_error <= max_error)
-        # Check if consensus reached
-        if np.sum(inliars) / len(inliars) >= min_consensus:
-            # Refit with consensus inliars
-            candidate_model, fitness = estimate_global_transformation(
-                positions0=positions0[inliars],
-                positions1=positions1[inliars],
-                weights=weights,
-                transform=candidate_model,
-            )
-            if fitness < best_fitness:
-                best_fitness = fitness
-                transform = candidate_model
-    return transform, best_fitness
+    subsets = tike.random.randomizer_np.choice(
+        a=len(positions0),
+        size=(max_iter, min_sample),
+        replace=True,
+    )
+    T, fitness = _ransac(
+        [positions0],
+        [positions1],
+        subsets=subsets,
+        offsets=[0],
+        num_total=len(positions0),
+        map_shards=_map_local,
+        sum_shards=lambda x: x[0],
+        weights=None if weights is None else [weights],
+        max_error=max_error,
+        min_consensus=min_consensus,
+    )
+    if T is None:
+        return transform, fitness
+    return AffineTransform.fromarray(T), fitness
 
 
 @dataclasses.dataclass
@@ -484,6 +713,7 @@ class PositionOptions:
             confidence=self.confidence,
         )
         # Momentum reset to zero when grid scale changes
+        return new
 
     @property
     def vx(self):
@@ -631,7 +861,7 @@ def update_positions_pd(operator, data, psi, probe, scan,
     scan = scan + (center0 - center1)
 
     check_allowed_positions(scan, psi, probe.shape)
-    cost = operator.cost(data=data, psi=psi, scan=scan, probe=probe).get()
+    cost = _asnumpy(operator.cost(data=data, psi=psi, scan=scan, probe=probe))
     logger.debug('%10s cost is %+12.5e', 'position', cost)
     return scan, cost
 
@@ -646,12 +876,20 @@ def _gaussian_frequency(sigma, size):
     return arr
 
 
+def _subtract(x: np.ndarray, origin: typing.Tuple[float, float]):
+    xp = cp.get_array_module(x)
+    return x - xp.asarray(origin, dtype=x.dtype)
+
+
 # TODO: What is a good default value for max_error?
 def affine_position_regularization(
     comm: tike.communicators.Comm,
     updated: typing.List[cp.ndarray],
     position_options: typing.List[PositionOptions],
     max_error: float = 32,
+    min_sample: int = 4,
+    min_consensus: float = 0.75,
+    max_iter: int = 20,
 ) -> typing.List[PositionOptions]:
     """Regularize position updates with an affine deformation constraint.
 
@@ -673,24 +911,40 @@ def affine_position_regularization(
         The updated scanning regularized with affine deformation.
 
     """
-    # Gather all of the scanning positions on one host
-    positions0 = comm.pool.gather_host(
-        [x.initial_scan for x in position_options], axis=0)
-    positions1 = comm.pool.gather_host(updated, axis=0)
-    positions0 = comm.mpi.Gather(positions0, axis=0, root=0)
-    positions1 = comm.mpi.Gather(positions1, axis=0, root=0)
+    # Only the sizes of the shards and small partial sums are communicated,
+    # so the cost does not grow with the number of positions or processes.
+    counts = np.array([len(x) for x in updated])
+    rank_counts = comm.mpi.Allgather(counts.sum(keepdims=True))
+    offsets = int(np.sum(rank_counts[:comm.mpi.rank])) + np.concatenate(
+        [[0], np.cumsum(counts)[:-1]])
 
     if comm.mpi.rank == 0:
-        new_transform, _ = estimate_global_transformation_ransac(
-            positions0=positions0 - position_options[0].origin,
-            positions1=positions1 - position_options[0].origin,
-            transform=position_options[0].transform,
-            max_error=max_error,
+        subsets = tike.random.randomizer_np.choice(
+            a=int(np.sum(rank_counts)),
+            size=(max_iter, min_sample),
+            replace=True,
         )
     else:
-        new_transform = None
-
-    new_transform = comm.mpi.bcast(new_transform, root=0)
+        subsets = None
+    subsets = comm.mpi.bcast(subsets, root=0)
+
+    origin = position_options[0].origin
+    T, _ = _ransac(
+        comm.pool.map(_subtract, [x.initial_scan for x in position_options],
+                      origin=origin),
+        comm.pool.map(_subtract, updated, origin=origin),
+        subsets=subsets,
+        offsets=[int(x) for x in offsets],
+        num_total=int(np.sum(rank_counts)),
+        map_shards=comm.pool.map,
+        sum_shards=lambda x: comm.mpi.Allreduce(np.sum(x, axis=0)),
+        max_error=max_error,
+        min_consensus=min_consensus,
+    )
+    if T is None:
+        new_transform = position_options[0].transform
+    else:
+        new_transform = AffineTransform.fromarray(T)
 
     for i in range(len(position_options)):
         position_options[i].transform = new_transform
@@ -53,10 +53,16 @@ __all__ = [
     "reconstruct",
     "simulate",
     "Reconstruction",
+    "ReconstructionGroup",
+    "reconstruct_group",
     "reconstruct_multigrid",
+    "MultigridReconstruction",
 ]
 
+import concurrent.futures
+import contextlib
 import copy
+import functools
 import logging
 import time
 import typing
@@ -65,6 +71,7 @@ import warnings
 import numpy as np
 import numpy.typing as npt
 import cupy as cp
+import cupyx
 
 import tike.operators
 import tike.communicators
@@ -72,6 +79,10 @@ import tike.opt
 from tike.ptycho import solvers
 import tike.cluster
 import tike.precision
+import tike.trace
+import tike.random
+import tike.ptycho.checkpoint
+import tike.ptycho.snapshot
 
 from .position import (
     PositionOptions,
@@ -230,6 +241,66 @@ def reconstruct(
     return context.parameters
 
 
+def reconstruct_group(
+    data: typing.Sequence[npt.NDArray],
+    parameters: typing.Sequence[solvers.PtychoParameters],
+    num_gpu: typing.Union[int, typing.Tuple[int, ...]] = 1,
+    use_mpi: bool = False,
+) -> typing.List[solvers.PtychoParameters]:
+    """Solve many independent ptychography problems together.
+
+    Each reconstruction advances for its own `algorithm_options.num_iter`
+    epochs, but the operators, worker threads, and streams are allocated once
+    for the whole group, and the solvers of compatible reconstructions process
+    their batches together. Prefer this over calling
+    :py:func:`tike.ptycho.ptycho.reconstruct` in a loop for queues of small
+    scans.
+
+    Parameters
+    ----------
+    data : list of (FRAME, WIDE, HIGH) uint16
+        The diffraction patterns of each scan. FFT-shifted so the diffraction
+        peak is at the corners.
+    parameters: list of :py:class:`tike.ptycho.solvers.PtychoParameters`
+        The reconstruction parameters of each scan.
+    num_gpu : int, tuple(int)
+        The number of GPUs to use or a tuple of the device numbers of the GPUs
+        to use.
+    use_mpi : bool
+        Whether to use MPI or not.
+
+    Returns
+    -------
+    result : list of :py:class:`tike.ptycho.solvers.PtychoParameters`
+        The reconstruction parameters of each scan in the same order as the
+        input.
+
+
+    .. seealso:: :py:class:`tike.ptycho.ptycho.ReconstructionGroup`
+    """
+    with ReconstructionGroup(
+            data,
+            parameters,
+            num_gpu,
+            use_mpi,
+    ) as context:
+        context.iterate(max(p.algorithm_options.num_iter for p in parameters))
+    return context.parameters
+
+
+def _data_is_valid(data: npt.NDArray, chunk_size: int = 256) -> bool:
+    """Return whether all of the data are non-negative and finite.
+
+    The data are checked a few frames at a time to avoid full size temporary
+    arrays, which matters when the data are memory-mapped.
+    """
+    for lo in range(0, len(data), chunk_size):
+        chunk = data[lo:lo + chunk_size]
+        if not np.all(np.isfinite(chunk)) or np.any(chunk < 0):
+            return False
+    return True
+
+
 def _clip_magnitude(x, a_max):
     """Clips a complex array's magnitude without changing the phase."""
     magnitude = np.abs(x)
@@ -269,6 +340,27 @@ class Reconstruction():
         # All datastructures are transferred off the GPU at context close
         final_result = context.parameters
 
+    The diffraction patterns may be a memory-mapped array such as the one
+    returned by :py:func:`tike.ptycho.io.read_diffraction_store`. Each worker
+    copies only its own patterns from the map into pinned host memory, so a
+    second full copy of the data is never held in host memory.
+
+    When a checkpoint_path and a positive checkpoint_period are provided, the
+    state of the reconstruction is saved to the checkpoint_path folder every
+    checkpoint_period epochs. It is copied and written in the background, so
+    checkpointing does not stall :py:meth:`Reconstruction.iterate`. Use
+    :py:meth:`Reconstruction.from_checkpoint` to resume after an interruption.
+
+    An existing operator and communicator may be provided in order to share
+    them between reconstructions. Shared resources are not entered or exited
+    by this context; :py:class:`tike.ptycho.ptycho.ReconstructionGroup` uses
+    this to amortize their setup cost.
+
+    When a :py:class:`tike.trace.Tracer` is provided, each stage of each
+    epoch (probe constraints, preconditioners, solver, object constraints,
+    etc.) is recorded with its duration, the bytes copied between the host
+    and the devices, and the memory of each device.
+
     .. seealso:: :py:func:`tike.ptycho.ptycho.reconstruct`
     """
 
@@ -278,6 +370,11 @@ class Reconstruction():
         parameters: solvers.PtychoParameters,
         num_gpu: typing.Union[int, typing.Tuple[int, ...]] = 1,
         use_mpi: bool = False,
+        operator: typing.Optional[tike.operators.Ptycho] = None,
+        comm: typing.Optional[tike.communicators.Comm] = None,
+        checkpoint_path: typing.Optional[str] = None,
+        checkpoint_period: int = 0,
+        tracer: typing.Optional[tike.trace.Tracer] = None,
     ):
         if (np.any(np.asarray(data.shape) < 1) or data.ndim != 3
                 or data.shape[-2] != data.shape[-1]):
@@ -323,48 +420,130 @@ class Reconstruction():
             detector_shape=data.shape[-1],
             nz=parameters.psi.shape[-2],
             n=parameters.psi.shape[-1],
-        )
-        self.comm = tike.communicators.Comm(num_gpu, mpi)
+            wavefront_dtype=parameters.precision.cwavefront,
+        ) if operator is None else operator
+        self.comm = tike.communicators.Comm(num_gpu,
+                                            mpi) if comm is None else comm
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_period = checkpoint_period
+        self._checkpoint_future = None
+        # The split of positions among the workers when resuming
+        self._resume_order = None
+        # The reference of the incremental preconditioners when resuming
+        self._resume_reference = None
+        self._snapshot = None
+        self._preconditioner_reference = solvers.PreconditionerReference()
+        # The scale of each encoded diffraction pattern on each worker
+        self.data_scale = None
+        # The diffraction patterns of each worker cropped by a factor of two
+        # for each level of a multi-grid reconstruction
+        self._pyramid = None
+        self.tracer = tracer
 
     def __enter__(self):
         self.device.__enter__()
         self.operator.__enter__()
         self.comm.__enter__()
+        return self._distribute()
+
+    def _distribute(self, levels: int = 0):
+        """Divide the inputs among the workers and copy them to the devices.
 
+        The device, operator, and communicator must already be entered. When
+        levels is positive, the diffraction patterns of each worker are kept
+        as `_pyramid`, a list where each level is cropped to half the width of
+        the previous level, and the solver uses the coarsest level.
+        """
         # Divide the inputs into regions
-        if (not np.all(np.isfinite(self.data)) or np.any(self.data < 0)):
+        if not _data_is_valid(self.data):
             warnings.warn(
                 "Diffraction patterns contain invalid data. "
                 "All data should be non-negative and finite.", UserWarning)
 
-        (
-            self.comm.order,
-            self.batches,
-            self.parameters.scan,
-            self.data,
-            self.parameters.eigen_weights,
-        ) = tike.cluster.by_scan_stripes_contiguous(
-            self.data,
-            self.parameters.eigen_weights,
-            scan=self.parameters.scan,
-            pool=self.comm.pool,
-            shape=(self.comm.pool.num_workers, 1),
-            dtype=(
-                tike.precision.floating,
-                tike.precision.floating
-                if self.data.itemsize > 2 else self.data.dtype,
-                tike.precision.floating,
-            ),
-            destination=('gpu', 'pinned', 'gpu'),
-            batch_method=self.parameters.algorithm_options.batch_method,
-            num_batch=self.parameters.algorithm_options.num_batch,
+        data_scale = None
+        if self.parameters.algorithm_options.data_encoding is not None:
+            # Patterns are encoded as they are copied into each worker's
+            # buffer (or gathered by the out-of-core view), so no full size
+            # copy of the encoded data is made on the host.
+            self.data = tike.operators.EncodedPatterns(
+                self.data,
+                dtype=self.parameters.algorithm_options.data_encoding,
+            )
+            data_scale = self.data.scale
+
+        precision = self.parameters.precision
+        dtype = (
+            precision.floating,
+            tike.precision.floating
+            if self.data.itemsize > 2 else self.data.dtype,
+            precision.floating,
+            tike.precision.floating,
+        )
+        destination = (
+            'gpu',
+            'lazy'
+            if self.parameters.algorithm_options.out_of_core else 'pinned',
+            'gpu',
+            'gpu',
         )
+        if self._resume_order is None:
+            (
+                self.comm.order,
+                self.batches,
+                self.parameters.scan,
+                self.data,
+                self.parameters.eigen_weights,
+                self.data_scale,
+            ) = tike.cluster.by_scan_stripes_contiguous(
+                self.data,
+                self.parameters.eigen_weights,
+                data_scale,
+                scan=self.parameters.scan,
+                pool=self.comm.pool,
+                shape=(self.comm.pool.num_workers, 1),
+                dtype=dtype,
+                destination=destination,
+                batch_method=self.parameters.algorithm_options.batch_method,
+                num_batch=self.parameters.algorithm_options.num_batch,
+            )
+        else:
+            # Repeat the split of the checkpointed reconstruction because
+            # the batches depend on the (corrected) positions.
+            self.comm.order, self.batches = self._resume_order
+            (
+                self.parameters.scan,
+                self.data,
+                self.parameters.eigen_weights,
+                self.data_scale,
+            ) = tike.cluster.by_order(
+                self.parameters.scan,
+                self.data,
+                self.parameters.eigen_weights,
+                data_scale,
+                order=self.comm.order,
+                pool=self.comm.pool,
+                dtype=dtype,
+                destination=destination,
+            )
+
+        if levels > 0:
+            self._pyramid = [self.data]
+            for _ in range(levels):
+                # Crop each level from the next finer level, which is smaller
+                # than the full patterns.
+                self._pyramid.append(
+                    self.comm.pool.map(
+                        _crop_patterns,
+                        self._pyramid[-1],
+                        w=self._pyramid[-1][0].shape[-1] // 2,
+                    ))
+            self.data = self._pyramid[-1]
 
         self.parameters.psi = self.comm.pool.bcast(
-            [self.parameters.psi.astype(tike.precision.cfloating)])
+            [self.parameters.psi.astype(precision.cfloating)])
 
         self.parameters.probe = self.comm.pool.bcast(
-            [self.parameters.probe.astype(tike.precision.cfloating)])
+            [self.parameters.probe.astype(precision.cfloating)])
 
         if self.parameters.probe_options is not None:
             self.parameters.probe_options = self.parameters.probe_options.copy_to_device(
@@ -380,7 +559,7 @@ class Reconstruction():
 
         if self.parameters.eigen_probe is not None:
             self.parameters.eigen_probe = self.comm.pool.bcast(
-                [self.parameters.eigen_probe.astype(tike.precision.cfloating)])
+                [self.parameters.eigen_probe.astype(precision.cfloating)])
 
         if self.parameters.position_options is not None:
             # TODO: Consider combining put/split, get/join operations?
@@ -390,13 +569,32 @@ class Reconstruction():
                  for x in self.comm.order),
             )
 
+        if self._resume_reference is not None:
+            reference = self._resume_reference
+            if reference.probe is not None:
+                reference.probe = self.comm.pool.map(
+                    cp.asarray,
+                    [reference.probe],
+                )[0]
+            if reference.scan is not None:
+                reference.scan = self.comm.pool.map(cp.asarray, reference.scan)
+            if reference.psi_sum is not None:
+                reference.psi_sum = self.comm.pool.bcast([reference.psi_sum])
+            if reference.probe_sum is not None:
+                reference.probe_sum = self.comm.pool.bcast(
+                    [reference.probe_sum])
+            self._preconditioner_reference = reference
+            self._resume_reference = None
+
         if self.parameters.probe_options is not None:
 
-            if self.parameters.probe_options.init_rescale_from_measurements:
+            if (self.parameters.probe_options.init_rescale_from_measurements
+                    and self._resume_order is None):
                 self.parameters.probe = _rescale_probe(
                     self.operator,
                     self.comm,
                     self.data,
+                    self.data_scale,
                     self.parameters.exitwave_options,
                     self.parameters.psi,
                     self.parameters.scan,
@@ -406,68 +604,113 @@ class Reconstruction():
 
             if np.isnan(self.parameters.probe_options.probe_photons):
                 self.parameters.probe_options.probe_photons = np.sum(
-                    np.abs(self.parameters.probe[0].get())**2)
+                    np.abs(self.comm.pool._copy_host(
+                        self.parameters.probe[0],
+                        worker=0,
+                    ))**2)
 
         return self
 
+    def _stage(self, name: str):
+        """Return a context which records a stage of an epoch to the tracer."""
+        if self.tracer is None:
+            return contextlib.nullcontext()
+        return self.tracer.stage(
+            name,
+            pool=self.comm.pool,
+            epoch=len(self.parameters.algorithm_options.times),
+            algorithm=self.parameters.algorithm_options.name,
+        )
+
     def iterate(self, num_iter: int) -> None:
         """Advance the reconstruction by num_iter epochs."""
-        start = time.perf_counter()
-        psi_previous = self.parameters.psi[0].copy()
+        self._begin_epochs()
         for i in range(num_iter):
+            if self._epoch(flush=i + 1 == num_iter):
+                break
 
-            logger.info(f"{self.parameters.algorithm_options.name} epoch "
-                        f"{len(self.parameters.algorithm_options.times):,d}")
-
-            total_epochs = len(self.parameters.algorithm_options.times)
-
-            if self.parameters.probe_options is not None:
-                self.parameters.probe_options.recover_probe = (
-                    total_epochs >= self.parameters.probe_options.update_start
-                    and (total_epochs % self.parameters.probe_options.update_period) == 0
-                )  # yapf: disable
-
-            if self.parameters.probe_options is not None:
-                if self.parameters.probe_options.recover_probe:
-
-                    if self.parameters.probe_options.force_centered_intensity:
-                        self.parameters.probe = self.comm.pool.map(
-                            constrain_center_peak,
-                            self.parameters.probe,
-                        )
-
-                    if self.parameters.probe_options.force_sparsity < 1:
-                        self.parameters.probe = self.comm.pool.map(
-                            constrain_probe_sparsity,
-                            self.parameters.probe,
-                            f=self.parameters.probe_options.force_sparsity,
-                        )
-
-                    if self.parameters.probe_options.force_orthogonality:
-                        (
-                            self.parameters.probe,
-                            power,
-                        ) = (list(a) for a in zip(*self.comm.pool.map(
-                            tike.ptycho.probe.orthogonalize_eig,
-                            self.parameters.probe,
-                        )))
-
-                        self.parameters.probe_options.power.append(
-                            power[0].get())
+    def _begin_epochs(self) -> None:
+        """Start the timer and save the object for the update norm."""
+        self._epoch_start = time.perf_counter()
+        self._psi_previous = self.parameters.psi[0].copy()
 
-            (
-                self.parameters.object_options,
-                self.parameters.probe_options,
-            ) = solvers.update_preconditioners(
-                comm=self.comm,
-                operator=self.operator,
-                scan=self.parameters.scan,
-                probe=self.parameters.probe,
-                psi=self.parameters.psi,
-                object_options=self.parameters.object_options,
-                probe_options=self.parameters.probe_options,
-            )
+    def _epoch(self, flush: bool) -> bool:
+        """Advance the reconstruction by one epoch.
+
+        The metrics are copied to the host when flush is True or every
+        metrics_period epochs. Return whether the object converged; this is
+        only checked when the metrics are copied.
+        """
+        self._epoch_begin()
+        self._solve()
+        return self._epoch_end(flush)
+
+    def _epoch_begin(self) -> None:
+        """Apply the probe constraints and update the preconditioners."""
+        logger.info(f"{self.parameters.algorithm_options.name} epoch "
+                    f"{len(self.parameters.algorithm_options.times):,d}")
 
+        total_epochs = len(self.parameters.algorithm_options.times)
+
+        if self.parameters.probe_options is not None:
+            self.parameters.probe_options.recover_probe = (
+                total_epochs >= self.parameters.probe_options.update_start
+                and (total_epochs % self.parameters.probe_options.update_period) == 0
+            )  # yapf: disable
+
+        with self._stage('probe_constraints'):
+            probe_options = self.parameters.probe_options
+            if probe_options is not None and probe_options.recover_probe:
+
+                if probe_options.force_centered_intensity:
+                    self.parameters.probe = self.comm.pool.map(
+                        constrain_center_peak,
+                        self.parameters.probe,
+                    )
+
+                if probe_options.force_sparsity < 1:
+                    self.parameters.probe = self.comm.pool.map(
+                        constrain_probe_sparsity,
+                        self.parameters.probe,
+                        f=probe_options.force_sparsity,
+                    )
+
+                if probe_options.force_orthogonality:
+                    (
+                        self.parameters.probe,
+                        power,
+                    ) = (list(a) for a in zip(*self.comm.pool.map(
+                        tike.ptycho.probe.orthogonalize_eig,
+                        self.parameters.probe,
+                    )))
+
+                    probe_options.power.append(power[0])
+
+        with self._stage('preconditioners'):
+            if solvers.FusedPreconditionerUpdate.is_enabled(
+                    self.parameters):
+                # The solver updates the preconditioners during its sweep
+                self._preconditioner_reference.invalidate()
+            elif (solvers.preconditioner_update_is_due(
+                    self.parameters.algorithm_options)
+                  or _preconditioner_is_missing(self.parameters)):
+                (
+                    self.parameters.object_options,
+                    self.parameters.probe_options,
+                ) = solvers.update_preconditioners(
+                    comm=self.comm,
+                    operator=self.operator,
+                    scan=self.parameters.scan,
+                    probe=self.parameters.probe,
+                    psi=self.parameters.psi,
+                    object_options=self.parameters.object_options,
+                    probe_options=self.parameters.probe_options,
+                    reference=self._preconditioner_reference,
+                )
+
+    def _solve(self) -> None:
+        """Sweep the solver over every position once."""
+        with self._stage('solver'):
             self.parameters = getattr(
                 solvers,
                 self.parameters.algorithm_options.name,
@@ -477,8 +720,15 @@ class Reconstruction():
                 data=self.data,
                 batches=self.batches,
                 parameters=self.parameters,
+                data_scale=self.data_scale,
             )
 
+    def _epoch_end(self, flush: bool) -> bool:
+        """Apply the constraints which follow the solver and copy metrics.
+
+        See :py:meth:`Reconstruction._epoch` for flush and the return value.
+        """
+        with self._stage('object_constraints'):
             if self.parameters.object_options.positivity_constraint:
                 self.parameters.psi = self.comm.pool.map(
                     tike.ptycho.object.positivity_constraint,
@@ -500,6 +750,7 @@ class Reconstruction():
                     a_max=1.0,
                 )
 
+        with self._stage('rescale'):
             if (
                 self.parameters.algorithm_options.name != 'dm'
                 and self.parameters.algorithm_options.rescale_method == 'mean_of_abs_object'
@@ -527,10 +778,12 @@ class Reconstruction():
                         tike.ptycho.probe
                         .rescale_probe_using_fixed_intensity_photons,
                         self.parameters.probe,
-                        Nphotons=self.parameters.probe_options.probe_photons,
+                        Nphotons=(
+                            self.parameters.probe_options.probe_photons),
                         probe_power_fraction=None,
                     )
 
+        with self._stage('variable_probe'):
             if (
                 self.parameters.probe_options is not None
                 and self.parameters.eigen_probe is not None
@@ -545,6 +798,7 @@ class Reconstruction():
                     self.parameters.eigen_weights,
                 )
 
+        with self._stage('position_regularization'):
             if (self.parameters.position_options and self.parameters
                     .position_options[0].use_position_regularization):
 
@@ -555,34 +809,215 @@ class Reconstruction():
                     position_options=self.parameters.position_options,
                 )
 
-            self.parameters.algorithm_options.times.append(time.perf_counter() -
-                                                           start)
-            start = time.perf_counter()
+        self.parameters.algorithm_options.times.append(
+            time.perf_counter() - self._epoch_start)
 
-            update_norm = tike.linalg.mnorm(self.parameters.psi[0] -
-                                            psi_previous)
+        self._epoch_start = time.perf_counter()
 
+        with self._stage('update_norm'):
+            # The norm stays on the device until the metrics are copied
             self.parameters.object_options.update_mnorm.append(
-                update_norm.get())
+                tike.linalg.mnorm(self.parameters.psi[0] - self._psi_previous))
 
-            logger.info(f"The object update mean-norm is {update_norm:.3e}")
+        if (self.checkpoint_period > 0 and self.checkpoint_path is not None
+                and len(self.parameters.algorithm_options.times) %
+                self.checkpoint_period == 0):
+            with self._stage('checkpoint'):
+                self.checkpoint()
 
-            if (np.mean(self.parameters.object_options.update_mnorm[-5:])
-                    < self.parameters.object_options.convergence_tolerance):
-                logger.info(
-                    f"The object seems converged. {update_norm:.3e} < "
-                    f"{self.parameters.object_options.convergence_tolerance:.3e}"
-                )
-                break
+        if (not flush and len(self.parameters.algorithm_options.times) %
+                self.parameters.algorithm_options.metrics_period != 0):
+            return False
+
+        with self._stage('metrics'):
+            self._flush_metrics()
 
+        update_norm = self.parameters.object_options.update_mnorm[-1]
+        logger.info(f"The object update mean-norm is {update_norm:.3e}")
+
+        if self._is_converged():
             logger.info(
-                '%10s cost is %+1.3e',
-                self.parameters.exitwave_options.noise_model,
-                np.mean(self.parameters.algorithm_options.costs[-1]),
+                f"The object seems converged. {update_norm:.3e} < "
+                f"{self.parameters.object_options.convergence_tolerance:.3e}"
             )
+            return True
+
+        logger.info(
+            '%10s cost is %+1.3e',
+            self.parameters.exitwave_options.noise_model,
+            np.mean(self.parameters.algorithm_options.costs[-1]),
+        )
+        return False
+
+    def _flush_metrics(self) -> None:
+        """Copy the metrics of recent epochs from the device to the host.
+
+        The solvers and :py:meth:`Reconstruction.iterate` leave the costs,
+        object update norms, and probe powers of each epoch on the device, so
+        that the host does not wait for the device every epoch.
+        """
+        # The metrics are on the first worker; the pool counts the copies
+        copy_host = functools.partial(self.comm.pool._copy_host, worker=0)
+        algorithm_options = self.parameters.algorithm_options
+        algorithm_options.costs[:] = [
+            x if isinstance(x, list) else copy_host(x).tolist()
+            for x in algorithm_options.costs
+        ]
+        object_options = self.parameters.object_options
+        object_options.update_mnorm[:] = [
+            copy_host(x) for x in object_options.update_mnorm
+        ]
+        if self.parameters.probe_options is not None:
+            probe_options = self.parameters.probe_options
+            probe_options.power[:] = [
+                copy_host(x) for x in probe_options.power
+            ]
+
+    def checkpoint(
+        self,
+        path: typing.Optional[str] = None,
+    ) -> concurrent.futures.Future:
+        """Save the state of the reconstruction to a folder in the background.
+
+        The state is copied from the devices on the streams of the
+        :py:meth:`Reconstruction.snapshot` machinery and written by its
+        background thread, so the reconstruction continues while the
+        checkpoint is being written. Arrays which are unchanged since the
+        previous checkpoint in the same folder are not written again. See
+        :py:mod:`tike.ptycho.checkpoint` for the format. Use
+        :py:meth:`Reconstruction.from_checkpoint` to resume.
+
+        Parameters
+        ----------
+        path : str
+            The folder to write. Defaults to the checkpoint_path given at
+            construction.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            Completes when the checkpoint is written.
+        """
+        path = self.checkpoint_path if path is None else path
+        if path is None:
+            raise ValueError("A checkpoint path is required.")
+        parameters = self.parameters
+        arrays = {
+            'psi': parameters.psi[:1],
+            'probe': parameters.probe[:1],
+            'eigen_probe': None if parameters.eigen_probe is None
+                           else parameters.eigen_probe[:1],
+            'eigen_weights': parameters.eigen_weights,
+            'scan': parameters.scan,
+        }
+        # The device arrays are replaced by their host copies in the
+        # background; the state must not refer to anything iterate changes.
+        host = copy.copy(parameters)
+        for name in _OPTIONS:
+            if getattr(host, name) is not None:
+                setattr(host, name, _detach(getattr(host, name), name, arrays))
+        if host.position_options is not None:
+            host.position_options = [
+                copy.copy(x) for x in host.position_options
+            ]
+            for key in _POSITION_ARRAYS:
+                if key in vars(host.position_options[0]):
+                    arrays[f'position_options.{key}'] = [
+                        vars(x)[key] for x in host.position_options
+                    ]
+        reference = copy.copy(self._preconditioner_reference)
+        arrays['reference.probe'] = (None if reference.probe is None else
+                                     [reference.probe])
+        arrays['reference.scan'] = reference.scan
+        # The sums are Allreduced, so every worker has the same copy
+        arrays['reference.psi_sum'] = (None if reference.psi_sum is None else
+                                       reference.psi_sum[:1])
+        arrays['reference.probe_sum'] = (None if reference.probe_sum is None
+                                         else reference.probe_sum[:1])
+        state = {
+            'parameters': host,
+            'order': self.comm.order,
+            'batches': self.batches,
+            'random_state': tike.random.randomizer_np.bit_generator.state,
+            'preconditioner_reference': reference,
+        }
+        if self._snapshot is None:
+            self._snapshot = tike.ptycho.snapshot.Snapshot(self.comm.pool)
+        logger.info(f"Writing checkpoint of epoch "
+                    f"{len(parameters.algorithm_options.times):,d} to {path}.")
+        self._checkpoint_future = self._snapshot.request(
+            arrays,
+            finalize=functools.partial(
+                _write_checkpoint,
+                path=path,
+                state=state,
+                reorder=np.argsort(np.concatenate(self.comm.order)),
+            ),
+        )
+        return self._checkpoint_future
+
+    def _finish_checkpoints(self) -> None:
+        """Wait for pending checkpoints to be written."""
+        if self._checkpoint_future is not None:
+            # Raise any errors from writing the last checkpoint
+            self._checkpoint_future.result()
+            self._checkpoint_future = None
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        path: str,
+        data: npt.NDArray,
+        num_gpu: typing.Union[int, typing.Tuple[int, ...]] = 1,
+        use_mpi: bool = False,
+        **kwargs,
+    ) -> 'Reconstruction':
+        """Create a Reconstruction which resumes from a checkpoint.
+
+        The positions are divided among the workers and batches exactly as
+        they were when the checkpoint was written, and the random number
+        generator of the solvers and the reference of the incremental
+        preconditioner updates are restored, so that continuing the
+        reconstruction gives the same result as if it were never interrupted.
+
+        Parameters
+        ----------
+        path : str
+            A folder written by :py:meth:`Reconstruction.checkpoint`.
+        data : (FRAME, WIDE, HIGH) uint16
+            The same diffraction patterns given to the checkpointed
+            reconstruction.
+        kwargs
+            Other keyword arguments for the Reconstruction constructor.
+        """
+        state = tike.ptycho.checkpoint.read(path)
+        reconstruction = cls(
+            data,
+            state['parameters'],
+            num_gpu,
+            use_mpi,
+            **kwargs,
+        )
+        if len(state['order']) != reconstruction.comm.pool.num_workers:
+            raise ValueError(
+                f"The checkpoint was split among {len(state['order'])} "
+                f"workers, but there are "
+                f"{reconstruction.comm.pool.num_workers} workers.")
+        reconstruction._resume_order = (state['order'], state['batches'])
+        reconstruction._resume_reference = state['preconditioner_reference']
+        tike.random.randomizer_np.bit_generator.state = state['random_state']
+        return reconstruction
+
+    def _is_converged(self) -> bool:
+        """Return whether the recent object updates are below tolerance."""
+        return bool(
+            len(self.parameters.object_options.update_mnorm) > 0 and
+            np.mean(self.parameters.object_options.update_mnorm[-5:])
+            < self.parameters.object_options.convergence_tolerance)
 
     def get_result(self):
         """Return the current parameter estimates."""
+        self._flush_metrics()
         reorder = np.argsort(np.concatenate(self.comm.order))
         parameters = solvers.PtychoParameters(
             probe=self.parameters.probe[0].get(),
@@ -592,6 +1027,7 @@ class Reconstruction():
                 axis=-2,
             )[reorder],
             algorithm_options=self.parameters.algorithm_options,
+            precision=self.parameters.precision,
         )
 
         if self.parameters.eigen_probe is not None:
@@ -629,7 +1065,15 @@ class Reconstruction():
 
         return parameters
 
+    def _close_snapshot(self) -> None:
+        """Wait for pending snapshots and stop the snapshot threads."""
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
     def __exit__(self, type, value, traceback):
+        self._finish_checkpoints()
+        self._close_snapshot()
         self.parameters = self.get_result()
         self.comm.__exit__(type, value, traceback)
         self.operator.__exit__(type, value, traceback)
@@ -643,6 +1087,7 @@ class Reconstruction():
         self
     ) -> typing.Tuple[typing.List[typing.List[float]], typing.List[float]]:
         """Return the cost function values and times as a tuple."""
+        self._flush_metrics()
         return (
             self.parameters.algorithm_options.costs,
             self.parameters.algorithm_options.times,
@@ -679,24 +1124,85 @@ class Reconstruction():
         probe, eigen_probe, eigen_weights = self.get_probe()
         return psi, probe, eigen_probe, eigen_weights
 
+    def snapshot(self, downsample: int = 1) -> concurrent.futures.Future:
+        """Return a future of the current object and probe as numpy arrays.
+
+        Unlike :py:meth:`Reconstruction.peek`, this method does not wait for
+        the devices. The arrays are copied on the devices in order with the
+        reconstruction, then transferred to pinned host memory on dedicated
+        streams while the reconstruction continues. Call this method as often
+        as needed for live monitoring.
+
+        Parameters
+        ----------
+        downsample : int
+            Average blocks of this width of the object and probes on the
+            device before the transfer to reduce the size of the transfer.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            Returns a tuple of object, probe, eigen_probe, eigen_weights. The
+            arrays share two rotating host buffers, so they remain valid until
+            two more snapshots are requested.
+        """
+        if self._snapshot is None:
+            self._snapshot = tike.ptycho.snapshot.Snapshot(self.comm.pool)
+        return self._snapshot.request(
+            {
+                'psi': self.parameters.psi[:1],
+                'probe': self.parameters.probe[:1],
+                'eigen_probe': None if self.parameters.eigen_probe is None
+                               else self.parameters.eigen_probe[:1],
+                'eigen_weights': self.parameters.eigen_weights,
+            },
+            downsample={
+                'psi': downsample,
+                'probe': downsample,
+                'eigen_probe': downsample,
+            },
+            finalize=functools.partial(
+                _join_snapshot,
+                reorder=np.argsort(np.concatenate(self.comm.order)),
+            ),
+        )
+
     def append_new_data(
         self,
         new_data: npt.NDArray,
         new_scan: npt.NDArray,
     ) -> None:
         """Append new diffraction patterns and positions to existing result."""
+        if self.parameters.algorithm_options.out_of_core:
+            raise ValueError(
+                "Cannot append new data to an out_of_core reconstruction.")
         # Assign positions and data to correct devices.
-        if (not np.all(np.isfinite(new_data)) or np.any(new_data < 0)):
+        if not _data_is_valid(new_data):
             warnings.warn(
                 "New diffraction patterns contain invalid data. "
                 "All data should be non-negative and finite.", UserWarning)
+        new_scale = None
+        if self.parameters.algorithm_options.data_encoding is not None:
+            new_data, new_scale = tike.operators.encode_patterns(
+                new_data,
+                dtype=self.parameters.algorithm_options.data_encoding,
+            )
+            if new_scale is None and self.data_scale is not None:
+                new_scale = np.ones(len(new_data), dtype=np.float32)
+            if new_scale is not None and self.data_scale is None:
+                self.data_scale = self.comm.pool.map(
+                    _ones_like_patterns,
+                    self.data,
+                )
         odd_pool = self.comm.pool.num_workers % 2
         (
             order,
             new_scan,
             new_data,
+            new_scale,
         ) = tike.cluster.by_scan_grid(
             new_data,
+            new_scale,
             scan=new_scan,
             pool=self.comm.pool,
             shape=(
@@ -704,8 +1210,12 @@ class Reconstruction():
                 if odd_pool else self.comm.pool.num_workers // 2,
                 1 if odd_pool else 2,
             ),
-            dtype=(self.parameters.scan[0].dtype, self.data[0].dtype),
-            destination=('gpu', 'pinned'),
+            dtype=(
+                self.parameters.scan[0].dtype,
+                self.data[0].dtype,
+                tike.precision.floating,
+            ),
+            destination=('gpu', 'pinned', 'gpu'),
         )
         # TODO: Perform sqrt of data here if gaussian model.
         # FIXME: Append makes a copy of each array!
@@ -715,6 +1225,13 @@ class Reconstruction():
             new_data,
             axis=0,
         )
+        if new_scale is not None:
+            self.data_scale = self.comm.pool.map(
+                cp.append,
+                self.data_scale,
+                new_scale,
+                axis=0,
+            )
         self.parameters.scan = self.comm.pool.map(
             cp.append,
             self.parameters.scan,
@@ -728,12 +1245,20 @@ class Reconstruction():
         )
 
         # Rebatch on each device
-        self.batches = self.comm.pool.map(
-            getattr(tike.cluster,
-                    self.parameters.algorithm_options.batch_method),
-            self.parameters.scan,
-            num_cluster=self.parameters.algorithm_options.num_batch,
-        )
+        if self.parameters.algorithm_options.batch_method == 'compact':
+            # Grow the existing batches instead of clustering from scratch
+            self.batches = self.comm.pool.map(
+                tike.cluster.compact_append,
+                self.parameters.scan,
+                self.batches,
+            )
+        else:
+            self.batches = self.comm.pool.map(
+                getattr(tike.cluster,
+                        self.parameters.algorithm_options.batch_method),
+                self.parameters.scan,
+                num_cluster=self.parameters.algorithm_options.num_batch,
+            )
 
         if self.parameters.eigen_weights is not None:
             self.parameters.eigen_weights = self.comm.pool.map(
@@ -755,12 +1280,447 @@ class Reconstruction():
             )
 
 
+class ReconstructionGroup():
+    """Context manager for many independent ptychography reconstructions.
+
+    Reconstructions in the group share one device context, one communicator
+    (worker threads and CUDA streams), and one operator for each distinct
+    combination of probe, detector, and object shapes. The cost of setting up
+    these resources is paid once for the whole group instead of once per scan,
+    which dominates the run time when reconstructing many small scans.
+
+    Reconstructions which use the rpie solver and have the same shapes,
+    precision, exitwave options, number of batches, and batch method are
+    packed: their diffraction patterns are concatenated once, and each epoch
+    their objects, probes, and positions are stacked along a leading dimension
+    so that the operators process the same batch step of all of them in one
+    call (see :py:func:`tike.ptycho.solvers.rpie_group`). Reconstructions with
+    position correction, variable probes, encoded or out-of-core data, or
+    fused preconditioners are not packed; their solvers take turns.
+
+    The group advances one epoch at a time. A reconstruction stops advancing
+    once its object converges or it reaches its own `num_iter`. Metrics are
+    copied from the devices every `metrics_period` epochs of each
+    reconstruction as in :py:meth:`Reconstruction.iterate`. The time of an
+    epoch of a packed reconstruction includes the solver time of the other
+    reconstructions in its pack.
+
+    Each reconstruction draws its random numbers from its own copy of
+    :py:data:`tike.random.randomizer_np`, so each result is the same as from
+    :py:func:`tike.ptycho.ptycho.reconstruct` starting from the generator
+    state when the group was created.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with tike.ptycho.ReconstructionGroup(
+            [data0, data1, data2],
+            [parameters0, parameters1, parameters2],
+        ) as context:
+            context.iterate(num_iter)
+            early_result = context[1].get_psi()
+        # A list of tike.ptycho.solvers.PtychoParameters
+        final_results = context.parameters
+
+    .. seealso:: :py:class:`tike.ptycho.ptycho.Reconstruction`
+    """
+
+    def __init__(
+        self,
+        data: typing.Sequence[npt.NDArray],
+        parameters: typing.Sequence[solvers.PtychoParameters],
+        num_gpu: typing.Union[int, typing.Tuple[int, ...]] = 1,
+        use_mpi: bool = False,
+    ):
+        if len(data) != len(parameters):
+            raise ValueError(
+                f"The number of datasets ({len(data)}) and parameters "
+                f"({len(parameters)}) should be the same.")
+        if len(data) < 1:
+            raise ValueError("At least one reconstruction is required.")
+        self.device = cp.cuda.Device(
+            num_gpu[0] if isinstance(num_gpu, tuple) else None)
+        self.comm = tike.communicators.Comm(
+            num_gpu,
+            tike.communicators.MPIComm
+            if use_mpi else tike.communicators.NoMPIComm,
+        )
+        self.operators = dict()
+        self.reconstructions = []
+        self._randomizers = []
+        self._pack_keys = []
+        self._packs = []
+        for d, p in zip(data, parameters):
+            key = (
+                p.probe.shape[-1],
+                d.shape[-1],
+                *p.psi.shape[-2:],
+                p.precision.cwavefront,
+            )
+            if key not in self.operators:
+                self.operators[key] = tike.operators.Ptycho(
+                    probe_shape=key[0],
+                    detector_shape=key[1],
+                    nz=key[2],
+                    n=key[3],
+                    wavefront_dtype=key[4],
+                )
+            self.reconstructions.append(
+                Reconstruction(
+                    d,
+                    p,
+                    num_gpu,
+                    use_mpi,
+                    operator=self.operators[key],
+                    # A shallow copy shares the workers and streams, but each
+                    # reconstruction keeps its own order of positions.
+                    comm=copy.copy(self.comm),
+                ))
+            self._randomizers.append(copy.deepcopy(tike.random.randomizer_np))
+            self._pack_keys.append(_pack_key(d, p))
+        logger.info(f"Group of {len(self.reconstructions):,d} reconstructions "
+                    f"using {len(self.operators):,d} operators.")
+
+    def __len__(self) -> int:
+        return len(self.reconstructions)
+
+    def __getitem__(self, i: int) -> Reconstruction:
+        return self.reconstructions[i]
+
+    def __enter__(self):
+        self.device.__enter__()
+        for operator in self.operators.values():
+            operator.__enter__()
+        self.comm.__enter__()
+        for r, randomizer in zip(self.reconstructions, self._randomizers):
+            with _using_randomizer(randomizer):
+                r._distribute()
+        self._packs = self._pack()
+        return self
+
+    def _pack(self) -> typing.List['_Pack']:
+        """Concatenate the patterns of the reconstructions which can be packed.
+
+        The patterns of each packed reconstruction are replaced by views of
+        the concatenated patterns, so the patterns are not held twice.
+        """
+        members = dict()
+        for i, key in enumerate(self._pack_keys):
+            if key is not None:
+                members.setdefault(key, []).append(i)
+        packs = []
+        for group in members.values():
+            if len(group) < 2:
+                continue
+            data = self.comm.pool.map(
+                _concatenate_pinned,
+                *(self.reconstructions[i].data for i in group),
+            )
+            offsets = []
+            start = [0] * self.comm.pool.num_workers
+            for i in group:
+                r = self.reconstructions[i]
+                offsets.append(start)
+                r.data = [
+                    x[a:a + len(y)] for x, a, y in zip(data, start, r.data)
+                ]
+                start = [a + len(y) for a, y in zip(start, r.data)]
+            packs.append(_Pack(group, data, offsets))
+        logger.info(f"{sum(len(p.members) for p in packs):,d} reconstructions "
+                    f"are packed into {len(packs):,d} groups.")
+        return packs
+
+    def iterate(self, num_iter: int) -> None:
+        """Advance each unconverged reconstruction by at most num_iter epochs."""
+
+        def remaining(r: Reconstruction) -> int:
+            return (r.parameters.algorithm_options.num_iter -
+                    len(r.parameters.algorithm_options.times))
+
+        # The metrics were copied at the end of the previous call, so checking
+        # for convergence here does not wait for the devices.
+        active = [
+            i for i, r in enumerate(self.reconstructions)
+            if remaining(r) > 0 and not r._is_converged()
+        ]
+        for i in active:
+            self.reconstructions[i]._begin_epochs()
+        for epoch in range(num_iter):
+            if not active:
+                logger.info("All reconstructions in the group are finished.")
+                break
+            logger.info(f"Group epoch {epoch:,d} advancing {len(active):,d} "
+                        f"of {len(self.reconstructions):,d} reconstructions.")
+            for i in active:
+                r = self.reconstructions[i]
+                # Do not count the stages of other reconstructions before it
+                r._epoch_start = time.perf_counter()
+                with _using_randomizer(self._randomizers[i]):
+                    r._epoch_begin()
+            self._solve(active)
+            finished = []
+            for i in active:
+                r = self.reconstructions[i]
+                last = epoch + 1 == num_iter or remaining(r) <= 1
+                with _using_randomizer(self._randomizers[i]):
+                    if r._epoch_end(flush=last) or last:
+                        finished.append(i)
+            active = [i for i in active if i not in finished]
+
+    def _solve(self, active: typing.List[int]) -> None:
+        """Sweep the solvers of the active reconstructions once."""
+        packed = []
+        for pack in self._packs:
+            members = [i for i in pack.members if i in active]
+            if len(members) < 2:
+                continue
+            reconstructions = [self.reconstructions[i] for i in members]
+            parameters = solvers.rpie_group(
+                reconstructions[0].operator,
+                self.comm,
+                pack.data,
+                batches=[r.batches for r in reconstructions],
+                offsets=[
+                    pack.offsets[pack.members.index(i)] for i in members
+                ],
+                parameters=[r.parameters for r in reconstructions],
+                randomizers=[self._randomizers[i] for i in members],
+            )
+            for r, p in zip(reconstructions, parameters):
+                r.parameters = p
+            packed.extend(members)
+        for i in active:
+            if i not in packed:
+                with _using_randomizer(self._randomizers[i]):
+                    self.reconstructions[i]._solve()
+
+    def get_result(self) -> typing.List[solvers.PtychoParameters]:
+        """Return the current parameter estimates of each reconstruction."""
+        return [r.get_result() for r in self.reconstructions]
+
+    def get_convergence(
+        self
+    ) -> typing.List[typing.Tuple[typing.List[typing.List[float]],
+                                  typing.List[float]]]:
+        """Return the cost function values and times of each reconstruction."""
+        return [r.get_convergence() for r in self.reconstructions]
+
+    def __exit__(self, type, value, traceback):
+        for r in self.reconstructions:
+            r._finish_checkpoints()
+            r._close_snapshot()
+        self.parameters = self.get_result()
+        for r in self.reconstructions:
+            r.parameters = None
+            r.data = None
+        self._packs = []
+        self.comm.__exit__(type, value, traceback)
+        for operator in self.operators.values():
+            operator.__exit__(type, value, traceback)
+        self.device.__exit__(type, value, traceback)
+        mempool = cp.get_default_memory_pool()
+        mempool.free_all_blocks()
+        pinned_mempool = cp.get_default_pinned_memory_pool()
+        pinned_mempool.free_all_blocks()
+
+
+class _Pack(typing.NamedTuple):
+    """Reconstructions of a group whose solvers advance together."""
+    members: typing.List[int]
+    # The concatenated patterns of the members on each worker
+    data: typing.List[npt.NDArray]
+    # The index of the first pattern of each member on each worker
+    offsets: typing.List[typing.List[int]]
+
+
+def _pack_key(
+    data: npt.NDArray,
+    parameters: solvers.PtychoParameters,
+) -> typing.Optional[typing.Tuple]:
+    """Return a key which is equal for reconstructions that can be packed.
+
+    Return None if the reconstruction cannot be packed with others.
+    """
+    algorithm_options = parameters.algorithm_options
+    if (algorithm_options.name != 'rpie'
+            or algorithm_options.data_encoding is not None
+            or algorithm_options.out_of_core
+            or algorithm_options.fuse_preconditioner
+            or parameters.position_options is not None
+            or parameters.eigen_probe is not None):
+        return None
+    exitwave_options = parameters.exitwave_options
+    return (
+        data.shape[1:],
+        data.dtype,
+        parameters.psi.shape,
+        parameters.probe.shape,
+        repr(parameters.precision),
+        algorithm_options.num_batch,
+        algorithm_options.batch_method,
+        parameters.object_options is None,
+        exitwave_options.noise_model,
+        exitwave_options.step_length_weight,
+        exitwave_options.step_length_usemodes,
+        exitwave_options.step_length_start,
+        exitwave_options.unmeasured_pixels_scaling,
+        np.asarray(exitwave_options.measured_pixels).tobytes(),
+    )
+
+
+def _concatenate_pinned(*x: npt.NDArray) -> npt.NDArray:
+    """Concatenate host arrays along the first axis into pinned memory."""
+    pinned = cupyx.empty_pinned(
+        shape=(sum(len(a) for a in x), *x[0].shape[1:]),
+        dtype=x[0].dtype,
+    )
+    np.concatenate(x, axis=0, out=pinned)
+    return pinned
+
+
+@contextlib.contextmanager
+def _using_randomizer(randomizer: np.random.Generator):
+    """Draw from randomizer instead of tike.random.randomizer_np."""
+    previous = tike.random.randomizer_np
+    tike.random.randomizer_np = randomizer
+    try:
+        yield
+    finally:
+        tike.random.randomizer_np = previous
+
+
+def _join_snapshot(arrays, reorder):
+    return (
+        arrays['psi'][0],
+        arrays['probe'][0],
+        None if arrays['eigen_probe'] is None else arrays['eigen_probe'][0],
+        None if arrays['eigen_weights'] is None else np.concatenate(
+            arrays['eigen_weights'],
+            axis=-3,
+        )[reorder],
+    )
+
+
+# The options which are checkpointed with the parameters
+_OPTIONS = (
+    'algorithm_options',
+    'exitwave_options',
+    'object_options',
+    'probe_options',
+)
+# The sums of updates which are accumulated from zero during each epoch
+_SUMS = ('combined_update', 'probe_update_sum')
+# The metrics of each epoch which the solvers leave on the device
+_METRICS = ('costs', 'power', 'update_mnorm')
+# The device arrays of the position options of each worker
+_POSITION_ARRAYS = ('initial_scan', 'confidence', '_momentum')
+
+
+class _OnDevice(typing.NamedTuple):
+    """The name of an array which is being copied to the host."""
+    name: str
+
+
+def _detach(options, name: str, arrays: dict):
+    """Return a shallow copy of options with its device arrays named in arrays.
+
+    Arrays which are broadcast to every worker are copied from the first
+    worker only. The metrics of each epoch which are still on the device are
+    named by their offset from the end of their list.
+    """
+    options = copy.copy(options)
+    for key, value in vars(options).items():
+        if key in _SUMS:
+            value = None
+        elif key in _METRICS:
+            value = list(value)
+            for i, x in enumerate(value):
+                if isinstance(x, cp.ndarray):
+                    value[i] = _OnDevice(f'{name}.{key}.{i - len(value)}')
+                    arrays[value[i].name] = [x]
+        elif isinstance(value, cp.ndarray):
+            arrays[f'{name}.{key}'] = [value]
+            value = _OnDevice(f'{name}.{key}')
+        elif (isinstance(value, list) and value
+              and isinstance(value[0], cp.ndarray)):
+            arrays[f'{name}.{key}'] = value[:1]
+            value = _OnDevice(f'{name}.{key}')
+        elif isinstance(value, list):
+            value = list(value)
+        vars(options)[key] = value
+    return options
+
+
+def _attach(options, arrays):
+    """Replace the device arrays named by _detach with their host copies."""
+    for key, value in vars(options).items():
+        if key in _METRICS:
+            vars(options)[key] = [
+                arrays[x.name][0] if isinstance(x, _OnDevice) else x
+                for x in value
+            ]
+        elif isinstance(value, _OnDevice):
+            vars(options)[key] = arrays[value.name][0]
+
+
+def _write_checkpoint(arrays, path, state, reorder):
+    """Fill the state with the host copies of arrays and write it to path."""
+    parameters = state['parameters']
+    for name in _OPTIONS:
+        if getattr(parameters, name) is not None:
+            _attach(getattr(parameters, name), arrays)
+    costs = parameters.algorithm_options.costs
+    costs[:] = [x if isinstance(x, list) else x.tolist() for x in costs]
+    parameters.psi = arrays['psi'][0]
+    parameters.probe = arrays['probe'][0]
+    parameters.scan = np.concatenate(arrays['scan'], axis=-2)[reorder]
+    parameters.eigen_probe = (None if arrays['eigen_probe'] is None else
+                              arrays['eigen_probe'][0])
+    parameters.eigen_weights = (None if arrays['eigen_weights'] is None else
+                                np.concatenate(
+                                    arrays['eigen_weights'],
+                                    axis=-3,
+                                )[reorder])
+    if parameters.position_options is not None:
+        host_position_options = parameters.position_options[0].empty()
+        for w, (x, o) in enumerate(
+                zip(parameters.position_options, state['order'])):
+            for key in _POSITION_ARRAYS:
+                if f'position_options.{key}' in arrays:
+                    vars(x)[key] = arrays[f'position_options.{key}'][w]
+            host_position_options = host_position_options.join(x, o)
+        parameters.position_options = host_position_options
+    reference = state['preconditioner_reference']
+    reference.probe = (None if arrays['reference.probe'] is None else
+                       arrays['reference.probe'][0])
+    reference.scan = arrays['reference.scan']
+    reference.psi_sum = (None if arrays['reference.psi_sum'] is None else
+                         arrays['reference.psi_sum'][0])
+    reference.probe_sum = (None if arrays['reference.probe_sum'] is None else
+                           arrays['reference.probe_sum'][0])
+    tike.ptycho.checkpoint.write(path, state)
+
+
+def _preconditioner_is_missing(parameters: solvers.PtychoParameters) -> bool:
+    return bool(
+        (parameters.object_options
+         and parameters.object_options.preconditioner is None)
+        or (parameters.probe_options
+            and parameters.probe_options.preconditioner is None))
+
+
+def _ones_like_patterns(data: npt.NDArray) -> npt.NDArray:
+    return cp.ones(len(data), dtype=tike.precision.floating)
+
+
 def _order_join(a, b):
     return np.append(a, b + len(a))
 
 
 def _get_rescale(
     data,
+    data_scale,
     measured_pixels,
     psi,
     scan,
@@ -775,7 +1735,7 @@ def _get_rescale(
     def make_certain_args_constant(
         ind_args,
         mod_args,
-        _,
+        indices,
     ) -> typing.Tuple[npt.NDArray]:
 
         (
@@ -784,6 +1744,9 @@ def _get_rescale(
         ) = ind_args
         (sums,) = mod_args
 
+        if data_scale is not None:
+            data = tike.operators.decode_patterns(data, data_scale[indices])
+
         intensity, _ = operator._compute_intensity(
             None,
             psi,
@@ -813,8 +1776,8 @@ def _get_rescale(
     return result[0]
 
 
-def _rescale_probe(operator, comm, data, exitwave_options, psi, scan, probe,
-                   num_batch):
+def _rescale_probe(operator, comm, data, data_scale, exitwave_options, psi,
+                   scan, probe, num_batch):
     """Rescale probe so model and measured intensity are similar magnitude.
 
     Rescales the probe so that the sum of modeled intensity at the detector is
@@ -824,6 +1787,8 @@ def _rescale_probe(operator, comm, data, exitwave_options, psi, scan, probe,
         n = comm.pool.map(
             _get_rescale,
             data,
+            ([None] * comm.pool.num_workers
+             if data_scale is None else data_scale),
             exitwave_options.measured_pixels,
             psi,
             scan,
@@ -848,6 +1813,247 @@ def _rescale_probe(operator, comm, data, exitwave_options, psi, scan, probe,
     return comm.pool.bcast([probe[0]])
 
 
+def _crop_patterns(data: npt.ArrayLike, w: int) -> npt.ArrayLike:
+    """Crop the diffraction patterns of one worker in Fourier space.
+
+    Patterns on the host are copied into pinned memory, so that they can be
+    streamed to the device asynchronously.
+    """
+    cropped = solvers.crop_fourier_space(data, w)
+    if isinstance(cropped, cp.ndarray):
+        return cropped
+    pinned = cupyx.empty_pinned(shape=cropped.shape, dtype=cropped.dtype)
+    pinned[...] = cropped
+    return pinned
+
+
+def _resample_position_options(
+    options: PositionOptions,
+    factor: float,
+) -> PositionOptions:
+    return options.copy_to_host().resample(factor).copy_to_device()
+
+
+class MultigridReconstruction():
+    """Context manager for a multi-grid ptychography reconstruction.
+
+    .. versionadded:: 0.26.0
+
+    The reconstruction starts on the coarsest grid, where the real-space
+    parameters are downsampled by a factor of two for each level and the
+    diffraction patterns are cropped in Fourier space to match. Each call to
+    :py:meth:`MultigridReconstruction.refine` moves to the next finer grid.
+
+    The full diffraction patterns are divided among the workers once. The
+    cropped patterns of each level are made from each worker's patterns of
+    the next finer level when the reconstruction is entered, so the positions
+    are not clustered again and refining does not copy any patterns. The
+    levels are kept in pinned host memory, from which the solvers stream
+    them to the devices, and each coarse level is released once it is
+    refined. Out-of-core data is not supported. The parameters are resampled on
+    the devices between levels, and the communicator is shared by all
+    levels.
+
+    A level may end early when its cost stops decreasing. The level is
+    considered converged when the relative decrease of the cost between
+    consecutive epochs is less than level_tolerance. This is never applied to
+    the finest level, which stops only by the convergence criteria of the
+    object.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with tike.ptycho.MultigridReconstruction(
+            data,
+            parameters,
+            num_levels=3,
+            level_tolerance=1e-3,
+        ) as context:
+            while True:
+                context.iterate(parameters.algorithm_options.num_iter)
+                if context.level == 0:
+                    break
+                context.refine()
+        result = context.parameters
+
+    Parameters
+    ----------
+    num_levels : int > 0
+        The number of times to reduce the problem by a factor of two.
+    interp : callable
+        The function used to resample the probes. It must accept arrays on
+        the host and on the device.
+    level_tolerance : float or None
+        The relative decrease in cost at which a coarse level is converged.
+        Each level runs for the full num_iter epochs when None.
+
+    .. seealso:: :py:func:`tike.ptycho.ptycho.reconstruct_multigrid`
+    """
+
+    def __init__(
+        self,
+        data: npt.NDArray,
+        parameters: solvers.PtychoParameters,
+        num_gpu: typing.Union[int, typing.Tuple[int, ...]] = 1,
+        use_mpi: bool = False,
+        num_levels: int = 3,
+        interp: typing.Callable = solvers.options._resize_fft,
+        level_tolerance: typing.Optional[float] = None,
+    ):
+        if num_levels < 1:
+            raise ValueError(f"num_levels must be > 0, not {num_levels}.")
+        if parameters.algorithm_options.out_of_core:
+            raise ValueError(
+                "Multi-grid reconstruction does not support out_of_core "
+                "because the diffraction patterns of every level are cropped "
+                "and kept in host memory.")
+        if (data.shape[-1] * 0.5**(num_levels - 1)) < 64:
+            warnings.warn('Cropping diffraction patterns to less than 64 '
+                          'pixels wide is not recommended because the full '
+                          'doughnut may be visible.')
+        self.level = num_levels - 1
+        self.interp = interp
+        self.level_tolerance = level_tolerance
+        self._exitwave_options = parameters.exitwave_options
+        self.device = cp.cuda.Device(
+            num_gpu[0] if isinstance(num_gpu, tuple) else None)
+        self.comm = tike.communicators.Comm(
+            num_gpu,
+            tike.communicators.MPIComm
+            if use_mpi else tike.communicators.NoMPIComm,
+        )
+        # Downsample PtychoParameters to smallest size
+        coarse = parameters.resample(0.5**self.level, interp)
+        self.context = Reconstruction(
+            data,
+            coarse,
+            num_gpu,
+            use_mpi,
+            operator=self._new_operator(data.shape[-1] // 2**self.level,
+                                        coarse),
+            comm=self.comm,
+        )
+        self._level_start = 0
+
+    @staticmethod
+    def _new_operator(
+        detector_shape: int,
+        parameters: solvers.PtychoParameters,
+    ) -> tike.operators.Ptycho:
+        return tike.operators.Ptycho(
+            probe_shape=parameters.probe.shape[-1],
+            detector_shape=detector_shape,
+            nz=parameters.psi.shape[-2],
+            n=parameters.psi.shape[-1],
+            wavefront_dtype=parameters.precision.cwavefront,
+        )
+
+    def __enter__(self):
+        self.device.__enter__()
+        self.context.operator.__enter__()
+        self.comm.__enter__()
+        self.context._distribute(levels=self.level)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.context._finish_checkpoints()
+        self.context._close_snapshot()
+        self.parameters = self.context.get_result()
+        self.context.data = None
+        self.context._pyramid = None
+        self.comm.__exit__(type, value, traceback)
+        self.context.operator.__exit__(type, value, traceback)
+        self.device.__exit__(type, value, traceback)
+        mempool = cp.get_default_memory_pool()
+        mempool.free_all_blocks()
+        pinned_mempool = cp.get_default_pinned_memory_pool()
+        pinned_mempool.free_all_blocks()
+
+    def _level_is_converged(self) -> bool:
+        """Return whether the cost of this coarse level stopped decreasing."""
+        costs = self.context.parameters.algorithm_options.costs[
+            self._level_start:]
+        if self.level == 0 or self.level_tolerance is None or len(costs) < 2:
+            return False
+        previous, current = (np.mean(c) for c in costs[-2:])
+        return bool(
+            previous - current <= self.level_tolerance * abs(previous))
+
+    def iterate(self, num_iter: int) -> None:
+        """Advance the current level by at most num_iter epochs."""
+        algorithm_options = self.context.parameters.algorithm_options
+        period = max(1, algorithm_options.metrics_period)
+        done = 0
+        while done < num_iter:
+            self.context.iterate(min(period, num_iter - done))
+            done += min(period, num_iter - done)
+            if self.context._is_converged():
+                break
+            if self._level_is_converged():
+                logger.info(f"Multi-grid level {self.level:d} converged "
+                            f"after {done:,d} epochs.")
+                break
+
+    def refine(self) -> None:
+        """Move the reconstruction to the next finer grid."""
+        if self.level == 0:
+            raise ValueError("The reconstruction is already on the finest "
+                             "grid.")
+        self.level -= 1
+        factor = 2.0
+        context = self.context
+        context._flush_metrics()
+        pool = self.comm.pool
+        p = context.parameters
+
+        p.psi = pool.bcast([
+            solvers.options._resize_spline(p.psi[0], factor).astype(
+                p.precision.cfloating, copy=False)
+        ])
+        p.probe = pool.bcast([
+            self.interp(p.probe[0], factor).astype(p.precision.cfloating,
+                                                   copy=False)
+        ])
+        if p.eigen_probe is not None:
+            p.eigen_probe = pool.bcast([
+                self.interp(p.eigen_probe[0], factor).astype(
+                    p.precision.cfloating, copy=False)
+            ])
+        p.scan = pool.map(cp.multiply, p.scan, [factor] * pool.num_workers)
+        if p.probe_options is not None:
+            p.probe_options = p.probe_options.resample(
+                factor, self.interp).copy_to_device(self.comm)
+        if p.object_options is not None:
+            p.object_options = p.object_options.resample(
+                factor, self.interp).copy_to_device(self.comm)
+        if p.position_options is not None:
+            p.position_options = pool.map(
+                _resample_position_options,
+                p.position_options,
+                factor=factor,
+            )
+
+        context.data = context._pyramid[self.level]
+        # The coarser levels are no longer needed
+        del context._pyramid[self.level + 1:]
+        width = context.data[0].shape[-1]
+        if p.exitwave_options is not None:
+            p.exitwave_options = self._exitwave_options.resample(
+                width / self._exitwave_options.measured_pixels.shape[-1]
+            ).copy_to_device(self.comm)
+
+        # The previous preconditioners are for the previous grid
+        context._preconditioner_reference = (
+            solvers.PreconditionerReference())
+        context.operator.__exit__(None, None, None)
+        context.operator = self._new_operator(width, p)
+        context.operator.__enter__()
+        self._level_start = len(p.algorithm_options.costs)
+        logger.info(f"Multi-grid moved to level {self.level:d} with "
+                    f"{width:,d} pixel wide diffraction patterns.")
+
+
 def reconstruct_multigrid(
     data: npt.NDArray,
     parameters: solvers.PtychoParameters,
@@ -855,6 +2061,7 @@ def reconstruct_multigrid(
     use_mpi: bool = False,
     num_levels: int = 3,
     interp: typing.Callable = solvers.options._resize_fft,
+    level_tolerance: typing.Optional[float] = None,
 ) -> solvers.PtychoParameters:
     """Solve the ptychography problem using a multi-grid method.
 
@@ -869,36 +2076,27 @@ def reconstruct_multigrid(
     ----------
     num_levels : int > 0
         The number of times to reduce the problem by a factor of two.
+    level_tolerance : float or None
+        Move to the next finer grid once the relative decrease of the cost
+        between epochs is less than this. Each level runs for num_iter epochs
+        when None.
 
 
-    .. seealso:: :py:func:`tike.ptycho.ptycho.reconstruct`
+    .. seealso:: :py:func:`tike.ptycho.ptycho.reconstruct`,
+        :py:class:`tike.ptycho.ptycho.MultigridReconstruction`
     """
-    if (data.shape[-1] * 0.5**(num_levels - 1)) < 64:
-        warnings.warn('Cropping diffraction patterns to less than 64 pixels '
-                      'wide is not recommended because the full doughnut'
-                      ' may be visible.')
-
-    # Downsample PtychoParameters to smallest size
-    resampled_parameters = parameters.resample(0.5**(num_levels - 1), interp)
-
-    for level in range((num_levels - 1), -1, -1):
-
-        # Create a new reconstruction context for each level
-        with tike.ptycho.Reconstruction(
-                data=data if level == 0 else solvers.crop_fourier_space(
-                    data,
-                    data.shape[-1] // (2**level),
-                ),
-                parameters=resampled_parameters,
-                num_gpu=num_gpu,
-                use_mpi=use_mpi,
-        ) as context:
-            context.iterate(resampled_parameters.algorithm_options.num_iter)
-
-        if level == 0:
-            return context.parameters
-
-        # Upsample result to next grid
-        resampled_parameters = context.parameters.resample(2.0, interp)
-
-    raise RuntimeError('This should not happen.')
+    with MultigridReconstruction(
+            data=data,
+            parameters=parameters,
+            num_gpu=num_gpu,
+            use_mpi=use_mpi,
+            num_levels=num_levels,
+            interp=interp,
+            level_tolerance=level_tolerance,
+    ) as context:
+        while True:
+            context.iterate(parameters.algorithm_options.num_iter)
+            if context.level == 0:
+                break
+            context.refine()
+    return context.parameters
@@ -0,0 +1,184 @@
+"""Copy reconstruction state to the host without stalling the solvers.
+
+A :py:class:`Snapshot` copies device arrays into pinned host memory on
+dedicated non-blocking streams. The requests return futures, so a live viewer
+may poll the state of a reconstruction as often as it wants while the solvers
+keep the devices busy.
+"""
+
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+
+import concurrent.futures
+import typing
+
+import cupy as cp
+import cupyx
+import numpy.typing as npt
+
+import tike.communicators
+
+
+def _downsample(x: npt.NDArray, factor: int) -> npt.NDArray:
+    """Average factor by factor blocks of the last two dimensions of x."""
+    height = x.shape[-2] // factor * factor
+    width = x.shape[-1] // factor * factor
+    return x[..., :height, :width].reshape(
+        *x.shape[:-2],
+        height // factor,
+        factor,
+        width // factor,
+        factor,
+    ).mean(axis=(-3, -1))
+
+
+def _new_stream() -> cp.cuda.Stream:
+    return cp.cuda.Stream(non_blocking=True)
+
+
+def _enqueue_copy(
+    x: npt.NDArray,
+    pinned: typing.Union[npt.NDArray, None],
+    stream: cp.cuda.Stream,
+    downsample: int = 1,
+) -> typing.Tuple[npt.NDArray, cp.cuda.Event, npt.NDArray]:
+    """Copy x to pinned host memory without blocking the host.
+
+    The device copy of x is made on the current stream, so it is ordered with
+    the computations which update x in place. The transfer of the copy to the
+    host is made on the provided stream.
+
+    Returns
+    -------
+    pinned : numpy.ndarray
+        The pinned host array which will hold the copy. It is reused if it has
+        the correct shape and dtype.
+    done : cupy.cuda.Event
+        Recorded when the transfer is complete.
+    copy : cupy.ndarray
+        The device copy of x. It must not be freed before done.
+    """
+    copy = cp.ascontiguousarray(
+        _downsample(x, downsample) if downsample > 1 else x.copy())
+    ready = cp.cuda.Event()
+    ready.record()
+    if (pinned is None or pinned.shape != copy.shape
+            or pinned.dtype != copy.dtype):
+        pinned = cupyx.empty_pinned(copy.shape, copy.dtype)
+    stream.wait_event(ready)
+    cp.cuda.runtime.memcpyAsync(
+        pinned.ctypes.data,
+        copy.data.ptr,
+        copy.nbytes,
+        cp.cuda.runtime.memcpyDeviceToHost,
+        stream.ptr,
+    )
+    done = cp.cuda.Event()
+    done.record(stream)
+    return pinned, done, copy
+
+
+def _wait_for_copies(
+    pending: typing.Dict[str, typing.Union[typing.List[tuple], None]],
+    finalize: typing.Union[typing.Callable, None],
+):
+    arrays = dict()
+    for name, copies in pending.items():
+        if copies is None:
+            arrays[name] = None
+            continue
+        for _, done, _ in copies:
+            done.synchronize()
+        arrays[name] = [pinned for pinned, _, _ in copies]
+    return arrays if finalize is None else finalize(arrays)
+
+
+class Snapshot():
+    """Asynchronously copy device arrays into pinned host buffers.
+
+    Each worker copies on its own non-blocking stream into one of
+    `num_buffer` sets of pinned host buffers which are used in rotation. The
+    arrays returned by a request are views of these buffers, so they remain
+    valid until `num_buffer` more requests are made; copy them to keep them
+    longer.
+
+    Parameters
+    ----------
+    pool : tike.communicators.ThreadPool
+        The workers which own the arrays.
+    num_buffer : int
+        The number of sets of pinned buffers. Two buffers allow a viewer to
+        read one snapshot while the next is being transferred.
+    """
+
+    def __init__(
+        self,
+        pool: tike.communicators.ThreadPool,
+        num_buffer: int = 2,
+    ):
+        self.pool = pool
+        self.streams = pool.map(_new_stream)
+        self._buffers = [dict() for _ in range(num_buffer)]
+        self._futures = [None] * num_buffer
+        self._next = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix='snapshot',
+        )
+
+    def request(
+        self,
+        arrays: typing.Dict[str, typing.Union[typing.List[npt.NDArray], None]],
+        downsample: typing.Union[typing.Dict[str, int], None] = None,
+        finalize: typing.Union[typing.Callable, None] = None,
+    ) -> concurrent.futures.Future:
+        """Start copying arrays to the host and return a future of the copies.
+
+        Parameters
+        ----------
+        arrays : dict of lists of cupy.ndarray
+            Each list holds one array per worker starting at the first worker.
+            Lists may be shorter than the number of workers; i.e. only the
+            copy on the first worker is needed for broadcast arrays.
+        downsample : dict of int
+            Average blocks of this width of the last two dimensions of the
+            named arrays before copying them.
+        finalize : callable
+            Called on the dictionary of lists of host arrays by the future.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            Returns a dictionary of lists of host arrays or the result of
+            finalize.
+        """
+        downsample = dict() if downsample is None else downsample
+        index = self._next
+        self._next = (self._next + 1) % len(self._futures)
+        if self._futures[index] is not None:
+            # The buffers are free once the copies into them are complete
+            concurrent.futures.wait([self._futures[index]])
+        buffers = self._buffers[index]
+        pending = dict()
+        for name, x in arrays.items():
+            if x is None:
+                pending[name] = None
+                continue
+            pending[name] = self.pool.map(
+                _enqueue_copy,
+                x,
+                buffers.get(name, [None] * len(x)),
+                self.streams,
+                downsample=downsample.get(name, 1),
+            )
+            buffers[name] = [pinned for pinned, _, _ in pending[name]]
+        self._futures[index] = self._executor.submit(
+            _wait_for_copies,
+            pending,
+            finalize,
+        )
+        return self._futures[index]
+
+    def close(self) -> None:
+        """Wait for the pending requests and stop the background thread."""
+        self._executor.shutdown(wait=True)
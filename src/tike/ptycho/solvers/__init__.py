@@ -12,8 +12,10 @@ __all__ = [
     'DmOptions',
     'lstsq_grad',
     'LstsqOptions',
+    'PreconditionerReference',
     'PtychoParameters',
     'rpie',
+    'rpie_group',
     'RpieOptions',
     'update_preconditioners',
 ]
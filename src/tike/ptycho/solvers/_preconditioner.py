@@ -3,6 +3,8 @@ import typing
 import cupy as cp
 import numpy.typing as npt
 
+import tike.communicators
+import tike.operators
 import tike.precision
 
 from .options import ObjectOptions, ProbeOptions
@@ -116,6 +118,174 @@ def _probe_preconditioner(
     )[0]
 
 
+class PreconditionerReference():
+    """The probe and positions at the previous update of the preconditioners.
+
+    Passing the same reference to successive calls of
+    :py:func:`update_preconditioners` allows the preconditioners to be updated
+    incrementally. If the probe (for the object preconditioner) or the object
+    (for the probe preconditioner) has not changed, only the contributions of
+    positions which moved by more than `tolerance` pixels are replaced instead
+    of patching every position again.
+
+    The reference keeps the exact sums of the contributions of every position
+    from the previous update, because the preconditioners themselves are
+    rolling averages. An incremental update corrects these sums and then
+    averages them into the preconditioners, so it gives the same result as an
+    update from scratch.
+
+    Parameters
+    ----------
+    tolerance : float
+        Positions which moved less than this many pixels since the
+        preconditioners were last updated are not updated.
+    max_fraction : float
+        When more than this fraction of positions moved, update the
+        preconditioners from scratch instead.
+    """
+
+    def __init__(self, tolerance: float = 0.5, max_fraction: float = 0.5):
+        self.tolerance = tolerance
+        self.max_fraction = max_fraction
+        self.probe = None
+        self.scan = None
+        self.psi_sum = None
+        self.probe_sum = None
+
+    def invalidate(self) -> None:
+        """Force the next update to patch every position."""
+        self.probe = None
+        self.scan = None
+        self.psi_sum = None
+        self.probe_sum = None
+
+
+def preconditioner_update_is_due(algorithm_options) -> bool:
+    """Return whether the preconditioners should be updated this epoch."""
+    return (len(algorithm_options.costs) %
+            max(1, algorithm_options.preconditioner_period) == 0)
+
+
+def _moved_positions(
+    scan: npt.NDArray[tike.precision.floating],
+    reference: npt.NDArray[tike.precision.floating],
+    tolerance: float,
+) -> npt.NDArray[cp.intc]:
+    return cp.flatnonzero(
+        cp.max(cp.abs(scan - reference), axis=-1) > tolerance).astype(
+            cp.intc)
+
+
+def _copy_moved(
+    reference: npt.NDArray[tike.precision.floating],
+    scan: npt.NDArray[tike.precision.floating],
+    moved: npt.NDArray[cp.intc],
+) -> npt.NDArray[tike.precision.floating]:
+    reference[moved] = scan[moved]
+    return reference
+
+
+def _preconditioner_delta(
+    preconditioner: npt.NDArray,
+    psi: npt.NDArray[tike.precision.cfloating],
+    scan: npt.NDArray[tike.precision.floating],
+    reference: npt.NDArray[tike.precision.floating],
+    probe: npt.NDArray[tike.precision.cfloating],
+    moved: npt.NDArray[cp.intc],
+    streams: typing.List[cp.cuda.Stream],
+    *,
+    f: typing.Callable,
+    operator: tike.operators.Ptycho,
+) -> npt.NDArray:
+    """Return the change in a preconditioner from the moved positions."""
+    if len(moved) == 0:
+        return cp.zeros_like(preconditioner)
+    new = f(psi, scan[moved], probe, streams, operator=operator)
+    new -= f(psi, reference[moved], probe, streams, operator=operator)
+    return new
+
+
+def _average_in(
+    comm: tike.communicators.Comm,
+    preconditioner: typing.Union[typing.List[npt.NDArray], None],
+    total: typing.List[npt.NDArray],
+) -> typing.List[npt.NDArray]:
+    """Average the Allreduced sums with the previous value."""
+    if preconditioner is None:
+        return total
+    return comm.pool.map(
+        _rolling_average,
+        preconditioner,
+        total,
+    )
+
+
+def _fold_in(
+    comm: tike.communicators.Comm,
+    preconditioner: typing.Union[typing.List[npt.NDArray], None],
+    update: typing.List[npt.NDArray],
+) -> typing.List[npt.NDArray]:
+    """Allreduce the partial sums and average them with the previous value."""
+    return _average_in(comm, preconditioner, comm.Allreduce(update))
+
+
+def _find_moved(
+    comm: tike.communicators.Comm,
+    scan,
+    reference: PreconditionerReference,
+) -> typing.Union[typing.List[npt.NDArray[cp.intc]], None]:
+    """Return the positions which moved since the reference on each worker.
+
+    Returns None if the preconditioners should be updated from scratch.
+    """
+    if reference.scan is None or any(
+            a.shape != b.shape for a, b in zip(scan, reference.scan)):
+        return None
+    moved = comm.pool.map(
+        _moved_positions,
+        scan,
+        reference.scan,
+        tolerance=reference.tolerance,
+    )
+    if (sum(len(m) for m in moved)
+            > reference.max_fraction * sum(len(s) for s in scan)):
+        return None
+    return moved
+
+
+def _update_moved(
+    comm: tike.communicators.Comm,
+    operator: tike.operators.Ptycho,
+    scan,
+    probe,
+    psi,
+    total: typing.List[npt.NDArray],
+    moved: typing.List[npt.NDArray[cp.intc]],
+    reference: PreconditionerReference,
+    f: typing.Callable,
+) -> typing.List[npt.NDArray]:
+    """Replace the contributions of the moved positions to a sum."""
+    if sum(len(m) for m in moved) == 0:
+        return total
+    delta = comm.pool.map(
+        _preconditioner_delta,
+        total,
+        psi,
+        scan,
+        reference.scan,
+        probe,
+        moved,
+        comm.streams,
+        f=f,
+        operator=operator,
+    )
+    return comm.pool.map(
+        cp.add,
+        total,
+        comm.Allreduce(delta),
+    )
+
+
 def update_preconditioners(
     comm: tike.communicators.Comm,
     operator: tike.operators.Ptycho,
@@ -124,50 +294,215 @@ def update_preconditioners(
     psi,
     object_options: typing.Optional[ObjectOptions] = None,
     probe_options: typing.Optional[ProbeOptions] = None,
+    reference: typing.Optional[PreconditionerReference] = None,
 ) -> typing.Tuple[ObjectOptions, ProbeOptions]:
-    """Update the probe and object preconditioners."""
-    if object_options:
+    """Update the probe and object preconditioners.
 
-        preconditioner = comm.pool.map(
-            _psi_preconditioner,
-            psi,
-            scan,
-            probe,
-            comm.streams,
-            operator=operator,
-        )
+    If a reference is provided, each preconditioner is updated incrementally
+    when possible, and the reference is updated to match the current probe and
+    positions.
+    """
+    moved = None if reference is None else _find_moved(comm, scan, reference)
+    incremental = False
 
-        preconditioner = comm.Allreduce(preconditioner)
+    if object_options:
 
-        if object_options.preconditioner is None:
-            object_options.preconditioner = preconditioner
-        else:
-            object_options.preconditioner = comm.pool.map(
-                _rolling_average,
-                object_options.preconditioner,
-                preconditioner,
+        if (moved is not None and object_options.preconditioner is not None
+                and reference.psi_sum is not None
+                and reference.probe is not None
+                and cp.array_equal(probe[0], reference.probe)):
+            total = _update_moved(
+                comm,
+                operator,
+                scan,
+                probe,
+                psi,
+                reference.psi_sum,
+                moved,
+                reference,
+                f=_psi_preconditioner,
             )
+            incremental = True
 
-    if probe_options:
+        else:
 
-        preconditioner = comm.pool.map(
-            _probe_preconditioner,
-            psi,
-            scan,
-            probe,
-            comm.streams,
-            operator=operator,
+            total = comm.Allreduce(
+                comm.pool.map(
+                    _psi_preconditioner,
+                    psi,
+                    scan,
+                    probe,
+                    comm.streams,
+                    operator=operator,
+                ))
+
+        if reference is not None:
+            reference.psi_sum = total
+        object_options.preconditioner = _average_in(
+            comm,
+            object_options.preconditioner,
+            total,
         )
 
-        preconditioner = comm.Allreduce(preconditioner)
+    if probe_options:
+
+        # The object changes every epoch when it is reconstructed
+        if (moved is not None and probe_options.preconditioner is not None
+                and reference.probe_sum is not None and not object_options):
+            total = _update_moved(
+                comm,
+                operator,
+                scan,
+                probe,
+                psi,
+                reference.probe_sum,
+                moved,
+                reference,
+                f=_probe_preconditioner,
+            )
+            incremental = True
 
-        if probe_options.preconditioner is None:
-            probe_options.preconditioner = preconditioner
         else:
-            probe_options.preconditioner = comm.pool.map(
-                _rolling_average,
-                probe_options.preconditioner,
-                preconditioner,
+
+            total = comm.Allreduce(
+                comm.pool.map(
+                    _probe_preconditioner,
+                    psi,
+                    scan,
+                    probe,
+                    comm.streams,
+                    operator=operator,
+                ))
+
+        if reference is not None:
+            reference.probe_sum = total
+        probe_options.preconditioner = _average_in(
+            comm,
+            probe_options.preconditioner,
+            total,
+        )
+
+    if reference is not None:
+        reference.probe = probe[0].copy()
+        if incremental:
+            # Positions which moved less than the tolerance keep their
+            # reference so that small shifts cannot accumulate unnoticed
+            reference.scan = comm.pool.map(
+                _copy_moved,
+                reference.scan,
+                scan,
+                moved,
             )
+        else:
+            reference.scan = comm.pool.map(cp.copy, scan)
 
     return object_options, probe_options
+
+
+class FusedPreconditionerUpdate():
+    """Accumulate the preconditioners during the batch sweep of a solver.
+
+    When the preconditioners are fused into a solver, there is no separate
+    pass over every position at the start of the epoch. Instead, the solver
+    calls :py:meth:`accumulate` for each chunk of positions that it processes,
+    reusing the patches of the object which it has already extracted, and the
+    new preconditioners are folded in after the sweep. Batches processed
+    before then use the preconditioners from the previous update.
+
+    Parameters
+    ----------
+    comm : tike.communicators.Comm
+    parameters : PtychoParameters
+
+    Attributes
+    ----------
+    psi_denominator : list
+        The partial sum of the object preconditioner on each worker, or Nones
+        if it is not accumulated.
+    probe_denominator : list
+        The partial sum of the probe preconditioner on each worker, or Nones
+        if it is not accumulated.
+    """
+
+    def __init__(self, comm: tike.communicators.Comm, parameters):
+        self.comm = comm
+        self.object_options = parameters.object_options
+        self.probe_options = parameters.probe_options
+        self.enabled = self.is_enabled(parameters)
+        # The sums are allocated once and added to in place
+        if self.enabled and self.object_options:
+            self.psi_denominator = comm.pool.map(cp.zeros_like,
+                                                 parameters.psi)
+        else:
+            self.psi_denominator = [None] * comm.pool.num_workers
+        if self.enabled and self.probe_options:
+            self.probe_denominator = comm.pool.map(
+                cp.zeros_like,
+                parameters.probe,
+                shape=parameters.probe[0].shape[-2:],
+            )
+        else:
+            self.probe_denominator = [None] * comm.pool.num_workers
+
+    @staticmethod
+    def is_enabled(parameters) -> bool:
+        """Return whether the solver should accumulate the preconditioners."""
+        return (parameters.algorithm_options.fuse_preconditioner
+                and preconditioner_update_is_due(parameters.algorithm_options)
+                and not (parameters.object_options and
+                         parameters.object_options.preconditioner is None)
+                and not (parameters.probe_options and
+                         parameters.probe_options.preconditioner is None))
+
+    @staticmethod
+    def accumulate(
+        psi_denominator: typing.Union[npt.NDArray, None],
+        probe_denominator: typing.Union[npt.NDArray, None],
+        psi: npt.NDArray[tike.precision.cfloating],
+        scan: npt.NDArray[tike.precision.floating],
+        probe: npt.NDArray[tike.precision.cfloating],
+        patches: typing.Union[npt.NDArray, None],
+        *,
+        operator: tike.operators.Ptycho,
+    ) -> typing.Tuple[npt.NDArray, npt.NDArray]:
+        """Add the contributions of some positions to the partial sums.
+
+        Parameters
+        ----------
+        patches : (..., WIDTH, WIDTH) complex, None
+            The patches of psi at scan which the solver has already
+            extracted. They are only extracted here if they are None.
+        """
+        if psi_denominator is not None:
+            psi_denominator = operator.diffraction.patch.adj(
+                patches=_probe_amp_sum(probe)[:, 0],
+                images=psi_denominator,
+                positions=scan,
+            )
+        if probe_denominator is not None:
+            if patches is None:
+                patches = operator.diffraction.patch.fwd(
+                    images=psi,
+                    positions=scan,
+                    patch_width=probe.shape[-1],
+                )
+            probe_denominator += _patch_amp_sum(
+                patches.reshape(-1, *probe.shape[-2:]))
+        return psi_denominator, probe_denominator
+
+    def finish(self) -> None:
+        """Fold the accumulated preconditioners into the options."""
+        if not self.enabled:
+            return
+        if self.object_options:
+            self.object_options.preconditioner = _fold_in(
+                self.comm,
+                self.object_options.preconditioner,
+                self.psi_denominator,
+            )
+        if self.probe_options:
+            self.probe_options.preconditioner = _fold_in(
+                self.comm,
+                self.probe_options.preconditioner,
+                self.probe_denominator,
+            )
@@ -6,11 +6,13 @@ import numpy.typing as npt
 
 import tike.linalg
 import tike.opt
+import tike.precision
 import tike.ptycho.position
 import tike.ptycho.probe
 import tike.random
 
 from .options import *
+from ._preconditioner import FusedPreconditionerUpdate
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,7 @@ def dm(
     batches: typing.List[typing.List[npt.NDArray[cp.intc]]],
     *,
     parameters: PtychoParameters,
+    data_scale: typing.Union[typing.List[npt.NDArray], None] = None,
 ) -> PtychoParameters:
     """Solve the ptychography problem using the difference map approach.
 
@@ -42,6 +45,9 @@ def dm(
         simultaneously.
     parameters : :py:class:`tike.ptycho.solvers.PtychoParameters`
         An object which contains reconstruction parameters.
+    data_scale : list((FRAME, ) float32, ...)
+        The scale of each pattern if `data` is encoded by
+        :py:func:`tike.operators.encode_patterns`.
 
     Returns
     -------
@@ -57,26 +63,36 @@ def dm(
     .. seealso:: :py:mod:`tike.ptycho`
 
     """
+    if data_scale is None:
+        data_scale = [None] * comm.pool.num_workers
+
     psi_update_numerator = [None] * comm.pool.num_workers
     probe_update_numerator = [None] * comm.pool.num_workers
 
+    fused = FusedPreconditionerUpdate(comm, parameters)
+
     # The objective function value for each batch
-    batch_cost: typing.List[float] = []
+    batch_cost: typing.List[cp.ndarray] = []
     for n in tike.random.randomizer_np.permutation(len(batches[0])):
 
         (
             cost,
             psi_update_numerator,
             probe_update_numerator,
+            fused.psi_denominator,
+            fused.probe_denominator,
         ) = (list(a) for a in zip(*comm.pool.map(
             _get_nearplane_gradients,
             data,
+            data_scale,
             parameters.scan,
             parameters.psi,
             parameters.probe,
             parameters.exitwave_options.measured_pixels,
             psi_update_numerator,
             probe_update_numerator,
+            fused.psi_denominator,
+            fused.probe_denominator,
             batches,
             comm.streams,
             n=n,
@@ -84,10 +100,12 @@ def dm(
             object_options=parameters.object_options,
             probe_options=parameters.probe_options,
             exitwave_options=parameters.exitwave_options,
+            precision=parameters.precision,
         )))
 
-        cost = comm.Allreduce_mean(cost, axis=None).get()
-        batch_cost.append(cost)
+        batch_cost.append(comm.Allreduce_mean(cost, axis=None))
+
+    fused.finish()
 
     (
         parameters.psi,
@@ -102,7 +120,9 @@ def dm(
         parameters.probe_options,
     )
 
-    parameters.algorithm_options.costs.append(batch_cost)
+    # The costs stay on the device until the reconstruction copies them
+    parameters.algorithm_options.costs.append(
+        comm.pool.gather(batch_cost, axis=None))
     return parameters
 
 
@@ -118,7 +138,7 @@ def _apply_update(
 
     if object_options:
         psi_update_numerator = comm.Allreduce_reduce_gpu(
-            psi_update_numerator)[0]
+            psi_update_numerator)[0].astype(psi[0].dtype, copy=False)
 
         new_psi = psi_update_numerator / (object_options.preconditioner[0] +
                                           1e-9)
@@ -140,7 +160,7 @@ def _apply_update(
     if probe_options:
 
         probe_update_numerator = comm.Allreduce_reduce_gpu(
-            probe_update_numerator)[0]
+            probe_update_numerator)[0].astype(probe[0].dtype, copy=False)
 
         new_probe = probe_update_numerator / (probe_options.preconditioner[0] +
                                               1e-9)
@@ -164,12 +184,15 @@ def _apply_update(
 
 def _get_nearplane_gradients(
     data: npt.NDArray,
+    data_scale: typing.Union[None, npt.NDArray],
     scan: npt.NDArray,
     psi: npt.NDArray,
     probe: npt.NDArray,
     measured_pixels: npt.NDArray,
     psi_update_numerator: typing.Union[None, npt.NDArray],
     probe_update_numerator: typing.Union[None, npt.NDArray],
+    psi_denominator: typing.Union[None, npt.NDArray],
+    probe_denominator: typing.Union[None, npt.NDArray],
     batches: typing.List[typing.List[int]],
     streams: typing.List[cp.cuda.Stream],
     *,
@@ -178,15 +201,24 @@ def _get_nearplane_gradients(
     object_options: typing.Union[None, ObjectOptions] = None,
     probe_options: typing.Union[None, ProbeOptions] = None,
     exitwave_options: ExitWaveOptions,
+    precision: tike.precision.Precision,
 ) -> typing.List[npt.NDArray]:
 
     def keep_some_args_constant(
         ind_args,
         mod_args,
-        _,
+        indices,
     ):
         (data, scan) = ind_args
-        (cost, psi_update_numerator, probe_update_numerator) = mod_args
+        if data_scale is not None:
+            data = tike.operators.decode_patterns(data, data_scale[indices])
+        (
+            cost,
+            psi_update_numerator,
+            probe_update_numerator,
+            psi_denominator,
+            probe_denominator,
+        ) = mod_args
 
         varying_probe = probe
 
@@ -202,7 +234,7 @@ def _get_nearplane_gradients(
             data[:, measured_pixels][:, None, :],
             intensity[:, measured_pixels][:, None, :],
         )
-        cost += cp.sum(each_cost)
+        cost += cp.sum(each_cost, dtype=precision.accumulate)
 
         farplane[..., measured_pixels] *= ((
             cp.sqrt(data) / (cp.sqrt(intensity) + 1e-9))[..., None, None,
@@ -219,6 +251,19 @@ def _get_nearplane_gradients(
             positions=scan,
         )[..., None, None, :, :]
 
+        (
+            psi_denominator,
+            probe_denominator,
+        ) = FusedPreconditionerUpdate.accumulate(
+            psi_denominator,
+            probe_denominator,
+            psi,
+            scan,
+            probe,
+            patches,
+            operator=op,
+        )
+
         if object_options:
 
             grad_psi = (cp.conj(varying_probe) * nearplane).reshape(
@@ -241,17 +286,26 @@ def _get_nearplane_gradients(
             cost,
             psi_update_numerator,
             probe_update_numerator,
+            psi_denominator,
+            probe_denominator,
         ]
 
+    # Sum the updates from every batch in the accumulation precision
     psi_update_numerator = cp.zeros_like(
-        psi,) if psi_update_numerator is None else psi_update_numerator
+        psi,
+        dtype=precision.caccumulate,
+    ) if psi_update_numerator is None else psi_update_numerator
     probe_update_numerator = cp.zeros_like(
-        probe,) if probe_update_numerator is None else probe_update_numerator
+        probe,
+        dtype=precision.caccumulate,
+    ) if probe_update_numerator is None else probe_update_numerator
 
     (
         cost,
         psi_update_numerator,
         probe_update_numerator,
+        psi_denominator,
+        probe_denominator,
     ) = tike.communicators.stream.stream_and_modify(
         f=keep_some_args_constant,
         ind_args=[
@@ -262,6 +316,8 @@ def _get_nearplane_gradients(
             0.0,
             psi_update_numerator,
             probe_update_numerator,
+            psi_denominator,
+            probe_denominator,
         ],
         streams=streams,
         indices=batches[n],
@@ -270,4 +326,6 @@ def _get_nearplane_gradients(
         cost / len(batches[n]),
         psi_update_numerator,
         probe_update_numerator,
+        psi_denominator,
+        probe_denominator,
     ]
@@ -16,6 +16,7 @@ import tike.ptycho.exitwave
 import tike.precision
 
 from .options import *
+from ._preconditioner import FusedPreconditionerUpdate
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ def lstsq_grad(
     batches: typing.List[npt.NDArray[cp.intc]],
     *,
     parameters: PtychoParameters,
+    data_scale: typing.Union[typing.List[npt.NDArray], None] = None,
 ):
     """Solve the ptychography problem using Odstrcil et al's approach.
 
@@ -50,6 +52,9 @@ def lstsq_grad(
         simultaneously.
     parameters : :py:class:`tike.ptycho.solvers.PtychoParameters`
         An object which contains reconstruction parameters.
+    data_scale : list((FRAME, ) float32, ...)
+        The scale of each pattern if `data` is encoded by
+        :py:func:`tike.operators.encode_patterns`.
 
     Returns
     -------
@@ -66,6 +71,9 @@ def lstsq_grad(
     .. seealso:: :py:mod:`tike.ptycho`
 
     """
+    if data_scale is None:
+        data_scale = [None] * comm.pool.num_workers
+
     probe = parameters.probe
     scan = parameters.scan
     psi = parameters.psi
@@ -110,24 +118,18 @@ def lstsq_grad(
     else:
         order = tike.random.randomizer_np.permutation
 
-    batch_cost = []
-    beta_object = []
-    beta_probe = []
-    for batch_index in order(len(batches[0])):
+    fused = FusedPreconditionerUpdate(comm, parameters)
 
+    def start_batch(batch_index):
+        """Compute the gradients of a batch and maybe start reducing them."""
         (
-            diff,
-            unique_probe,
-            probe_update,
-            object_upd_sum,
-            m_probe_update,
-            costs,
-            patches,
-            position_update_numerator,
-            position_update_denominator,
+            *gradients,
+            fused.psi_denominator,
+            fused.probe_denominator,
         ) = (list(a) for a in zip(*comm.pool.map(
             _get_nearplane_gradients,
             data,
+            data_scale,
             psi,
             scan,
             probe,
@@ -136,6 +138,8 @@ def lstsq_grad(
             batches,
             position_update_numerator,
             position_update_denominator,
+            fused.psi_denominator,
+            fused.probe_denominator,
             comm.streams,
             exitwave_options.measured_pixels,
             batch_index=batch_index,
@@ -144,17 +148,59 @@ def lstsq_grad(
             recover_psi=object_options is not None,
             recover_probe=recover_probe,
             recover_positions=position_options is not None,
+            precision=parameters.precision,
         )))
+        if not algorithm_options.overlap_reductions:
+            return gradients, (None, None)
+        requests = (
+            comm.Iallreduce(gradients[3])
+            if object_options is not None else None,
+            comm.Iallreduce_mean(gradients[4], axis=-5)
+            if recover_probe else None,
+        )
+        return gradients, requests
+
+    batch_order = order(len(batches[0]))
+    started = start_batch(batch_order[0])
+    batch_cost = []
+    beta_object = []
+    beta_probe = []
+    for i, batch_index in enumerate(batch_order):
+
+        (
+            (
+                diff,
+                unique_probe,
+                probe_update,
+                object_upd_sum,
+                m_probe_update,
+                costs,
+                patches,
+                position_update_numerator,
+                position_update_denominator,
+            ),
+            (object_request, probe_request),
+        ) = started
+
+        if algorithm_options.overlap_reductions and i + 1 < len(batch_order):
+            # Reduce this batch while the gradients of the next are computed
+            started = start_batch(batch_order[i + 1])
 
         if object_options is not None:
-            object_upd_sum = comm.Allreduce(object_upd_sum)
+            object_upd_sum = comm.pool.map(
+                cp.ndarray.astype,
+                comm.Allreduce(object_upd_sum)
+                if object_request is None else object_request.wait(),
+                dtype=psi[0].dtype,
+                copy=False,
+            )
 
         if recover_probe:
-            m_probe_update = comm.pool.bcast(
-                [comm.Allreduce_mean(
-                    m_probe_update,
-                    axis=-5,
-                )])
+            m_probe_update = comm.pool.bcast([
+                (comm.Allreduce_mean(m_probe_update, axis=-5)
+                 if probe_request is None else probe_request.wait()).astype(
+                     probe[0].dtype, copy=False)
+            ])
 
             (
                 beigen_probe,
@@ -267,8 +313,7 @@ def lstsq_grad(
             probe[0] += dprobe
             probe = comm.pool.bcast([probe[0]])
 
-        for c in costs:
-            batch_cost = batch_cost + c.tolist()
+        batch_cost.append(comm.pool.gather(costs))
 
         if object_options is not None:
             beta_object.append(bbeta_object)
@@ -276,6 +321,10 @@ def lstsq_grad(
         if recover_probe:
             beta_probe.append(bbeta_probe)
 
+        if (not algorithm_options.overlap_reductions
+                and i + 1 < len(batch_order)):
+            started = start_batch(batch_order[i + 1])
+
     if eigen_probe is not None:
         eigen_probe = beigen_probe
 
@@ -291,7 +340,10 @@ def lstsq_grad(
             position_update_denominator,
         ))
 
-    algorithm_options.costs.append(batch_cost)
+    # The costs stay on the device until the reconstruction copies them
+    algorithm_options.costs.append(comm.pool.gather(batch_cost))
+
+    fused.finish()
 
     if object_options and algorithm_options.batch_method == 'compact':
         object_update_precond = _precondition_object_update(
@@ -443,6 +495,7 @@ def _update_nearplane(
 
 def _get_nearplane_gradients(
     data: npt.NDArray,
+    data_scale: typing.Union[None, npt.NDArray],
     psi: npt.NDArray[cp.csingle],
     scan: npt.NDArray[cp.single],
     probe: npt.NDArray[cp.csingle],
@@ -451,6 +504,8 @@ def _get_nearplane_gradients(
     batches,
     position_update_numerator,
     position_update_denominator,
+    psi_denominator,
+    probe_denominator,
     streams: typing.List[cp.cuda.Stream],
     measured_pixels: npt.NDArray,
     *,
@@ -460,19 +515,25 @@ def _get_nearplane_gradients(
     recover_probe: bool,
     recover_positions: bool,
     exitwave_options: ExitWaveOptions,
+    precision: tike.precision.Precision,
 ):
     lo: int = 0
     costs = cp.empty_like(scan, shape=len(batches[batch_index]))
+    # The intermediate wavefronts of the whole batch are kept until the step
+    # lengths are computed, so they are stored in the wavefront precision.
     chi = cp.empty_like(
         probe,
+        dtype=precision.cwavefront,
         shape=(len(batches[batch_index]), 1, *probe.shape[-3:]),
     )
     patches = cp.empty_like(
         probe,
+        dtype=precision.cwavefront,
         shape=(len(batches[batch_index]), 1, 1, *probe.shape[-2:]),
     )
     probe_update = cp.empty_like(
         probe,
+        dtype=precision.cwavefront,
         shape=chi.shape,
     )
     unique_probe = cp.empty_like(
@@ -480,8 +541,8 @@ def _get_nearplane_gradients(
         shape=(len(batches[batch_index]), 1, *probe.shape[-3:]),
     )
 
-    m_probe_update = cp.zeros_like(probe)
-    object_upd_sum = cp.zeros_like(psi)
+    m_probe_update = cp.zeros_like(probe, dtype=precision.caccumulate)
+    object_upd_sum = cp.zeros_like(psi, dtype=precision.caccumulate)
     position_update_numerator = cp.empty_like(
         scan
     ) if position_update_numerator is None else position_update_numerator
@@ -495,6 +556,8 @@ def _get_nearplane_gradients(
         indices,
     ):
         (data,) = ind_args
+        if data_scale is not None:
+            data = tike.operators.decode_patterns(data, data_scale[indices])
         (
             lo,
             chi,
@@ -506,6 +569,8 @@ def _get_nearplane_gradients(
             patches,
             position_update_numerator,
             position_update_denominator,
+            psi_denominator,
+            probe_denominator,
         ) = mod_args
         hi = lo + len(indices)
 
@@ -618,6 +683,19 @@ def _get_nearplane_gradients(
             m_probe_update = None
             patches = None
 
+        (
+            psi_denominator,
+            probe_denominator,
+        ) = FusedPreconditionerUpdate.accumulate(
+            psi_denominator,
+            probe_denominator,
+            psi,
+            scan[indices],
+            probe,
+            patches[lo:hi] if patches is not None else None,
+            operator=op,
+        )
+
         if recover_positions:
             m = 0
 
@@ -656,6 +734,8 @@ def _get_nearplane_gradients(
             patches,
             position_update_numerator,
             position_update_denominator,
+            psi_denominator,
+            probe_denominator,
         )
 
     (
@@ -669,6 +749,8 @@ def _get_nearplane_gradients(
         patches,
         position_update_numerator,
         position_update_denominator,
+        psi_denominator,
+        probe_denominator,
     ) = tike.communicators.stream.stream_and_modify(
         f=keep_some_args_constant,
         ind_args=[
@@ -685,6 +767,8 @@ def _get_nearplane_gradients(
             patches,
             position_update_numerator,
             position_update_denominator,
+            psi_denominator,
+            probe_denominator,
         ],
         streams=streams,
         indices=batches[batch_index],
@@ -701,6 +785,8 @@ def _get_nearplane_gradients(
         patches,
         position_update_numerator,
         position_update_denominator,
+        psi_denominator,
+        probe_denominator,
     )
 
 
@@ -946,23 +1032,37 @@ def _momentum_checked(
     previous_g[-1] = g / tike.linalg.norm(g) * beta
 
     # Only apply momentum updates if the objective function is decreasing
-    if (len(errors) > 2
-            and max(errors[-3], errors[-2]) > min(errors[-2], errors[-1])):
-        # Check that previous updates are moving in a similar direction
+    # and previous updates are moving in a similar direction. The costs of
+    # recent epochs may still be on the device, so the decision is made on
+    # the device instead of waiting for them.
+    if len(errors) > 2:
+        xp = cp.get_array_module(g)
+        errors = xp.stack([xp.mean(xp.asarray(x)) for x in errors[-3:]])
+        decreasing = (xp.maximum(errors[0], errors[1])
+                      > xp.minimum(errors[1], errors[2]))
         previous_update_correlation = tike.linalg.inner(
             previous_g[:-1],
             previous_g[-1],
             axis=(-2, -1),
         ).real.flatten()
-        if np.all(previous_update_correlation > 0):
-            friction, _ = tike.opt.fit_line_least_squares(
-                x=np.arange(len(previous_update_correlation) + 1),
-                y=[
-                    0,
-                ] + np.log(previous_update_correlation).tolist(),
-            )
-            friction = 0.5 * max(-friction, 0)
-            m = (1 - friction) * m + g
-            return mdecay * m, previous_g, m
+        positive = previous_update_correlation > 0
+        friction, _ = tike.opt.fit_line_least_squares(
+            x=xp.arange(
+                len(previous_update_correlation) + 1,
+                dtype=previous_update_correlation.dtype,
+            ),
+            y=xp.concatenate([
+                xp.zeros(1, dtype=previous_update_correlation.dtype),
+                xp.log(xp.where(positive, previous_update_correlation, 1)),
+            ]),
+        )
+        friction = 0.5 * xp.maximum(-friction, 0).astype(g.real.dtype)
+        momentum = decreasing & xp.all(positive)
+        m = xp.where(momentum, (1 - friction) * m + g, m / 2)
+        return (
+            xp.where(momentum, mdecay * m, xp.zeros_like(g)),
+            previous_g,
+            m,
+        )
 
     return np.zeros_like(g), previous_g, m / 2
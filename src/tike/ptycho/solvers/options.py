@@ -3,6 +3,8 @@ import abc
 import dataclasses
 import typing
 
+import cupy as cp
+import cupyx.scipy.ndimage
 import numpy as np
 import numpy.typing as npt
 import scipy.ndimage
@@ -11,6 +13,7 @@ from tike.ptycho.object import ObjectOptions
 from tike.ptycho.position import PositionOptions, check_allowed_positions
 from tike.ptycho.probe import ProbeOptions
 from tike.ptycho.exitwave import ExitWaveOptions
+from tike.precision import Precision
 
 
 @dataclasses.dataclass
@@ -57,7 +60,8 @@ class IterativeOptions(abc.ABC):
         default_factory=list,
     )
     """The objective function value at previous iterations. One list is
-    returned for each mini-batch."""
+    returned for each mini-batch. The values of epochs which have not been
+    copied from the device yet (see metrics_period) are a device array."""
 
     num_iter: int = 1
     """The number of epochs to process before returning."""
@@ -68,10 +72,45 @@ class IterativeOptions(abc.ABC):
     )
     """The per-iteration wall-time for each previous iteration."""
 
+    data_encoding: typing.Union[str, None] = None
+    """Store the diffraction patterns as this unsigned integer type ('uint8'
+    or 'uint16') with a scale for each pattern instead of as floats. Patterns
+    of photon counts which fit in the type are stored exactly; other patterns
+    are quantized relative to their maximum. The patterns are decoded on the
+    device as they are streamed to the solver, so 2-4x more patterns fit in
+    host memory and fewer bytes are copied to the devices. When out_of_core is
+    True, each batch is encoded as it is read from the source."""
+
+    preconditioner_period: int = 1
+    """Update the object and probe preconditioners every this many epochs.
+    Between updates, the previous preconditioners are reused."""
+
+    fuse_preconditioner: bool = False
+    """Accumulate the preconditioners during the batch sweep of the solver
+    from the object patches that it already extracts instead of in a separate
+    pass over every position at the start of the epoch. The new
+    preconditioners are used starting with the next epoch."""
+
+    metrics_period: int = 1
+    """Copy the costs, object update norms, and probe powers of recent epochs
+    from the device to the host every this many epochs instead of every
+    epoch. Each copy waits for all queued device work to finish, so copying
+    less often keeps the devices busy when epochs are short. Convergence is
+    only tested after a copy, so up to metrics_period - 1 extra epochs may run
+    after the reconstruction converges. The metrics are always copied at the
+    end of :py:meth:`tike.ptycho.ptycho.Reconstruction.iterate`."""
+
     convergence_window: int = 0
     """The number of epochs to consider for convergence monitoring. Set to
     any value less than 2 to disable."""
 
+    out_of_core: bool = False
+    """Leave the diffraction patterns where they are (e.g. a memory-mapped
+    diffraction store) instead of copying each worker's share into pinned host
+    memory. Mini-batches are gathered through small pinned staging buffers
+    while the previous chunk is processed, so host memory is bounded by the
+    staging buffers instead of the dataset."""
+
 
 @dataclasses.dataclass
 class DmOptions(IterativeOptions):
@@ -97,6 +136,14 @@ class RpieOptions(IterativeOptions):
 class LstsqOptions(IterativeOptions):
     name: str = dataclasses.field(default='lstsq_grad', init=False)
 
+    overlap_reductions: bool = False
+    """Sum the object and probe updates of each mini-batch from all workers
+    in the background while the gradients of the next mini-batch are
+    computed. The gradients of each mini-batch are then computed from an
+    object and probe which do not yet include the update from the previous
+    mini-batch; this staleness is at most one mini-batch, so the cost per
+    epoch may decrease more slowly than without overlap."""
+
 
 @dataclasses.dataclass
 class PtychoParameters():
@@ -141,6 +188,10 @@ class PtychoParameters():
     position_options: typing.Union[PositionOptions, None] = None
     """A class containing settings related to position correction."""
 
+    precision: Precision = dataclasses.field(default_factory=Precision)
+    """The floating point types of the parameters, the intermediate
+    wavefronts, and the sums of updates."""
+
     def __post_init__(self):
         if (self.scan.ndim != 2 or self.scan.shape[1] != 2
                 or np.any(np.asarray(self.scan.shape) < 1)):
@@ -195,11 +246,14 @@ class PtychoParameters():
             if self.position_options is not None else None,
             exitwave_options=self.exitwave_options.resample(factor)
             if self.exitwave_options is not None else None,
+            precision=self.precision,
         )
 
 
 def _resize_spline(x: np.ndarray, f: float) -> np.ndarray:
-    return scipy.ndimage.zoom(
+    ndimage = cupyx.scipy.ndimage if isinstance(
+        x, cp.ndarray) else scipy.ndimage
+    return ndimage.zoom(
         x,
         zoom=[1] * (x.ndim - 2) + [f, f],
         grid_mode=True,
@@ -16,6 +16,7 @@ import tike.random
 
 from .options import *
 from .lstsq import _momentum_checked
+from ._preconditioner import FusedPreconditionerUpdate
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ def rpie(
     batches: typing.List[typing.List[npt.NDArray[cp.intc]]],
     *,
     parameters: PtychoParameters,
+    data_scale: typing.Union[typing.List[npt.NDArray], None] = None,
 ) -> PtychoParameters:
     """Solve the ptychography problem using regularized ptychographical engine.
 
@@ -52,6 +54,9 @@ def rpie(
         simultaneously.
     parameters : :py:class:`tike.ptycho.solvers.PtychoParameters`
         An object which contains reconstruction parameters.
+    data_scale : list((FRAME, ) float32, ...)
+        The scale of each pattern if `data` is encoded by
+        :py:func:`tike.operators.encode_patterns`.
 
     Returns
     -------
@@ -72,6 +77,9 @@ def rpie(
     .. seealso:: :py:mod:`tike.ptycho`
 
     """
+    if data_scale is None:
+        data_scale = [None] * comm.pool.num_workers
+
     probe = parameters.probe
     scan = parameters.scan
     psi = parameters.psi
@@ -98,18 +106,15 @@ def rpie(
     else:
         beigen_weights = eigen_weights
 
-    if parameters.algorithm_options.batch_method == 'compact':
-        order = range
-    else:
-        order = tike.random.randomizer_np.permutation
-
     psi_update_numerator = [None] * comm.pool.num_workers
     probe_update_numerator = [None] * comm.pool.num_workers
     position_update_numerator = [None] * comm.pool.num_workers
     position_update_denominator = [None] * comm.pool.num_workers
 
-    batch_cost: typing.List[float] = []
-    for n in order(algorithm_options.num_batch):
+    fused = FusedPreconditionerUpdate(comm, parameters)
+
+    batch_cost: typing.List[cp.ndarray] = []
+    for n in _batch_order(algorithm_options, tike.random.randomizer_np):
 
         (
             cost,
@@ -118,9 +123,12 @@ def rpie(
             position_update_numerator,
             position_update_denominator,
             beigen_weights,
+            fused.psi_denominator,
+            fused.probe_denominator,
         ) = (list(a) for a in zip(*comm.pool.map(
             _get_nearplane_gradients,
             data,
+            data_scale,
             scan,
             psi,
             probe,
@@ -131,6 +139,8 @@ def rpie(
             position_update_denominator,
             beigen_probe,
             beigen_weights,
+            fused.psi_denominator,
+            fused.probe_denominator,
             batches,
             comm.streams,
             n=n,
@@ -140,9 +150,10 @@ def rpie(
             recover_probe=recover_probe,
             position_options=position_options,
             exitwave_options=exitwave_options,
+            precision=parameters.precision,
         )))
 
-        batch_cost.append(comm.Allreduce_mean(cost, axis=None).get())
+        batch_cost.append(comm.Allreduce_mean(cost, axis=None))
 
         if algorithm_options.batch_method != 'compact':
             (
@@ -162,7 +173,10 @@ def rpie(
             psi_update_numerator = [None] * comm.pool.num_workers
             probe_update_numerator = [None] * comm.pool.num_workers
 
-    algorithm_options.costs.append(batch_cost)
+    # The costs stay on the device until the reconstruction copies them
+    algorithm_options.costs.append(comm.pool.gather(batch_cost, axis=None))
+
+    fused.finish()
 
     if position_options is not None:
         (
@@ -212,6 +226,164 @@ def rpie(
     return parameters
 
 
+def rpie_group(
+    op: tike.operators.Ptycho,
+    comm: tike.communicators.Comm,
+    data: typing.List[npt.NDArray],
+    batches: typing.List[typing.List[typing.List[npt.NDArray[cp.intc]]]],
+    offsets: typing.List[typing.List[int]],
+    *,
+    parameters: typing.List[PtychoParameters],
+    randomizers: typing.List[np.random.Generator],
+) -> typing.List[PtychoParameters]:
+    """Advance many independent reconstructions by one epoch of rpie together.
+
+    The reconstructions are stacked along a leading dimension, so the
+    operators process the same step of the batch sweep of every
+    reconstruction in one call instead of in one call per reconstruction. The
+    updates of each reconstruction are the same as those of :py:func:`rpie`.
+
+    The reconstructions must have the same object, probe, and diffraction
+    pattern shapes, precision, exitwave options, number of batches, and batch
+    method. Position correction, variable probes, encoded data, and fused
+    preconditioners are not supported.
+
+    Parameters
+    ----------
+    op : :py:class:`tike.operators.Ptycho`
+        A ptychography operator for the shapes of the reconstructions.
+    comm : :py:class:`tike.communicators.Comm`
+        An object which manages communications between GPUs and nodes.
+    data : list((FRAME, WIDE, HIGH) float32, ...)
+        For each device, the diffraction patterns of every reconstruction
+        concatenated along the FRAME axis.
+    batches : list(list(list((BATCH_SIZE, ) int, ...), ...), ...)
+        For each reconstruction, the batches of its own patterns on each
+        device.
+    offsets : list(list(int, ...), ...)
+        For each reconstruction, the index in `data` of its first pattern on
+        each device.
+    parameters : list(:py:class:`tike.ptycho.solvers.PtychoParameters`, ...)
+        The parameters of each reconstruction.
+    randomizers : list(numpy.random.Generator, ...)
+        The generator which chooses the order of the batches of each
+        reconstruction.
+
+    Returns
+    -------
+    result : list(:py:class:`tike.ptycho.solvers.PtychoParameters`, ...)
+        The updated parameters of each reconstruction.
+    """
+    if any(p.position_options is not None or p.eigen_probe is not None
+           or p.algorithm_options.data_encoding is not None
+           or p.algorithm_options.fuse_preconditioner for p in parameters):
+        raise ValueError(
+            "Reconstructions with position correction, variable probes, "
+            "encoded data, or fused preconditioners cannot be grouped.")
+
+    algorithm_options = parameters[0].algorithm_options
+    exitwave_options = parameters[0].exitwave_options
+    recover_probe = [
+        p.probe_options is not None and p.probe_options.recover_probe
+        for p in parameters
+    ]
+    orders = [
+        _batch_order(p.algorithm_options, r)
+        for p, r in zip(parameters, randomizers)
+    ]
+
+    psi_update_numerator = [[None] * comm.pool.num_workers for _ in parameters]
+    probe_update_numerator = [[None] * comm.pool.num_workers
+                              for _ in parameters]
+    batch_cost: typing.List[typing.List[cp.ndarray]] = [[] for _ in parameters]
+    for step in range(algorithm_options.num_batch):
+
+        (
+            cost,
+            psi_update_numerator,
+            probe_update_numerator,
+        ) = (_transpose(a) for a in zip(*comm.pool.map(
+            _get_group_nearplane_gradients,
+            data,
+            _transpose([p.scan for p in parameters]),
+            _transpose([p.psi for p in parameters]),
+            _transpose([p.probe for p in parameters]),
+            _transpose(psi_update_numerator),
+            _transpose(probe_update_numerator),
+            _transpose([[b[order[step]]
+                         for b in batch]
+                        for batch, order in zip(batches, orders)]),
+            _transpose(offsets),
+            exitwave_options.measured_pixels,
+            comm.streams,
+            op=op,
+            recover_psi=parameters[0].object_options is not None,
+            recover_probe=any(recover_probe),
+            exitwave_options=exitwave_options,
+            precision=parameters[0].precision,
+        )))
+
+        for i, p in enumerate(parameters):
+            batch_cost[i].append(comm.Allreduce_mean(cost[i], axis=None))
+
+            if algorithm_options.batch_method != 'compact':
+                (
+                    p.psi,
+                    p.probe,
+                ) = _update(
+                    comm,
+                    p.psi,
+                    p.probe,
+                    psi_update_numerator[i],
+                    probe_update_numerator[i],
+                    p.object_options,
+                    p.probe_options,
+                    recover_probe[i],
+                    p.algorithm_options,
+                )
+                psi_update_numerator[i] = [None] * comm.pool.num_workers
+                probe_update_numerator[i] = [None] * comm.pool.num_workers
+
+    for i, p in enumerate(parameters):
+        # The costs stay on the device until the reconstruction copies them
+        p.algorithm_options.costs.append(
+            comm.pool.gather(batch_cost[i], axis=None))
+
+        if algorithm_options.batch_method == 'compact':
+            (
+                p.psi,
+                p.probe,
+            ) = _update(
+                comm,
+                p.psi,
+                p.probe,
+                psi_update_numerator[i],
+                probe_update_numerator[i],
+                p.object_options,
+                p.probe_options,
+                recover_probe[i],
+                p.algorithm_options,
+                errors=list(np.mean(x) for x in p.algorithm_options.costs[-3:]),
+            )
+
+    return parameters
+
+
+def _batch_order(
+    algorithm_options: RpieOptions,
+    randomizer: np.random.Generator,
+) -> typing.Sequence[int]:
+    """Return the order in which to process the batches this epoch."""
+    if algorithm_options.batch_method == 'compact':
+        return range(algorithm_options.num_batch)
+    return randomizer.permutation(algorithm_options.num_batch)
+
+
+def _transpose(x: typing.Sequence[typing.Sequence]) -> typing.List[list]:
+    """Swap the reconstruction and worker axes of nested lists."""
+    return [list(a) for a in zip(*x)]
+
+
 def _normalize_eigen_weights(eigen_weights):
     return eigen_weights / tike.linalg.mnorm(
         eigen_weights,
@@ -235,7 +407,7 @@ def _update(
     if object_options:
         psi_update_numerator = comm.Allreduce_reduce_gpu(
             psi_update_numerator)[0]
-        dpsi = psi_update_numerator
+        dpsi = psi_update_numerator.astype(psi[0].dtype, copy=False)
         deno = (
             (1 - algorithm_options.alpha) * object_options.preconditioner[0] +
             algorithm_options.alpha * object_options.preconditioner[0].max(
@@ -275,7 +447,7 @@ def _update(
     if recover_probe:
 
         probe_update_numerator = comm.Allreduce_reduce_gpu(
-            probe_update_numerator)[0]
+            probe_update_numerator)[0].astype(probe[0].dtype, copy=False)
         b0 = tike.ptycho.probe.finite_probe_support(
             probe[0],
             p=probe_options.probe_support,
@@ -328,6 +500,7 @@ def _update(
 
 def _get_nearplane_gradients(
     data: npt.NDArray,
+    data_scale: typing.Union[None, npt.NDArray],
     scan: npt.NDArray,
     psi: npt.NDArray,
     probe: npt.NDArray,
@@ -338,6 +511,8 @@ def _get_nearplane_gradients(
     position_update_denominator: typing.Union[None, npt.NDArray],
     eigen_probe: typing.Union[None, npt.NDArray],
     eigen_weights: typing.Union[None, npt.NDArray],
+    psi_denominator: typing.Union[None, npt.NDArray],
+    probe_denominator: typing.Union[None, npt.NDArray],
     batches: typing.List[typing.List[int]],
     streams: typing.List[cp.cuda.Stream],
     *,
@@ -348,13 +523,17 @@ def _get_nearplane_gradients(
     recover_probe: bool,
     position_options: typing.Union[None, PositionOptions],
     exitwave_options: ExitWaveOptions,
+    precision: tike.precision.Precision,
 ) -> typing.List[npt.NDArray]:
 
     cost = 0.0
+    # Sum the updates from every batch in the accumulation precision
     psi_update_numerator = cp.zeros_like(
-        psi) if psi_update_numerator is None else psi_update_numerator
+        psi, dtype=precision.caccumulate
+    ) if psi_update_numerator is None else psi_update_numerator
     probe_update_numerator = cp.zeros_like(
-        probe) if probe_update_numerator is None else probe_update_numerator
+        probe, dtype=precision.caccumulate
+    ) if probe_update_numerator is None else probe_update_numerator
     position_update_numerator = cp.empty_like(
         scan
     ) if position_update_numerator is None else position_update_numerator
@@ -368,6 +547,8 @@ def _get_nearplane_gradients(
         indices,
     ):
         (data,) = ind_args
+        if data_scale is not None:
+            data = tike.operators.decode_patterns(data, data_scale[indices])
         (
             cost,
             psi_update_numerator,
@@ -376,6 +557,8 @@ def _get_nearplane_gradients(
             position_update_denominator,
             eigen_weights,
             scan,
+            psi_denominator,
+            probe_denominator,
         ) = mod_args
 
         unique_probe = tike.ptycho.probe.get_varying_probe(
@@ -396,7 +579,7 @@ def _get_nearplane_gradients(
             data[:, measured_pixels][:, None, :],
             intensity[:, measured_pixels][:, None, :],
         )
-        cost += cp.sum(each_cost)
+        cost += cp.sum(each_cost, dtype=precision.accumulate)
 
         if exitwave_options.noise_model == 'poisson':
 
@@ -472,6 +655,22 @@ def _get_nearplane_gradients(
                 positions=scan[indices],
             )[..., None, None, :, :]
 
+        else:
+            patches = None
+
+        (
+            psi_denominator,
+            probe_denominator,
+        ) = FusedPreconditionerUpdate.accumulate(
+            psi_denominator,
+            probe_denominator,
+            psi,
+            scan[indices],
+            probe,
+            patches,
+            operator=op,
+        )
+
         if recover_probe:
             probe_update_numerator += cp.sum(
                 cp.conj(patches) * diff,
@@ -522,6 +721,8 @@ def _get_nearplane_gradients(
             position_update_denominator,
             eigen_weights,
             scan,
+            psi_denominator,
+            probe_denominator,
         )
 
     (
@@ -532,6 +733,8 @@ def _get_nearplane_gradients(
         position_update_denominator,
         eigen_weights,
         scan,
+        psi_denominator,
+        probe_denominator,
     ) = tike.communicators.stream.stream_and_modify(
         f=keep_some_args_constant,
         ind_args=[
@@ -545,6 +748,8 @@ def _get_nearplane_gradients(
             position_update_denominator,
             eigen_weights,
             scan,
+            psi_denominator,
+            probe_denominator,
         ],
         streams=streams,
         indices=batches[n],
@@ -557,7 +762,259 @@ def _get_nearplane_gradients(
         position_update_numerator,
         position_update_denominator,
         eigen_weights,
+        psi_denominator,
+        probe_denominator,
+    )
+
+
+def _get_group_nearplane_gradients(
+    data: npt.NDArray,
+    scan: typing.List[npt.NDArray],
+    psi: typing.List[npt.NDArray],
+    probe: typing.List[npt.NDArray],
+    psi_update_numerator: typing.List[typing.Union[None, npt.NDArray]],
+    probe_update_numerator: typing.List[typing.Union[None, npt.NDArray]],
+    batch: typing.List[npt.NDArray],
+    offset: typing.List[int],
+    measured_pixels: npt.NDArray,
+    streams: typing.List[cp.cuda.Stream],
+    *,
+    op: tike.operators.Ptycho,
+    recover_psi: bool,
+    recover_probe: bool,
+    exitwave_options: ExitWaveOptions,
+    precision: tike.precision.Precision,
+) -> typing.Tuple[typing.List[npt.NDArray], ...]:
+    """Return the cost and gradients of one batch of each reconstruction.
+
+    The reconstructions whose batches have the same size are stacked along a
+    leading dimension and processed together.
+    """
+    cost = [None] * len(batch)
+    psi_update_numerator = list(psi_update_numerator)
+    probe_update_numerator = list(probe_update_numerator)
+    sizes = [len(b) for b in batch]
+    for size in sorted(set(sizes)):
+        members = [i for i in range(len(batch)) if sizes[i] == size]
+        (
+            stacked_cost,
+            stacked_psi_update_numerator,
+            stacked_probe_update_numerator,
+        ) = _get_stacked_nearplane_gradients(
+            data,
+            # The patterns are streamed in the order (position, member)
+            np.stack([batch[i] + offset[i] for i in members], axis=-1).ravel(),
+            cp.stack([scan[i][batch[i]] for i in members]),
+            cp.stack([psi[i] for i in members]),
+            cp.stack([probe[i] for i in members]),
+            measured_pixels,
+            _stack_sums(
+                [psi_update_numerator[i] for i in members],
+                psi[members[0]],
+                precision.caccumulate,
+            ),
+            _stack_sums(
+                [probe_update_numerator[i] for i in members],
+                probe[members[0]],
+                precision.caccumulate,
+            ),
+            streams,
+            op=op,
+            recover_psi=recover_psi,
+            recover_probe=recover_probe,
+            exitwave_options=exitwave_options,
+            precision=precision,
+        )
+        for j, i in enumerate(members):
+            cost[i] = stacked_cost[j] / size
+            psi_update_numerator[i] = stacked_psi_update_numerator[j]
+            probe_update_numerator[i] = stacked_probe_update_numerator[j]
+    return cost, psi_update_numerator, probe_update_numerator
+
+
+def _stack_sums(
+    sums: typing.List[typing.Union[None, npt.NDArray]],
+    like: npt.NDArray,
+    dtype: npt.DTypeLike,
+) -> npt.NDArray:
+    """Stack partial sums along a new leading dimension; zeros if None."""
+    if sums[0] is None:
+        return cp.zeros_like(like, shape=(len(sums), *like.shape), dtype=dtype)
+    return cp.stack(sums)
+
+
+def _get_stacked_nearplane_gradients(
+    data: npt.NDArray,
+    rows: npt.NDArray,
+    scan: npt.NDArray,
+    psi: npt.NDArray,
+    probe: npt.NDArray,
+    measured_pixels: npt.NDArray,
+    psi_update_numerator: npt.NDArray,
+    probe_update_numerator: npt.NDArray,
+    streams: typing.List[cp.cuda.Stream],
+    *,
+    op: tike.operators.Ptycho,
+    recover_psi: bool,
+    recover_probe: bool,
+    exitwave_options: ExitWaveOptions,
+    precision: tike.precision.Precision,
+) -> typing.Tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+    """Return the cost and gradients of a batch of stacked reconstructions.
+
+    Parameters
+    ----------
+    data : (FRAME, WIDE, HIGH)
+        The diffraction patterns of every reconstruction.
+    rows : (POSI * STACK, ) int
+        The rows of data for each position and then each reconstruction.
+    scan : (STACK, POSI, 2) float32
+    psi : (STACK, WIDE, HIGH) complex64
+    probe : (STACK, 1, 1, SHARED, WIDE, HIGH) complex64
+    psi_update_numerator : (STACK, WIDE, HIGH)
+    probe_update_numerator : (STACK, 1, 1, SHARED, WIDE, HIGH)
+    """
+    stack = len(psi)
+
+    def keep_some_args_constant(
+        ind_args,
+        mod_args,
+        indices,
+    ):
+        (data,) = ind_args
+        (
+            lo,
+            cost,
+            psi_update_numerator,
+            probe_update_numerator,
+        ) = mod_args
+        hi = lo + len(indices) // stack
+
+        data = cp.swapaxes(
+            data.reshape(hi - lo, stack, *data.shape[1:]),
+            0,
+            1,
+        )
+        positions = cp.ascontiguousarray(scan[:, lo:hi])
+
+        farplane = op.fwd(probe=probe, scan=positions, psi=psi)
+        intensity = cp.sum(
+            cp.square(cp.abs(farplane)),
+            axis=(-4, -3),
+        )
+        each_cost = getattr(
+            tike.operators,
+            f'{exitwave_options.noise_model}_each_pattern',
+        )(
+            data[..., measured_pixels][..., None, :],
+            intensity[..., measured_pixels][..., None, :],
+        )
+        cost += cp.sum(each_cost, axis=-1, dtype=precision.accumulate)
+
+        if exitwave_options.noise_model == 'poisson':
+
+            xi = (1 - data / intensity)[..., None, None, :, :]
+            grad_cost = farplane * xi
+
+            step_length = cp.full(
+                shape=(*farplane.shape[:-2], 1, 1),
+                fill_value=exitwave_options.step_length_start,
+            )
+
+            if exitwave_options.step_length_usemodes == 'dominant_mode':
+
+                step_length = tike.ptycho.exitwave.poisson_steplength_dominant_mode(
+                    xi,
+                    intensity,
+                    data,
+                    measured_pixels,
+                    step_length,
+                    exitwave_options.step_length_weight,
+                )
+
+            else:
+
+                step_length = tike.ptycho.exitwave.poisson_steplength_all_modes(
+                    xi,
+                    cp.square(cp.abs(farplane)),
+                    intensity,
+                    data,
+                    measured_pixels,
+                    step_length,
+                    exitwave_options.step_length_weight,
+                )
+
+            farplane[..., measured_pixels] = (-step_length *
+                                              grad_cost)[..., measured_pixels]
+
+        else:
+
+            farplane[..., measured_pixels] = -getattr(
+                tike.operators, f'{exitwave_options.noise_model}_grad')(
+                    data,
+                    farplane,
+                    intensity,
+                )[..., measured_pixels]
+
+        unmeasured_pixels = cp.logical_not(measured_pixels)
+        farplane[..., unmeasured_pixels] *= (
+            exitwave_options.unmeasured_pixels_scaling - 1.0)
+
+        pad, end = op.diffraction.pad, op.diffraction.end
+        diff = op.propagation.adj(farplane, overwrite=True)[..., pad:end,
+                                                            pad:end]
+
+        if recover_psi:
+            grad_psi = (cp.conj(probe) * diff / probe.shape[-3]).reshape(
+                stack, (hi - lo) * probe.shape[-3], *probe.shape[-2:])
+            psi_update_numerator = op.diffraction.patch.adj(
+                patches=grad_psi,
+                images=psi_update_numerator,
+                positions=positions,
+                nrepeat=probe.shape[-3],
+            )
+
+        if recover_probe:
+            patches = op.diffraction.patch.fwd(
+                patches=cp.zeros_like(diff[..., 0, 0, :, :]),
+                images=psi,
+                positions=positions,
+            )[..., None, None, :, :]
+            probe_update_numerator += cp.sum(
+                cp.conj(patches) * diff,
+                axis=-5,
+                keepdims=True,
+            )
+
+        return (
+            hi,
+            cost,
+            psi_update_numerator,
+            probe_update_numerator,
+        )
+
+    (
+        _,
+        cost,
+        psi_update_numerator,
+        probe_update_numerator,
+    ) = tike.communicators.stream.stream_and_modify(
+        f=keep_some_args_constant,
+        ind_args=[
+            data,
+        ],
+        mod_args=[
+            0,
+            cp.zeros(stack, dtype=precision.accumulate),
+            psi_update_numerator,
+            probe_update_numerator,
+        ],
+        streams=streams,
+        indices=rows,
+        # Each chunk holds the same positions of every reconstruction
+        chunk_size=stack * max(1, 64 // stack),
     )
+    return cost, psi_update_numerator, probe_update_numerator
 
 
 def _update_position(
@@ -2,17 +2,30 @@
 
 import logging
 
-import cupy as cp
 import numpy as np
 
 import tike.precision
 
 randomizer_np = np.random.default_rng()
-randomizer_cp = cp.random.default_rng()
 
 logger = logging.getLogger(__name__)
 
 
+def _randomizer_cp():
+    """Return randomizer_cp; CuPy is only imported on first use."""
+    global randomizer_cp
+    if 'randomizer_cp' not in globals():
+        import cupy as cp
+        randomizer_cp = cp.random.default_rng()
+    return randomizer_cp
+
+
+def __getattr__(name):
+    if name == 'randomizer_cp':
+        return _randomizer_cp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def numpy_complex(*shape):
     """Return a complex random array in the range [-0.5, 0.5)."""
     return (
@@ -22,9 +35,10 @@ def numpy_complex(*shape):
 
 def cupy_complex(*shape):
     """Return a complex random array in the range [-0.5, 0.5)."""
-    return (
-        randomizer_cp.random(size=(*shape, 2), dtype=tike.precision.floating) -
-        0.5).view(tike.precision.cfloating)[..., 0]
+    return (_randomizer_cp().random(
+        size=(*shape, 2),
+        dtype=tike.precision.floating,
+    ) - 0.5).view(tike.precision.cfloating)[..., 0]
 
 
 def cluster_wobbly_center(*args, **kwargs):
@@ -0,0 +1,217 @@
+"""Record where the time, bytes, and memory of a reconstruction go.
+
+A :py:class:`Tracer` times named stages of work, counts the bytes copied
+between the host and the devices while each stage is open, and samples the
+memory used by each device when a stage ends. Finished stages are passed to
+callbacks as they happen and may be exported as a Chrome trace which can be
+viewed with chrome://tracing or https://ui.perfetto.dev.
+
+Example
+-------
+.. code-block:: python
+
+    tracer = tike.trace.Tracer(callbacks=[print])
+    with tike.ptycho.Reconstruction(data, parameters, tracer=tracer) as r:
+        r.iterate(8)
+    tracer.export('reconstruction.trace.json')
+    print(tracer.summary())
+
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+import typing
+
+logger = logging.getLogger(__name__)
+
+copy_kinds = (
+    'host_to_device',
+    'device_to_host',
+    'device_to_device',
+)
+"""The kinds of copies which are counted by tracers."""
+
+# The tracers which have at least one open stage
+_active: typing.List['Tracer'] = []
+_active_lock = threading.Lock()
+
+
+def count_bytes(kind: str, nbytes: int) -> None:
+    """Add nbytes of the given kind of copy to the open stages of tracers.
+
+    Communication functions call this for every copy that they make. It does
+    nothing unless a stage of some tracer is open.
+    """
+    if _active:
+        with _active_lock:
+            for tracer in _active:
+                tracer._count(kind, nbytes)
+
+
+def _synchronize():
+    import cupy
+    cupy.cuda.Device().synchronize()
+
+
+def _memory_usage() -> typing.Dict[str, int]:
+    import cupy
+    pool = cupy.get_default_memory_pool()
+    return {
+        'used': int(pool.used_bytes()),
+        'reserved': int(pool.total_bytes()),
+    }
+
+
+class Tracer():
+    """Collect the duration, copied bytes, and device memory of stages.
+
+    Stages may be nested; the bytes copied during a stage are also counted
+    by every enclosing stage.
+
+    Parameters
+    ----------
+    callbacks : list of callable
+        Each is called with the record of each stage when the stage ends.
+    synchronize : bool
+        Wait for the devices to finish their queued work at the beginning and
+        end of each stage, so the durations of asynchronous device work are
+        attributed to the correct stage. This slows the reconstruction.
+
+    Attributes
+    ----------
+    records : list of dict
+        One record per finished stage in the order that the stages ended.
+        Each record has the name of the stage, its start time and duration
+        in seconds, the bytes copied of each kind in `copy_kinds`, and the
+        memory of each device when the stage ended. The used memory is held
+        by arrays; the reserved memory is held by the memory pool and is the
+        most memory which was used by the pool so far. Other keyword
+        arguments of the stage are also included.
+    """
+
+    def __init__(
+        self,
+        callbacks: typing.Sequence[typing.Callable[[dict], None]] = (),
+        synchronize: bool = True,
+    ):
+        self.callbacks = list(callbacks)
+        self.synchronize = synchronize
+        self.records: typing.List[dict] = []
+        self._origin = time.perf_counter()
+        self._open: typing.List[dict] = []
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str, nbytes: int) -> None:
+        with self._lock:
+            for record in self._open:
+                record['bytes'][kind] += nbytes
+
+    def _wait(self, pool) -> None:
+        if self.synchronize and pool is not None and not pool.use_cpu:
+            pool.map(_synchronize)
+
+    @contextlib.contextmanager
+    def stage(self, name: str, pool=None, **attributes):
+        """Record a stage of work while in context.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        pool : :py:class:`tike.communicators.ThreadPool`
+            The workers whose devices are synchronized and whose memory is
+            sampled.
+        attributes
+            Other values to save in the record e.g. the epoch.
+        """
+        self._wait(pool)
+        record = dict(
+            name=name,
+            **attributes,
+            bytes={kind: 0 for kind in copy_kinds},
+        )
+        with self._lock:
+            self._open.append(record)
+        if len(self._open) == 1:
+            with _active_lock:
+                _active.append(self)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self._wait(pool)
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._open.remove(record)
+            if not self._open:
+                with _active_lock:
+                    _active.remove(self)
+            record['start'] = start - self._origin
+            record['duration'] = duration
+            if pool is not None and not pool.use_cpu:
+                record['memory'] = pool.map(_memory_usage)
+            self.records.append(record)
+            for callback in self.callbacks:
+                callback(record)
+
+    def summary(self) -> typing.Dict[str, dict]:
+        """Return the total duration and bytes of each named stage.
+
+        The memory of each stage is the most memory that was reserved by the
+        memory pool of any device when any of its records ended. It is not
+        the peak memory during the stage; memory which was allocated and
+        freed within a stage is only included when the pool kept it.
+        """
+        totals = dict()
+        for record in self.records:
+            total = totals.setdefault(
+                record['name'],
+                dict(
+                    count=0,
+                    duration=0.0,
+                    bytes={kind: 0 for kind in copy_kinds},
+                    max_reserved_memory=0,
+                ),
+            )
+            total['count'] += 1
+            total['duration'] += record['duration']
+            for kind, nbytes in record['bytes'].items():
+                total['bytes'][kind] += nbytes
+            for memory in record.get('memory', []):
+                total['max_reserved_memory'] = max(
+                    total['max_reserved_memory'],
+                    memory['reserved'],
+                )
+        return totals
+
+    def export(self, path: str) -> None:
+        """Write the records to path in the Chrome trace event format."""
+        events = []
+        for record in self.records:
+            events.append({
+                'name': record['name'],
+                'ph': 'X',
+                'pid': 0,
+                'tid': 0,
+                'ts': record['start'] * 1e6,
+                'dur': record['duration'] * 1e6,
+                'args': {
+                    k: v
+                    for k, v in record.items()
+                    if k not in ('name', 'start', 'duration')
+                },
+            })
+            for i, memory in enumerate(record.get('memory', [])):
+                events.append({
+                    'name': f'memory {i}',
+                    'ph': 'C',
+                    'pid': 0,
+                    'ts': (record['start'] + record['duration']) * 1e6,
+                    'args': memory,
+                })
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events}, f)
+        logger.info(f"Wrote {len(self.records):,d} stages to {path}.")
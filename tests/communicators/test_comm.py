@@ -68,6 +68,37 @@ class TestComm(unittest.TestCase):
 
         self.comm.pool.map(check_correct, result)
 
+    def test_Iallreduce(self):
+        a = self.xp.arange(10).reshape(2, 5)
+        a_list = self.comm.pool.bcast([a])
+        request = self.comm.Iallreduce(a_list)
+        # Queue more work on the devices before waiting
+        b_list = self.comm.pool.map(self.xp.multiply, a_list, 2)
+        result = request.wait()
+        assert len(result) == self.comm.pool.num_workers
+
+        def check_correct(result, b):
+            self.xp.testing.assert_array_equal(
+                result,
+                self.xp.arange(10).reshape(2, 5) * self.comm.pool.num_workers *
+                self.comm.mpi.size,
+            )
+            self.xp.testing.assert_array_equal(
+                b,
+                self.xp.arange(10).reshape(2, 5) * 2,
+            )
+
+        self.comm.pool.map(check_correct, result, b_list)
+
+    def test_Iallreduce_mean(self):
+        a = cp.arange(10.0).reshape(2, 5)
+        a_list = self.comm.pool.bcast([a])
+        result = self.comm.Iallreduce_mean(a_list, axis=0).wait()
+        cp.testing.assert_array_equal(
+            result,
+            self.comm.Allreduce_mean(a_list, axis=0),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,11 @@
+import subprocess
+import sys
 import unittest
 
 import numpy as np
 
 from tike.communicators import ThreadPool
+import tike.communicators.pool
 
 
 class TestThreadPool(unittest.TestCase):
@@ -64,7 +67,7 @@ class TestThreadPool(unittest.TestCase):
             stride=stride,
         )
         for (a, b) in zip(result, truth):
-            print(a.device)
+            print(getattr(a, 'device', 'cpu'))
             self.xp.testing.assert_array_equal(a, b)
 
     def test_scatter_bcast(self, stride=3):
@@ -78,7 +81,7 @@ class TestThreadPool(unittest.TestCase):
             stride=stride,
         )
         for (a, b) in zip(result, truth):
-            print(a.device)
+            print(getattr(a, 'device', 'cpu'))
             self.xp.testing.assert_array_equal(a, b)
 
     def test_reduce_gpu(self, stride=3):
@@ -96,7 +99,7 @@ class TestThreadPool(unittest.TestCase):
             stride=stride,
         )
         for (a, b) in zip(result, truth):
-            print(a.device)
+            print(getattr(a, 'device', 'cpu'))
             self.xp.testing.assert_array_equal(a, b)
 
     def test_reduce_cpu(self):
@@ -127,7 +130,7 @@ class TestThreadPool(unittest.TestCase):
             stride=stride,
         )
         for (a, b) in zip(result, truth):
-            print(a.device)
+            print(getattr(a, 'device', 'cpu'))
             self.xp.testing.assert_array_equal(a, b)
 
     def test_reduce_mean(self):
@@ -148,5 +151,45 @@ class TestSoloThreadPool(TestThreadPool):
         self.xp = self.pool.xp
 
 
+class TestCPUThreadPool(TestThreadPool):
+
+    def setUp(self, workers=4):
+        self.pool = ThreadPool(workers, xp=np, device_count=workers)
+        self.xp = self.pool.xp
+
+    def test_pinned(self):
+        cpus = self.pool.map(tike.communicators.pool._available_cpus)
+        for worker, result in zip(self.pool.workers, cpus):
+            assert result == self.pool._cpus[worker], (result, worker)
+
+
+class TestSoloCPUThreadPool(TestCPUThreadPool):
+
+    def setUp(self, workers=1):
+        self.pool = ThreadPool(workers, xp=np)
+        self.xp = self.pool.xp
+
+
+def test_parse_cpulist():
+    assert tike.communicators.pool._parse_cpulist('0-3,8,10-11\n') == {
+        0, 1, 2, 3, 8, 10, 11
+    }
+
+
+def test_cpu_workers_without_cupy():
+    """Check that CPU workers never import CuPy."""
+    subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            "import sys; sys.modules['cupy'] = None; "
+            "import numpy as np; import tike.communicators; "
+            "pool = tike.communicators.ThreadPool(2, xp=np, device_count=2); "
+            "pool.gather_host(pool.bcast([np.ones(3)]))",
+        ],
+        check=True,
+    )
+
+
 if __name__ == "__main__":
     unittest.main()
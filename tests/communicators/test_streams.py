@@ -2,6 +2,7 @@ import numpy as np
 import cupy as cp
 import cupyx
 
+import tike.cluster
 import tike.communicators.stream
 
 
@@ -113,3 +114,32 @@ def test_stream_modify(dtype=np.double, num_streams=2):
         print(t, type(t))
         print(r, type(t))
         cp.testing.assert_array_equal(t, r)
+
+
+def test_stream_modify_staged(dtype=np.double, num_streams=2):
+    """Check streaming from sources that require pinned staging buffers."""
+
+    def f(ind_args, mod_args, _):
+        (a, b), (c,) = ind_args, mod_args
+        return (cp.sum(a * b) + c,)
+
+    x0 = np.arange(10, dtype=dtype)
+    x1 = tike.cluster.IndexedRows(
+        np.arange(20, dtype=np.uint16),
+        index=np.arange(10)[::-1] * 2,
+        dtype=dtype,
+    )
+    indices = [1, 2, 3, 7, 5, 0]
+
+    truth = np.sum(x0[indices] * x1[indices])
+
+    result = tike.communicators.stream.stream_and_modify(
+        f,
+        ind_args=(x0, x1),
+        mod_args=(0.0,),
+        streams=[cp.cuda.Stream() for _ in range(num_streams)],
+        indices=indices,
+        chunk_size=3,
+    )
+
+    cp.testing.assert_array_equal(truth, result[0])
@@ -37,6 +37,20 @@ class TestFlow(unittest.TestCase, OperatorTests):
     def test_scaled(self):
         pass
 
+    def test_batch_matches_single(self):
+        """Check that the batched remap matches remapping one image."""
+        flow = self.kwargs['flow']
+        for method, x in ((self.operator.fwd, self.m),
+                          (self.operator.adj, self.d)):
+            result = method(x, flow)
+            for i in range(len(x)):
+                self.xp.testing.assert_allclose(
+                    result[i],
+                    method(x[i], flow[i]),
+                    rtol=1e-4,
+                    atol=1e-5,
+                )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -74,6 +74,26 @@ class TestLaminoBucket(unittest.TestCase, OperatorTests):
     def test_scaled(self):
         pass
 
+    def test_cached_geometry(self):
+        """Check that cached and uncached geometry are the same."""
+        cache = self.operator.geometry_cache
+        max_bytes = cache.max_bytes
+        try:
+            cache.set_limits(max_bytes=0)
+            uncached = self.operator.fwd(self.m, **self.kwargs)
+            cache.set_limits(max_bytes=max_bytes)
+            hits = cache.hits
+            cached = [self.operator.fwd(self.m, **self.kwargs) for _ in 'ab']
+        finally:
+            cache.set_limits(max_bytes=max_bytes)
+        assert cache.hits == hits + 1
+        for result in cached:
+            self.xp.testing.assert_array_equal(result, uncached)
+        # The geometry is released when the operator exits
+        assert len(cache) == 1
+        self.operator.__exit__(None, None, None)
+        assert len(cache) == 0
+
 
 if __name__ == '__main__':
     unittest.main()
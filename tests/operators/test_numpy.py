@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the operators from the NumPy backend.
+
+These tests mirror the tests of the default (CuPy) operators, but they
+explicitly request the NumPy implementations from tike.operators.numpy.
+"""
+
+import unittest
+
+import numpy as np
+import tike.operators.numpy
+import tike.precision
+
+from .util import random_complex, random_floating, OperatorTests
+
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+__docformat__ = 'restructuredtext en'
+
+
+class TestNumPyPatch(unittest.TestCase, OperatorTests):
+    """Test the NumPy Patch operator."""
+
+    def setUp(self, ntheta=3, nscan=7, width=64, patch_width=16):
+        """Load a dataset for reconstruction."""
+        self.operator = tike.operators.numpy.Patch()
+        self.operator.__enter__()
+        self.xp = self.operator.xp
+        assert self.xp is np
+
+        np.random.seed(0)
+        scan = np.random.rand(ntheta, nscan, 2) * (width - patch_width - 2)
+        self.m = random_complex(ntheta, width, width)
+        self.m_name = 'images'
+        self.kwargs = {
+            'positions': scan.astype(tike.precision.floating),
+            'patch_width': patch_width,
+            'height': width,
+            'width': width,
+        }
+        self.d = random_complex(ntheta, nscan, patch_width, patch_width)
+        self.d_name = 'patches'
+        print(self.operator)
+
+    @unittest.skip('FIXME: This operator is not scaled.')
+    def test_scaled(self):
+        pass
+
+    def test_integer_positions(self, win=4):
+        """Check that integer positions extract exact copies."""
+        images = random_complex(1, 16, 16)
+        positions = np.array([[[2, 3], [0, 12], [12, 0]]],
+                             dtype=tike.precision.floating)
+        patches = self.operator.fwd(
+            images=images,
+            positions=positions,
+            patch_width=win,
+        )
+        for i, (y, x) in enumerate(positions[0].astype(int)):
+            np.testing.assert_array_equal(
+                patches[0, i],
+                images[0, y:y + win, x:x + win],
+            )
+
+
+class TestNumPyPropagation(unittest.TestCase, OperatorTests):
+    """Test the NumPy Propagation operator."""
+
+    def setUp(self, nwaves=13, probe_shape=127):
+        """Load a dataset for reconstruction."""
+        self.operator = tike.operators.numpy.Propagation(
+            nwaves=nwaves,
+            detector_shape=probe_shape,
+            probe_shape=probe_shape,
+        )
+        self.operator.__enter__()
+        self.xp = self.operator.xp
+        np.random.seed(0)
+        self.m = random_complex(nwaves, probe_shape, probe_shape)
+        self.m_name = 'nearplane'
+        self.d = random_complex(nwaves, probe_shape, probe_shape)
+        self.d_name = 'farplane'
+        self.kwargs = {}
+        print(self.operator)
+
+
+class TestNumPyFlow(unittest.TestCase, OperatorTests):
+    """Test the NumPy Flow operator."""
+
+    def setUp(self, n=16, nz=17, ntheta=8):
+        """Load a dataset for reconstruction."""
+        self.operator = tike.operators.numpy.Flow()
+        self.operator.__enter__()
+        self.xp = self.operator.xp
+
+        np.random.seed(0)
+        self.m = random_complex(ntheta, nz, n)
+        self.m_name = 'f'
+        self.d = random_complex(*self.m.shape)
+        self.d_name = 'g'
+        self.kwargs = {
+            'flow': random_floating(*self.m.shape, 2) * 16,
+        }
+        print(self.operator)
+
+    @unittest.skip('FIXME: This operator is not scaled.')
+    def test_scaled(self):
+        pass
+
+    def test_chunked_remap(self, m=2):
+        """Resampling a few grids at a time matches one pass."""
+        remap = tike.operators.numpy.flow._remap_lanczos
+        x = random_floating(len(self.m), 11, 2) * 16
+        F = random_complex(len(self.m), 11)
+        for fwd in (True, False):
+            Fe0, F0 = self.m.copy(), F.copy()
+            remap(Fe0, x, m, F0, fwd=fwd)
+            # A budget this small resamples one grid at a time
+            Fe1, F1 = self.m.copy(), F.copy()
+            remap(Fe1, x, m, F1, fwd=fwd, max_bytes=1)
+            np.testing.assert_allclose(Fe1, Fe0, rtol=1e-5)
+            np.testing.assert_allclose(F1, F0, rtol=1e-5)
+
+
+class TestNumPyRotate(unittest.TestCase, OperatorTests):
+    """Test the NumPy Rotate operator."""
+
+    def setUp(self, shape=(7, 25, 53)):
+        """Load a dataset for reconstruction."""
+        self.operator = tike.operators.numpy.Rotate()
+        self.operator.__enter__()
+        self.xp = self.operator.xp
+
+        np.random.seed(0)
+        self.m = random_complex(*shape)
+        self.m_name = 'unrotated'
+        self.d = random_complex(*shape)
+        self.d_name = 'rotated'
+        self.kwargs = {
+            'angle': np.random.rand() * 2 * np.pi,
+        }
+        print(self.operator)
+
+    @unittest.skip('FIXME: This operator is not scaled.')
+    def test_scaled(self):
+        pass
+
+    def test_per_image_angles(self):
+        """Check that each image is rotated by its own angle."""
+        angle = np.random.rand(len(self.m)) * 2 * np.pi
+        for method, x in ((self.operator.fwd, self.m),
+                          (self.operator.adj, self.d)):
+            result = method(x, angle)
+            for i in range(len(x)):
+                np.testing.assert_allclose(
+                    result[i],
+                    method(x[i], angle[i]),
+                    rtol=1e-4,
+                    atol=1e-5,
+                )
+
+
+class TestNumPyLamino(unittest.TestCase, OperatorTests):
+    """Test the NumPy Laminography operator."""
+
+    def setUp(self, n=16, ntheta=8, tilt=np.pi / 3, eps=1e-6):
+        """Load a dataset for reconstruction."""
+        self.operator = tike.operators.numpy.Lamino(
+            n=n,
+            tilt=tilt,
+            eps=eps,
+        )
+        self.operator.__enter__()
+        self.xp = self.operator.xp
+
+        np.random.seed(0)
+        self.m = random_complex(n, n, n)
+        self.m_name = 'u'
+        self.d = random_complex(ntheta, n, n)
+        self.d_name = 'data'
+        self.kwargs = {
+            'theta': np.linspace(0, 2 * np.pi,
+                                 ntheta).astype(tike.precision.floating),
+        }
+        print(self.operator)
+
+    @unittest.skip('FIXME: This operator is not scaled.')
+    def test_scaled(self):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
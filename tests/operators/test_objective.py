@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the compact storage of diffraction patterns."""
+
+import unittest
+
+import numpy as np
+import tike.operators.numpy
+
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+__docformat__ = 'restructuredtext en'
+
+
+class TestEncodePatterns(unittest.TestCase):
+    """Test encoding of diffraction patterns as unsigned integers."""
+
+    def setUp(self):
+        np.random.seed(0)
+
+    def test_counts_are_exact(self):
+        data = np.random.poisson(100, size=(7, 16, 16)).astype('float32')
+        codes, scale = tike.operators.numpy.encode_patterns(data, chunk=3)
+        assert codes.dtype == np.uint16
+        assert scale is None
+        np.testing.assert_array_equal(
+            tike.operators.numpy.decode_patterns(codes, scale),
+            data,
+        )
+
+    def test_scaled_patterns(self):
+        data = np.random.rand(7, 16, 16).astype('float32') * 1000
+        data[2] = np.random.poisson(3, size=(16, 16))
+        codes, scale = tike.operators.numpy.encode_patterns(data, 'uint8')
+        assert codes.dtype == np.uint8
+        assert scale[2] == 1
+        decoded = tike.operators.numpy.decode_patterns(codes, scale)
+        np.testing.assert_array_equal(decoded[2], data[2])
+        assert np.all(np.abs(decoded - data) <= scale[:, None, None] / 2 + 1e-3)
+
+    def test_encoded_view_matches(self):
+        """Rows of the view are encoded like the whole array."""
+        data = np.random.rand(7, 16, 16).astype('float32') * 1000
+        data[2] = np.random.poisson(3, size=(16, 16))
+        codes, scale = tike.operators.numpy.encode_patterns(data, 'uint8')
+        view = tike.operators.numpy.EncodedPatterns(data, 'uint8', chunk=3)
+        assert view.shape == data.shape
+        assert view.itemsize == 1
+        np.testing.assert_array_equal(view.scale, scale)
+        np.testing.assert_array_equal(view[[5, 1, 2]], codes[[5, 1, 2]])
+        np.testing.assert_array_equal(view[1:4], codes[1:4])
+        np.testing.assert_array_equal(view[3], codes[3])
+
+    def test_signed_is_error(self):
+        with self.assertRaises(ValueError):
+            tike.operators.numpy.encode_patterns(np.zeros((1, 2, 2)), 'int16')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Test the process-wide FFT plan cache."""
+
+import unittest
+
+from tike.operators.plancache import PlanCache
+
+__author__ = "Daniel Ching"
+__copyright__ = "Copyright (c) 2021, UChicago Argonne, LLC."
+__docformat__ = 'restructuredtext en'
+
+
+class TestPlanCache(unittest.TestCase):
+    """Test the LRU eviction and accounting of PlanCache."""
+
+    def get(self, cache, key, size=10):
+        return cache.get(key, create=lambda: key, nbytes=lambda _: size)
+
+    def test_hits_and_misses(self):
+        cache = PlanCache(max_bytes=100, max_plans=4)
+        for key in ['a', 'b', 'a', 'a', 'c']:
+            assert self.get(cache, key) == key
+        assert cache.hits == 2
+        assert cache.misses == 3
+        assert cache.nbytes == 30
+        assert len(cache) == 3
+
+    def test_evict_least_recently_used(self):
+        cache = PlanCache(max_bytes=100, max_plans=2)
+        self.get(cache, 'a')
+        self.get(cache, 'b')
+        self.get(cache, 'a')
+        self.get(cache, 'c')
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert cache.evictions == 1
+
+    def test_byte_budget(self):
+        cache = PlanCache(max_bytes=25, max_plans=8)
+        for key in 'abc':
+            self.get(cache, key)
+        assert cache.nbytes <= 25
+        assert len(cache) == 2
+        # Plans larger than the budget are returned but not cached
+        assert self.get(cache, 'big', size=26) == 'big'
+        assert 'big' not in cache
+        cache.set_limits(max_bytes=0)
+        assert len(cache) == 0
+        assert cache.nbytes == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
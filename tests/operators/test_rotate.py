@@ -56,6 +56,20 @@ class TestRotate(unittest.TestCase, OperatorTests):
     def test_scaled(self):
         pass
 
+    def test_per_image_angles(self):
+        """Check that each image is rotated by its own angle."""
+        angle = np.random.rand(len(self.m)) * 2 * np.pi
+        for method, x in ((self.operator.fwd, self.m),
+                          (self.operator.adj, self.d)):
+            result = method(x, angle)
+            for i in range(len(x)):
+                self.xp.testing.assert_allclose(
+                    result[i],
+                    method(x[i], angle[i]),
+                    rtol=1e-4,
+                    atol=1e-5,
+                )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,125 @@
+import os.path
+import tempfile
+import unittest
+
+import numpy as np
+
+import tike.ptycho
+import tike.ptycho.checkpoint
+import tike.random
+
+from .templates import _mpi_size, MPIAndGPUInfo, SiemensStarSetup
+
+
+@unittest.skipIf(
+    _mpi_size > 1,
+    reason="MPI not implemented for checkpointing.",
+)
+class TestPtychoCheckpoint(
+        MPIAndGPUInfo,
+        SiemensStarSetup,
+        unittest.TestCase,
+):
+    """Test that resuming from a checkpoint matches an uninterrupted run."""
+
+    def test_resume_from_checkpoint(self, num_iter=4):
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.LstsqOptions(
+                num_batch=5,
+                num_iter=num_iter,
+            ),
+            probe_options=tike.ptycho.ProbeOptions(use_adaptive_moment=True),
+            object_options=tike.ptycho.ObjectOptions(use_adaptive_moment=True),
+            position_options=tike.ptycho.PositionOptions(
+                self.scan,
+                use_adaptive_moment=True,
+            ),
+        )
+        random_state = tike.random.randomizer_np.bit_generator.state
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint')
+
+            with tike.ptycho.Reconstruction(
+                    self.data,
+                    params,
+                    num_gpu=self.gpu_indices,
+                    checkpoint_path=path,
+                    checkpoint_period=num_iter // 2,
+            ) as context:
+                context.iterate(num_iter // 2)
+                expected_checkpoint = context.get_result()
+                context.iterate(num_iter - num_iter // 2)
+            # The second checkpoint is overwritten by resuming below
+            expected = context.parameters
+
+            tike.random.randomizer_np.bit_generator.state = random_state
+            with tike.ptycho.Reconstruction(
+                    self.data,
+                    params,
+                    num_gpu=self.gpu_indices,
+            ) as context:
+                context.iterate(num_iter // 2)
+                context.checkpoint(path).result()
+
+            with tike.ptycho.Reconstruction.from_checkpoint(
+                    path,
+                    self.data,
+                    num_gpu=self.gpu_indices,
+            ) as context:
+                assert (len(context.parameters.algorithm_options.costs) ==
+                        len(expected_checkpoint.algorithm_options.costs))
+                context.iterate(num_iter - num_iter // 2)
+            result = context.parameters
+
+        np.testing.assert_array_equal(result.psi, expected.psi)
+        np.testing.assert_array_equal(result.probe, expected.probe)
+        np.testing.assert_array_equal(result.scan, expected.scan)
+        np.testing.assert_array_equal(
+            result.algorithm_options.costs,
+            expected.algorithm_options.costs,
+        )
+
+
+class TestCheckpointFormat(unittest.TestCase):
+    """Test that checkpoints are restored without pickle."""
+
+    def test_unchanged_arrays_are_reused(self, n=32, w=8):
+        scan = np.random.rand(7, 2).astype('float32') * (n - w - 2) + 1
+        state = {
+            'parameters': tike.ptycho.PtychoParameters(
+                psi=np.ones((n, n), dtype='complex64'),
+                probe=np.ones((1, 1, 1, w, w), dtype='complex64'),
+                scan=scan,
+                algorithm_options=tike.ptycho.LstsqOptions(),
+                position_options=tike.ptycho.PositionOptions(scan),
+            ),
+            'order': [np.arange(7)],
+        }
+        with tempfile.TemporaryDirectory() as folder:
+            tike.ptycho.checkpoint.write(folder, state)
+            before = set(os.listdir(folder))
+            state['parameters'].psi = state['parameters'].psi * 2
+            tike.ptycho.checkpoint.write(folder, state)
+            after = set(os.listdir(folder))
+            # Only the object changed, so one array is replaced
+            assert len(after - before) == 1
+            assert len(before - after) == 1
+            result = tike.ptycho.checkpoint.read(folder)
+
+        parameters = result['parameters']
+        assert isinstance(parameters.algorithm_options,
+                          tike.ptycho.LstsqOptions)
+        np.testing.assert_array_equal(parameters.psi, state['parameters'].psi)
+        np.testing.assert_array_equal(
+            parameters.position_options.initial_scan,
+            scan,
+        )
+        np.testing.assert_array_equal(result['order'][0], np.arange(7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import copy
+import unittest
+
+import numpy as np
+
+import tike.ptycho
+import tike.random
+
+from .test_ptycho import PtychoRecon
+from .templates import _mpi_size
+
+
+def _assert_close(actual, desired):
+    np.testing.assert_allclose(
+        actual,
+        desired,
+        rtol=1e-3,
+        atol=1e-3 * np.max(np.abs(desired)),
+    )
+
+
+@unittest.skipIf(
+    _mpi_size > 1,
+    reason="MPI not implemented for groups of reconstructions.",
+)
+class TestPtychoGroup(PtychoRecon, unittest.TestCase):
+    """Test ptychography reconstruction of many scans with shared resources."""
+
+    post_name = "-group"
+
+    def template_consistent_algorithm(self, *, data, params, copies=3):
+        """Check that each member of a group matches a reconstruction alone."""
+        if self.mpi_size > 1:
+            raise NotImplementedError()
+
+        # Scale the patterns so that the members have different solutions
+        datas = [data * (1 + 0.25 * i) for i in range(copies)]
+        state = copy.deepcopy(tike.random.randomizer_np.bit_generator.state)
+
+        with tike.ptycho.ReconstructionGroup(
+                data=datas,
+                parameters=[params] * copies,
+                num_gpu=self.gpu_indices,
+        ) as context:
+            # The copies share one operator for their common shapes
+            assert len(context.operators) == 1
+            if tike.ptycho.ptycho._pack_key(data, params) is None:
+                assert len(context._packs) == 0
+            else:
+                assert len(context._packs) == 1
+            context.iterate(params.algorithm_options.num_iter)
+        results = context.parameters
+        assert len(results) == copies
+
+        for d, result in zip(datas, results):
+            # Each member draws from a copy of the generator
+            tike.random.randomizer_np.bit_generator.state = copy.deepcopy(
+                state)
+            alone = tike.ptycho.reconstruct(
+                data=d,
+                parameters=params,
+                num_gpu=self.gpu_indices,
+            )
+            assert (len(result.algorithm_options.costs) == len(
+                alone.algorithm_options.costs))
+            _assert_close(
+                np.mean(result.algorithm_options.costs, axis=-1),
+                np.mean(alone.algorithm_options.costs, axis=-1),
+            )
+            _assert_close(result.psi, alone.psi)
+            _assert_close(result.probe, alone.probe)
+            _assert_close(result.scan, alone.scan)
+
+        print()
+        print('\n'.join(
+            f'{c[0]:1.3e}' for c in results[0].algorithm_options.costs))
+        return results[0]
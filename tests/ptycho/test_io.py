@@ -0,0 +1,131 @@
+import os.path
+import tempfile
+
+import h5py
+import numpy as np
+import pytest
+
+import tike.precision
+import tike.ptycho.io
+
+
+def _make_lynx(folder, num_frame=50, num_position=47, chunk=7):
+    """Write a small synthetic LYNX dataset to folder."""
+    rng = np.random.default_rng(0)
+    diffraction_path = os.path.join(folder, 'lynx.h5')
+    position_path = os.path.join(folder, 'lynx.dat')
+    with h5py.File(diffraction_path, 'w') as f:
+        dataset = f.create_dataset(
+            '/entry/data/eiger_4',
+            data=rng.integers(0, 5000, (num_frame, 40, 50), dtype='uint16'),
+            chunks=(chunk, 40, 50),
+        )
+        dataset.attrs['Pixel_size'] = np.array([7.5e-5])
+    np.savetxt(
+        position_path,
+        rng.random((num_position, 7)) * 1000,
+        delimiter=' ',
+        header='header\nheader',
+        comments='',
+    )
+    return diffraction_path, position_path
+
+
+def _read_lynx_baseline(
+    diffraction_path,
+    position_path,
+    photon_energy,
+    beam_center_x,
+    beam_center_y,
+    detector_dist,
+    binned_pix,
+    radius=16,
+    gap_value=2**12 - 1,
+):
+    """Load the whole synthetic LYNX dataset at once without chunking."""
+    with h5py.File(diffraction_path, 'r') as f:
+        dataset = f['/entry/data/eiger_4']
+        det_pix_width = dataset.attrs['Pixel_size'].item()
+        # yapf: disable
+        cropped = dataset[
+            :,
+            beam_center_y - radius:beam_center_y + radius,
+            beam_center_x - radius:beam_center_x + radius,
+        ]
+        # yapf: enable
+    cropped[cropped == gap_value] = 0
+    width = 2 * radius // binned_pix
+    data = np.fft.ifftshift(
+        np.sum(
+            cropped.reshape(-1, width, binned_pix, width, binned_pix),
+            axis=(-3, -1),
+            dtype=cropped.dtype,
+        ),
+        axes=(-2, -1),
+    )
+    scan = np.genfromtxt(
+        position_path,
+        usecols=(6, 3, 0),
+        delimiter=' ',
+        dtype=tike.precision.floating,
+        skip_header=2,
+    )[:, :2] * -1e-6
+    num_frame = min(len(data), len(scan))
+    scan = tike.ptycho.io.position_units_to_pixels(
+        scan[:num_frame],
+        detector_dist,
+        width,
+        det_pix_width * binned_pix,
+        photon_energy,
+    )
+    return data[:num_frame], scan.astype(tike.precision.floating)
+
+
+def test_iter_aps_lynx_matches_read(chunk_size=16):
+    with tempfile.TemporaryDirectory() as folder:
+        args = (*_make_lynx(folder), 10000, 25, 20, 2.0)
+        truth_data, truth_scan = _read_lynx_baseline(*args, binned_pix=2)
+        data, scan = tike.ptycho.io.read_aps_lynx(*args, binned_pix=2)
+        chunks = list(tike.ptycho.io.iter_aps_lynx(
+            *args,
+            binned_pix=2,
+            chunk_size=chunk_size,
+        ))
+    # Blocks are whole numbers of the HDF5 chunks
+    for d, s in chunks[:-1]:
+        assert len(d) == 14
+        assert len(d) == len(s)
+    np.testing.assert_array_equal(
+        np.concatenate([d for d, _ in chunks], axis=0),
+        truth_data,
+    )
+    np.testing.assert_array_equal(
+        np.concatenate([s for _, s in chunks], axis=0),
+        truth_scan,
+    )
+    np.testing.assert_array_equal(data, truth_data)
+    np.testing.assert_array_equal(scan, truth_scan)
+    assert len(data) == len(scan) == 47
+
+
+def test_read_no_frames():
+    with pytest.raises(ValueError):
+        tike.ptycho.io._concatenate_chunks(iter([]))
+
+
+def test_diffraction_store_round_trip():
+    with tempfile.TemporaryDirectory() as folder:
+        args = (*_make_lynx(folder), 10000, 25, 20, 2.0)
+        data, scan = tike.ptycho.io.read_aps_lynx(*args)
+        store = os.path.join(folder, 'store')
+        num_frame = tike.ptycho.io.write_diffraction_store(
+            store,
+            tike.ptycho.io.iter_aps_lynx(*args, chunk_size=8),
+        )
+        assert num_frame == len(data)
+        mapped, mapped_scan = tike.ptycho.io.read_diffraction_store(store)
+        assert isinstance(mapped, np.memmap)
+        np.testing.assert_array_equal(mapped, data)
+        np.testing.assert_array_equal(mapped_scan, scan)
+        assert mapped_scan.dtype == scan.dtype
+        del mapped
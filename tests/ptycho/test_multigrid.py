@@ -7,6 +7,7 @@ import numpy as np
 import pytest
 import unittest
 
+import tike.precision
 import tike.ptycho
 from tike.ptycho.solvers.options import (
     _resize_fft,
@@ -55,6 +56,33 @@ def test_resample(function, filename='siemens-star-small.npz.bz2'):
         )
 
 
+def test_crop_pyramid(width=101):
+    """Cropping each level from the next finer level equals cropping once."""
+    x = np.random.rand(3, width, width)
+    finer = x
+    for level in range(1, 4):
+        finer = tike.ptycho.crop_fourier_space(finer, finer.shape[-1] // 2)
+        np.testing.assert_array_equal(
+            finer,
+            tike.ptycho.crop_fourier_space(x, width // 2**level),
+        )
+
+
+def test_multigrid_rejects_out_of_core():
+    params = tike.ptycho.PtychoParameters(
+        psi=np.ones((256, 256), dtype=tike.precision.cfloating),
+        probe=np.ones((1, 1, 1, 128, 128), dtype=tike.precision.cfloating),
+        scan=np.random.rand(4, 2).astype(tike.precision.floating) * 64 + 10,
+        algorithm_options=tike.ptycho.RpieOptions(out_of_core=True),
+    )
+    with pytest.raises(ValueError):
+        tike.ptycho.MultigridReconstruction(
+            np.zeros((4, 128, 128), dtype=tike.precision.floating),
+            params,
+            num_levels=2,
+        )
+
+
 @unittest.skipIf(
     _mpi_size > 1,
     reason="MPI not implemented for multi-grid.",
@@ -62,6 +90,8 @@ def test_resample(function, filename='siemens-star-small.npz.bz2'):
 class ReconMultiGrid():
     """Test ptychography multi-grid reconstruction method."""
 
+    level_tolerance = None
+
     def interp(self, x, f):
         pass
 
@@ -78,6 +108,7 @@ class ReconMultiGrid():
                 use_mpi=self.mpi_size > 1,
                 num_levels=2,
                 interp=self.interp,
+                level_tolerance=self.level_tolerance,
             )
 
         print()
@@ -98,6 +129,20 @@ class TestPtychoReconMultiGridFFT(
         return _resize_fft(x, f)
 
 
+class TestPtychoReconMultiGridAdaptive(
+        ReconMultiGrid,
+        PtychoRecon,
+        unittest.TestCase,
+):
+
+    post_name = '-multigrid-adaptive'
+
+    level_tolerance = 1e-2
+
+    def interp(self, x, f):
+        return _resize_fft(x, f)
+
+
 if False:
     # Don't need to run these tests on CI every time.
 
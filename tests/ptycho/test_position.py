@@ -143,6 +143,80 @@ class TestAffineEstimation(unittest.TestCase):
 
         np.testing.assert_almost_equal(result.asarray3(), T, decimal=3)
 
+    def test_ransac_rejects_outliars(self):
+        """Recover the transform when some positions are far off."""
+        positions1 = self.positions1.copy()
+        positions1[::10] += 100
+        (
+            result,
+            fitness,
+        ) = tike.ptycho.position.estimate_global_transformation_ransac(
+            self.positions0,
+            positions1,
+            max_error=1,
+        )
+        assert np.isfinite(fitness)
+        np.testing.assert_allclose(
+            result(self.positions0)[1::10],
+            self.positions1[1::10],
+            atol=0.5,
+        )
+
+    def test_ransac_sharded(self):
+        """Partial sums over shards give the same model as one shard."""
+        subsets = np.random.randint(len(self.positions0), size=(20, 4))
+        shards = np.array_split(np.arange(len(self.positions0)), 3)
+        kwargs = dict(
+            subsets=subsets,
+            num_total=len(self.positions0),
+            map_shards=tike.ptycho.position._map_local,
+            max_error=1,
+            min_consensus=0.75,
+        )
+        T0, fitness0 = tike.ptycho.position._ransac(
+            [self.positions0],
+            [self.positions1],
+            offsets=[0],
+            sum_shards=lambda x: x[0],
+            **kwargs,
+        )
+        T1, fitness1 = tike.ptycho.position._ransac(
+            [self.positions0[s] for s in shards],
+            [self.positions1[s] for s in shards],
+            offsets=[s[0] for s in shards],
+            sum_shards=lambda x: np.sum(x, axis=0),
+            **kwargs,
+        )
+        np.testing.assert_allclose(T0, T1, rtol=1e-6, atol=1e-9)
+        np.testing.assert_allclose(fitness0, fitness1)
+
+    def test_ransac_weighted_refit(self):
+        """The consensus refit uses the weights like the least squares fit."""
+        expected, _ = tike.ptycho.position.estimate_global_transformation(
+            self.positions0,
+            self.positions1,
+            weights=self.weights,
+        )
+        shards = np.array_split(np.arange(len(self.positions0)), 3)
+        T, _ = tike.ptycho.position._ransac(
+            [self.positions0[s] for s in shards],
+            [self.positions1[s] for s in shards],
+            subsets=np.random.randint(len(self.positions0), size=(4, 4)),
+            offsets=[s[0] for s in shards],
+            num_total=len(self.positions0),
+            map_shards=tike.ptycho.position._map_local,
+            sum_shards=lambda x: np.sum(x, axis=0),
+            weights=[self.weights[s] for s in shards],
+            max_error=np.inf,
+            min_consensus=0.75,
+        )
+        np.testing.assert_allclose(
+            tike.ptycho.position.AffineTransform.fromarray(T).asarray3(),
+            expected.asarray3(),
+            rtol=1e-5,
+            atol=1e-6,
+        )
+
 
 class CNMPositionSetup():
 
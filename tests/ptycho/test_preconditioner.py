@@ -0,0 +1,69 @@
+import unittest
+
+import cupy as cp
+import numpy as np
+
+import tike.communicators
+import tike.operators
+import tike.precision
+import tike.ptycho
+from tike.ptycho.solvers import PreconditionerReference, update_preconditioners
+
+
+class TestIncrementalPreconditioner(unittest.TestCase):
+    """Incremental preconditioner updates should match full updates."""
+
+    def setUp(self, n=48, w=8, num_scan=64):
+        rng = np.random.default_rng(0)
+        self.probe = (rng.random((1, 1, 1, w, w)) +
+                      1j * rng.random((1, 1, 1, w, w))).astype(
+                          tike.precision.cfloating)
+        self.psi = (rng.random((n, n)) + 1j * rng.random((n, n))).astype(
+            tike.precision.cfloating)
+        self.scan = rng.uniform(1, n - w - 3, (num_scan, 2)).astype(
+            tike.precision.floating)
+        self.moved = self.scan.copy()
+        self.moved[:5] += 2.0
+        self.w = w
+        self.n = n
+
+    def _update(self, comm, operator, scan, options, reference):
+        return update_preconditioners(
+            comm=comm,
+            operator=operator,
+            scan=comm.pool.bcast([scan]),
+            probe=comm.pool.bcast([self.probe]),
+            psi=comm.pool.bcast([self.psi]),
+            object_options=options,
+            reference=reference,
+        )[0]
+
+    def test_matches_full_update(self):
+        with tike.communicators.Comm(1) as comm, tike.operators.Ptycho(
+                detector_shape=self.w,
+                probe_shape=self.w,
+                nz=self.n,
+                n=self.n,
+        ) as operator:
+            reference = PreconditionerReference()
+            incremental = tike.ptycho.ObjectOptions()
+            full = tike.ptycho.ObjectOptions()
+            for scan in (self.scan, self.scan, self.moved, self.moved):
+                incremental = self._update(
+                    comm,
+                    operator,
+                    scan,
+                    incremental,
+                    reference,
+                )
+                full = self._update(comm, operator, scan, full, None)
+                np.testing.assert_allclose(
+                    cp.asnumpy(incremental.preconditioner[0]),
+                    cp.asnumpy(full.preconditioner[0]),
+                    rtol=1e-4,
+                    atol=1e-4,
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,6 +56,7 @@ import numpy as np
 from tike.ptycho.exitwave import ExitWaveOptions
 from tike.ptycho.object import ObjectOptions
 from tike.ptycho.probe import ProbeOptions
+import tike.precision
 import tike.ptycho
 import tike.random
 
@@ -384,6 +385,105 @@ class PtychoRecon(
                 params=params,
             ), f"mpi{self.mpi_size}-lstsq_grad{self.post_name}")
 
+    def test_consistent_lstsq_grad_preconditioner_period(self):
+        """Check ptycho.solver.lstsq_grad with infrequent preconditioning."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.LstsqOptions(
+                num_batch=5,
+                num_iter=16,
+                preconditioner_period=4,
+            ),
+            probe_options=ProbeOptions(
+                force_orthogonality=True,
+                use_adaptive_moment=True,
+            ),
+            object_options=ObjectOptions(use_adaptive_moment=True,),
+        )
+
+        _save_ptycho_result(
+            self.template_consistent_algorithm(
+                data=self.data,
+                params=params,
+            ), f"mpi{self.mpi_size}-lstsq_grad-preconditioner-period"
+            f"{self.post_name}")
+
+    def test_consistent_lstsq_grad_double_wavefront(self):
+        """Check ptycho.solver.lstsq_grad with double precision wavefronts."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.LstsqOptions(
+                num_batch=5,
+                num_iter=16,
+            ),
+            probe_options=ProbeOptions(),
+            object_options=ObjectOptions(),
+            precision=tike.precision.Precision(
+                wavefront='float64',
+                accumulate='float64',
+            ),
+        )
+
+        _save_ptycho_result(
+            self.template_consistent_algorithm(
+                data=self.data,
+                params=params,
+            ), f"mpi{self.mpi_size}-lstsq_grad-double-wavefront"
+            f"{self.post_name}")
+
+    def test_consistent_lstsq_grad_overlap_reductions(self):
+        """Check ptycho.solver.lstsq_grad with reductions in the background."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.LstsqOptions(
+                num_batch=5,
+                num_iter=16,
+                overlap_reductions=True,
+            ),
+            probe_options=ProbeOptions(),
+            object_options=ObjectOptions(),
+        )
+
+        _save_ptycho_result(
+            self.template_consistent_algorithm(
+                data=self.data,
+                params=params,
+            ), f"mpi{self.mpi_size}-lstsq_grad-overlap-reductions"
+            f"{self.post_name}")
+
+    def test_consistent_lstsq_grad_deferred_metrics(self):
+        """Check ptycho.solver.lstsq_grad with metrics copied every 5 epochs."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.LstsqOptions(
+                num_batch=5,
+                num_iter=16,
+                metrics_period=5,
+            ),
+            probe_options=ProbeOptions(),
+            object_options=ObjectOptions(),
+        )
+
+        result = self.template_consistent_algorithm(
+            data=self.data,
+            params=params,
+        )
+        assert len(result.algorithm_options.costs) == 32
+        for cost in result.algorithm_options.costs:
+            assert isinstance(cost, list)
+        _save_ptycho_result(
+            result,
+            f"mpi{self.mpi_size}-lstsq_grad-deferred-metrics{self.post_name}",
+        )
+
     def test_consistent_lstsq_grad_no_probe(self):
         """Check ptycho.solver.lstsq_grad for consistency."""
         params = tike.ptycho.PtychoParameters(
@@ -595,6 +695,76 @@ class PtychoRecon(
             f"mpi{self.mpi_size}-rpie{self.post_name}",
         )
 
+    def test_consistent_rpie_fused_preconditioner(self):
+        """Check ptycho.solver.rpie with preconditioners fused into it."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.RpieOptions(
+                num_batch=5,
+                num_iter=16,
+                preconditioner_period=2,
+                fuse_preconditioner=True,
+            ),
+            probe_options=ProbeOptions(force_orthogonality=True,),
+            object_options=ObjectOptions(smoothness_constraint=0.01,),
+        )
+
+        _save_ptycho_result(
+            self.template_consistent_algorithm(
+                data=self.data,
+                params=params,
+            ),
+            f"mpi{self.mpi_size}-rpie-fused-preconditioner{self.post_name}",
+        )
+
+    def test_consistent_rpie_encoded_data(self):
+        """Check ptycho.solver.rpie with data stored as quantized integers."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.RpieOptions(
+                num_batch=5,
+                num_iter=16,
+                data_encoding='uint16',
+            ),
+            probe_options=ProbeOptions(),
+            object_options=ObjectOptions(),
+        )
+
+        _save_ptycho_result(
+            self.template_consistent_algorithm(
+                data=self.data,
+                params=params,
+            ),
+            f"mpi{self.mpi_size}-rpie-encoded-data{self.post_name}",
+        )
+
+    def test_consistent_rpie_mixed_precision(self):
+        """Check ptycho.solver.rpie with updates summed in double precision."""
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.RpieOptions(
+                num_batch=5,
+                num_iter=16,
+            ),
+            probe_options=ProbeOptions(),
+            object_options=ObjectOptions(),
+            precision=tike.precision.Precision(accumulate='float64'),
+        )
+
+        _save_ptycho_result(
+            self.template_consistent_algorithm(
+                data=self.data,
+                params=params,
+            ),
+            f"mpi{self.mpi_size}-rpie-mixed-precision{self.post_name}",
+        )
+
     def test_consistent_rpie_no_probe(self):
         """Check ptycho.solver.rpie for consistency."""
         params = tike.ptycho.PtychoParameters(
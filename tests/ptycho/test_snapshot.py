@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+import tike.ptycho
+
+from .templates import _mpi_size, MPIAndGPUInfo, SiemensStarSetup
+
+
+@unittest.skipIf(
+    _mpi_size > 1,
+    reason="MPI not implemented for snapshots.",
+)
+class TestPtychoSnapshot(
+        MPIAndGPUInfo,
+        SiemensStarSetup,
+        unittest.TestCase,
+):
+    """Test asynchronous snapshots of a reconstruction."""
+
+    def test_snapshot_matches_peek(self, downsample=4):
+        params = tike.ptycho.PtychoParameters(
+            psi=self.psi,
+            probe=self.probe,
+            scan=self.scan,
+            algorithm_options=tike.ptycho.RpieOptions(num_batch=5),
+            probe_options=tike.ptycho.ProbeOptions(),
+            object_options=tike.ptycho.ObjectOptions(),
+        )
+        with tike.ptycho.Reconstruction(
+                self.data,
+                params,
+                num_gpu=self.gpu_indices,
+        ) as context:
+            context.iterate(1)
+            full = context.snapshot()
+            small = context.snapshot(downsample=downsample)
+            # Snapshots do not block continuing the reconstruction
+            context.iterate(1)
+            psi, probe, _, _ = full.result()
+            small_psi, small_probe, _, _ = small.result()
+            # Buffers are reused after two more snapshots
+            psi, probe = psi.copy(), probe.copy()
+            context.iterate(1)
+            expected_psi, expected_probe, _, _ = context.peek()
+            latest_psi, latest_probe, _, _ = context.snapshot().result()
+
+        np.testing.assert_array_equal(latest_psi, expected_psi)
+        np.testing.assert_array_equal(latest_probe, expected_probe)
+        assert small_psi.shape == (
+            psi.shape[0] // downsample,
+            psi.shape[1] // downsample,
+        )
+        assert small_probe.shape[-1] == probe.shape[-1] // downsample
+        np.testing.assert_allclose(
+            small_psi,
+            psi.reshape(
+                psi.shape[0] // downsample,
+                downsample,
+                psi.shape[1] // downsample,
+                downsample,
+            ).mean(axis=(1, 3)),
+            rtol=1e-5,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
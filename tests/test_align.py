@@ -93,6 +93,23 @@ class TestAlignRecon(unittest.TestCase):
                                    self.flow[:, 0, 0] + self.shift,
                                    atol=1e-1)
 
+    def test_align_cross_correlation_batched(self):
+        """Check that align.solvers.cross_correlation aligns stacks on CPU."""
+        result = tike.align.solvers.cross_correlation(
+            op=None,
+            unaligned=np.tile(self.data, (2, 3, 1, 1)),
+            original=np.tile(self.original, (2, 3, 1, 1)),
+            upsample_factor=1e3,
+        )
+        shift = result['shift']
+        assert shift.dtype == 'float32', shift.dtype
+        np.testing.assert_array_equal(shift.shape, (2, 3, 2))
+        np.testing.assert_allclose(
+            shift,
+            np.broadcast_to(self.flow[:, 0, 0] + self.shift, shift.shape),
+            atol=1e-1,
+        )
+
     def test_align_farneback(self):
         """Check that align.solvers.farneback works."""
         result = tike.align.solvers.farneback(
@@ -108,6 +125,38 @@ class TestAlignRecon(unittest.TestCase):
                                    self.flow[:, 0, 0] + self.shift,
                                    atol=1e-1)
 
+    def test_align_farneback_parallel(self):
+        """Check that align.solvers.farneback is the same for any workers."""
+        original = np.tile(np.angle(self.original), (4, 1, 1))
+        unaligned = np.tile(np.angle(self.data), (4, 1, 1))
+        serial = tike.align.solvers.farneback(
+            op=None,
+            unaligned=unaligned,
+            original=original,
+            num_workers=1,
+        )['flow']
+        parallel = tike.align.solvers.farneback(
+            op=None,
+            unaligned=unaligned,
+            original=original,
+            num_workers=4,
+        )['flow']
+        np.testing.assert_array_equal(parallel, serial)
+        # Warm start from the previous flow without rescaling
+        result = tike.align.solvers.farneback(
+            op=None,
+            unaligned=unaligned,
+            original=original,
+            flow=serial,
+            rescale=False,
+            num_workers=4,
+        )['flow']
+        assert result.dtype == 'float32', result.dtype
+        h, w = result.shape[1:3]
+        np.testing.assert_allclose(result[:, h // 2, w // 2, :],
+                                   serial[:, h // 2, w // 2, :],
+                                   atol=1e-1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+import numpy as np
+
+import tike.precision
+
+
+class TestPrecision(unittest.TestCase):
+    """Test the floating point policy of a reconstruction."""
+
+    def test_defaults_follow_floating(self):
+        policy = tike.precision.Precision(floating='float64')
+        assert policy.wavefront == np.float64
+        assert policy.accumulate == np.float64
+        assert policy.cfloating == np.complex128
+        assert policy.unit_roundoff == np.finfo(np.float64).eps / 2
+
+    def test_mixed(self):
+        policy = tike.precision.Precision(accumulate=np.double)
+        assert policy.floating == tike.precision.floating
+        assert policy.cwavefront == tike.precision.cfloating
+        assert policy.caccumulate == np.complex128
+        assert policy.unit_roundoff == np.finfo(np.float32).eps / 2
+
+    def test_half_is_error(self):
+        with self.assertRaises(ValueError):
+            tike.precision.Precision(wavefront='float16')
+
+
+if __name__ == '__main__':
+    unittest.main()
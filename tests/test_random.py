@@ -113,6 +113,31 @@ class TestWobblyCenter(ClusterTests, unittest.TestCase):
         # We should be more condifent that wobbly samples are the same
         assert np.all(p0 > p1)
 
+    def test_matches_brute_force(self):
+        """Test that pruning the search does not change the clusters."""
+
+        def brute_force(population, num_cluster):
+            labels = np.full(len(population), -1)
+            labels[np.argpartition(
+                np.linalg.norm(population - population.mean(axis=0), axis=1),
+                num_cluster,
+            )[:num_cluster]] = range(num_cluster)
+            for c in range(len(population) - num_cluster):
+                c = c % num_cluster
+                distance = np.linalg.norm(
+                    population - population[labels == c].mean(axis=0),
+                    axis=1,
+                )
+                distance[labels != -1] = -1
+                labels[np.argmax(distance)] = c
+            return [np.flatnonzero(labels == c) for c in range(num_cluster)]
+
+        for a, b in zip(
+                brute_force(self.population, self.num_cluster),
+                tike.cluster.wobbly_center(self.population, self.num_cluster),
+        ):
+            np.testing.assert_array_equal(a, b)
+
 
 class TestWobblyCenterRandomBootstrap(ClusterTests, unittest.TestCase):
 
@@ -215,6 +240,19 @@ class TestClusterCompact(ClusterTests, unittest.TestCase):
             os.makedirs(folder)
         plt.savefig(os.path.join(folder, 'clusters.svg'))
 
+    def test_append(self):
+        """Tests that appended samples fill the existing clusters equally."""
+        num_old = self.num_pop * 3 // 4
+        old = tike.cluster.compact(self.population[:num_old], self.num_cluster)
+        new = tike.cluster.compact_append(self.population, old)
+        assert len(new) == self.num_cluster
+        np.testing.assert_array_equal(
+            np.sort(np.concatenate(new)),
+            np.arange(self.num_pop),
+        )
+        sizes = [len(c) for c in new]
+        assert max(sizes) - min(sizes) <= 1, sizes
+
 
 class TestClusterStripesEqualCount(ClusterTests, unittest.TestCase):
 
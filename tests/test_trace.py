@@ -0,0 +1,51 @@
+import json
+import os
+import tempfile
+import unittest
+
+import tike.trace
+
+
+class TestTracer(unittest.TestCase):
+    """Test the recording of stages of work."""
+
+    def test_nested_stages_count_bytes(self):
+        records = []
+        tracer = tike.trace.Tracer(callbacks=[records.append])
+        tike.trace.count_bytes('host_to_device', 7)
+        with tracer.stage('outer', epoch=3):
+            tike.trace.count_bytes('host_to_device', 5)
+            with tracer.stage('inner'):
+                tike.trace.count_bytes('device_to_host', 11)
+        tike.trace.count_bytes('device_to_host', 13)
+        assert [r['name'] for r in records] == ['inner', 'outer']
+        assert records == tracer.records
+        inner, outer = records
+        assert inner['bytes']['host_to_device'] == 0
+        assert inner['bytes']['device_to_host'] == 11
+        assert outer['bytes']['host_to_device'] == 5
+        assert outer['bytes']['device_to_host'] == 11
+        assert outer['epoch'] == 3
+        assert outer['duration'] >= inner['duration']
+
+    def test_summary_and_export(self):
+        tracer = tike.trace.Tracer()
+        for _ in range(2):
+            with tracer.stage('solver'):
+                tike.trace.count_bytes('device_to_device', 2)
+        summary = tracer.summary()
+        assert summary['solver']['count'] == 2
+        assert summary['solver']['bytes']['device_to_device'] == 4
+        # No pool was given, so no memory was sampled
+        assert summary['solver']['max_reserved_memory'] == 0
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'trace.json')
+            tracer.export(path)
+            with open(path) as f:
+                events = json.load(f)['traceEvents']
+        assert len(events) == 2
+        assert events[0]['ph'] == 'X'
+
+
+if __name__ == '__main__':
+    unittest.main()